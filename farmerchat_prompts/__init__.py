@@ -2,8 +2,22 @@
 FarmerChat Prompts - A prompt management library for agricultural AI applications
 """
 
+from .conversation import Conversation
 from .manager import PromptManager
-from .models import Prompt, PromptMetadata, Provider, UseCase, Domain
+from .models import Prompt, PromptMetadata, Provider, UseCase, Domain, TemplateEngine
+from .parallel import render_parallel
+from .templates import TemplateVariableError
 
 __version__ = "0.2.0"
-__all__ = ["PromptManager", "Prompt", "PromptMetadata", "Provider", "UseCase", "Domain"]
+__all__ = [
+    "PromptManager",
+    "Prompt",
+    "PromptMetadata",
+    "Provider",
+    "UseCase",
+    "Domain",
+    "TemplateEngine",
+    "render_parallel",
+    "TemplateVariableError",
+    "Conversation",
+]
@@ -0,0 +1,9 @@
+"""
+Allow ``python -m farmerchat_prompts``, equivalent to the farmerchat-prompts script
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Keyword Automaton - Aho-Corasick matching of tags and vocabulary terms
+
+All keywords are compiled into one automaton, so a single pass over the
+input finds every occurrence of every keyword. Matching cost grows with the
+length of the text and the number of matches, not with the number of
+keywords.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+from .models import Prompt
+
+# Characters treated as spaces in keywords and text
+_SEPARATORS = str.maketrans({"-": " ", "_": " "})
+
+
+def normalize_keyword(text: str) -> str:
+    """
+    Lowercase text and turn hyphens and underscores into spaces
+
+    The result always has the same length as the input, so offsets found in
+    normalized text are valid in the original.
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters ("İ") lowercase to more than one code point
+        lowered = "".join(char.lower()[:1] for char in text)
+    return lowered.translate(_SEPARATORS)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum()
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of keywords
+
+    Matches are case-insensitive, treat "-" and "_" as spaces, and only count
+    at word boundaries ("rust" does not match inside "trust").
+
+    Usage:
+        automaton = KeywordAutomaton(["stem borer", "borer", "rice"])
+        automaton.find("Stem-borer in my rice")
+        # [(0, 0, 10), (1, 5, 10), (2, 17, 21)]
+    """
+
+    __slots__ = ("keywords", "_goto", "_fail", "_output")
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Args:
+            keywords: Keywords to match. They are normalized and duplicates
+                are dropped; find() reports indexes into ``self.keywords``.
+        """
+        unique: Dict[str, None] = {}
+        for keyword in keywords:
+            normalized = " ".join(normalize_keyword(keyword).split())
+            if normalized:
+                unique[normalized] = None
+        self.keywords: Tuple[str, ...] = tuple(unique)
+
+        # Trie
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append(index)
+
+        # Failure links, breadth first; outputs of suffix states are merged
+        # in so a match never has to walk the failure chain
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+                output[next_state] = output[next_state] + output[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [tuple(indexes) for indexes in output]
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Find every keyword occurrence in one pass over the text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            (keyword_index, start, end) tuples ordered by end offset, longer
+            keywords first for the same end
+        """
+        normalized = normalize_keyword(text)
+        length = len(normalized)
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        matches = []
+        state = 0
+        for position, char in enumerate(normalized):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            if end < length and _is_word_char(normalized[end]):
+                continue
+            for index in output[state]:
+                start = end - len(self.keywords[index])
+                if start == 0 or not _is_word_char(normalized[start - 1]):
+                    matches.append((index, start, end))
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+
+class KeywordMatch(NamedTuple):
+    """A keyword found in text"""
+    keyword: str
+    """Normalized keyword, e.g. "pest control" for the tag "pest-control\""""
+    start: int
+    end: int
+    tags: Tuple[str, ...]
+    """Prompt tags spelled this way"""
+    prompts: Tuple[Prompt, ...]
+    """Prompts carrying one of those tags"""
+    vocabularies: Tuple[str, ...]
+    """Names of the vocabularies containing the keyword"""
+
+
+class KeywordIndex:
+    """
+    One automaton over all prompt tags and vocabulary terms, with references
+    from each keyword back to its prompts and vocabularies
+
+    Usage:
+        index = KeywordIndex(manager.catalog, {"pest": ["stem borer"]})
+        for match in index.match("stem borer and pest control in rice"):
+            print(match.keyword, match.vocabularies, match.prompts)
+    """
+
+    def __init__(
+        self,
+        prompts: Iterable[Prompt],
+        vocabularies: Mapping[str, Iterable[str]],
+    ):
+        """
+        Args:
+            prompts: Prompts whose tags are matched
+            vocabularies: Vocabulary name -> terms
+        """
+        tags: Dict[str, List[str]] = {}
+        tagged: Dict[str, List[Prompt]] = {}
+        vocabulary_names: Dict[str, List[str]] = {}
+
+        for prompt in prompts:
+            for tag in prompt.metadata.tags:
+                keyword = " ".join(normalize_keyword(tag).split())
+                if tag not in tags.setdefault(keyword, []):
+                    tags[keyword].append(tag)
+                tagged.setdefault(keyword, []).append(prompt)
+        for name, terms in vocabularies.items():
+            for term in terms:
+                keyword = " ".join(normalize_keyword(term).split())
+                names = vocabulary_names.setdefault(keyword, [])
+                if name not in names:
+                    names.append(name)
+
+        self.automaton = KeywordAutomaton(list(tags) + list(vocabulary_names))
+        self._entries = [
+            (
+                keyword,
+                tuple(tags.get(keyword, ())),
+                tuple(tagged.get(keyword, ())),
+                tuple(vocabulary_names.get(keyword, ())),
+            )
+            for keyword in self.automaton.keywords
+        ]
+
+    def match(self, text: str) -> List[KeywordMatch]:
+        """
+        Return every tag and vocabulary term in the text, in text order
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            KeywordMatches sorted by start offset, longer matches first
+        """
+        matches = []
+        for index, start, end in self.automaton.find(text):
+            keyword, tags, prompts, vocabularies = self._entries[index]
+            matches.append(KeywordMatch(keyword, start, end, tags, prompts, vocabularies))
+        matches.sort(key=lambda match: (match.start, -match.end))
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.automaton)
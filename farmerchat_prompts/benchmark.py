@@ -0,0 +1,127 @@
+"""
+Benchmarks - Micro-benchmarks of the prompt lookup and render paths
+
+A fixed suite of timings for the operations services call per request:
+lookup, formatting, provider structures, JSON serialization, token
+estimation, routing and catalog rebuilds. Each benchmark runs a number of
+iterations several times and keeps the fastest round, which is the least
+disturbed by other processes. Use it to compare commits on one machine;
+absolute numbers vary between hosts.
+
+    farmerchat-prompts bench --iterations 20000
+"""
+
+import json
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from .manager import PromptManager
+from .tokens import estimate_tokens
+
+# Representative request: a fact recall eval row
+BENCH_KEY = ("openai", "fact_recall", "prompt_evals")
+BENCH_ROW = {
+    "category": "pest management",
+    "gold_fact": "Spray neem oil at 5 ml per litre to control aphids on mustard",
+    "pred_facts": "Neem oil spray controls aphids; apply in the evening; repeat after 10 days",
+}
+BENCH_QUERY = "Yellow spots on my tomato leaves and the fruit is rotting, what should I spray?"
+
+
+class BenchmarkResult(NamedTuple):
+    """Timing of one benchmark"""
+
+    name: str
+    iterations: int
+    best_ns: float  # Per call, fastest round
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1e9 / self.best_ns if self.best_ns else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "name": self.name,
+            "iterations": self.iterations,
+            "ns_per_op": round(self.best_ns, 1),
+            "ops_per_second": round(self.ops_per_second, 1),
+        }
+
+
+def _suite(manager: PromptManager) -> Dict[str, Callable[[], object]]:
+    """Benchmark name -> zero-argument callable, bound to one manager"""
+    prompt = manager.get_prompt(*BENCH_KEY)
+    text = prompt.format(**BENCH_ROW)
+    prompts = list(manager.catalog.all_prompts())
+    catalog = manager.catalog
+    return {
+        "get_prompt": lambda: manager.get_prompt(*BENCH_KEY),
+        "format": lambda: prompt.format(**BENCH_ROW),
+        "get_full_prompt": lambda: prompt.get_full_prompt(text),
+        "render_json": lambda: json.dumps(prompt.get_full_prompt(prompt.format(**BENCH_ROW)), ensure_ascii=False),
+        "estimate_tokens": lambda: estimate_tokens(text),
+        "route": lambda: manager.route(BENCH_QUERY),
+        "catalog_rebuild": lambda: type(catalog)(prompts),
+    }
+
+
+BENCHMARKS = (
+    "get_prompt",
+    "format",
+    "get_full_prompt",
+    "render_json",
+    "estimate_tokens",
+    "route",
+    "catalog_rebuild",
+)
+
+
+def run_benchmarks(
+    manager: Optional[PromptManager] = None,
+    names: Optional[Sequence[str]] = None,
+    iterations: int = 10000,
+    rounds: int = 3,
+) -> List[BenchmarkResult]:
+    """
+    Run the benchmark suite
+
+    Args:
+        manager: Manager to benchmark (default: a new PromptManager)
+        names: Benchmarks to run (default: all of BENCHMARKS)
+        iterations: Calls per round; catalog_rebuild runs a hundredth of these
+        rounds: Rounds per benchmark, the fastest is reported
+
+    Returns:
+        One BenchmarkResult per benchmark, in suite order
+
+    Raises:
+        ValueError: If a benchmark name is unknown or a count is below 1
+
+    Example:
+        for result in run_benchmarks(iterations=5000):
+            print(f"{result.name:<16} {result.best_ns:>10.0f} ns")
+    """
+    if iterations < 1 or rounds < 1:
+        raise ValueError("iterations and rounds must be at least 1")
+    names = list(names) if names else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(
+            f"Benchmark '{unknown[0]}' not supported. Available benchmarks: {', '.join(BENCHMARKS)}"
+        )
+
+    suite = _suite(manager if manager is not None else PromptManager())
+    results = []
+    for name in names:
+        function = suite[name]
+        count = max(1, iterations // 100) if name == "catalog_rebuild" else iterations
+        function()  # Warm caches outside the timed rounds
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter_ns()
+            for _ in range(count):
+                function()
+            elapsed = time.perf_counter_ns() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append(BenchmarkResult(name, count, best / count))
+    return results
@@ -0,0 +1,352 @@
+"""
+Prompt Catalog - Immutable snapshot of registered prompts
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from . import instrumentation
+from .models import Prompt, Provider
+from .versioning import LATEST, TrafficSplit, build_resolution_table, sorted_versions
+
+PromptKey = Tuple[str, str, str]  # (provider, domain, use_case)
+VersionKey = Tuple[str, str, str, str]  # (provider, domain, use_case, version)
+CoverageKey = Tuple[str, str]  # (domain, use_case)
+
+# Provider order used for coverage and fallback when no preference is given
+_PROVIDER_ORDER = {provider.value: index for index, provider in enumerate(Provider)}
+# Bound on memoized fallback resolutions per snapshot
+_MAX_FALLBACKS = 4096
+
+
+def _provider_order(provider: str) -> Tuple[int, str]:
+    return (_PROVIDER_ORDER.get(provider, len(_PROVIDER_ORDER)), provider)
+
+_MISSING = object()
+
+
+def prompt_key(prompt: Prompt) -> PromptKey:
+    """Return the (provider, domain, use_case) key a prompt is registered under"""
+    metadata = prompt.metadata
+    return (metadata.provider.value, metadata.domain.value, metadata.use_case.value)
+
+
+def version_key(prompt: Prompt) -> VersionKey:
+    """Return the (provider, domain, use_case, version) key of a prompt"""
+    return prompt_key(prompt) + (prompt.metadata.version,)
+
+
+class PromptCatalog:
+    """
+    Immutable snapshot of prompts keyed by provider, domain and use case
+
+    A catalog is never modified after construction. Adding or overriding
+    prompts builds a new catalog, which PromptManager publishes with a single
+    reference assignment, so readers always see one consistent snapshot
+    without taking a lock.
+
+    Every version of a key is kept. A resolution table mapping version
+    selectors ("1.2.3", "1.2.x", "1", "latest", ...) to prompts is
+    precomputed per key, so resolving a version is a dict lookup.
+
+    Indexes derived from a snapshot (search indexes, lookup tables, ...) are
+    built lazily through ``derived()`` and live as long as the snapshot does.
+
+    Usage:
+        catalog = PromptCatalog(OPENAI_PROMPTS)
+        catalog = catalog.with_prompts(LLAMA_PROMPTS)
+        prompt = catalog.get("openai", "crop_advisory", "crop_recommendation")
+        pinned = catalog.resolve("openai", "crop_advisory", "crop_recommendation", "1.x")
+    """
+
+    __slots__ = (
+        "_versions", "_resolution", "_entries", "_tree", "_splits",
+        "_derived", "_derived_lock",
+    )
+
+    def __init__(
+        self,
+        prompts: Iterable[Prompt] = (),
+        splits: Optional[Mapping[PromptKey, Mapping[str, float]]] = None
+    ):
+        """
+        Args:
+            prompts: Prompts to include. A later prompt with the same key and
+                version replaces an earlier one.
+            splits: Optional traffic split weights per key, as
+                {key: {version_selector: weight}}
+        """
+        versions: Dict[PromptKey, Dict[str, Prompt]] = {}
+        for prompt in prompts:
+            versions.setdefault(prompt_key(prompt), {})[prompt.metadata.version] = prompt
+
+        resolution = {key: build_resolution_table(by_version) for key, by_version in versions.items()}
+        entries = {key: table[LATEST] for key, table in resolution.items()}
+
+        tree: Dict[str, Dict[str, Dict[str, Prompt]]] = {}
+        for (provider, domain, use_case), prompt in entries.items():
+            tree.setdefault(provider, {}).setdefault(domain, {})[use_case] = prompt
+
+        self._versions: Mapping[PromptKey, Mapping[str, Prompt]] = MappingProxyType({
+            key: MappingProxyType(by_version) for key, by_version in versions.items()
+        })
+        self._resolution: Mapping[PromptKey, Mapping[str, Prompt]] = MappingProxyType({
+            key: MappingProxyType(table) for key, table in resolution.items()
+        })
+        self._entries: Mapping[PromptKey, Prompt] = MappingProxyType(entries)
+        self._tree: Mapping[str, Mapping[str, Mapping[str, Prompt]]] = MappingProxyType({
+            provider: MappingProxyType({
+                domain: MappingProxyType(use_cases)
+                for domain, use_cases in domains.items()
+            })
+            for provider, domains in tree.items()
+        })
+        self._splits: Mapping[PromptKey, TrafficSplit] = MappingProxyType(
+            self._build_splits(splits or {})
+        )
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.Lock()
+
+    def _build_splits(self, splits: Mapping[PromptKey, Mapping[str, float]]) -> Dict[PromptKey, TrafficSplit]:
+        """Resolve split selectors against this snapshot, skipping ones that no longer exist"""
+        built = {}
+        for key, weights in splits.items():
+            table = self._resolution.get(key)
+            if table is None:
+                continue
+            live = {selector: weight for selector, weight in weights.items() if selector in table}
+            if not live or sum(live.values()) <= 0:
+                continue
+            built[key] = TrafficSplit(
+                "/".join(key), live, [table[selector] for selector in live]
+            )
+        return built
+
+    @property
+    def tree(self) -> Mapping[str, Mapping[str, Mapping[str, Prompt]]]:
+        """Read-only view of latest versions: {provider: {domain: {use_case: Prompt}}}"""
+        return self._tree
+
+    @property
+    def entries(self) -> Mapping[PromptKey, Prompt]:
+        """Read-only view of latest versions keyed by (provider, domain, use_case)"""
+        return self._entries
+
+    @property
+    def splits(self) -> Mapping[PromptKey, TrafficSplit]:
+        """Traffic splits keyed by (provider, domain, use_case)"""
+        return self._splits
+
+    def get(self, provider: str, domain: str, use_case: str) -> Optional[Prompt]:
+        """Return the latest version for a key, or None if it is not registered"""
+        return self._entries.get((provider, domain, use_case))
+
+    def resolve(
+        self,
+        provider: str,
+        domain: str,
+        use_case: str,
+        version: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Optional[Prompt]:
+        """
+        Resolve a prompt version with a single table lookup
+
+        Args:
+            provider: Provider name
+            domain: Domain name
+            use_case: Use case name
+            version: Exact version, selector ("1.2", "1.2.x", "1") or "latest".
+                When omitted, a traffic split for the key (if any) assigns the
+                version by user_id; otherwise the latest version is used.
+            user_id: Sticky identifier used for traffic splitting
+
+        Returns:
+            Prompt, or None if the key or version is not registered
+        """
+        key = (provider, domain, use_case)
+        if version is None:
+            if user_id is not None:
+                split = self._splits.get(key)
+                if split is not None:
+                    return split.choose(user_id)
+            return self._entries.get(key)
+        table = self._resolution.get(key)
+        if table is None:
+            return None
+        return table.get(version)
+
+    def get_version(self, provider: str, domain: str, use_case: str, version: str) -> Optional[Prompt]:
+        """Return one exact version of a key, or None if it is not registered"""
+        return self._versions.get((provider, domain, use_case), {}).get(version)
+
+    def versions(self, provider: str, domain: str, use_case: str) -> List[str]:
+        """Return all registered versions of a key, oldest first"""
+        return sorted_versions(self._versions.get((provider, domain, use_case), {}))
+
+    def all_prompts(self) -> Iterator[Prompt]:
+        """Iterate over every version of every prompt"""
+        for by_version in self._versions.values():
+            yield from by_version.values()
+
+    def with_prompts(self, prompts: Iterable[Prompt]) -> "PromptCatalog":
+        """Return a new catalog with prompts added, replacing identical key+version pairs"""
+        return PromptCatalog(list(self.all_prompts()) + list(prompts), self._split_weights())
+
+    def without(self, keys: Iterable[Union[PromptKey, VersionKey]]) -> "PromptCatalog":
+        """
+        Return a new catalog with entries removed
+
+        Args:
+            keys: (provider, domain, use_case) keys remove every version;
+                (provider, domain, use_case, version) keys remove one version
+        """
+        removed_keys = set()
+        removed_versions = set()
+        for key in keys:
+            (removed_versions if len(key) == 4 else removed_keys).add(tuple(key))
+        return PromptCatalog(
+            (
+                prompt for key, by_version in self._versions.items()
+                if key not in removed_keys
+                for version, prompt in by_version.items()
+                if key + (version,) not in removed_versions
+            ),
+            self._split_weights(),
+        )
+
+    def with_split(self, key: PromptKey, weights: Optional[Mapping[str, float]]) -> "PromptCatalog":
+        """
+        Return a new catalog with a traffic split set (or removed when weights is None)
+
+        Raises:
+            ValueError: If the key or any selector is not registered
+        """
+        splits = self._split_weights()
+        if weights is None:
+            splits.pop(key, None)
+        else:
+            table = self._resolution.get(key)
+            if table is None:
+                raise ValueError(f"Prompt '{'/'.join(key)}' not found")
+            unknown = [selector for selector in weights if selector not in table]
+            if unknown:
+                raise ValueError(
+                    f"Versions not found for '{'/'.join(key)}': {', '.join(unknown)}. "
+                    f"Available versions: {', '.join(self.versions(*key))}"
+                )
+            splits[key] = dict(weights)
+        return PromptCatalog(self.all_prompts(), splits)
+
+    def _split_weights(self) -> Dict[PromptKey, Dict[str, float]]:
+        return {key: dict(split.weights) for key, split in self._splits.items()}
+
+    def derived(self, name: str, factory: Callable[["PromptCatalog"], Any]) -> Any:
+        """
+        Return a value derived from this snapshot, building it on first use
+
+        Args:
+            name: Cache name for the derived value
+            factory: Callable receiving this catalog and returning the value
+
+        Returns:
+            The cached derived value
+        """
+        value = self._derived.get(name, _MISSING)
+        if value is _MISSING:
+            with self._derived_lock:
+                value = self._derived.get(name, _MISSING)
+                if value is _MISSING:
+                    value = factory(self)
+                    self._derived[name] = value
+            if instrumentation.hooks:
+                instrumentation.record_cache(name, False)
+        elif instrumentation.hooks:
+            instrumentation.record_cache(name, True)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Prompt]:
+        return iter(self._entries.values())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __repr__(self) -> str:
+        return f"PromptCatalog(prompts={len(self._entries)})"
+
+
+class CoverageMatrix:
+    """
+    Which providers serve each (domain, use_case) of a catalog snapshot
+
+    Built once per snapshot (see PromptCatalog.derived). ``providers`` lists
+    the available providers of each key in Provider order, and resolving a
+    fallback through a preference list is memoized, so repeated lookups
+    with the same preferences are a single dict lookup.
+
+    Usage:
+        coverage = CoverageMatrix(catalog)
+        coverage.providers[("crop_advisory", "pest_management")]  # ('openai', 'llama', 'gemma')
+        prompt = coverage.resolve(("gemma", "llama"), "crop_advisory", "pest_management")
+    """
+
+    __slots__ = ("providers", "_prompts", "_fallbacks")
+
+    def __init__(self, catalog: PromptCatalog):
+        prompts: Dict[CoverageKey, Dict[str, Prompt]] = {}
+        for (provider, domain, use_case), prompt in catalog.entries.items():
+            prompts.setdefault((domain, use_case), {})[provider] = prompt
+        self.providers: Mapping[CoverageKey, Tuple[str, ...]] = MappingProxyType({
+            key: tuple(sorted(by_provider, key=_provider_order)) for key, by_provider in sorted(prompts.items())
+        })
+        self._prompts: Mapping[CoverageKey, Mapping[str, Prompt]] = MappingProxyType(prompts)
+        self._fallbacks: Dict[Tuple[Tuple[Union[str, Provider], ...], str, str], Prompt] = {}
+
+    def resolve(self, preferred: Tuple[Union[str, Provider], ...], domain: str, use_case: str) -> Optional[Prompt]:
+        """
+        Latest prompt of the first preferred provider serving a key
+
+        Args:
+            preferred: Provider names or Provider members in order of
+                preference; empty for any provider, in Provider order
+            domain: Domain name
+            use_case: Use case name
+
+        Returns:
+            Prompt, or None if no preferred provider serves the key
+        """
+        key = (preferred, domain, use_case)
+        prompt = self._fallbacks.get(key)
+        if prompt is not None:
+            return prompt
+        by_provider = self._prompts.get((domain, use_case))
+        if by_provider is None:
+            return None
+        for provider in preferred or self.providers[(domain, use_case)]:
+            prompt = by_provider.get(provider.value if isinstance(provider, Provider) else provider)
+            if prompt is not None:
+                break
+        else:
+            return None
+        if len(self._fallbacks) >= _MAX_FALLBACKS:
+            self._fallbacks.clear()
+        self._fallbacks[key] = prompt
+        return prompt
+
+    def matrix(self) -> Dict[str, Dict[str, Dict[str, bool]]]:
+        """{domain: {use_case: {provider: available}}} over every provider in the snapshot"""
+        providers = sorted(
+            {provider for available in self.providers.values() for provider in available},
+            key=_provider_order,
+        )
+        matrix: Dict[str, Dict[str, Dict[str, bool]]] = {}
+        for (domain, use_case), available in self.providers.items():
+            matrix.setdefault(domain, {})[use_case] = {provider: provider in available for provider in providers}
+        return matrix
+
+    def __repr__(self) -> str:
+        return f"CoverageMatrix(keys={len(self.providers)})"
@@ -0,0 +1,433 @@
+"""
+Command Line - The ``farmerchat-prompts`` console script
+
+    farmerchat-prompts list [--provider P] [--domain D] [--use-case U] [--json]
+    farmerchat-prompts show PROVIDER USE_CASE [DOMAIN] [--version V] [--variant V] [--json]
+    farmerchat-prompts render PROVIDER USE_CASE [DOMAIN] [-i rows.jsonl] [-o out.jsonl] [--workers N]
+    farmerchat-prompts tokens PROVIDER USE_CASE [DOMAIN] [-i rows.jsonl] [--json]
+    farmerchat-prompts cost --key PROVIDER USE_CASE [DOMAIN] ... [-i rows.jsonl] [--prices prices.json]
+    farmerchat-prompts snapshot build -o catalog.json
+    farmerchat-prompts snapshot verify catalog.json
+    farmerchat-prompts bench [--iterations N] [--only NAME ...] [--json]
+
+Every subcommand accepts ``--prompt-dir`` (repeatable) to add prompt files
+to the built-in catalog. ``render`` and ``tokens`` read JSONL rows of
+template variables from a file or stdin ("-", the default) and stream them
+through worker processes, so they fit shell pipelines over files of any
+size:
+
+    zcat rows.jsonl.gz | farmerchat-prompts render openai fact_recall prompt_evals --workers 8 > prompts.jsonl
+
+A snapshot is a JSON prompt file holding every version in the catalog with
+its fingerprint, plus a digest over all of them. ``snapshot verify`` checks
+the file is intact and that the catalog still matches it, and exits with
+status 1 if not, so deploys can pin the prompts they were tested with.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .catalog import PromptCatalog, version_key
+from .loader import parse_prompt_data
+from .manager import PromptManager
+from .models import Prompt
+from .parallel import RENDER_MODES, render_parallel
+from .tokens import estimate_tokens
+
+PROG = "farmerchat-prompts"
+SNAPSHOT_FORMAT = 1
+
+
+@contextmanager
+def _open(path: str, mode: str = "r") -> Iterator[IO[str]]:
+    """Open a file, or use stdin/stdout for "-" without closing it"""
+    if path == "-":
+        yield sys.stdin if mode == "r" else sys.stdout
+        return
+    with open(path, mode, encoding="utf-8") as handle:
+        yield handle
+
+
+def read_rows(handle: IO[str], source: str = "<stdin>") -> Iterator[Dict[str, Any]]:
+    """
+    Lazily parse JSONL rows of template variables, skipping blank lines
+
+    Raises:
+        ValueError: If a line is not a JSON object
+    """
+    for number, line in enumerate(handle, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"Invalid JSON on line {number} of {source}: {exc}") from None
+        if not isinstance(row, dict):
+            raise ValueError(f"Line {number} of {source} is not a JSON object")
+        yield row
+
+
+def _key_name(key: Tuple[str, ...]) -> str:
+    return "/".join(key)
+
+
+def _lookup(manager: PromptManager, args: argparse.Namespace) -> Prompt:
+    return manager.get_prompt(
+        args.provider, args.use_case, args.domain,
+        version=getattr(args, "version", None), variant=getattr(args, "variant", None),
+    )
+
+
+def _percentile(ordered: Sequence[int], fraction: float) -> int:
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# Snapshots
+
+def _snapshot_digest(fingerprints: Dict[str, str]) -> str:
+    lines = "".join(f"{key} {fingerprint}\n" for key, fingerprint in sorted(fingerprints.items()))
+    return hashlib.sha256(lines.encode("utf-8")).hexdigest()
+
+
+def _fingerprints(prompts: Iterable[Prompt]) -> Dict[str, str]:
+    """{"provider/domain/use_case@version": fingerprint}"""
+    fingerprints = {}
+    for prompt in prompts:
+        *key, version = version_key(prompt)
+        fingerprints[f"{_key_name(tuple(key))}@{version}"] = prompt.fingerprint
+    return fingerprints
+
+
+def build_snapshot(catalog: PromptCatalog) -> Dict[str, Any]:
+    """
+    Serializable snapshot of every prompt version in a catalog
+
+    The result is a valid prompt file (see loader.parse_prompt_data) with a
+    "snapshot" header of fingerprints and their digest.
+    """
+    prompts = sorted(catalog.all_prompts(), key=version_key)
+    fingerprints = _fingerprints(prompts)
+    from . import __version__
+
+    return {
+        "snapshot": {
+            "format": SNAPSHOT_FORMAT,
+            "package_version": __version__,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "count": len(prompts),
+            "digest": _snapshot_digest(fingerprints),
+            "fingerprints": fingerprints,
+        },
+        "prompts": [prompt.model_dump(mode="json") for prompt in prompts],
+    }
+
+
+def verify_snapshot(data: Any, catalog: PromptCatalog, source: str = "<snapshot>") -> List[str]:
+    """
+    Check a snapshot is intact and matches a catalog
+
+    Returns:
+        One message per problem; empty if the snapshot verifies
+
+    Raises:
+        ValueError: If the data is not a snapshot
+    """
+    header = data.get("snapshot") if isinstance(data, dict) else None
+    if not isinstance(header, dict):
+        raise ValueError(f"'{source}' is not a prompt catalog snapshot")
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(
+            f"Snapshot format '{header.get('format')}' not supported. Available formats: {SNAPSHOT_FORMAT}"
+        )
+
+    problems = []
+    recorded: Dict[str, str] = header.get("fingerprints", {})
+    stored = _fingerprints(parse_prompt_data(data, source=source))
+    if _snapshot_digest(recorded) != header.get("digest"):
+        problems.append("digest does not match the recorded fingerprints")
+    for key in sorted(set(recorded) | set(stored)):
+        if recorded.get(key) != stored.get(key):
+            problems.append(f"{key}: stored prompt does not match its recorded fingerprint")
+
+    current = _fingerprints(catalog.all_prompts())
+    for key in sorted(set(recorded) | set(current)):
+        if key not in current:
+            problems.append(f"{key}: missing from the catalog")
+        elif key not in recorded:
+            problems.append(f"{key}: not in the snapshot")
+        elif current[key] != recorded[key]:
+            problems.append(f"{key}: changed ({recorded[key]} -> {current[key]})")
+    return problems
+
+
+# Subcommands
+
+def _cmd_list(manager: PromptManager, args: argparse.Namespace) -> int:
+    catalog = manager.catalog
+    rows = []
+    for key in sorted(catalog.entries):
+        provider, domain, use_case = key
+        if (args.provider and provider != args.provider) or (args.domain and domain != args.domain) \
+                or (args.use_case and use_case != args.use_case):
+            continue
+        prompt = catalog.entries[key]
+        rows.append({
+            "provider": provider,
+            "domain": domain,
+            "use_case": use_case,
+            "version": prompt.metadata.version,
+            "versions": catalog.versions(*key),
+            "fingerprint": prompt.fingerprint,
+            "system_tokens": estimate_tokens(prompt.system_prompt),
+        })
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+    columns = ("provider", "domain", "use_case", "version", "system_tokens", "fingerprint")
+    table = [columns] + [tuple(str(row[column]) for column in columns) for row in rows]
+    widths = [max(len(line[index]) for line in table) for index in range(len(columns))]
+    for line in table:
+        print("  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip())
+    return 0
+
+
+def _cmd_show(manager: PromptManager, args: argparse.Namespace) -> int:
+    from .serve import prompt_payload
+
+    prompt = _lookup(manager, args)
+    if args.json:
+        json.dump(prompt_payload(prompt), sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return 0
+    metadata = prompt.metadata
+    print(f"{metadata.provider.value}/{metadata.domain.value}/{metadata.use_case.value} "
+          f"v{metadata.version} ({prompt.fingerprint})")
+    print(metadata.description)
+    print(f"\nVariables: {', '.join(sorted(prompt.template_fields.fields)) or '-'}")
+    print(f"\n--- System prompt ({estimate_tokens(prompt.system_prompt)} tokens) ---")
+    print(prompt.system_prompt)
+    print("\n--- User prompt template ---")
+    print(prompt.user_prompt_template)
+    return 0
+
+
+def _cmd_render(manager: PromptManager, args: argparse.Namespace) -> int:
+    prompt = _lookup(manager, args)
+    source = "<stdin>" if args.input == "-" else args.input
+    with _open(args.input) as handle, _open(args.output, "w") as output:
+        results = render_parallel(
+            prompt, read_rows(handle, source), workers=args.workers,
+            chunksize=args.chunksize, mode=args.mode,
+        )
+        write = output.write
+        for result in results:
+            write((result if args.mode == "json" else json.dumps(result, ensure_ascii=False)) + "\n")
+    return 0
+
+
+def _cmd_tokens(manager: PromptManager, args: argparse.Namespace) -> int:
+    prompt = _lookup(manager, args)
+    system_tokens = estimate_tokens(prompt.system_prompt)
+    source = "<stdin>" if args.input == "-" else args.input
+    with _open(args.input) as handle:
+        counts = sorted(
+            system_tokens + estimate_tokens(text)
+            for text in render_parallel(
+                prompt, read_rows(handle, source), workers=args.workers, chunksize=args.chunksize
+            )
+        )
+    total = sum(counts)
+    report = {
+        "rows": len(counts),
+        "total_tokens": total,
+        "mean_tokens": round(total / len(counts), 1) if counts else 0.0,
+        "p50_tokens": _percentile(counts, 0.5),
+        "p95_tokens": _percentile(counts, 0.95),
+        "max_tokens": counts[-1] if counts else 0,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, value in report.items():
+            print(f"{name:<14} {value}")
+    return 0
+
+
+def _cmd_cost(manager: PromptManager, args: argparse.Namespace) -> int:
+    from .cost import estimate_cost, load_prices
+
+    keys = []
+    for key in args.key:
+        if not 2 <= len(key) <= 3:
+            raise ValueError(f"--key {' '.join(key)}: expected PROVIDER USE_CASE [DOMAIN]")
+        keys.append(tuple(key))
+    prices, models = load_prices(args.prices) if args.prices else ({}, {})
+    for mapping in args.model:
+        name, separator, model = mapping.partition("=")
+        if not separator:
+            raise ValueError(f"--model {mapping}: expected PROVIDER=MODEL")
+        models[name] = model
+
+    source = sys.stdin.buffer if args.input == "-" else args.input
+    report = estimate_cost(
+        source, keys, prices=prices, models=models,
+        output_tokens=args.output_tokens, workers=args.workers, manager=manager,
+    )
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+        return 0
+    print(f"{'prompt':<40} {'model':<16} {'rows':>9} {'tokens':>12} {'p50':>6} {'p99':>6} {'cost':>12}")
+    for key in report.keys:
+        print(f"{key.key:<40} {key.model:<16} {key.rows:>9} {key.input_tokens:>12} "
+              f"{key.p50_tokens:>6} {key.p99_tokens:>6} {key.cost:>12.4f}")
+    print(f"{'total':<40} {'':<16} {report.rows:>9} {report.input_tokens:>12} "
+          f"{'':>6} {'':>6} {report.cost:>12.4f}")
+    if report.invalid_rows:
+        print(f"{report.invalid_rows} invalid lines skipped", file=sys.stderr)
+    return 0
+
+
+def _cmd_snapshot(manager: PromptManager, args: argparse.Namespace) -> int:
+    if args.action == "build":
+        snapshot = build_snapshot(manager.catalog)
+        with _open(args.output, "w") as output:
+            json.dump(snapshot, output, indent=2, ensure_ascii=False)
+            output.write("\n")
+        if args.output != "-":
+            print(f"Wrote {snapshot['snapshot']['count']} prompts to {args.output} "
+                  f"(digest {snapshot['snapshot']['digest'][:12]})", file=sys.stderr)
+        return 0
+
+    with _open(args.path) as handle:
+        data = json.load(handle)
+    problems = verify_snapshot(data, manager.catalog, source=args.path)
+    for problem in problems:
+        print(problem)
+    if problems:
+        return 1
+    print(f"OK: {data['snapshot']['count']} prompts match {args.path}")
+    return 0
+
+
+def _cmd_bench(manager: PromptManager, args: argparse.Namespace) -> int:
+    from .benchmark import run_benchmarks
+
+    results = run_benchmarks(manager, args.only, iterations=args.iterations, rounds=args.rounds)
+    if args.json:
+        print(json.dumps([result.to_dict() for result in results], indent=2))
+        return 0
+    print(f"{'benchmark':<16} {'iterations':>10} {'ns/op':>12} {'ops/s':>12}")
+    for result in results:
+        print(f"{result.name:<16} {result.iterations:>10} {result.best_ns:>12.0f} {result.ops_per_second:>12.0f}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--prompt-dir", action="append", default=[],
+        help="Directory of prompt files to add; may be repeated",
+    )
+
+    def add_key(parser: argparse.ArgumentParser):
+        parser.add_argument("provider", help="Provider (openai, llama, gemma)")
+        parser.add_argument("use_case", help="Use case")
+        parser.add_argument("domain", nargs="?", default="crop_advisory", help="Domain (default: crop_advisory)")
+        parser.add_argument("--version", help="Version selector (default: latest)")
+
+    def add_input(parser: argparse.ArgumentParser):
+        parser.add_argument("-i", "--input", default="-", help="JSONL rows of template variables (default: stdin)")
+        parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+        parser.add_argument("--chunksize", type=int, default=512, help="Rows per worker task")
+
+    parser = argparse.ArgumentParser(prog=PROG, description="Inspect, render and benchmark FarmerChat prompts")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    listing = commands.add_parser("list", parents=[common], help="List the prompt catalog")
+    listing.add_argument("--provider", help="Only this provider")
+    listing.add_argument("--domain", help="Only this domain")
+    listing.add_argument("--use-case", help="Only this use case")
+    listing.add_argument("--json", action="store_true", help="Print JSON")
+    listing.set_defaults(handler=_cmd_list)
+
+    show = commands.add_parser("show", parents=[common], help="Show one prompt")
+    add_key(show)
+    show.add_argument("--variant", help="Compressed variant (e.g. minimal)")
+    show.add_argument("--json", action="store_true", help="Print JSON")
+    show.set_defaults(handler=_cmd_show)
+
+    render = commands.add_parser("render", parents=[common], help="Render JSONL rows to JSONL prompts")
+    add_key(render)
+    add_input(render)
+    render.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout)")
+    render.add_argument("--mode", choices=RENDER_MODES, default="json", help="Output per row (default: json)")
+    render.set_defaults(handler=_cmd_render)
+
+    tokens = commands.add_parser("tokens", parents=[common], help="Estimate prompt tokens for a dataset")
+    add_key(tokens)
+    add_input(tokens)
+    tokens.add_argument("--json", action="store_true", help="Print JSON")
+    tokens.set_defaults(handler=_cmd_tokens)
+
+    cost = commands.add_parser("cost", parents=[common], help="Estimate tokens and cost of a dataset")
+    cost.add_argument(
+        "--key", action="append", nargs="+", required=True, metavar="NAME",
+        help="PROVIDER USE_CASE [DOMAIN] to price each row with; may be repeated",
+    )
+    cost.add_argument("-i", "--input", default="-", help="JSONL rows of template variables (default: stdin)")
+    cost.add_argument("--prices", help="Price table file: {\"prices\": {model: {\"input\", \"output\"}}}")
+    cost.add_argument("--model", action="append", default=[], metavar="PROVIDER=MODEL", help="Price a provider as a model")
+    cost.add_argument("--output-tokens", type=int, default=0, help="Expected completion tokens per call")
+    cost.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    cost.add_argument("--json", action="store_true", help="Print JSON")
+    cost.set_defaults(handler=_cmd_cost)
+
+    snapshot = commands.add_parser("snapshot", help="Build or verify a catalog snapshot")
+    actions = snapshot.add_subparsers(dest="action", required=True, metavar="ACTION")
+    build = actions.add_parser("build", parents=[common], help="Write a snapshot of the catalog")
+    build.add_argument("-o", "--output", default="-", help="Snapshot file (default: stdout)")
+    verify = actions.add_parser("verify", parents=[common], help="Check the catalog against a snapshot")
+    verify.add_argument("path", help="Snapshot file, or - for stdin")
+    snapshot.set_defaults(handler=_cmd_snapshot)
+
+    bench = commands.add_parser("bench", parents=[common], help="Run the benchmark suite")
+    bench.add_argument("--iterations", type=int, default=10000, help="Calls per round")
+    bench.add_argument("--rounds", type=int, default=3, help="Rounds per benchmark; the fastest is reported")
+    bench.add_argument("--only", nargs="+", metavar="NAME", help="Benchmarks to run")
+    bench.add_argument("--json", action="store_true", help="Print JSON")
+    bench.set_defaults(handler=_cmd_bench)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point of the ``farmerchat-prompts`` console script
+
+    Returns:
+        Exit status: 0 on success, 1 on errors or a failed snapshot check
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        manager = PromptManager(prompt_dirs=args.prompt_dir)
+        return args.handler(manager, args)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); silence the flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except (ValueError, OSError) as exc:
+        print(f"{PROG}: error: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
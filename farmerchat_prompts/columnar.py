@@ -0,0 +1,225 @@
+"""
+Columnar rendering - Batch prompt rendering over Arrow, pandas and NumPy data
+
+pyarrow, pandas and numpy are optional. Inputs are recognised by their shape,
+so none of them is imported unless the caller asks for that output type.
+"""
+
+import json
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from .models import Prompt
+from .templates import TemplateVariableError
+
+OUTPUT_MODES = ("text", "full", "json")
+
+# Sentinel used to split a provider payload into a JSON prefix and suffix
+_SENTINEL = "\u0000farmerchat-user-input\u0000"
+
+
+def _is_arrow(data: Any) -> bool:
+    return hasattr(data, "column_names") and hasattr(data, "column")
+
+
+def _is_pandas(data: Any) -> bool:
+    return hasattr(data, "columns") and hasattr(data, "index") and hasattr(data, "iloc")
+
+
+def _to_list(values: Any) -> List[Any]:
+    """Convert one column to a Python list without touching other columns"""
+    if hasattr(values, "to_pylist"):          # pyarrow Array / ChunkedArray
+        values = values.to_pylist()
+    elif hasattr(values, "tolist"):           # numpy array / pandas Series
+        values = values.tolist()
+    elif not isinstance(values, list):
+        values = list(values)
+    return values
+
+
+def _column_names(data: Any) -> Sequence[str]:
+    if _is_arrow(data):
+        return list(data.column_names)
+    if _is_pandas(data):
+        return [str(name) for name in data.columns]
+    if isinstance(data, Mapping):
+        return list(data.keys())
+    raise TypeError(
+        f"Unsupported input type '{type(data).__name__}'. "
+        f"Expected a pyarrow Table, pandas DataFrame or dict of arrays"
+    )
+
+
+def _get_column(data: Any, name: str) -> Any:
+    if _is_arrow(data):
+        return data.column(name)
+    return data[name]
+
+
+def _row_count(data: Any) -> int:
+    if _is_arrow(data):
+        return data.num_rows
+    if _is_pandas(data):
+        return len(data.index)
+    # A dict of arrays has no shape of its own, so every column must agree
+    length = None
+    for name, values in data.items():
+        if length is None:
+            first, length = name, len(values)
+        elif len(values) != length:
+            raise ValueError(
+                f"Column '{name}' has {len(values)} rows but column '{first}' has {length}. "
+                f"All columns must have the same length"
+            )
+    return length or 0
+
+
+def _json_payload_parts(prompt: Prompt):
+    """
+    Split the serialized provider payload around the user input
+
+    Returns (prefix, suffix) such that
+    ``prefix + json.dumps(text)[1:-1] + suffix`` equals
+    ``json.dumps(prompt.get_full_prompt(text))``, or None when the payload
+    does not contain the user input exactly once.
+    """
+    payload = json.dumps(prompt.get_full_prompt(_SENTINEL), ensure_ascii=False)
+    marker = json.dumps(_SENTINEL, ensure_ascii=False)[1:-1]
+    if payload.count(marker) != 1:
+        return None
+    prefix, suffix = payload.split(marker)
+    return prefix, suffix
+
+
+def _as_output_column(data: Any, values: List[Any], output: str, name: str) -> Any:
+    """Return results in the same container family as the input"""
+    if _is_arrow(data) and output != "full":
+        import pyarrow as pa
+        return pa.array(values, type=pa.string())
+    if _is_pandas(data):
+        import pandas as pd
+        return pd.Series(values, index=data.index, name=name)
+    return values
+
+
+def render_columns(
+    prompt: Prompt,
+    data: Any,
+    output: str = "text",
+    columns: Optional[Dict[str, str]] = None,
+    constants: Optional[Dict[str, Any]] = None,
+    name: str = "rendered",
+) -> Any:
+    """
+    Render a prompt for every row of a columnar dataset
+
+    Template fields are mapped to columns once. Each row is then rendered
+    from a positional template over zipped column values, so no per-row
+    keyword dict is built.
+
+    Args:
+        prompt: Prompt whose user_prompt_template is rendered
+        data: pyarrow Table/RecordBatch, pandas DataFrame, or a dict mapping
+            column names to NumPy arrays or sequences
+        output: "text" for rendered user prompts, "full" for provider
+            payload dicts, or "json" for payloads serialized to JSON
+        columns: Optional mapping of template field -> column name, for
+            columns whose names differ from the template fields
+        constants: Values for template fields that are not columns
+            (e.g. {"category": "irrigation"}); optional fields without a
+            column or constant take the prompt's default
+        name: Name of the output column (pandas only)
+
+    Null values (None) count as missing, as in format(): an optional field
+    takes its default and a required field raises.
+
+    Returns:
+        pyarrow string Array for Arrow input with output "text" or "json"
+        (a list of payload dicts for "full"), pandas Series (aligned to the
+        input index) for DataFrame input, otherwise a list
+
+    Raises:
+        ValueError: If output is invalid, template fields have no column, or
+            the columns of a dict input differ in length
+        TemplateVariableError: If a required field is null in some row
+        TypeError: If data is not a supported columnar type
+
+    Example:
+        table = pyarrow.parquet.read_table("recall.parquet")
+        prompt = manager.get_prompt("openai", "fact_recall", "prompt_evals")
+        payloads = render_columns(prompt, table, output="json")
+    """
+    if output not in OUTPUT_MODES:
+        raise ValueError(
+            f"Output mode '{output}' not supported. "
+            f"Available modes: {', '.join(OUTPUT_MODES)}"
+        )
+
+    template = prompt.template_fields
+    columns = columns or {}
+    constants = dict(constants or {})
+    available = set(_column_names(data))
+    length = _row_count(data)
+
+    value_columns = []
+    missing = []
+    for field in template.fields:
+        if field in constants:
+            value_columns.append(None)
+            continue
+        column = columns.get(field, field)
+        if column in available:
+            values = _to_list(_get_column(data, column))
+            if None in values:
+                if field not in template.defaults:
+                    raise TemplateVariableError(
+                        f"Missing required template variables for {prompt} "
+                        f"in row {values.index(None)}: {field}",
+                        (field,),
+                    )
+                default = template.defaults[field]
+                values = [default if value is None else value for value in values]
+            value_columns.append(values)
+        elif field in template.defaults:
+            constants[field] = template.defaults[field]
+            value_columns.append(None)
+        else:
+            missing.append(field)
+
+    if missing:
+        raise ValueError(
+            f"No column found for template fields: {', '.join(missing)}. "
+            f"Available columns: {', '.join(sorted(available))}"
+        )
+
+    # Broadcast constants so every field is an equally long column
+    value_columns = [
+        [constants[field]] * length if values is None else values
+        for field, values in zip(template.fields, value_columns)
+    ]
+
+    if template.sections:
+        render = template.render_values
+    else:
+        render = template.compiled.positional.format
+    if value_columns:
+        texts = [render(*values) for values in zip(*value_columns)]
+    else:
+        texts = [render()] * length
+
+    if output == "text":
+        results = texts
+    elif output == "full":
+        results = [prompt.get_full_prompt(text) for text in texts]
+    else:
+        parts = _json_payload_parts(prompt)
+        if parts is None:
+            results = [
+                json.dumps(prompt.get_full_prompt(text), ensure_ascii=False)
+                for text in texts
+            ]
+        else:
+            prefix, suffix = parts
+            dumps = json.JSONEncoder(ensure_ascii=False).encode
+            results = [prefix + dumps(text)[1:-1] + suffix for text in texts]
+
+    return _as_output_column(data, results, output, name)
@@ -0,0 +1,281 @@
+"""
+Prompt Compression - Cheaper variants of long system prompts
+
+A variant is a named pipeline of text transformations applied to a prompt's
+system prompt: whitespace normalization, removal of repeated instructions,
+trimming or removing worked examples, and stripping markdown. Variants are
+built once per catalog snapshot, and each one reports its token savings.
+"""
+
+import re
+from functools import partial
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from .models import Prompt
+from .tokens import estimate_tokens
+
+# Lines that start a worked example ("EXAMPLE INPUT:", "## Examples",
+# "**EXAMPLE TRANSFORMATION:**") and lines that resume the instructions after
+# one ("FORMAT: ...", "Now classify ...")
+_EXAMPLE_START = re.compile(r"^(?:#{1,6}\s*|\*\*)?EXAMPLES?\b", re.IGNORECASE)
+_EXAMPLE_RESUME = re.compile(r"^(?:FORMAT\b|Now\b)", re.IGNORECASE)
+_HEADING_LEVEL = re.compile(r"^(#{1,6})\s")
+_FENCE = re.compile(r"^\s*(?:```|~~~)")
+
+_INNER_SPACES = re.compile(r"(?<=\S)[ \t]{2,}(?=\S)")
+_BOLD = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
+_HEADING = re.compile(r"^#{1,6}\s+")
+_RULE = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$")
+_LINE_KEY = re.compile(r"[^a-z0-9]+")
+
+# Lines kept of each example by the "compact" variant
+COMPACT_EXAMPLE_LINES = 24
+
+# Lines shorter than this many words are never treated as repeated
+# instructions ("Requirements:", "Economics:" repeat legitimately)
+MIN_DEDUPLICATE_WORDS = 4
+
+TRIMMED_MARKER = "[... example shortened ...]"
+
+
+def _fenced(lines: Sequence[str]) -> List[bool]:
+    """Flag the lines of code-fenced blocks, fence lines included"""
+    flags = []
+    inside = False
+    for line in lines:
+        fence = bool(_FENCE.match(line))
+        flags.append(inside or fence)
+        if fence:
+            inside = not inside
+    return flags
+
+
+def normalize_whitespace(text: str) -> str:
+    """
+    Strip trailing spaces, squeeze runs of spaces and blank lines
+
+    Code-fenced blocks are left as written, since their spacing often
+    aligns columns.
+    """
+    lines = text.split("\n")
+    kept = []
+    for line, fenced in zip(lines, _fenced(lines)):
+        if not fenced:
+            line = _INNER_SPACES.sub(" ", line.rstrip())
+            if not line and kept and not kept[-1]:
+                continue
+        kept.append(line)
+    return "\n".join(kept).strip()
+
+
+def strip_markdown(text: str) -> str:
+    """
+    Remove bold markers, heading hashes and horizontal rules
+
+    Code-fenced blocks are left as written, since "#", "*" and "---" mean
+    something else inside them.
+    """
+    lines = text.split("\n")
+    kept = []
+    for line, fenced in zip(lines, _fenced(lines)):
+        if not fenced:
+            if _RULE.match(line):
+                continue
+            line = _HEADING.sub("", line)
+            line = _BOLD.sub(lambda match: match.group(1) or match.group(2), line)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def _heading_level(line: str) -> int:
+    """Markdown heading level of a line, 0 if it is not a heading"""
+    match = _HEADING_LEVEL.match(line)
+    return len(match.group(1)) if match else 0
+
+
+def _example_end(lines: Sequence[str], start: int) -> Tuple[int, bool]:
+    """
+    Find where the example starting at a header line ends
+
+    An example ends at the next example header, at a heading of its own
+    level or above (for "## Examples"-style headers), or at a line that
+    resumes the instructions ("FORMAT: ...", "Now ..."). Headings below the
+    example's own level are part of the example, so a resume line followed
+    by more of them sits inside the example rather than ending it.
+
+    Returns:
+        (end, clear): the exclusive end line, and False when the end is
+        ambiguous and the example should be kept as is
+    """
+    level = _heading_level(lines[start])
+    index = start + 1
+    while index < len(lines):
+        line = lines[index]
+        heading = _heading_level(line)
+        if _EXAMPLE_START.match(line) or (level and heading and heading <= level):
+            return index, True
+        if _EXAMPLE_RESUME.match(line):
+            for after in lines[index + 1:]:
+                heading = _heading_level(after)
+                if _EXAMPLE_START.match(after) or (level and heading and heading <= level):
+                    break
+                if heading:
+                    # Example content follows, so this line didn't end it
+                    return len(lines), False
+            return index, True
+        index += 1
+    return len(lines), True
+
+
+def _example_spans(lines: Sequence[str]) -> List[Tuple[int, int, bool]]:
+    """Return (start, end, clear) line ranges of worked examples; see _example_end"""
+    spans = []
+    index = 0
+    while index < len(lines):
+        if _EXAMPLE_START.match(lines[index]):
+            end, clear = _example_end(lines, index)
+            spans.append((index, end, clear))
+            index = end
+        else:
+            index += 1
+    return spans
+
+
+def trim_examples(text: str, max_lines: int = COMPACT_EXAMPLE_LINES) -> str:
+    """
+    Shorten every worked example to its first max_lines lines
+
+    Args:
+        text: System prompt text
+        max_lines: Lines to keep per example; 0 removes examples entirely.
+            Examples whose end can't be told apart from the instructions
+            after them are kept whole.
+    """
+    lines = text.split("\n")
+    spans = [(start, end) for start, end, clear in _example_spans(lines) if clear]
+    if not spans:
+        return text
+    kept = []
+    cursor = 0
+    for start, end in spans:
+        kept.extend(lines[cursor:start])
+        if max_lines and end - start > max_lines:
+            kept.extend(lines[start:start + max_lines])
+            kept.extend([TRIMMED_MARKER, ""])
+        elif max_lines:
+            kept.extend(lines[start:end])
+        cursor = end
+    kept.extend(lines[cursor:])
+    return "\n".join(kept)
+
+
+remove_examples = partial(trim_examples, max_lines=0)
+
+
+def deduplicate_instructions(text: str) -> str:
+    """
+    Drop instruction lines that repeat an earlier line
+
+    Lines are compared ignoring case, punctuation and list markers. Only
+    prose is deduplicated: worked examples, code-fenced blocks and lines of
+    {...} output schemas (whose repeated fields are not repetition) are left
+    alone, and so are short lines such as headings.
+    """
+    lines = text.split("\n")
+    protected = _fenced(lines)
+    for start, end, _ in _example_spans(lines):
+        for index in range(start, end):
+            protected[index] = True
+    depth = 0
+    for index, line in enumerate(lines):
+        if depth or "{" in line or "}" in line:
+            protected[index] = True
+        depth = max(depth + line.count("{") - line.count("}"), 0)
+
+    seen = set()
+    kept = []
+    for index, line in enumerate(lines):
+        if not protected[index]:
+            key = _LINE_KEY.sub(" ", line.lower()).strip()
+            key = re.sub(r"^\d+ ", "", key)
+            if len(key.split()) >= MIN_DEDUPLICATE_WORDS:
+                if key in seen:
+                    continue
+                seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+CompressionStep = Callable[[str], str]
+
+# Variant name -> steps applied to the system prompt, in order
+COMPRESSION_VARIANTS: Dict[str, Tuple[CompressionStep, ...]] = {
+    "compact": (deduplicate_instructions, trim_examples, normalize_whitespace),
+    "minimal": (deduplicate_instructions, remove_examples, strip_markdown, normalize_whitespace),
+}
+
+
+class CompressionReport(NamedTuple):
+    """Token savings of one prompt variant"""
+    prompt: Prompt
+    variant: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+    @property
+    def ratio(self) -> float:
+        """Variant size relative to the original (1.0 = no savings)"""
+        return self.tokens / self.original_tokens if self.original_tokens else 1.0
+
+
+def _steps(variant: str) -> Tuple[CompressionStep, ...]:
+    steps = COMPRESSION_VARIANTS.get(variant)
+    if steps is None:
+        raise ValueError(
+            f"Variant '{variant}' not supported. "
+            f"Available variants: {', '.join(COMPRESSION_VARIANTS)}"
+        )
+    return steps
+
+
+def compress_text(text: str, variant: str = "compact") -> str:
+    """Apply a variant's compression steps to a text"""
+    for step in _steps(variant):
+        text = step(text)
+    return text
+
+
+def compress_prompt(prompt: Prompt, variant: str = "compact") -> Prompt:
+    """
+    Build a compressed copy of a prompt
+
+    Only the system prompt is rewritten; the user prompt template, its
+    variables and the metadata are unchanged.
+
+    Args:
+        prompt: Prompt to compress
+        variant: Name of a COMPRESSION_VARIANTS entry
+
+    Returns:
+        New Prompt with the compressed system prompt
+
+    Raises:
+        ValueError: If the variant is unknown
+    """
+    return prompt.model_copy(update={
+        "system_prompt": compress_text(prompt.system_prompt, variant)
+    })
+
+
+def compression_report(prompt: Prompt, variant: str, compressed: Prompt) -> CompressionReport:
+    """Compare the estimated system prompt tokens of a prompt and its variant"""
+    return CompressionReport(
+        prompt,
+        variant,
+        estimate_tokens(prompt.system_prompt),
+        estimate_tokens(compressed.system_prompt),
+    )
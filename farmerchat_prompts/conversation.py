@@ -0,0 +1,177 @@
+"""
+Conversations - Multi-turn prompts assembled one turn at a time
+
+A Conversation renders each turn once, with the prompt's chat formatter,
+and keeps the rendered history. Adding a turn costs only that turn; dropping
+the oldest turns to stay within a token budget re-renders only the new first
+turn, which carries the system prompt.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .formatters import ASSISTANT, USER, Segment, resolve_formatter
+from .models import Prompt
+from .tokens import estimate_tokens
+
+# Labels used by transcript(), e.g. for the chat_history template variable
+TRANSCRIPT_LABELS = {USER: "User", ASSISTANT: "Assistant"}
+
+
+def _segment_tokens(segment: Segment) -> int:
+    if isinstance(segment, dict):
+        return estimate_tokens(segment["content"])
+    return estimate_tokens(segment)
+
+
+class Conversation:
+    """
+    Multi-turn chat history bound to a prompt
+
+    Usage:
+        chat = Conversation(manager.get_prompt("llama", "pest_management"), token_budget=3000)
+        chat.add_user("Leaves of my tomato are curling")
+        reply = llm(chat.render()["prompt"])
+        chat.add_assistant(reply)
+        chat.add_user("Which spray is safest?")
+        chat.render()
+    """
+
+    def __init__(
+        self,
+        prompt: Prompt,
+        token_budget: Optional[int] = None,
+        turns: Iterable[Tuple[str, str]] = (),
+        formatter: Optional[str] = None,
+    ):
+        """
+        Args:
+            prompt: Prompt whose system prompt and provider format are used
+            token_budget: Maximum estimated tokens of the rendered
+                conversation; the oldest exchanges are dropped to fit
+            turns: Initial (role, content) turns, roles "user" and "assistant"
+            formatter: Registered formatter name (default: the prompt's)
+        """
+        self.prompt = prompt
+        self.token_budget = token_budget
+        self.formatter = (
+            prompt.chat_formatter if formatter is None
+            else resolve_formatter(prompt.metadata.provider.value, formatter)
+        )
+        self._turns: List[Tuple[str, str]] = []
+        self._segments: List[Segment] = []
+        self._tokens: List[int] = []
+        self._total = 0
+        # Joined string segments for single-string formats, built by render()
+        # and reset whenever the segments change
+        self._text: Optional[str] = None
+        # Message formats carry the system prompt as its own message
+        self._system_tokens = (
+            estimate_tokens(prompt.system_prompt) if self.formatter.messages else 0
+        )
+        for role, content in turns:
+            self.add(role, content)
+
+    @property
+    def turns(self) -> List[Tuple[str, str]]:
+        """Kept (role, content) turns, oldest first"""
+        return list(self._turns)
+
+    @property
+    def tokens(self) -> int:
+        """Estimated tokens of the rendered conversation"""
+        return self._system_tokens + self._total
+
+    def add(self, role: str, content: str) -> "Conversation":
+        """
+        Append a turn, then drop the oldest exchanges if over the token budget
+
+        Args:
+            role: "user" or "assistant"; turns must alternate, starting with
+                a user turn
+            content: Turn text
+
+        Returns:
+            This conversation, for chaining
+
+        Raises:
+            ValueError: If the role is unknown or out of turn
+        """
+        expected = ASSISTANT if self._turns and self._turns[-1][0] == USER else USER
+        if role != expected:
+            if role not in TRANSCRIPT_LABELS:
+                raise ValueError(
+                    f"Role '{role}' not supported. Available roles: {USER}, {ASSISTANT}"
+                )
+            raise ValueError(f"Turn out of order: expected {expected}, got {role}")
+
+        segment = self._render(role, content, first=not self._turns)
+        self._turns.append((role, content))
+        self._push(segment)
+        if self.token_budget is not None:
+            self._fit(self.token_budget)
+        return self
+
+    def add_user(self, content: str) -> "Conversation":
+        """Append a user turn"""
+        return self.add(USER, content)
+
+    def add_assistant(self, content: str) -> "Conversation":
+        """Append an assistant turn"""
+        return self.add(ASSISTANT, content)
+
+    def _render(self, role: str, content: str, first: bool) -> Segment:
+        return self.formatter.turn(role, content, self.prompt.system_prompt, first)
+
+    def _push(self, segment: Segment):
+        tokens = _segment_tokens(segment)
+        self._segments.append(segment)
+        self._tokens.append(tokens)
+        self._total += tokens
+        self._text = None
+
+    def _fit(self, budget: int):
+        """Drop whole exchanges from the front until the history fits"""
+        # The latest user turn (and its reply, if any) is always kept
+        keep = 2 if self._turns[-1][0] == ASSISTANT else 1
+        while self.tokens > budget and len(self._turns) > keep:
+            self._total -= self._tokens[0] + self._tokens[1]
+            del self._turns[:2], self._segments[:2], self._tokens[:2]
+            # The new first turn carries the system prompt
+            role, content = self._turns[0]
+            first = self._render(role, content, first=True)
+            tokens = _segment_tokens(first)
+            self._total += tokens - self._tokens[0]
+            self._segments[0] = first
+            self._tokens[0] = tokens
+            self._text = None
+
+    def render(self) -> Dict[str, Any]:
+        """
+        Get the conversation ready for an API call
+
+        Returns:
+            The same structure as Prompt.get_full_prompt: {"messages": [...]}
+            for message formats, {"prompt": "..."} for string formats
+        """
+        last_role = self._turns[-1][0] if self._turns else ASSISTANT
+        if self._text is None and not self.formatter.messages:
+            self._text = "".join(self._segments)
+        return self.formatter.payload(
+            self.prompt.system_prompt, self._segments, last_role, self._text
+        )
+
+    def transcript(self, labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Plain-text history, e.g. for the chat_history template variable
+
+        Args:
+            labels: Role -> label (default: TRANSCRIPT_LABELS)
+        """
+        labels = labels or TRANSCRIPT_LABELS
+        return "\n".join(f"{labels[role]}: {content}" for role, content in self._turns)
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __repr__(self) -> str:
+        return f"Conversation({self.prompt}, turns={len(self._turns)}, tokens={self.tokens})"
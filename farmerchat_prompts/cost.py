@@ -0,0 +1,384 @@
+"""
+Cost Estimation - Token and price footprint of a dataset before an eval run
+
+Estimates what rendering every row of a JSONL dataset with one or more
+prompts would cost, without rendering anything. The static part of each
+prompt (system prompt, chat formatter markup and template literals) is
+counted once; per row only the variable values are estimated, and a value
+shared by several prompts is estimated once for all of them:
+
+    row tokens = static tokens + sum(value tokens * placeholder occurrences)
+
+Files are split into byte ranges processed by worker processes, each
+reading its own range, so throughput scales with cores. Per prompt, token
+counts are kept as a histogram {tokens: rows}, so memory is bounded by the
+number of distinct counts rather than rows and percentiles are exact.
+
+Counts use tokens.estimate_tokens(), an approximation of BPE tokenizers;
+treat costs as a budget estimate, not an invoice.
+"""
+
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .catalog import prompt_key
+from .manager import PromptManager
+from .models import Prompt
+from .parallel import _default_start_method
+from .tokens import estimate_tokens
+from .truncation import template_costs
+
+# Values up to this length are cached: categories, crops and other repeats
+_CACHED_VALUE_CHARS = 256
+_VALUE_CACHE_SIZE = 65536
+# Smaller files are read in the calling process
+_PARALLEL_MIN_BYTES = 1 << 20
+# Byte ranges per worker, so a slow range doesn't idle the others
+_RANGES_PER_WORKER = 4
+
+
+class ModelPrice(NamedTuple):
+    """Price of a model in currency units per million tokens"""
+
+    input_per_million: float
+    output_per_million: float = 0.0
+
+
+class PromptCost(NamedTuple):
+    """Precomputed token counts of one prompt"""
+
+    key: str  # provider/domain/use_case
+    model: str
+    static_tokens: int
+    occurrences: Tuple[Tuple[str, int], ...]  # (field, placeholder occurrences)
+    required: frozenset
+    default_tokens: Mapping[str, int]
+
+
+class KeyCost(NamedTuple):
+    """Estimated footprint of one prompt over a dataset"""
+
+    key: str
+    model: str
+    rows: int
+    skipped: int  # Rows missing a required field
+    input_tokens: int
+    output_tokens: int
+    cost: float
+    mean_tokens: float
+    p50_tokens: int
+    p90_tokens: int
+    p99_tokens: int
+    max_tokens: int
+
+
+class CostReport(NamedTuple):
+    """Result of estimate_cost()"""
+
+    rows: int
+    invalid_rows: int
+    keys: List[KeyCost]
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(key.input_tokens for key in self.keys)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(key.output_tokens for key in self.keys)
+
+    @property
+    def cost(self) -> float:
+        return sum(key.cost for key in self.keys)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "invalid_rows": self.invalid_rows,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost": round(self.cost, 6),
+            "keys": [dict(key._asdict(), cost=round(key.cost, 6)) for key in self.keys],
+        }
+
+
+def _payload_tokens(payload: Any) -> int:
+    """Estimated tokens of a get_full_prompt() payload"""
+    if isinstance(payload, str):
+        return estimate_tokens(payload)
+    if "prompt" in payload:
+        return estimate_tokens(payload["prompt"])
+    return sum(estimate_tokens(message["content"]) for message in payload.get("messages", ()))
+
+
+def prompt_cost(prompt: Prompt, model: Optional[str] = None) -> PromptCost:
+    """
+    Precompute the static token count and placeholder layout of a prompt
+
+    Args:
+        prompt: Prompt to estimate
+        model: Model the prompt is priced as (default: its provider)
+    """
+    template = prompt.template_fields
+    literal_tokens, occurrences = template_costs(template.compiled.source)
+    provider, domain, use_case = prompt_key(prompt)
+    return PromptCost(
+        key=f"{provider}/{domain}/{use_case}",
+        model=model or provider,
+        # Formatter markup and the system prompt, around an empty user turn
+        static_tokens=_payload_tokens(prompt.get_full_prompt("")) + literal_tokens,
+        occurrences=tuple((name, occurrences.get(name, 1)) for name in template.fields),
+        required=frozenset(template.required),
+        default_tokens={name: estimate_tokens(str(value)) for name, value in template.defaults.items()},
+    )
+
+
+class _Totals:
+    """Per-prompt accumulator: row counts and a token histogram"""
+
+    __slots__ = ("rows", "skipped", "tokens", "histogram")
+
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.tokens = 0
+        self.histogram: Dict[int, int] = {}
+
+    def merge(self, other: "_Totals"):
+        self.rows += other.rows
+        self.skipped += other.skipped
+        self.tokens += other.tokens
+        histogram = self.histogram
+        for tokens, count in other.histogram.items():
+            histogram[tokens] = histogram.get(tokens, 0) + count
+
+    def percentile(self, fraction: float) -> int:
+        if not self.rows:
+            return 0
+        rank = min(self.rows - 1, int(fraction * self.rows))
+        seen = 0
+        for tokens in sorted(self.histogram):
+            seen += self.histogram[tokens]
+            if seen > rank:
+                return tokens
+        return 0
+
+
+def _count_lines(lines: Iterable[bytes], costs: Sequence[PromptCost]) -> Tuple[int, int, List[_Totals]]:
+    """Accumulate token counts over JSONL lines; returns (rows, invalid_rows, totals)"""
+    totals = [_Totals() for _ in costs]
+    fields = tuple({name for cost in costs for name, _ in cost.occurrences})
+    cache: Dict[str, int] = {}
+    rows = invalid = 0
+    loads = json.loads
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = loads(line)
+        except ValueError:
+            invalid += 1
+            continue
+        if not isinstance(row, dict):
+            invalid += 1
+            continue
+        rows += 1
+
+        sizes = {}
+        for name in fields:
+            if name not in row:
+                continue
+            value = row[name]
+            text = value if isinstance(value, str) else str(value)
+            if len(text) <= _CACHED_VALUE_CHARS:
+                size = cache.get(text)
+                if size is None:
+                    if len(cache) >= _VALUE_CACHE_SIZE:
+                        cache.clear()
+                    size = cache[text] = estimate_tokens(text)
+            else:
+                size = estimate_tokens(text)
+            sizes[name] = size
+
+        for cost, total in zip(costs, totals):
+            tokens = cost.static_tokens
+            for name, occurrences in cost.occurrences:
+                size = sizes.get(name)
+                if size is None:
+                    if name in cost.required:
+                        break
+                    size = cost.default_tokens.get(name, 0)
+                tokens += size * occurrences
+            else:
+                total.rows += 1
+                total.tokens += tokens
+                total.histogram[tokens] = total.histogram.get(tokens, 0) + 1
+                continue
+            total.skipped += 1
+    return rows, invalid, totals
+
+
+def _iter_range(path: str, start: int, end: int) -> Iterable[bytes]:
+    """Lines of a file that start within [start, end)"""
+    with open(path, "rb") as handle:
+        if start:
+            # A line starting exactly at ``start`` is kept: seek one byte back
+            handle.seek(start - 1)
+            position = start - 1 + len(handle.readline())
+        else:
+            position = 0
+        for line in handle:
+            if position >= end:
+                return
+            position += len(line)
+            yield line
+
+
+def _count_range(path: str, start: int, end: int, costs: Sequence[PromptCost]):
+    return _count_lines(_iter_range(path, start, end), costs)
+
+
+def _byte_ranges(size: int, parts: int) -> List[Tuple[int, int]]:
+    step = max(1, -(-size // parts))
+    return [(start, min(size, start + step)) for start in range(0, size, step)]
+
+
+def estimate_cost(
+    source: Union[str, Iterable[Union[str, bytes]]],
+    prompts: Iterable[Union[Prompt, Tuple[str, ...]]],
+    prices: Optional[Mapping[str, ModelPrice]] = None,
+    models: Optional[Mapping[str, str]] = None,
+    output_tokens: int = 0,
+    workers: Optional[int] = None,
+    manager: Optional[PromptManager] = None,
+    start_method: Optional[str] = None,
+) -> CostReport:
+    """
+    Estimate tokens and cost of rendering a JSONL dataset with prompts
+
+    Args:
+        source: Path of a JSONL file of template variables, or an iterable
+            of JSONL lines (read in this process, e.g. stdin)
+        prompts: Prompt objects or (provider, use_case[, domain]) keys;
+            every row is priced once per prompt
+        prices: Model -> ModelPrice; prompts whose model has no price
+            are counted with cost 0
+        models: Provider or "provider/domain/use_case" -> model name
+            (default: the provider name, e.g. prices={"openai": ...})
+        output_tokens: Expected completion tokens per call, priced at the
+            model's output rate
+        workers: Processes splitting a file (default: CPU count; 1 reads
+            in this process)
+        manager: PromptManager used to resolve keys (default: a new manager)
+        start_method: multiprocessing start method (default: fork on Linux)
+
+    Returns:
+        CostReport with totals and one KeyCost per prompt. Lines that are
+        not JSON objects are counted as invalid; rows missing a required
+        field are skipped for that prompt.
+
+    Example:
+        report = estimate_cost(
+            "evals.jsonl",
+            [("openai", "fact_recall", "prompt_evals"), ("llama", "fact_recall", "prompt_evals")],
+            prices={"gpt-4o": ModelPrice(2.5, 10.0), "llama": ModelPrice(0.2, 0.2)},
+            models={"openai": "gpt-4o"},
+            output_tokens=150,
+        )
+        print(f"{report.input_tokens} tokens, ${report.cost:.2f}")
+    """
+    prices = prices or {}
+    models = models or {}
+    resolved = []
+    for prompt in prompts:
+        if not isinstance(prompt, Prompt):
+            if manager is None:
+                manager = PromptManager()
+            prompt = manager.get_prompt(*prompt)
+        provider, domain, use_case = prompt_key(prompt)
+        model = models.get(f"{provider}/{domain}/{use_case}") or models.get(provider)
+        resolved.append(prompt_cost(prompt, model))
+    if not resolved:
+        raise ValueError("At least one prompt is required")
+
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    if not isinstance(source, str):
+        lines = (line.encode("utf-8") if isinstance(line, str) else line for line in source)
+        rows, invalid, totals = _count_lines(lines, resolved)
+    elif workers == 1 or os.path.getsize(source) < _PARALLEL_MIN_BYTES:
+        rows, invalid, totals = _count_range(source, 0, os.path.getsize(source), resolved)
+    else:
+        ranges = _byte_ranges(os.path.getsize(source), workers * _RANGES_PER_WORKER)
+        context = multiprocessing.get_context(start_method or _default_start_method())
+        rows = invalid = 0
+        totals = [_Totals() for _ in resolved]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [executor.submit(_count_range, source, start, end, resolved) for start, end in ranges]
+            for future in futures:
+                part_rows, part_invalid, part_totals = future.result()
+                rows += part_rows
+                invalid += part_invalid
+                for total, part in zip(totals, part_totals):
+                    total.merge(part)
+
+    keys = []
+    for cost, total in zip(resolved, totals):
+        price = prices.get(cost.model, ModelPrice(0.0))
+        completion = total.rows * output_tokens
+        keys.append(KeyCost(
+            key=cost.key,
+            model=cost.model,
+            rows=total.rows,
+            skipped=total.skipped,
+            input_tokens=total.tokens,
+            output_tokens=completion,
+            cost=(total.tokens * price.input_per_million + completion * price.output_per_million) / 1e6,
+            mean_tokens=round(total.tokens / total.rows, 1) if total.rows else 0.0,
+            p50_tokens=total.percentile(0.5),
+            p90_tokens=total.percentile(0.9),
+            p99_tokens=total.percentile(0.99),
+            max_tokens=max(total.histogram, default=0),
+        ))
+    return CostReport(rows, invalid, keys)
+
+
+def load_prices(path: str) -> Tuple[Dict[str, ModelPrice], Dict[str, str]]:
+    """
+    Read a price table file
+
+    The file is JSON (or YAML/TOML, as for prompt files) with prices per
+    million tokens and an optional model mapping:
+
+        {"prices": {"gpt-4o": {"input": 2.5, "output": 10.0}},
+         "models": {"openai": "gpt-4o"}}
+
+    Returns:
+        (prices, models) for estimate_cost()
+    """
+    from .loader import _parse_toml, _parse_yaml
+
+    with open(path, "r", encoding="utf-8") as handle:
+        text = handle.read()
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".toml":
+        data = _parse_toml(text)
+    elif suffix in (".yaml", ".yml"):
+        data = _parse_yaml(text)
+    else:
+        data = json.loads(text)
+    if not isinstance(data, dict) or not isinstance(data.get("prices", {}), dict):
+        raise ValueError(f"Invalid price table '{path}': expected a 'prices' mapping")
+
+    prices = {}
+    for model, entry in data.get("prices", {}).items():
+        try:
+            prices[model] = ModelPrice(float(entry["input"]), float(entry.get("output", 0.0)))
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid price for model '{model}' in '{path}': {exc}") from None
+    return prices, dict(data.get("models", {}))
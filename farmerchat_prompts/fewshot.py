@@ -0,0 +1,125 @@
+"""
+Few-Shot Selection - Pick the worked examples most similar to a query
+
+Each prompt's ``examples`` are indexed once with TF-IDF weighted stemmed
+unigrams and bigrams of their inputs (the features the query router uses).
+At render time the examples closest to the user input are chosen, best
+first, until the requested count or token budget is reached.
+"""
+
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .router import query_features
+from .tokens import estimate_tokens
+
+Example = Mapping[str, str]
+
+
+def example_input(example: Example) -> str:
+    """Input text of an example ("input", or "user_input" as the router accepts)"""
+    return example.get("input") or example.get("user_input") or ""
+
+
+def example_output(example: Example) -> str:
+    """Expected output text of an example"""
+    return example.get("output") or ""
+
+
+def format_example(example: Example) -> str:
+    """Render an example the way the Llama prompts write theirs inline"""
+    return f"EXAMPLE INPUT:\n{example_input(example)}\n\nEXAMPLE OUTPUT:\n{example_output(example)}"
+
+
+class ExampleIndex:
+    """
+    Similarity index over a prompt's few-shot examples
+
+    Usage:
+        index = ExampleIndex(prompt.examples)
+        index.select("stem borer in my paddy", k=2, token_budget=600)
+    """
+
+    __slots__ = ("source", "examples", "tokens", "_weights")
+
+    def __init__(self, examples: Optional[Iterable[Example]]):
+        """
+        Args:
+            examples: Example dicts with "input" and "output" keys
+        """
+        self.source = examples
+        self.examples: Tuple[Example, ...] = tuple(examples or ())
+        self.tokens: Tuple[int, ...] = tuple(
+            estimate_tokens(format_example(example)) for example in self.examples
+        )
+
+        counts = [Counter(query_features(example_input(example))) for example in self.examples]
+        document_frequency = Counter(feature for counter in counts for feature in counter)
+        size = len(counts)
+
+        # feature -> [(example_index, weight)] with example vectors L2-normalized
+        self._weights: Dict[str, List[Tuple[int, float]]] = {}
+        for index, counter in enumerate(counts):
+            vector = {
+                feature: (1.0 + math.log(count)) * math.log(1.0 + size / document_frequency[feature])
+                for feature, count in counter.items()
+            }
+            norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+            for feature, weight in vector.items():
+                self._weights.setdefault(feature, []).append((index, weight / norm))
+
+    def scores(self, query: str) -> List[float]:
+        """Cosine similarity of the query to each example, in example order"""
+        scores = [0.0] * len(self.examples)
+        features = set(query_features(query))
+        for feature in features:
+            for index, weight in self._weights.get(feature, ()):
+                scores[index] += weight
+        if features:
+            scale = 1.0 / math.sqrt(len(features))
+            scores = [score * scale for score in scores]
+        return scores
+
+    def select(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        token_budget: Optional[int] = None,
+    ) -> List[Example]:
+        """
+        Choose the examples most similar to a query
+
+        Args:
+            query: User input the examples should resemble
+            k: Maximum number of examples (default: no limit)
+            token_budget: Maximum estimated tokens of all chosen examples;
+                an example that doesn't fit is skipped for a smaller one
+
+        Returns:
+            Examples ordered from most to least similar; ties keep the
+            declared order
+        """
+        if not self.examples or k == 0:
+            return []
+        scores = self.scores(query)
+        order = sorted(range(len(self.examples)), key=lambda index: -scores[index])
+        chosen = []
+        remaining = token_budget
+        for index in order:
+            if remaining is not None:
+                if self.tokens[index] > remaining:
+                    continue
+                remaining -= self.tokens[index]
+            chosen.append(self.examples[index])
+            if k is not None and len(chosen) >= k:
+                break
+        return chosen
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+
+def render_examples(examples: Sequence[Example]) -> str:
+    """Join examples into one block for single-string prompt formats"""
+    return "\n\n".join(format_example(example) for example in examples)
@@ -0,0 +1,352 @@
+"""
+Chat Formatters - Provider chat formats for full prompts and conversations
+
+A formatter turns a system prompt and user/assistant turns into the request
+structure one model family expects: a list of chat messages, or a single
+string with the family's special tokens. Formatters are registered by name;
+each provider has a default, and a prompt can pick another with
+``Prompt.formatter``. Third-party packages add formatters through the
+``farmerchat_prompts.formatters`` entry point group.
+
+String formats never start with a BOS token (``<s>``, ``<|begin_of_text|>``):
+inference servers and tokenizers add it when they tokenize the prompt, and
+a second one degrades output. BOS tokens that separate later turns, as in
+Llama 2 conversations, are part of the format and are kept.
+"""
+
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+USER = "user"
+ASSISTANT = "assistant"
+
+ENTRY_POINT_GROUP = "farmerchat_prompts.formatters"
+
+Segment = Union[str, Dict[str, str]]
+
+logger = logging.getLogger(__name__)
+
+
+class ChatFormatter:
+    """
+    Base class for chat formats
+
+    Subclasses implement turn(); string formats may also override cue().
+    Set ``messages = True`` for formats that send a list of chat messages.
+    """
+
+    name = "base"
+    messages = False
+    """True: payload is {"messages": [...]}; False: {"prompt": "..."}"""
+
+    def turn(self, role: str, content: str, system_prompt: str, first: bool) -> Segment:
+        """
+        Render one turn
+
+        Args:
+            role: "user" or "assistant"
+            content: Turn text
+            system_prompt: The prompt's system prompt, for formats that
+                carry it inside the first turn
+            first: Whether this is the first turn of the conversation
+
+        Returns:
+            A message dict for message formats, a string otherwise
+        """
+        raise NotImplementedError
+
+    def cue(self, last_role: str) -> str:
+        """Text that opens the model's reply after the last turn"""
+        return ""
+
+    def payload(
+        self,
+        system_prompt: str,
+        segments: Sequence[Segment],
+        last_role: str,
+        text: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Assemble rendered turns into the request structure
+
+        Args:
+            system_prompt: The prompt's system prompt
+            segments: Rendered turns, oldest first
+            last_role: Role of the last turn
+            text: Already joined string segments, if the caller keeps them
+        """
+        if self.messages:
+            return {"messages": [{"role": "system", "content": system_prompt}, *segments]}
+        if text is None:
+            text = "".join(segments)
+        return {"prompt": text + self.cue(last_role)}
+
+    def full_prompt(
+        self,
+        system_prompt: str,
+        user_input: str,
+        examples: Sequence[Mapping[str, str]] = (),
+    ) -> Dict[str, Any]:
+        """
+        Render a single-turn prompt, optionally with few-shot examples
+
+        Examples become user/assistant turns in message formats and are
+        appended to the system prompt in string formats.
+        """
+        if not examples:
+            return self.single_turn(system_prompt, user_input)
+        from .fewshot import example_input, example_output, render_examples
+
+        turns: List[Tuple[str, str]] = []
+        if self.messages:
+            for example in examples:
+                turns.append((USER, example_input(example)))
+                turns.append((ASSISTANT, example_output(example)))
+        else:
+            system_prompt = f"{system_prompt}\n\n{render_examples(examples)}"
+        turns.append((USER, user_input))
+        segments = [
+            self.turn(role, content, system_prompt, index == 0)
+            for index, (role, content) in enumerate(turns)
+        ]
+        return self.payload(system_prompt, segments, USER)
+
+    def single_turn(self, system_prompt: str, user_input: str) -> Dict[str, Any]:
+        """One user turn; built-in formats override this with a single f-string"""
+        return self.payload(system_prompt, [self.turn(USER, user_input, system_prompt, True)], USER)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class OpenAIFormatter(ChatFormatter):
+    """OpenAI chat completions messages (also vLLM and other compatible servers)"""
+
+    name = "openai"
+    messages = True
+
+    def turn(self, role: str, content: str, system_prompt: str, first: bool) -> Segment:
+        return {"role": role, "content": content}
+
+    def single_turn(self, system_prompt: str, user_input: str) -> Dict[str, Any]:
+        return {
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_input},
+            ]
+        }
+
+
+class Llama2Formatter(ChatFormatter):
+    """Llama 2 chat: [INST] blocks with a <<SYS>> header in the first one"""
+
+    name = "llama2"
+
+    def turn(self, role: str, content: str, system_prompt: str, first: bool) -> Segment:
+        if role == ASSISTANT:
+            return f" {content} </s>"
+        if first:
+            return f"[INST] <<SYS>>\n{system_prompt}\n<</SYS>>\n\n{content} [/INST]"
+        return f"<s>[INST] {content} [/INST]"
+
+    def single_turn(self, system_prompt: str, user_input: str) -> Dict[str, Any]:
+        return {"prompt": f"[INST] <<SYS>>\n{system_prompt}\n<</SYS>>\n\n{user_input} [/INST]"}
+
+
+class Llama3Formatter(ChatFormatter):
+    """Llama 3.x chat template with header and end-of-turn tokens"""
+
+    name = "llama3"
+
+    def turn(self, role: str, content: str, system_prompt: str, first: bool) -> Segment:
+        text = f"<|start_header_id|>{role}<|end_header_id|>\n\n{content}<|eot_id|>"
+        if first:
+            return f"<|start_header_id|>system<|end_header_id|>\n\n{system_prompt}<|eot_id|>{text}"
+        return text
+
+    def cue(self, last_role: str) -> str:
+        return "<|start_header_id|>assistant<|end_header_id|>\n\n" if last_role == USER else ""
+
+    def single_turn(self, system_prompt: str, user_input: str) -> Dict[str, Any]:
+        return {
+            "prompt": (
+                f"<|start_header_id|>system<|end_header_id|>\n\n{system_prompt}<|eot_id|>"
+                f"<|start_header_id|>user<|end_header_id|>\n\n{user_input}<|eot_id|>"
+                f"<|start_header_id|>assistant<|end_header_id|>\n\n"
+            )
+        }
+
+
+class GemmaFormatter(ChatFormatter):
+    """Gemma instruction-tuned turns; system instructions open the first user turn"""
+
+    name = "gemma"
+
+    def turn(self, role: str, content: str, system_prompt: str, first: bool) -> Segment:
+        if role == ASSISTANT:
+            return f"<start_of_turn>model\n{content}<end_of_turn>\n"
+        if first:
+            # Gemma does not have a distinct "system" role token
+            return f"<start_of_turn>user\n{system_prompt}\n\n{content}<end_of_turn>\n"
+        return f"<start_of_turn>user\n{content}<end_of_turn>\n"
+
+    def cue(self, last_role: str) -> str:
+        return "<start_of_turn>model\n" if last_role == USER else ""
+
+    def single_turn(self, system_prompt: str, user_input: str) -> Dict[str, Any]:
+        return {
+            "prompt": (
+                f"<start_of_turn>user\n"
+                f"{system_prompt}\n\n"
+                f"{user_input}<end_of_turn>\n"
+                f"<start_of_turn>model\n"
+            )
+        }
+
+
+class MistralFormatter(ChatFormatter):
+    """Mistral instruct: [INST] blocks, system prompt merged into the first one"""
+
+    name = "mistral"
+
+    def turn(self, role: str, content: str, system_prompt: str, first: bool) -> Segment:
+        if role == ASSISTANT:
+            return f" {content}</s>"
+        if first:
+            return f"[INST] {system_prompt}\n\n{content} [/INST]"
+        return f"[INST] {content} [/INST]"
+
+
+class ChatMLFormatter(ChatFormatter):
+    """ChatML (<|im_start|> / <|im_end|>), used by Qwen and others"""
+
+    name = "chatml"
+
+    def turn(self, role: str, content: str, system_prompt: str, first: bool) -> Segment:
+        text = f"<|im_start|>{role}\n{content}<|im_end|>\n"
+        if first:
+            return f"<|im_start|>system\n{system_prompt}<|im_end|>\n{text}"
+        return text
+
+    def cue(self, last_role: str) -> str:
+        return "<|im_start|>assistant\n" if last_role == USER else ""
+
+
+FORMATTERS: Dict[str, ChatFormatter] = {
+    formatter.name: formatter
+    for formatter in (
+        OpenAIFormatter(),
+        Llama2Formatter(),
+        Llama3Formatter(),
+        GemmaFormatter(),
+        MistralFormatter(),
+        ChatMLFormatter(),
+    )
+}
+
+# Provider -> name of its default formatter
+PROVIDER_FORMATTERS: Dict[str, str] = {
+    "openai": "openai",
+    "llama": "llama3",
+    "gemma": "gemma",
+}
+
+# Bumped on every registry change so prompts re-resolve their bound formatter
+_generation = 0
+_entry_points_loaded = False
+
+
+def _load_entry_points():
+    """
+    Register formatters advertised by installed packages, once
+
+    A plugin that fails to load is logged and skipped so it can't keep
+    the built-in formatters or other plugins from resolving.
+    """
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+
+    try:
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:
+        # Python < 3.10: entry_points() returns a dict of groups
+        found = entry_points().get(ENTRY_POINT_GROUP, ())
+    for entry_point in found:
+        try:
+            formatter = entry_point.load()
+            if isinstance(formatter, type):
+                formatter = formatter()
+            register_formatter(entry_point.name, formatter)
+        except Exception:
+            logger.exception(
+                "Failed to load chat formatter '%s' from %s", entry_point.name, entry_point.value
+            )
+
+
+def register_formatter(
+    name: str,
+    formatter: ChatFormatter,
+    provider: Optional[str] = None,
+):
+    """
+    Add or replace a formatter
+
+    Args:
+        name: Registry name, used in Prompt.formatter
+        formatter: ChatFormatter instance
+        provider: Also make it the default formatter of this provider
+
+    Example:
+        register_formatter("qwen", ChatMLFormatter())
+        register_formatter("llama2", Llama2Formatter(), provider="llama")
+    """
+    global _generation
+    if not isinstance(formatter, ChatFormatter):
+        raise TypeError(f"Formatter '{name}' must be a ChatFormatter, got {type(formatter).__name__}")
+    FORMATTERS[name] = formatter
+    if provider is not None:
+        PROVIDER_FORMATTERS[provider] = name
+    _generation += 1
+
+
+def get_formatter(name: str) -> ChatFormatter:
+    """
+    Look up a formatter by name
+
+    Raises:
+        ValueError: If no formatter has this name
+    """
+    _load_entry_points()
+    formatter = FORMATTERS.get(name)
+    if formatter is None:
+        raise ValueError(
+            f"Formatter '{name}' not supported. "
+            f"Available formatters: {', '.join(FORMATTERS)}"
+        )
+    return formatter
+
+
+def resolve_formatter(provider: str, name: Optional[str] = None) -> ChatFormatter:
+    """Return the named formatter, or the provider's default"""
+    if name is None:
+        name = PROVIDER_FORMATTERS.get(provider)
+        if name is None:
+            raise ValueError(
+                f"Provider '{provider}' has no default formatter. "
+                f"Available providers: {', '.join(PROVIDER_FORMATTERS)}"
+            )
+    return get_formatter(name)
+
+
+def registry_generation() -> int:
+    """Counter that changes whenever a formatter is registered"""
+    return _generation
+
+
+def available_formatters() -> List[str]:
+    """Names of all registered formatters, including entry point plugins"""
+    _load_entry_points()
+    return list(FORMATTERS)
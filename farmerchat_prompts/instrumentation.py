@@ -0,0 +1,418 @@
+"""
+Instrumentation - Per-call hooks for prompt lookups and renders
+
+PromptManager.get_prompt, Prompt.format and Prompt.get_full_prompt report
+each call to the registered hooks as a RenderEvent. With no hooks registered
+the only cost is one check of a module-level tuple. An event carries the
+prompt, the operation, the latency and the output; the prompt key, version,
+fingerprint, output size and token estimate are derived from those only
+when read, so a hook that just queues events stays within a few hundred
+nanoseconds per call.
+
+MetricsAggregator is such a hook: it queues events and folds them into
+per-prompt counters in batches, off the render path when given an interval.
+TracerHook turns events into OpenTelemetry spans.
+
+While any hook is registered, the prompt and catalog caches also count their
+hits and misses (cache_counts()); catalog swaps are always counted
+(reload_counts()).
+"""
+
+import logging
+import threading
+from collections import deque
+from time import perf_counter_ns, time_ns
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .tokens import estimate_tokens
+
+if TYPE_CHECKING:
+    from .models import Prompt
+
+logger = logging.getLogger(__name__)
+
+# Instrumented operations
+GET_PROMPT = "get_prompt"
+FORMAT = "format"
+FULL_PROMPT = "get_full_prompt"
+
+Hook = Callable[["RenderEvent"], None]
+
+# Registered hooks; replaced wholesale so emit() never sees a half-built tuple
+hooks: Tuple[Hook, ...] = ()
+
+
+def add_hook(hook: Hook) -> Hook:
+    """
+    Call ``hook(event)`` after every instrumented call
+
+    Hooks run synchronously on the calling thread and should return quickly;
+    exceptions they raise are logged and never reach the caller.
+
+    Returns:
+        The hook, so it can be passed to remove_hook() later
+
+    Example:
+        metrics = add_hook(MetricsAggregator(exporter=print, interval=10))
+    """
+    global hooks
+    hooks = (*hooks, hook)
+    return hook
+
+
+def remove_hook(hook: Hook):
+    """Stop calling a hook; unknown hooks are ignored"""
+    global hooks
+    hooks = tuple(registered for registered in hooks if registered is not hook)
+
+
+def clear_hooks():
+    """Remove every hook, returning instrumented calls to zero overhead"""
+    global hooks
+    hooks = ()
+
+
+# Cache name -> [hits, misses], counted only while hooks are registered
+_cache_counts: Dict[str, List[int]] = {}
+
+# Catalog swaps by source ("register", "publish", "files", "split")
+_reload_counts: Dict[str, int] = {}
+
+
+def record_cache(name: str, hit: bool):
+    """Count one cache lookup; callers only call this when ``hooks`` is set"""
+    counts = _cache_counts.get(name)
+    if counts is None:
+        counts = _cache_counts.setdefault(name, [0, 0])
+    counts[0 if hit else 1] += 1
+
+
+def cache_counts() -> Dict[str, Tuple[int, int]]:
+    """Cache name -> (hits, misses) recorded while hooks were registered"""
+    return {name: (counts[0], counts[1]) for name, counts in list(_cache_counts.items())}
+
+
+def record_reload(source: str):
+    """Count a published catalog snapshot"""
+    _reload_counts[source] = _reload_counts.get(source, 0) + 1
+
+
+def reload_counts() -> Dict[str, int]:
+    """Source -> number of catalog snapshots published in this process"""
+    return dict(_reload_counts)
+
+
+def _output_chars(output: Any) -> int:
+    """Characters of a rendered string or get_full_prompt() payload"""
+    if isinstance(output, str):
+        return len(output)
+    if isinstance(output, dict):
+        if "prompt" in output:
+            return len(output["prompt"])
+        return sum(len(message["content"]) for message in output.get("messages", ()))
+    return 0
+
+
+# Characters per estimated token, measured once per prompt fingerprint
+_CHARS_PER_TOKEN: Dict[str, float] = {}
+
+
+def chars_per_token(prompt: "Prompt") -> float:
+    """Characters per estimated token of a prompt's own text"""
+    fingerprint = prompt.fingerprint
+    ratio = _CHARS_PER_TOKEN.get(fingerprint)
+    if ratio is None:
+        text = f"{prompt.system_prompt}\n{prompt.user_prompt_template}"
+        ratio = _CHARS_PER_TOKEN[fingerprint] = len(text) / max(1, estimate_tokens(text))
+    return ratio
+
+
+def output_tokens(prompt: "Prompt", chars: int) -> int:
+    """
+    Estimated tokens of ``chars`` characters rendered from a prompt
+
+    Scales by chars_per_token(), so the cost is constant rather than a pass
+    over every output. Use tokens.estimate_tokens() on the output when an
+    exact estimate matters.
+    """
+    return round(chars / chars_per_token(prompt))
+
+
+class RenderEvent:
+    """
+    One instrumented call
+
+    Attributes:
+        operation: GET_PROMPT, FORMAT or FULL_PROMPT
+        prompt: The prompt looked up or rendered
+        duration_ns: Wall-clock latency in nanoseconds
+        output: The rendered string or payload (None for lookups)
+    """
+
+    __slots__ = ("operation", "prompt", "duration_ns", "output")
+
+    def __init__(self, operation: str, prompt: "Prompt", duration_ns: int, output: Any = None):
+        self.operation = operation
+        self.prompt = prompt
+        self.duration_ns = duration_ns
+        self.output = output
+
+    @property
+    def seconds(self) -> float:
+        return self.duration_ns / 1e9
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        """(provider, domain, use_case) of the prompt"""
+        metadata = self.prompt.metadata
+        return (metadata.provider.value, metadata.domain.value, metadata.use_case.value)
+
+    @property
+    def version(self) -> str:
+        return self.prompt.metadata.version
+
+    @property
+    def fingerprint(self) -> str:
+        return self.prompt.fingerprint
+
+    @property
+    def chars(self) -> int:
+        """Characters of the output"""
+        return _output_chars(self.output)
+
+    @property
+    def tokens(self) -> int:
+        """Estimated tokens of the output, see output_tokens()"""
+        return output_tokens(self.prompt, self.chars) if self.output is not None else 0
+
+    def __repr__(self) -> str:
+        return f"RenderEvent({self.operation}, {self.prompt}, {self.duration_ns}ns)"
+
+
+def emit(operation: str, prompt: "Prompt", start_ns: int, output: Any = None):
+    """Report a call that started at ``start_ns`` (time.perf_counter_ns) to every hook"""
+    event = RenderEvent(operation, prompt, perf_counter_ns() - start_ns, output)
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            logger.exception("Instrumentation hook %r failed", hook)
+
+
+class MetricKey(NamedTuple):
+    """Aggregation key: one prompt version and operation"""
+    operation: str
+    provider: str
+    domain: str
+    use_case: str
+    version: str
+    fingerprint: str
+
+
+class RenderStats:
+    """Counters for one MetricKey"""
+
+    __slots__ = ("count", "total_ns", "max_ns", "chars", "tokens")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.chars = 0
+        self.tokens = 0
+
+    def add(self, event: RenderEvent):
+        """Count an event; tokens are filled in per batch from chars"""
+        self.count += 1
+        self.total_ns += event.duration_ns
+        if event.duration_ns > self.max_ns:
+            self.max_ns = event.duration_ns
+        if event.output is not None:
+            self.chars += _output_chars(event.output)
+
+    def merge(self, other: "RenderStats"):
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.chars += other.chars
+        self.tokens += other.tokens
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_ns / self.count / 1e9 if self.count else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"RenderStats(count={self.count}, mean_seconds={self.mean_seconds:.6f}, "
+            f"chars={self.chars}, tokens={self.tokens})"
+        )
+
+
+Exporter = Callable[[Dict[MetricKey, RenderStats]], None]
+
+
+class MetricsAggregator:
+    """
+    Hook that aggregates events into per-prompt counters, exported in batches
+
+    Calling the hook only queues the event. Queued events are folded into
+    counters when a batch is flushed, grouped by prompt first so keys and
+    token estimates are computed once per prompt per batch: every
+    ``batch_size`` events on the calling thread, or every ``interval`` seconds
+    on a background thread if one is given.
+
+    Usage:
+        metrics = MetricsAggregator(exporter=send_to_statsd, interval=10)
+        add_hook(metrics)
+        ...
+        for key, stats in metrics.totals().items():
+            print(key.use_case, key.version, stats.count, stats.mean_seconds)
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[Exporter] = None,
+        batch_size: int = 4096,
+        interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            exporter: Called with {MetricKey: RenderStats} for each flushed batch
+            batch_size: Flush once this many events are queued
+            interval: Also flush every this many seconds on a daemon thread
+        """
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending: deque = deque()
+        self._totals: Dict[MetricKey, RenderStats] = {}
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if interval is not None:
+            self._thread = threading.Thread(
+                target=self._run, name="farmerchat-metrics", daemon=True
+            )
+            self._thread.start()
+
+    def __call__(self, event: RenderEvent):
+        pending = self._pending
+        pending.append(event)
+        if len(pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> Dict[MetricKey, RenderStats]:
+        """
+        Aggregate queued events and pass the batch to the exporter
+
+        Returns:
+            Counters of this batch only
+        """
+        with self._flush_lock:
+            groups: Dict[Tuple[str, int], Tuple["Prompt", List[RenderEvent]]] = {}
+            pending = self._pending
+            # popleft() is atomic, so events queued meanwhile are never lost
+            while pending:
+                event = pending.popleft()
+                group_key = (event.operation, id(event.prompt))
+                group = groups.get(group_key)
+                if group is None:
+                    group = groups[group_key] = (event.prompt, [])
+                group[1].append(event)
+
+            batch: Dict[MetricKey, RenderStats] = {}
+            for (operation, _), (prompt, events) in groups.items():
+                metadata = prompt.metadata
+                key = MetricKey(
+                    operation,
+                    metadata.provider.value,
+                    metadata.domain.value,
+                    metadata.use_case.value,
+                    metadata.version,
+                    prompt.fingerprint,
+                )
+                stats = self._record(key, prompt, events)
+                if key in batch:
+                    batch[key].merge(stats)
+                else:
+                    batch[key] = stats
+            for key, stats in batch.items():
+                total = self._totals.get(key)
+                if total is None:
+                    total = self._totals[key] = RenderStats()
+                total.merge(stats)
+        if batch and self.exporter is not None:
+            try:
+                self.exporter(batch)
+            except Exception:
+                logger.exception("Metrics exporter %r failed", self.exporter)
+        return batch
+
+    def _record(self, key: MetricKey, prompt: "Prompt", events: List[RenderEvent]) -> RenderStats:
+        """Fold one prompt's events of a batch into counters; called under the flush lock"""
+        stats = RenderStats()
+        for event in events:
+            stats.add(event)
+        stats.tokens = output_tokens(prompt, stats.chars) if stats.chars else 0
+        return stats
+
+    def totals(self) -> Dict[MetricKey, RenderStats]:
+        """Cumulative counters since creation, after flushing queued events"""
+        self.flush()
+        with self._flush_lock:
+            snapshot = {}
+            for key, stats in self._totals.items():
+                copy = snapshot[key] = RenderStats()
+                copy.merge(stats)
+            return snapshot
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        """Stop the background thread and flush what is left"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+
+class TracerHook:
+    """
+    Hook that records each event as an OpenTelemetry span
+
+    Works with any tracer exposing the OpenTelemetry API's
+    ``start_span(name, attributes=..., start_time=...)``. Hooks run when
+    the call returns. Each span therefore ends now and is back-dated to
+    start one call latency earlier. Spans cost far more than counters;
+    prefer MetricsAggregator on hot paths.
+
+    Usage:
+        from opentelemetry import trace
+        add_hook(TracerHook(trace.get_tracer("farmerchat_prompts")))
+    """
+
+    def __init__(self, tracer: Any, prefix: str = "farmerchat_prompts"):
+        self.tracer = tracer
+        self.prefix = prefix
+
+    def __call__(self, event: RenderEvent):
+        provider, domain, use_case = event.key
+        attributes = {
+            "prompt.provider": provider,
+            "prompt.domain": domain,
+            "prompt.use_case": use_case,
+            "prompt.version": event.version,
+            "prompt.fingerprint": event.fingerprint,
+        }
+        if event.output is not None:
+            attributes["prompt.output_chars"] = event.chars
+            attributes["prompt.estimated_tokens"] = event.tokens
+        end_ns = time_ns()
+        span = self.tracer.start_span(
+            f"{self.prefix}.{event.operation}",
+            attributes=attributes,
+            start_time=end_ns - event.duration_ns,
+        )
+        span.end(end_time=end_ns)
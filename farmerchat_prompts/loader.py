@@ -0,0 +1,153 @@
+"""
+Prompt Loader - Read prompt definitions from YAML, JSON and TOML files
+
+A file holds either a single prompt or a list of prompts under a top-level
+``prompts`` key. Each prompt uses the same structure as the Prompt model:
+
+    prompts:
+      - metadata:
+          provider: openai
+          use_case: pest_management
+          domain: crop_advisory
+          version: 1.1.0
+          description: IPM advice tuned for Bihar
+          tags: [pest-control]
+        system_prompt: |
+          You are an expert in Integrated Pest Management...
+        user_prompt_template: |
+          Crop: {crop}
+          Symptoms: {symptoms}
+
+YAML support requires PyYAML. TOML uses tomllib (Python 3.11+) or tomli.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List
+
+from .models import Prompt
+
+SUPPORTED_SUFFIXES = (".json", ".yaml", ".yml", ".toml")
+
+
+def _parse_yaml(text: str) -> Any:
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError(
+            "Loading YAML prompt files requires PyYAML. "
+            "Install it with: pip install farmerchat-prompts[yaml]"
+        )
+    return yaml.safe_load(text)
+
+
+def _parse_toml(text: str) -> Any:
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError(
+                "Loading TOML prompt files requires Python 3.11+ or tomli. "
+                "Install it with: pip install farmerchat-prompts[toml]"
+            )
+    return tomllib.loads(text)
+
+
+def is_prompt_file(path: str) -> bool:
+    """Check whether a path has a supported prompt file extension"""
+    name = os.path.basename(path)
+    return not name.startswith(".") and name.lower().endswith(SUPPORTED_SUFFIXES)
+
+
+def parse_prompt_data(data: Any, source: str = "<data>") -> List[Prompt]:
+    """
+    Build Prompt objects from parsed file content
+
+    Args:
+        data: A prompt mapping, a list of them, or {"prompts": [...]}
+        source: Name used in error messages
+
+    Returns:
+        List of Prompt objects
+
+    Raises:
+        ValueError: If the structure or any prompt is invalid
+    """
+    if data is None:
+        return []
+    if isinstance(data, dict) and "prompts" in data:
+        data = data["prompts"]
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        raise ValueError(
+            f"Invalid prompt file '{source}': expected a prompt, "
+            f"a list of prompts or a 'prompts' key"
+        )
+
+    prompts = []
+    for index, entry in enumerate(data):
+        try:
+            prompts.append(Prompt.model_validate(entry))
+        except Exception as exc:
+            raise ValueError(f"Invalid prompt #{index} in '{source}': {exc}") from exc
+    return prompts
+
+
+def load_prompt_file(path: str) -> List[Prompt]:
+    """
+    Load prompts from a single YAML, JSON or TOML file
+
+    Args:
+        path: Path to the prompt file
+
+    Returns:
+        List of Prompt objects
+
+    Raises:
+        ValueError: If the extension is unsupported or the content is invalid
+
+    Example:
+        prompts = load_prompt_file("prompts/pest_management_v2.yaml")
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise ValueError(
+            f"Unsupported prompt file '{path}'. "
+            f"Supported extensions: {', '.join(SUPPORTED_SUFFIXES)}"
+        )
+
+    with open(path, "r", encoding="utf-8") as fh:
+        text = fh.read()
+
+    if suffix == ".json":
+        data = json.loads(text)
+    elif suffix == ".toml":
+        data = _parse_toml(text)
+    else:
+        data = _parse_yaml(text)
+
+    return parse_prompt_data(data, source=path)
+
+
+def iter_prompt_files(directory: str) -> Iterator[str]:
+    """Yield supported prompt files in a directory, sorted by name"""
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if is_prompt_file(path) and os.path.isfile(path):
+            yield path
+
+
+def load_prompt_directory(directory: str) -> Dict[str, List[Prompt]]:
+    """
+    Load every prompt file in a directory
+
+    Args:
+        directory: Directory containing prompt files (not searched recursively)
+
+    Returns:
+        Dict mapping each file path to the prompts it defines
+    """
+    return {path: load_prompt_file(path) for path in iter_prompt_files(directory)}
@@ -2,8 +2,26 @@
 Prompt Manager - Central interface for accessing prompts with multi-domain support
 """
 
-from typing import Dict, List, Optional, Union
+import logging
+import os
+import threading
+from time import perf_counter_ns
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+from . import instrumentation
+from .automaton import KeywordIndex, KeywordMatch
+from .catalog import CoverageMatrix, PromptCatalog, PromptKey, VersionKey, version_key
+from .compression import COMPRESSION_VARIANTS, CompressionReport, compress_prompt, compression_report
+from .loader import iter_prompt_files, load_prompt_file
 from .models import Prompt, Provider, UseCase, Domain
+from .profiling import RenderProfiler
+from .router import PromptRouter, RouteResult
+from .search import SearchIndex, SearchResult
+from .templates import JsonExampleIssue, TemplateIssue, check_json_examples, check_template_fields
+from .vocabulary import VOCABULARIES
+from .watcher import DirectoryWatcher
+
+logger = logging.getLogger(__name__)
 
 
 class PromptManager:
@@ -20,78 +38,322 @@ class PromptManager:
         prompt = manager.get_prompt("openai", "specificity_evaluation", "prompt_evals")
         
         messages = prompt.get_full_prompt("I have sandy soil in Bihar")
+        
+        # Extra or overriding prompts from YAML/JSON/TOML files, hot-reloaded
+        manager = PromptManager(prompt_dirs=["/etc/farmerchat/prompts"], watch=True)
     """
     
-    def __init__(self):
-        """Initialize the prompt manager with all available prompts"""
-        self._prompts: Dict[str, Dict[str, Dict[str, Prompt]]] = {}
-        # Structure: {provider: {domain: {use_case: Prompt}}}
+    def __init__(
+        self,
+        prompt_dirs: Optional[Iterable[str]] = None,
+        watch: bool = False
+    ):
+        """
+        Initialize the prompt manager with all available prompts
+        
+        Args:
+            prompt_dirs: Optional directories of prompt files that add to or
+                override the built-in prompts
+            watch: Reload prompt_dirs in the background when files change
+        """
+        # Immutable snapshot, replaced wholesale on every change.
+        # Readers take one reference to it and never lock.
+        self._catalog = PromptCatalog()
+        # Serializes writers so concurrent updates don't lose each other
+        self._write_lock = threading.Lock()
+        
+        # Prompt directory state: versions defined by each file, and the
+        # prompts those files displaced so they can be restored on delete
+        self._file_keys: Dict[str, List[VersionKey]] = {}
+        self._overridden: Dict[VersionKey, Prompt] = {}
+        self._watchers: Dict[str, DirectoryWatcher] = {}
+        
+        # Keyword vocabularies, replaced wholesale like the catalog, and the
+        # automaton compiled from the last (catalog, vocabularies) pair seen
+        self._vocabularies: Mapping[str, Tuple[str, ...]] = MappingProxyType(dict(VOCABULARIES))
+        self._keyword_index: Optional[Tuple[PromptCatalog, Mapping, KeywordIndex]] = None
+        
+        self._profiler: Optional[RenderProfiler] = None
+        
         self._load_prompts()
         
+        for directory in prompt_dirs or ():
+            if watch:
+                self.watch_directory(directory)
+            else:
+                self.load_directory(directory)
+
+    @property
+    def catalog(self) -> PromptCatalog:
+        """The currently published prompt catalog snapshot"""
+        return self._catalog
+
+    @property
+    def _prompts(self) -> Mapping[str, Mapping[str, Mapping[str, Prompt]]]:
+        """Read-only view of the current catalog: {provider: {domain: {use_case: Prompt}}}"""
+        return self._catalog.tree
+        
     def _load_prompts(self):
         """Load all prompts into the manager"""
+        prompts: List[Prompt] = []
         
         # Load Crop Advisory prompts
         try:
             from .prompts.crop_advisory.openai import OPENAI_PROMPTS as CROP_OPENAI
-            self._register_prompts(CROP_OPENAI)
+            prompts.extend(CROP_OPENAI)
         except ImportError:
             pass
             
         try:
             from .prompts.crop_advisory.llama import LLAMA_PROMPTS as CROP_LLAMA
-            self._register_prompts(CROP_LLAMA)
+            prompts.extend(CROP_LLAMA)
         except ImportError:
             pass
 
         try:
             from .prompts.crop_advisory.gemma import GEMMA_PROMPTS as CROP_GEMMA
-            self._register_prompts(CROP_GEMMA)
+            prompts.extend(CROP_GEMMA)
         except ImportError:
             pass
         
         # Load Prompt Evals prompts
         try:
             from .prompts.prompt_evals.openai import OPENAI_PROMPT_EVALS_PROMPTS
-            self._register_prompts(OPENAI_PROMPT_EVALS_PROMPTS)
+            prompts.extend(OPENAI_PROMPT_EVALS_PROMPTS)
         except ImportError:
             pass
             
         try:
             from .prompts.prompt_evals.llama import LLAMA_PROMPT_EVALS_PROMPTS
             if LLAMA_PROMPT_EVALS_PROMPTS:  # Check if not empty
-                self._register_prompts(LLAMA_PROMPT_EVALS_PROMPTS)
+                prompts.extend(LLAMA_PROMPT_EVALS_PROMPTS)
         except ImportError:
             pass
     
         try:
             from .prompts.prompt_evals.gemma import GEMMA_PROMPT_EVALS_PROMPTS
             if GEMMA_PROMPT_EVALS_PROMPTS:  # Check if not empty
-                self._register_prompts(GEMMA_PROMPT_EVALS_PROMPTS)
+                prompts.extend(GEMMA_PROMPT_EVALS_PROMPTS)
         except ImportError:
             pass
 
-    def _register_prompts(self, prompts: List[Prompt]):
-        """Register a list of prompts into the internal structure"""
+        self._register_prompts(prompts)
+
+    def _register_prompts(self, prompts: Iterable[Prompt]):
+        """Register a list of prompts by publishing a new catalog snapshot"""
+        self.register_prompts(prompts)
+
+    def register_prompts(self, prompts: Iterable[Prompt]) -> PromptCatalog:
+        """
+        Add prompts and atomically publish the resulting catalog
+        
+        Every metadata.version of a provider/domain/use_case is kept. A
+        prompt with a new version is added alongside the others; one with
+        an already registered version replaces that version. Lookups
+        without a version resolve "latest": the newest stable version, or
+        the newest pre-release if the key has no stable version.
+        
+        Args:
+            prompts: Prompts to add
+            
+        Returns:
+            The newly published catalog
+            
+        Example:
+            manager.register_prompts([my_custom_prompt])
+        """
+        prompts = list(prompts)
+        self._warm_prompts(prompts)
+        with self._write_lock:
+            catalog = self._catalog.with_prompts(prompts)
+            self._catalog = catalog
+        instrumentation.record_reload("register")
+        return catalog
+
+    def publish(self, catalog: PromptCatalog) -> PromptCatalog:
+        """
+        Atomically replace the current catalog with a prebuilt snapshot
+        
+        Readers that already hold the previous snapshot keep using it;
+        every subsequent lookup sees the new one.
+        
+        Args:
+            catalog: Catalog to publish
+            
+        Returns:
+            The previously published catalog
+        """
+        with self._write_lock:
+            previous = self._catalog
+            self._catalog = catalog
+        instrumentation.record_reload("publish")
+        return previous
+
+    def load_directory(self, path: str) -> List[Prompt]:
+        """
+        Load prompt files from a directory and publish them atomically
+        
+        Files are read non-recursively. Prompts are added as new versions of
+        their provider/domain/use_case; a prompt with an already registered
+        version overrides it, and the overridden prompt comes back if the file
+        is later deleted. Calling this again reloads the directory.
+        
+        Args:
+            path: Directory containing .yaml/.yml/.json/.toml prompt files
+            
+        Returns:
+            List of prompts loaded from the directory
+            
+        Raises:
+            ValueError: If a file contains an invalid prompt definition
+            
+        Example:
+            manager.load_directory("/etc/farmerchat/prompts")
+        """
+        directory = os.path.abspath(path)
+        files = {
+            file_path for file_path in self._file_keys
+            if os.path.dirname(file_path) == directory
+        }
+        files.update(iter_prompt_files(directory))
+        return self._apply_file_changes(files)
+
+    def watch_directory(
+        self,
+        path: str,
+        poll_interval: float = 1.0,
+        backend: str = "auto"
+    ) -> DirectoryWatcher:
+        """
+        Load a prompt directory and keep it in sync as files change
+        
+        Changed files are re-parsed on a background thread. Only their prompts
+        are rebuilt and warmed (see _warm_prompts); unchanged prompts are
+        carried over to the new catalog as-is, which is then published with a
+        single atomic swap. Invalid files are logged and leave the previous
+        prompts in place. The watcher records the directory's state before
+        the initial load, so edits made during that load are picked up too.
+        
+        Args:
+            path: Directory containing prompt files
+            poll_interval: Seconds between scans when polling
+            backend: "inotify", "polling" or "auto" (inotify when available)
+            
+        Returns:
+            The running DirectoryWatcher
+            
+        Example:
+            manager.watch_directory("/etc/farmerchat/prompts")
+            ...
+            manager.stop_watching()
+        """
+        directory = os.path.abspath(path)
+        watcher = DirectoryWatcher(
+            directory,
+            lambda changed: self._apply_file_changes(changed, strict=False),
+            poll_interval=poll_interval,
+            backend=backend,
+        ).prepare()
+        try:
+            self.load_directory(directory)
+        except BaseException:
+            watcher.stop()
+            raise
+        watcher.start()
+        previous = self._watchers.pop(directory, None)
+        self._watchers[directory] = watcher
+        if previous is not None:
+            previous.stop()
+        return watcher
+
+    def stop_watching(self, path: Optional[str] = None):
+        """
+        Stop watching one prompt directory, or all of them
+        
+        Args:
+            path: Directory to stop watching (default: all directories)
+        """
+        if path is None:
+            directories = list(self._watchers)
+        else:
+            directories = [os.path.abspath(path)]
+        for directory in directories:
+            watcher = self._watchers.pop(directory, None)
+            if watcher is not None:
+                watcher.stop()
+
+    def _apply_file_changes(self, paths: Iterable[str], strict: bool = True) -> List[Prompt]:
+        """Re-read changed prompt files and publish a catalog with only those entries replaced"""
+        loaded: Dict[str, Optional[List[Prompt]]] = {}
+        for path in sorted(paths):
+            if not os.path.exists(path):
+                loaded[path] = None  # Deleted
+                continue
+            try:
+                loaded[path] = load_prompt_file(path)
+            except Exception:
+                if strict:
+                    raise
+                logger.exception("Failed to reload prompt file %s; keeping previous prompts", path)
+        
+        added: List[Prompt] = []
+        for prompts in loaded.values():
+            added.extend(prompts or ())
+        # Build derived caches for the changed prompts before they go live
+        self._warm_prompts(added)
+        
+        with self._write_lock:
+            catalog = self._catalog
+            removed: Set[VersionKey] = set()
+            for path in loaded:
+                removed.update(self._file_keys.pop(path, ()))
+            owned_elsewhere = {key for keys in self._file_keys.values() for key in keys}
+            
+            added_keys = set()
+            for path, prompts in loaded.items():
+                if prompts is None:
+                    continue
+                keys = [version_key(prompt) for prompt in prompts]
+                self._file_keys[path] = keys
+                added_keys.update(keys)
+            
+            # Remember what a file displaces so deleting the file restores it
+            for key in added_keys - removed - owned_elsewhere:
+                existing = catalog.get_version(*key)
+                if key not in self._overridden and existing is not None:
+                    self._overridden[key] = existing
+            
+            dropped = removed - added_keys - owned_elsewhere
+            restored = [self._overridden.pop(key) for key in dropped if key in self._overridden]
+            
+            self._catalog = catalog.without(dropped).with_prompts(restored + added)
+        instrumentation.record_reload("files")
+        
+        return added
+
+    def _warm_prompts(self, prompts: Iterable[Prompt]):
+        """
+        Precompute the caches kept on each prompt before it goes live
+        
+        Warms the parsed template fields, the bound chat formatter and the
+        few-shot example index. Caches kept per catalog snapshot (compressed
+        variants, search and routing indexes) are built on first use after
+        publishing, and token ID prefixes wait for a caller's tokenizer.
+        """
         for prompt in prompts:
-            provider = prompt.metadata.provider.value
-            domain = prompt.metadata.domain.value
-            use_case = prompt.metadata.use_case.value
-            
-            # Initialize nested dictionaries if they don't exist
-            if provider not in self._prompts:
-                self._prompts[provider] = {}
-            if domain not in self._prompts[provider]:
-                self._prompts[provider][domain] = {}
-            
-            # Store the prompt
-            self._prompts[provider][domain][use_case] = prompt
+            prompt.template_fields
+            prompt.chat_formatter
+            if prompt.examples:
+                prompt.example_index
     
     def get_prompt(
         self, 
         provider: Union[str, Provider], 
         use_case: Union[str, UseCase],
-        domain: Union[str, Domain] = "crop_advisory"  # Default for backward compatibility
+        domain: Union[str, Domain] = "crop_advisory",  # Default for backward compatibility
+        version: Optional[str] = None,
+        user_id: Optional[str] = None,
+        variant: Optional[str] = None
     ) -> Prompt:
         """
         Get a specific prompt by provider, use case, and domain
@@ -100,12 +362,18 @@ class PromptManager:
             provider: Provider name (openai, gemma, llama)
             use_case: Use case name
             domain: Domain name (default: crop_advisory for backward compatibility)
+            version: Optional version or selector ("1.2.0", "1.2.x", "1", "latest").
+                Defaults to the latest version.
+            user_id: Optional sticky id; when the prompt has a traffic split
+                and no version is given, selects this user's assigned version
+            variant: Optional compression variant ("compact", "minimal") of
+                the system prompt; see COMPRESSION_VARIANTS
             
         Returns:
             Prompt object
             
         Raises:
-            ValueError: If combination doesn't exist
+            ValueError: If combination, version or variant doesn't exist
             
         Examples:
             # Backward compatible
@@ -120,37 +388,245 @@ class PromptManager:
                 UseCase.PEST_MANAGEMENT,
                 Domain.CROP_ADVISORY
             )
+            
+            # Pinned version, or A/B split assignment for a user
+            prompt = manager.get_prompt("openai", "crop_recommendation", version="1.2.x")
+            prompt = manager.get_prompt("openai", "crop_recommendation", user_id="farmer-42")
+            
+            # Cheaper variant with worked examples shortened
+            prompt = manager.get_prompt("llama", "crop_recommendation", variant="compact")
         """
+        start = perf_counter_ns() if instrumentation.hooks else 0
         # Convert enums to strings if needed
         provider_str = provider.value if isinstance(provider, Provider) else provider
         use_case_str = use_case.value if isinstance(use_case, UseCase) else use_case
         domain_str = domain.value if isinstance(domain, Domain) else domain
         
+        # Single snapshot read: no lock, no torn state across a swap
+        catalog = self._catalog
+        prompt = catalog.resolve(provider_str, domain_str, use_case_str, version, user_id)
+        if prompt is not None:
+            if variant is not None:
+                prompt = self._variants(catalog, variant)[id(prompt)]
+            if start:
+                instrumentation.emit(instrumentation.GET_PROMPT, prompt, start)
+            return prompt
+        
+        tree = catalog.tree
+        
         # Validate provider
-        if provider_str not in self._prompts:
-            available = ", ".join(self._prompts.keys())
+        if provider_str not in tree:
+            available = ", ".join(tree.keys())
             raise ValueError(
                 f"Provider '{provider_str}' not found. "
                 f"Available providers: {available}"
             )
         
         # Validate domain
-        if domain_str not in self._prompts[provider_str]:
-            available = ", ".join(self._prompts[provider_str].keys())
+        if domain_str not in tree[provider_str]:
+            available = ", ".join(tree[provider_str].keys())
             raise ValueError(
                 f"Domain '{domain_str}' not found for provider '{provider_str}'. "
                 f"Available domains: {available}"
             )
         
         # Validate use case
-        if use_case_str not in self._prompts[provider_str][domain_str]:
-            available = ", ".join(self._prompts[provider_str][domain_str].keys())
+        if use_case_str not in tree[provider_str][domain_str]:
+            available = ", ".join(tree[provider_str][domain_str].keys())
             raise ValueError(
                 f"Use case '{use_case_str}' not found for provider '{provider_str}' "
                 f"in domain '{domain_str}'. Available use cases: {available}"
             )
         
-        return self._prompts[provider_str][domain_str][use_case_str]
+        available = ", ".join(catalog.versions(provider_str, domain_str, use_case_str))
+        raise ValueError(
+            f"Version '{version}' not found for '{provider_str}/{domain_str}/{use_case_str}'. "
+            f"Available versions: {available}"
+        )
+
+    def _variants(self, catalog: PromptCatalog, variant: str) -> Mapping[int, Prompt]:
+        """Compressed copies of every prompt in a snapshot, keyed by id() of the original"""
+        if variant not in COMPRESSION_VARIANTS:
+            raise ValueError(
+                f"Variant '{variant}' not supported. "
+                f"Available variants: {', '.join(COMPRESSION_VARIANTS)}"
+            )
+        return catalog.derived(
+            f"variant:{variant}",
+            lambda catalog: {
+                id(prompt): compress_prompt(prompt, variant)
+                for prompt in catalog.all_prompts()
+            }
+        )
+    
+    def compression_report(self, variant: Optional[str] = None) -> List[CompressionReport]:
+        """
+        Report the token savings of compressed variants
+        
+        Token counts are estimates of the system prompt (see
+        tokens.estimate_tokens) and are computed once per catalog snapshot.
+        
+        Args:
+            variant: Only report this variant; defaults to all variants
+            
+        Returns:
+            CompressionReport(prompt, variant, original_tokens, tokens) tuples
+            for the latest version of every prompt
+            
+        Raises:
+            ValueError: If the variant doesn't exist
+            
+        Example:
+            for report in manager.compression_report("compact"):
+                print(report.prompt, report.saved_tokens, f"{report.ratio:.0%}")
+        """
+        catalog = self._catalog
+        variants = [variant] if variant is not None else list(COMPRESSION_VARIANTS)
+        reports = []
+        for name in variants:
+            compressed = self._variants(catalog, name)
+            for prompt in catalog:
+                reports.append(compression_report(prompt, name, compressed[id(prompt)]))
+        return reports
+    
+    def enable_profiling(self, sample_rate: float = 0.01) -> RenderProfiler:
+        """
+        Profile a sample of prompt lookups and renders
+        
+        Sampled calls of get_prompt, Prompt.format and Prompt.get_full_prompt
+        are traced call by call and recorded as collapsed stacks per prompt
+        key; the others only pay for one random draw. Prompt methods are
+        wrapped on the class, so renders of every prompt are sampled.
+        
+        Args:
+            sample_rate: Fraction of calls profiled (default: 1%)
+            
+        Returns:
+            The installed RenderProfiler
+            
+        Raises:
+            RuntimeError: If a profiler is already installed
+            
+        Example:
+            profiler = manager.enable_profiling(sample_rate=0.05)
+            ...
+            profiler.dump("render.folded")
+            manager.disable_profiling()
+        """
+        self.disable_profiling()
+        self._profiler = RenderProfiler(sample_rate).install(self)
+        return self._profiler
+    
+    def disable_profiling(self) -> Optional[RenderProfiler]:
+        """
+        Remove the profiler, restoring the unwrapped methods
+        
+        Returns:
+            The removed profiler, with its recorded stacks, or None
+        """
+        profiler, self._profiler = self._profiler, None
+        if profiler is not None:
+            profiler.uninstall()
+        return profiler
+    
+    def get_versions(
+        self,
+        provider: Union[str, Provider],
+        use_case: Union[str, UseCase],
+        domain: Union[str, Domain] = "crop_advisory"
+    ) -> List[str]:
+        """
+        Get all registered versions of a prompt, oldest first
+        
+        Args:
+            provider: Provider name
+            use_case: Use case name
+            domain: Domain name (default: crop_advisory)
+            
+        Returns:
+            List of version strings (empty if the prompt doesn't exist)
+            
+        Example:
+            versions = manager.get_versions("openai", "crop_recommendation")
+            # ['1.0.0', '1.1.0']
+        """
+        return self._catalog.versions(*self._key(provider, use_case, domain))
+
+    def set_traffic_split(
+        self,
+        provider: Union[str, Provider],
+        use_case: Union[str, UseCase],
+        domain: Union[str, Domain] = "crop_advisory",
+        *,
+        weights: Dict[str, float]
+    ):
+        """
+        Split traffic for a prompt across versions, sticky per user
+        
+        Users passed as ``user_id`` to get_prompt are hashed into buckets, so
+        each user keeps seeing the same version while the weights are
+        unchanged. The split is published atomically with the catalog.
+        
+        Args:
+            provider: Provider name
+            use_case: Use case name
+            domain: Domain name (default: crop_advisory)
+            weights: Version selector -> relative weight. Use
+                clear_traffic_split() to remove a split.
+            
+        Raises:
+            ValueError: If weights is None, or the prompt or a version
+                doesn't exist
+            
+        Example:
+            manager.set_traffic_split(
+                "openai", "crop_recommendation",
+                weights={"1.0.0": 90, "1.1.0": 10}
+            )
+        """
+        if weights is None:
+            raise ValueError("Traffic split weights are required. Use clear_traffic_split() to remove a split")
+        key = self._key(provider, use_case, domain)
+        with self._write_lock:
+            self._catalog = self._catalog.with_split(key, weights)
+        instrumentation.record_reload("split")
+
+    def clear_traffic_split(
+        self,
+        provider: Union[str, Provider],
+        use_case: Union[str, UseCase],
+        domain: Union[str, Domain] = "crop_advisory"
+    ):
+        """
+        Remove a prompt's traffic split so every user gets the latest version
+        
+        Does nothing if the prompt has no split.
+        
+        Args:
+            provider: Provider name
+            use_case: Use case name
+            domain: Domain name (default: crop_advisory)
+            
+        Example:
+            manager.clear_traffic_split("openai", "crop_recommendation")
+        """
+        key = self._key(provider, use_case, domain)
+        with self._write_lock:
+            self._catalog = self._catalog.with_split(key, None)
+        instrumentation.record_reload("split")
+
+    def _key(
+        self,
+        provider: Union[str, Provider],
+        use_case: Union[str, UseCase],
+        domain: Union[str, Domain]
+    ) -> PromptKey:
+        """Normalize enums into a (provider, domain, use_case) key"""
+        return (
+            provider.value if isinstance(provider, Provider) else provider,
+            domain.value if isinstance(domain, Domain) else domain,
+            use_case.value if isinstance(use_case, UseCase) else use_case,
+        )
     
     def get_prompts_by_provider(
         self, 
@@ -174,20 +650,21 @@ class PromptManager:
             # OpenAI prompts only in crop_advisory domain
             crop_openai = manager.get_prompts_by_provider("openai", "crop_advisory")
         """
+        tree = self._catalog.tree
         provider_str = provider.value if isinstance(provider, Provider) else provider
         
-        if provider_str not in self._prompts:
+        if provider_str not in tree:
             return []
         
         prompts = []
         
         if domain:
             domain_str = domain.value if isinstance(domain, Domain) else domain
-            if domain_str in self._prompts[provider_str]:
-                prompts.extend(self._prompts[provider_str][domain_str].values())
+            if domain_str in tree[provider_str]:
+                prompts.extend(tree[provider_str][domain_str].values())
         else:
             # Get all prompts across all domains for this provider
-            for domain_prompts in self._prompts[provider_str].values():
+            for domain_prompts in tree[provider_str].values():
                 prompts.extend(domain_prompts.values())
         
         return prompts
@@ -217,12 +694,13 @@ class PromptManager:
                 "prompt_evals"
             )
         """
+        tree = self._catalog.tree
         use_case_str = use_case.value if isinstance(use_case, UseCase) else use_case
         domain_str = domain.value if isinstance(domain, Domain) else domain if domain else None
         
         prompts = []
         
-        for provider_domains in self._prompts.values():
+        for provider_domains in tree.values():
             if domain_str:
                 # Filter by specific domain
                 if domain_str in provider_domains:
@@ -250,10 +728,11 @@ class PromptManager:
             # All prompts in prompt_evals domain
             eval_prompts = manager.get_prompts_by_domain("prompt_evals")
         """
+        tree = self._catalog.tree
         domain_str = domain.value if isinstance(domain, Domain) else domain
         
         prompts = []
-        for provider_domains in self._prompts.values():
+        for provider_domains in tree.values():
             if domain_str in provider_domains:
                 prompts.extend(provider_domains[domain_str].values())
         
@@ -274,8 +753,9 @@ class PromptManager:
             #   ...
             # ]
         """
+        tree = self._catalog.tree
         prompts = []
-        for provider, domains in self._prompts.items():
+        for provider, domains in tree.items():
             for domain, use_cases in domains.items():
                 for use_case in use_cases.keys():
                     prompts.append({
@@ -310,6 +790,158 @@ class PromptManager:
             return True
         except ValueError:
             return False
+
+    def _coverage(self, catalog: PromptCatalog) -> CoverageMatrix:
+        """Provider coverage of a snapshot, built once per snapshot"""
+        return catalog.derived("coverage", CoverageMatrix)
+
+    def get_prompt_with_fallback(
+        self,
+        preferred_providers: Sequence[Union[str, Provider]],
+        use_case: Union[str, UseCase],
+        domain: Union[str, Domain] = "crop_advisory",
+        variant: Optional[str] = None
+    ) -> Prompt:
+        """
+        Get the latest prompt of the first preferred provider that has it
+
+        Resolution goes through the snapshot's precomputed coverage matrix
+        and is memoized per preference order, so rerouting traffic away from
+        a provider during an outage costs one dict lookup per call.
+
+        Args:
+            preferred_providers: Providers in order of preference; empty for
+                any provider (openai, llama, gemma order)
+            use_case: Use case name
+            domain: Domain name (default: crop_advisory)
+            variant: Optional compression variant, as in get_prompt()
+
+        Returns:
+            Prompt object
+
+        Raises:
+            ValueError: If no preferred provider has the use case
+
+        Example:
+            # OpenAI is down: try Llama, then Gemma
+            prompt = manager.get_prompt_with_fallback(("llama", "gemma"), "pest_management")
+        """
+        start = perf_counter_ns() if instrumentation.hooks else 0
+        # Tuples are memoized as passed; provider enums are resolved on a miss
+        preferred = preferred_providers if type(preferred_providers) is tuple else tuple(preferred_providers)
+        use_case_str = use_case.value if isinstance(use_case, UseCase) else use_case
+        domain_str = domain.value if isinstance(domain, Domain) else domain
+
+        catalog = self._catalog
+        coverage = self._coverage(catalog)
+        prompt = coverage.resolve(preferred, domain_str, use_case_str)
+        if prompt is not None:
+            if variant is not None:
+                prompt = self._variants(catalog, variant)[id(prompt)]
+            if start:
+                instrumentation.emit(instrumentation.GET_PROMPT, prompt, start)
+            return prompt
+
+        available = coverage.providers.get((domain_str, use_case_str))
+        if available is None:
+            use_cases = sorted(use_case for domain, use_case in coverage.providers if domain == domain_str)
+            raise ValueError(
+                f"Use case '{use_case_str}' not found in domain '{domain_str}'. "
+                f"Available use cases: {', '.join(use_cases)}"
+            )
+        names = [provider.value if isinstance(provider, Provider) else provider for provider in preferred]
+        raise ValueError(
+            f"No provider in {', '.join(names)} has use case '{use_case_str}' "
+            f"in domain '{domain_str}'. Available providers: {', '.join(available)}"
+        )
+
+    def get_fallback_providers(
+        self,
+        use_case: Union[str, UseCase],
+        domain: Union[str, Domain] = "crop_advisory"
+    ) -> List[str]:
+        """
+        Get the providers that have a use case, in fallback order
+
+        Args:
+            use_case: Use case name
+            domain: Domain name (default: crop_advisory)
+
+        Returns:
+            List of provider names; empty if no provider has the use case
+
+        Example:
+            providers = manager.get_fallback_providers("fact_recall", "prompt_evals")
+            # ['openai', 'llama', 'gemma']
+        """
+        use_case_str = use_case.value if isinstance(use_case, UseCase) else use_case
+        domain_str = domain.value if isinstance(domain, Domain) else domain
+        return list(self._coverage(self._catalog).providers.get((domain_str, use_case_str), ()))
+
+    def get_coverage_matrix(self) -> Dict[str, Dict[str, Dict[str, bool]]]:
+        """
+        Get which providers have each use case of each domain
+
+        Returns:
+            {domain: {use_case: {provider: available}}}
+
+        Example:
+            matrix = manager.get_coverage_matrix()
+            missing = [
+                (domain, use_case, provider)
+                for domain, use_cases in matrix.items()
+                for use_case, providers in use_cases.items()
+                for provider, available in providers.items()
+                if not available
+            ]
+        """
+        return self._coverage(self._catalog).matrix()
+
+    def check_templates(self) -> List[TemplateIssue]:
+        """
+        Report templates whose placeholders don't match their documented variables
+        
+        Checks every version in the current catalog. The report is computed
+        once per catalog snapshot from the template fields parsed at
+        registration.
+        
+        Returns:
+            TemplateIssue(prompt, kind, variables) tuples; kind is
+            "undocumented" for placeholders missing from Prompt.variables and
+            "unused" for variables the template never references
+            
+        Example:
+            for issue in manager.check_templates():
+                print(issue.prompt, issue.kind, issue.variables)
+        """
+        return list(self._catalog.derived(
+            "template_issues",
+            lambda catalog: tuple(check_template_fields(catalog.all_prompts()))
+        ))
+    
+    def check_json_examples(self, strict: bool = False) -> List[JsonExampleIssue]:
+        """
+        Report malformed JSON examples in the text the models receive
+        
+        Catches doubled braces left over from escaping and unbalanced braces
+        in system prompts and rendered user templates, for every version in
+        the current catalog. Computed once per catalog snapshot.
+        
+        Args:
+            strict: Also require every example to parse as JSON after "//"
+                comments are removed; schema placeholders such as
+                "<number 1-5>" and "0.0-1.0" count as values
+            
+        Returns:
+            JsonExampleIssue(prompt, field, line, kind, message) tuples
+            
+        Example:
+            assert not manager.check_json_examples()
+        """
+        return list(self._catalog.derived(
+            f"json_example_issues:{strict}",
+            lambda catalog: tuple(check_json_examples(catalog.all_prompts(), strict))
+        ))
     
     def get_available_providers(self) -> List[str]:
         """
@@ -322,7 +954,8 @@ class PromptManager:
             providers = manager.get_available_providers()
             # ['openai', 'gemma', 'llama']
         """
-        return list(self._prompts.keys())
+        tree = self._catalog.tree
+        return list(tree.keys())
     
     def get_available_domains(self) -> List[str]:
         """
@@ -335,8 +968,9 @@ class PromptManager:
             domains = manager.get_available_domains()
             # ['crop_advisory', 'prompt_evals']
         """
+        tree = self._catalog.tree
         domains = set()
-        for provider_domains in self._prompts.values():
+        for provider_domains in tree.values():
             domains.update(provider_domains.keys())
         return sorted(list(domains))
     
@@ -371,6 +1005,7 @@ class PromptManager:
                 domain="prompt_evals"
             )
         """
+        tree = self._catalog.tree
         provider_str = provider.value if isinstance(provider, Provider) else provider if provider else None
         domain_str = domain.value if isinstance(domain, Domain) else domain if domain else None
         
@@ -378,18 +1013,18 @@ class PromptManager:
         
         if provider_str:
             # Filter by specific provider
-            if provider_str in self._prompts:
+            if provider_str in tree:
                 if domain_str:
                     # Filter by specific domain
-                    if domain_str in self._prompts[provider_str]:
-                        use_cases.update(self._prompts[provider_str][domain_str].keys())
+                    if domain_str in tree[provider_str]:
+                        use_cases.update(tree[provider_str][domain_str].keys())
                 else:
                     # All domains for this provider
-                    for domain_prompts in self._prompts[provider_str].values():
+                    for domain_prompts in tree[provider_str].values():
                         use_cases.update(domain_prompts.keys())
         else:
             # All providers
-            for provider_domains in self._prompts.values():
+            for provider_domains in tree.values():
                 if domain_str:
                     # Filter by specific domain
                     if domain_str in provider_domains:
@@ -407,14 +1042,17 @@ class PromptManager:
         domain: Optional[Union[str, Domain]] = None
     ) -> List[Prompt]:
         """
-        Search prompts by keyword in description or tags, optionally filtered by domain
+        Search prompts by keyword, optionally filtered by domain
+        
+        Matches tags, description, system prompt and user prompt template
+        through the catalog's search index, best match first.
         
         Args:
-            keyword: Keyword to search for
+            keyword: Keyword(s) to search for
             domain: Optional domain filter
             
         Returns:
-            List of matching Prompt objects
+            List of matching Prompt objects, ranked by relevance
             
         Examples:
             # Search all domains
@@ -423,27 +1061,169 @@ class PromptManager:
             # Search only in crop_advisory domain
             crop_pest = manager.search_prompts("pest", "crop_advisory")
         """
-        keyword_lower = keyword.lower()
+        return [result.prompt for result in self.search(keyword, domain)]
+
+    def search(
+        self,
+        query: str,
+        domain: Optional[Union[str, Domain]] = None,
+        provider: Optional[Union[str, Provider]] = None,
+        limit: Optional[int] = None
+    ) -> List[SearchResult]:
+        """
+        Full-text search with BM25 ranking and highlight offsets
+        
+        The inverted index is built once per catalog snapshot and rebuilt
+        automatically after prompts are registered or reloaded.
+        
+        Args:
+            query: Free-text query
+            domain: Optional domain filter
+            provider: Optional provider filter
+            limit: Maximum number of results
+            
+        Returns:
+            List of SearchResult(prompt, score, highlights), best match first.
+            highlights maps field names to (start, end) offsets.
+            
+        Example:
+            for result in manager.search("stem borer in rice", limit=3):
+                print(result.prompt, result.score, result.highlights)
+        """
         domain_str = domain.value if isinstance(domain, Domain) else domain if domain else None
-        matching_prompts = []
+        provider_str = provider.value if isinstance(provider, Provider) else provider if provider else None
+        index = self._catalog.derived("search_index", SearchIndex)
+        return index.search(query, domain=domain_str, provider=provider_str, limit=limit)
+    
+    def classify_query(
+        self,
+        query: str,
+        domain: Union[str, Domain] = "crop_advisory"
+    ) -> RouteResult:
+        """
+        Classify a raw farmer query into one of a domain's use cases
         
-        for provider_domains in self._prompts.values():
-            for current_domain, domain_prompts in provider_domains.items():
-                # Skip if domain filter is set and doesn't match
-                if domain_str and current_domain != domain_str:
-                    continue
-                    
-                for prompt in domain_prompts.values():
-                    # Search in description
-                    if keyword_lower in prompt.metadata.description.lower():
-                        matching_prompts.append(prompt)
-                        continue
-                    
-                    # Search in tags
-                    if any(keyword_lower in tag.lower() for tag in prompt.metadata.tags):
-                        matching_prompts.append(prompt)
-        
-        return matching_prompts
+        Runs locally in well under a millisecond, using a model built once
+        per catalog snapshot from prompt tags, descriptions and examples.
+        
+        Args:
+            query: Raw farmer message
+            domain: Domain whose use cases are candidates (default: crop_advisory)
+            
+        Returns:
+            RouteResult(use_case, score, scores); use_case is None when no
+            use case matched at all
+            
+        Example:
+            result = manager.classify_query("aphids on my mustard, what to spray?")
+            # RouteResult(use_case='pest_management', score=0.41, scores={...})
+        """
+        domain_str = domain.value if isinstance(domain, Domain) else domain
+        router = self._catalog.derived(
+            f"router:{domain_str}",
+            lambda catalog: PromptRouter(catalog, domain=domain_str)
+        )
+        return router.classify(query)
+
+    def route(
+        self,
+        query: str,
+        provider: Union[str, Provider] = "openai",
+        domain: Union[str, Domain] = "crop_advisory",
+        default_use_case: Optional[Union[str, UseCase]] = None,
+        min_score: float = 0.0
+    ) -> Prompt:
+        """
+        Pick the best prompt for a raw farmer query without an LLM call
+        
+        Args:
+            query: Raw farmer message
+            provider: Provider of the returned prompt
+            domain: Domain to route within (default: crop_advisory)
+            default_use_case: Use case to fall back to when no use case scores
+                above min_score
+            min_score: Minimum score required to accept the routed use case
+            
+        Returns:
+            Prompt for the routed use case
+            
+        Raises:
+            ValueError: If nothing matched and no default_use_case was given,
+                or the provider has no prompt for the routed use case
+            
+        Example:
+            prompt = manager.route("mandi rate for onion today", provider="llama")
+            # Prompt(llama, market_insights)
+        """
+        domain_str = domain.value if isinstance(domain, Domain) else domain
+        result = self.classify_query(query, domain_str)
+        use_case = result.use_case
+        if use_case is None or result.score <= min_score:
+            if default_use_case is None:
+                raise ValueError(f"Could not route query to a use case in domain '{domain_str}'")
+            use_case = default_use_case
+        return self.get_prompt(provider, use_case, domain_str)
+    
+    @property
+    def vocabularies(self) -> Mapping[str, Tuple[str, ...]]:
+        """Registered keyword vocabularies: {name: terms}"""
+        return self._vocabularies
+
+    def register_vocabulary(self, name: str, terms: Optional[Iterable[str]]):
+        """
+        Add, replace or remove a keyword vocabulary for match_keywords()
+        
+        Args:
+            name: Vocabulary name, e.g. "crop" or "pest"
+            terms: Terms of the vocabulary; None removes it
+            
+        Example:
+            manager.register_vocabulary("fertilizer", ["urea", "dap", "npk"])
+        """
+        with self._write_lock:
+            vocabularies = dict(self._vocabularies)
+            if terms is None:
+                vocabularies.pop(name, None)
+            else:
+                vocabularies[name] = tuple(terms)
+            self._vocabularies = MappingProxyType(vocabularies)
+
+    def match_keywords(self, text: str) -> List[KeywordMatch]:
+        """
+        Find every prompt tag and vocabulary term in a text in one pass
+        
+        All tags and vocabulary terms are compiled into one Aho-Corasick
+        automaton, rebuilt after the catalog or a vocabulary changes.
+        Matching is case-insensitive, treats "-" and "_" as spaces and
+        respects word boundaries.
+        
+        Args:
+            text: Text to scan, e.g. a farmer message
+            
+        Returns:
+            KeywordMatch(keyword, start, end, tags, prompts, vocabularies)
+            tuples in text order
+            
+        Example:
+            for match in manager.match_keywords("Pest control for stem borer in paddy"):
+                print(match.keyword, match.vocabularies, len(match.prompts))
+            # pest control () 3
+            # stem borer ('pest',) 0
+            # borer ('pest',) 0
+            # paddy ('crop',) 0
+        """
+        return self._keywords().match(text)
+
+    def _keywords(self) -> KeywordIndex:
+        """Return the keyword index for the current catalog and vocabularies"""
+        catalog = self._catalog
+        vocabularies = self._vocabularies
+        cached = self._keyword_index
+        if cached is not None and cached[0] is catalog and cached[1] is vocabularies:
+            return cached[2]
+        index = KeywordIndex(catalog.entries.values(), vocabularies)
+        self._keyword_index = (catalog, vocabularies, index)
+        return index
     
     def get_stats(self) -> Dict[str, int]:
         """
@@ -461,16 +1241,14 @@ class PromptManager:
             #   "use_cases": 10
             # }
         """
-        total = 0
-        for provider_domains in self._prompts.values():
-            for domain_prompts in provider_domains.values():
-                total += len(domain_prompts)
+        catalog = self._catalog
+        keys = catalog.entries.keys()
         
         return {
-            "total_prompts": total,
-            "providers": len(self._prompts),
-            "domains": len(self.get_available_domains()),
-            "use_cases": len(self.get_available_use_cases()),
+            "total_prompts": len(catalog),
+            "providers": len(catalog.tree),
+            "domains": len({domain for _, domain, _ in keys}),
+            "use_cases": len({use_case for _, _, use_case in keys}),
         }
     
     def get_domain_stats(self) -> Dict[str, Dict[str, int]]:
@@ -487,15 +1265,16 @@ class PromptManager:
             #   "prompt_evals": {"prompts": 5, "providers": 1, "use_cases": 5}
             # }
         """
+        keys = self._catalog.entries.keys()
         domain_stats = {}
         
-        for domain in self.get_available_domains():
-            prompts = self.get_prompts_by_domain(domain)
-            providers = set(p.metadata.provider.value for p in prompts)
-            use_cases = set(p.metadata.use_case.value for p in prompts)
+        for domain in sorted({domain for _, domain, _ in keys}):
+            domain_keys = [key for key in keys if key[1] == domain]
+            providers = set(provider for provider, _, _ in domain_keys)
+            use_cases = set(use_case for _, _, use_case in domain_keys)
             
             domain_stats[domain] = {
-                "prompts": len(prompts),
+                "prompts": len(domain_keys),
                 "providers": len(providers),
                 "use_cases": len(use_cases)
             }
@@ -0,0 +1,266 @@
+"""
+Prometheus Metrics - Prompt usage and render performance in text exposition format
+
+PrometheusMetrics is an instrumentation hook. Like MetricsAggregator it only
+queues events on the calling thread and folds them in batches, here into
+request counters and latency and token histograms labelled by operation,
+provider, domain, use case and version. Cache hit ratios and catalog reloads
+come from the counters kept by the instrumentation module.
+
+The metrics are rendered in the Prometheus text format (version 0.0.4): serve
+them over HTTP for a scraper, or write them to a file for node_exporter's
+textfile collector. No Prometheus client library is needed.
+"""
+
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from . import instrumentation
+from .instrumentation import FORMAT, FULL_PROMPT, MetricKey, MetricsAggregator, RenderEvent, RenderStats
+
+if TYPE_CHECKING:
+    from .models import Prompt
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "farmerchat_prompt"
+
+# Renders take microseconds; lookups well under that
+LATENCY_BUCKETS = (
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005,
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01,
+)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+LABELS = ("operation", "provider", "domain", "use_case", "version")
+Labels = Tuple[str, ...]
+
+
+class Histogram:
+    """Cumulative Prometheus histogram with fixed upper bounds"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        """Bucket counts for each bound and +Inf, as exposed (le semantics)"""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusMetrics(MetricsAggregator):
+    """
+    Instrumentation hook exposing prompt metrics to Prometheus
+
+    Metrics:
+        farmerchat_prompt_requests_total           counter, per prompt and operation
+        farmerchat_prompt_render_seconds           histogram of call latency
+        farmerchat_prompt_tokens                   histogram of estimated output tokens
+        farmerchat_prompt_output_chars_total       counter of rendered characters
+        farmerchat_prompt_cache_requests_total     counter, per cache and hit/miss
+        farmerchat_prompt_cache_hit_ratio          gauge, per cache
+        farmerchat_prompt_catalog_reloads_total    counter, per source
+
+    Usage:
+        metrics = add_hook(PrometheusMetrics(interval=5))
+        server = metrics.serve(9464)                  # GET /metrics
+        metrics.write_textfile("/var/lib/node_exporter/farmerchat.prom")
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 4096,
+        interval: Optional[float] = None,
+        latency_buckets: Sequence[float] = LATENCY_BUCKETS,
+        token_buckets: Sequence[float] = TOKEN_BUCKETS,
+    ):
+        """
+        Args:
+            batch_size: Fold queued events once this many are waiting
+            interval: Also fold every this many seconds on a daemon thread
+            latency_buckets: Upper bounds, in seconds, of the latency histogram
+            token_buckets: Upper bounds of the estimated token histogram
+        """
+        self.latency_buckets = tuple(latency_buckets)
+        self.token_buckets = tuple(token_buckets)
+        self._latency: Dict[Labels, Histogram] = {}
+        self._tokens: Dict[Labels, Histogram] = {}
+        super().__init__(batch_size=batch_size, interval=interval)
+
+    def _record(self, key: MetricKey, prompt: "Prompt", events: List[RenderEvent]) -> RenderStats:
+        stats = super()._record(key, prompt, events)
+        labels = key[:5]
+        latency = self._latency.get(labels)
+        if latency is None:
+            latency = self._latency[labels] = Histogram(self.latency_buckets)
+        for event in events:
+            latency.observe(event.duration_ns / 1e9)
+        if key.operation in (FORMAT, FULL_PROMPT):
+            tokens = self._tokens.get(labels)
+            if tokens is None:
+                tokens = self._tokens[labels] = Histogram(self.token_buckets)
+            ratio = instrumentation.chars_per_token(prompt)
+            for event in events:
+                tokens.observe(round(event.chars / ratio))
+        return stats
+
+    def render(self) -> str:
+        """Current metrics in the Prometheus text exposition format"""
+        totals = self.totals()
+        requests: Dict[Labels, int] = {}
+        chars: Dict[Labels, int] = {}
+        for key, stats in totals.items():
+            labels = key[:5]
+            requests[labels] = requests.get(labels, 0) + stats.count
+            chars[labels] = chars.get(labels, 0) + stats.chars
+        with self._flush_lock:
+            latency = {labels: self._copy(histogram) for labels, histogram in self._latency.items()}
+            tokens = {labels: self._copy(histogram) for labels, histogram in self._tokens.items()}
+
+        lines: List[str] = []
+        self._counter(lines, "requests_total", "Prompt lookups and renders", LABELS, requests)
+        self._histogram(lines, "render_seconds", "Latency of prompt lookups and renders", latency)
+        self._histogram(lines, "tokens", "Estimated tokens of rendered prompts", tokens)
+        self._counter(
+            lines, "output_chars_total", "Characters of rendered prompts", LABELS,
+            {labels: count for labels, count in chars.items() if labels[0] != instrumentation.GET_PROMPT},
+        )
+
+        caches = instrumentation.cache_counts()
+        cache_requests = {}
+        ratios = {}
+        for name, (hits, misses) in sorted(caches.items()):
+            cache_requests[(name, "hit")] = hits
+            cache_requests[(name, "miss")] = misses
+            if hits + misses:
+                ratios[(name,)] = hits / (hits + misses)
+        self._counter(
+            lines, "cache_requests_total", "Prompt cache lookups while instrumented",
+            ("cache", "result"), cache_requests,
+        )
+        self._gauge(lines, "cache_hit_ratio", "Share of cache lookups served from cache", ("cache",), ratios)
+        self._counter(
+            lines, "catalog_reloads_total", "Prompt catalog snapshots published",
+            ("source",), {(source,): count for source, count in sorted(instrumentation.reload_counts().items())},
+        )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _copy(histogram: Histogram) -> Histogram:
+        copy = Histogram(histogram.bounds)
+        copy.counts = list(histogram.counts)
+        copy.sum = histogram.sum
+        copy.count = histogram.count
+        return copy
+
+    @staticmethod
+    def _header(lines: List[str], name: str, help_text: str, kind: str):
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+    def _counter(
+        self,
+        lines: List[str],
+        name: str,
+        help_text: str,
+        names: Sequence[str],
+        values: Dict[Labels, float],
+        kind: str = "counter",
+    ):
+        self._header(lines, name, help_text, kind)
+        for labels, value in values.items():
+            lines.append(f"{PREFIX}_{name}{{{_labels(names, labels)}}} {_number(value)}")
+
+    def _gauge(
+        self, lines: List[str], name: str, help_text: str, names: Sequence[str], values: Dict[Labels, float]
+    ):
+        self._counter(lines, name, help_text, names, values, kind="gauge")
+
+    def _histogram(self, lines: List[str], name: str, help_text: str, histograms: Dict[Labels, Histogram]):
+        self._header(lines, name, help_text, "histogram")
+        for labels, histogram in histograms.items():
+            base = _labels(LABELS, labels)
+            bounds = [*histogram.bounds, float("inf")]
+            for bound, count in zip(bounds, histogram.cumulative()):
+                lines.append(f'{PREFIX}_{name}_bucket{{{base},le="{_number(bound)}"}} {count}')
+            lines.append(f"{PREFIX}_{name}_sum{{{base}}} {_number(histogram.sum)}")
+            lines.append(f"{PREFIX}_{name}_count{{{base}}} {histogram.count}")
+
+    def write_textfile(self, path: str):
+        """
+        Write the metrics to a file atomically, for node_exporter's textfile collector
+
+        The file is written next to ``path`` and renamed over it, so a
+        scraper never reads a partial file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".farmerchat-metrics-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(self.render())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve GET /metrics on a daemon thread
+
+        Returns:
+            The running server; call shutdown() and server_close() to stop it
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds would flood stderr
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(
+            target=server.serve_forever, name="farmerchat-metrics-http", daemon=True
+        ).start()
+        return server
@@ -2,11 +2,22 @@
 Data models for prompt management
 """
 
+import hashlib
+import json
 from enum import Enum
-from typing import Dict, Any, Optional
-from pydantic import BaseModel, Field
+from time import perf_counter_ns
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
 
+from . import instrumentation
+from .formatters import ChatFormatter, registry_generation, resolve_formatter
+from .templates import TemplateFields, TemplateVariableError
+from .truncation import fit_values
+
+if TYPE_CHECKING:
+    from .fewshot import ExampleIndex
+
 
 class Provider(str, Enum):
     """Supported AI providers"""
@@ -37,6 +48,12 @@ class UseCase(str, Enum):
     CONVERSATIONALITY_EVAL_FOR_STITCHING = "conversationality_eval_for_stitching"
 
 
+class TemplateEngine(str, Enum):
+    """Placeholder syntax of user_prompt_template"""
+    FORMAT = "format"  # str.format: {name}, literal braces doubled
+    TEMPLATE = "template"  # string.Template: ${name}, braces literal, $$ for $
+
+
 class PromptMetadata(BaseModel):
     """Metadata for a prompt template"""
     provider: Provider
@@ -55,48 +72,269 @@ class Prompt(BaseModel):
     user_prompt_template: str
     variables: Dict[str, str] = Field(default_factory=dict)
     examples: Optional[list[Dict[str, str]]] = None
+    defaults: Dict[str, str] = Field(default_factory=dict)
+    template_engine: TemplateEngine = TemplateEngine.FORMAT
+    formatter: Optional[str] = None  # Chat format name; None = provider default
+    
+    _template_fields: Optional[TemplateFields] = PrivateAttr(default=None)
+    _example_index: Optional["ExampleIndex"] = PrivateAttr(default=None)
+    _chat_formatter: Optional[tuple] = PrivateAttr(default=None)
+    _tokenized: Optional[Dict[tuple, tuple]] = PrivateAttr(default=None)
+    _fingerprint: Optional[tuple] = PrivateAttr(default=None)
+    
+    @property
+    def template_fields(self) -> TemplateFields:
+        """Required and optional placeholders of user_prompt_template, parsed once"""
+        # Read the private dict directly: pydantic's __getattr__ fallback for
+        # private attributes costs microseconds, more than the render itself
+        private = self.__pydantic_private__
+        fields = private.get("_template_fields")
+        engine = self.template_engine.value
+        if fields is None or fields.source is not self.user_prompt_template or fields.engine != engine:
+            fields = TemplateFields(
+                self.user_prompt_template, self.variables, self.defaults, engine
+            )
+            private["_template_fields"] = fields
+            if instrumentation.hooks:
+                instrumentation.record_cache("template_fields", False)
+        elif instrumentation.hooks:
+            instrumentation.record_cache("template_fields", True)
+        return fields
+    
+    @property
+    def fingerprint(self) -> str:
+        """
+        Short content hash of the text a model receives
+        
+        Covers the system prompt, user template, template engine, examples
+        and defaults, so two prompts with the same version string but edited
+        text have different fingerprints. Computed once per content change.
+        """
+        private = self.__pydantic_private__
+        cached = private.get("_fingerprint")
+        content = (
+            self.system_prompt, self.user_prompt_template, self.template_engine,
+            self.examples, self.defaults,
+        )
+        if cached is None or any(old is not new for old, new in zip(cached, content)):
+            digest = hashlib.sha256()
+            for part in (
+                self.system_prompt,
+                self.user_prompt_template,
+                self.template_engine.value,
+                json.dumps(self.examples, sort_keys=True),
+                json.dumps(self.defaults, sort_keys=True),
+            ):
+                digest.update(part.encode("utf-8"))
+                digest.update(b"\0")
+            cached = (*content, digest.hexdigest()[:12])
+            private["_fingerprint"] = cached
+        return cached[-1]
+    
+    @property
+    def chat_formatter(self) -> ChatFormatter:
+        """The formatter for this prompt, resolved once per registry change"""
+        return self._bound_formatter()[3]
+    
+    def _bound_formatter(self) -> tuple:
+        """(generation, formatter name, provider, formatter, bound full_prompt)"""
+        private = self.__pydantic_private__
+        bound = private.get("_chat_formatter")
+        provider = self.metadata.provider
+        generation = registry_generation()
+        if bound is None or bound[0] != generation or bound[1] != self.formatter or bound[2] is not provider:
+            formatter = resolve_formatter(provider.value, self.formatter)
+            bound = (generation, self.formatter, provider, formatter, formatter.full_prompt)
+            private["_chat_formatter"] = bound
+            if instrumentation.hooks:
+                instrumentation.record_cache("chat_formatter", False)
+        elif instrumentation.hooks:
+            instrumentation.record_cache("chat_formatter", True)
+        return bound
+    
+    @property
+    def example_index(self) -> "ExampleIndex":
+        """Similarity index over examples, built on first use"""
+        # Imported here: fewshot depends on the router, which imports this module
+        from .fewshot import ExampleIndex
+        
+        private = self.__pydantic_private__
+        index = private.get("_example_index")
+        if index is None or index.source is not self.examples:
+            index = ExampleIndex(self.examples)
+            private["_example_index"] = index
+            if instrumentation.hooks:
+                instrumentation.record_cache("example_index", False)
+        elif instrumentation.hooks:
+            instrumentation.record_cache("example_index", True)
+        return index
+    
+    def select_examples(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        token_budget: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Choose the examples most similar to a query
+        
+        Args:
+            query: User input the examples should resemble
+            k: Maximum number of examples (default: no limit)
+            token_budget: Maximum estimated tokens of the chosen examples
+            
+        Returns:
+            Example dicts, most similar first
+        """
+        return self.example_index.select(query, k, token_budget)
     
-    def format(self, **kwargs) -> str:
-        """Format the user prompt with provided variables"""
-        return self.user_prompt_template.format(**kwargs)
+    def format(
+        self,
+        token_budget: Optional[int] = None,
+        truncation: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> str:
+        """
+        Format the user prompt with provided variables
+        
+        Optional variables that are not passed take their default. An optional
+        variable rendered empty drops its whole section, label included.
+        
+        Args:
+            token_budget: Maximum estimated tokens of the rendered prompt
+            truncation: Field -> policy ("head", "tail", "middle", "facts")
+                for the fields that may be cut to meet token_budget
+            **kwargs: Template variables
+        
+        Raises:
+            TemplateVariableError: If required variables are missing
+                (a KeyError and ValueError subclass)
+            ValueError: If token_budget can't be met by truncating the
+                allowed fields
+        
+        Example:
+            prompt.format(
+                token_budget=6000,
+                truncation={"pred_facts": "facts", "response": "middle"},
+                **row,
+            )
+        """
+        start = perf_counter_ns() if instrumentation.hooks else 0
+        fields = self.template_fields
+        missing = fields.missing(kwargs)
+        if missing:
+            raise TemplateVariableError(
+                f"Missing required template variables for {self}: {', '.join(missing)}",
+                missing,
+            )
+        if token_budget is not None:
+            kwargs = fit_values(fields, kwargs, token_budget, truncation or {})
+        rendered = fields.render(kwargs)
+        if start:
+            instrumentation.emit(instrumentation.FORMAT, self, start, rendered)
+        return rendered
     
-    def get_full_prompt(self, user_input: str) -> Dict[str, Any]:
+    def get_full_prompt(
+        self,
+        user_input: str,
+        num_examples: Optional[int] = None,
+        example_budget: Optional[int] = None,
+        formatter: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Get a complete prompt structure ready for API calls
         
+        The structure comes from the prompt's chat formatter: OpenAI
+        messages, Llama 3 header tokens or Gemma turns by default.
+        
+        With num_examples or example_budget, the prompt's examples most similar
+        to user_input are included: as user/assistant turns in message
+        formats, and appended to the system prompt in string formats.
+        
         Args:
             user_input: The user's input/query
+            num_examples: Include at most this many examples
+            example_budget: Include examples up to this many estimated tokens
+            formatter: Use this registered formatter instead ("llama2",
+                "mistral", "chatml", ...)
             
         Returns:
             Dict with provider-specific structure
+            
+        Example:
+            prompt.get_full_prompt("Stem borer in paddy", num_examples=2, example_budget=800)
         """
-        if self.metadata.provider == Provider.OPENAI:
-            return {
-                "messages": [
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_input}
-                ]
-            }
-
-        elif self.metadata.provider == Provider.LLAMA:
-            return {
-                "prompt": f"[INST] <<SYS>>\n{self.system_prompt}\n<</SYS>>\n\n{user_input} [/INST]"
-            }
+        start = perf_counter_ns() if instrumentation.hooks else 0
+        if formatter is None:
+            full_prompt = self._bound_formatter()[4]
+        else:
+            full_prompt = resolve_formatter(self.metadata.provider.value, formatter).full_prompt
+        if num_examples is None and example_budget is None:
+            payload = full_prompt(self.system_prompt, user_input)
+        else:
+            selected = self.select_examples(user_input, num_examples, example_budget)
+            payload = full_prompt(self.system_prompt, user_input, selected)
+        if start:
+            instrumentation.emit(instrumentation.FULL_PROMPT, self, start, payload)
+        return payload
         
-        elif self.metadata.provider == Provider.GEMMA:
-            # Gemma IT (Instruction Tuned) format
-            # Gemma does not have a distinct "system" role token.
-            # Best practice: Prepend system instructions to the first user turn.
-            return {
-                "prompt": (
-                    f"<start_of_turn>user\n"
-                    f"{self.system_prompt}\n\n"  # System prompt injected here
-                    f"{user_input}<end_of_turn>\n"
-                    f"<start_of_turn>model\n"
-                )
-            }
+    def get_token_ids(
+        self,
+        user_input: str,
+        tokenizer: Any,
+        formatter: Optional[str] = None,
+        bos_id: Optional[int] = None
+    ) -> Any:
+        """
+        Get the full prompt as token IDs for a self-hosted model
+        
+        The static prefix and suffix around the user input are tokenized
+        once per tokenizer and cached on the prompt; each call tokenizes only
+        user_input. Requires numpy.
         
-        return {} # Fallback
+        Args:
+            user_input: The user's input/query
+            tokenizer: Callable or object with encode() returning token IDs;
+                see pretokenized.as_encoder()
+            formatter: Registered string formatter (default: the prompt's)
+            bos_id: BOS token ID to start with; formatters leave it out
+            
+        Returns:
+            1-D numpy int32 array of token IDs
+            
+        Raises:
+            ValueError: If the formatter produces chat messages (openai)
+            
+        Example:
+            encode = lambda text: tok.encode(text, add_special_tokens=False)
+            ids = prompt.get_token_ids(query, encode, bos_id=tok.bos_token_id)
+        """
+        from .pretokenized import TokenizedPrompt
         
+        private = self.__pydantic_private__
+        cache = private.get("_tokenized")
+        key = (id(tokenizer), formatter, bos_id)
+        generation = registry_generation()
+        entry = cache.get(key) if cache is not None else None
+        if (
+            entry is None
+            or entry[1] != generation
+            or entry[2].prompt is not self
+            or entry[2].system_prompt is not self.system_prompt
+        ):
+            if entry is not None and entry[2].prompt is not self:
+                # model_copy() shares the private dict; give the copy its own
+                cache = None
+            if cache is None:
+                cache = private["_tokenized"] = {}
+            # The tokenizer is kept in the entry so its id() cannot be reused
+            entry = (tokenizer, generation, TokenizedPrompt(self, tokenizer, formatter, bos_id))
+            cache[key] = entry
+            if instrumentation.hooks:
+                instrumentation.record_cache("token_ids", False)
+        elif instrumentation.hooks:
+            instrumentation.record_cache("token_ids", True)
+        return entry[2].encode(user_input)
+    
     def __str__(self) -> str:
         return f"Prompt({self.metadata.provider.value}, {self.metadata.use_case.value})"
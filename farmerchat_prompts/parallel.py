@@ -0,0 +1,204 @@
+"""
+Parallel rendering - Multi-process rendering backend for large offline jobs
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .models import Prompt
+
+RENDER_MODES = ("text", "full", "json")
+
+# Worker-side state, set once per worker process by the pool initializer.
+# Never set in the parent, so concurrent pools can't see each other's prompt.
+_worker_prompt: Optional[Prompt] = None
+_worker_mode: str = "text"
+
+
+def _init_worker(prompt: Prompt, mode: str):
+    """Pool initializer: bind the prompt and render mode for this worker"""
+    global _worker_prompt, _worker_mode
+    _worker_prompt = prompt
+    _worker_mode = mode
+
+
+def _render_row(prompt: Prompt, mode: str, row: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+    """Render a single row in the requested mode"""
+    text = prompt.format(**row)
+    if mode == "text":
+        return text
+    full = prompt.get_full_prompt(text)
+    if mode == "full":
+        return full
+    return json.dumps(full, ensure_ascii=False)
+
+
+def _render_chunk(rows: List[Dict[str, Any]]) -> List[Union[str, Dict[str, Any]]]:
+    """Render one chunk of rows with the worker's bound prompt"""
+    prompt = _worker_prompt
+    mode = _worker_mode
+    return [_render_row(prompt, mode, row) for row in rows]
+
+
+def _chunked(rows: Iterable[Dict[str, Any]], chunksize: int) -> Iterator[List[Dict[str, Any]]]:
+    """Lazily split an iterable of rows into lists of at most chunksize rows"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _resolve_prompt(
+    prompt: Union[Prompt, Tuple[str, ...]],
+    manager: Optional[Any]
+) -> Prompt:
+    """Resolve a Prompt from either a Prompt object or a (provider, use_case[, domain]) key"""
+    if isinstance(prompt, Prompt):
+        return prompt
+    if manager is None:
+        from .manager import PromptManager
+        manager = PromptManager()
+    return manager.get_prompt(*prompt)
+
+
+def _default_start_method() -> Optional[str]:
+    """Prefer fork on Linux so workers inherit the prompt without pickling"""
+    if sys.platform.startswith("linux") and "fork" in multiprocessing.get_all_start_methods():
+        return "fork"
+    return None
+
+
+def render_parallel(
+    prompt: Union[Prompt, Tuple[str, ...]],
+    rows: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    chunksize: int = 512,
+    ordered: bool = True,
+    mode: str = "text",
+    manager: Optional[Any] = None,
+    start_method: Optional[str] = None,
+) -> Iterator[Any]:
+    """
+    Render many rows of template variables across a pool of worker processes
+
+    The prompt is handed to each worker exactly once through the pool
+    initializer: inherited with the process image where fork is available,
+    otherwise pickled once per worker.
+    Rows are consumed lazily in chunks and at most ``2 * workers`` chunks are
+    in flight at a time, so arbitrarily large inputs stream in bounded memory.
+
+    Args:
+        prompt: Prompt object, or a (provider, use_case[, domain]) key
+        rows: Iterable of dicts with the template variables for each row
+        workers: Number of worker processes (default: CPU count).
+            With 1 worker, rows are rendered in the calling process.
+        chunksize: Number of rows sent to a worker per task
+        ordered: Preserve input order. When False, results are yielded as
+            (row_index, result) tuples in completion order.
+        mode: "text" for the formatted user prompt, "full" for the
+            provider-specific structure from get_full_prompt, or "json"
+            for that structure serialized to a JSON string
+        manager: PromptManager used to resolve a key (default: a new manager)
+        start_method: multiprocessing start method (default: fork on Linux)
+
+    Returns:
+        Iterator over rendered results
+
+    Raises:
+        ValueError: If mode, workers or chunksize is invalid
+
+    Example:
+        prompt = manager.get_prompt("openai", "fact_recall", "prompt_evals")
+        for payload in render_parallel(prompt, rows, workers=8, mode="json"):
+            out.write(payload + "\\n")
+    """
+    if mode not in RENDER_MODES:
+        raise ValueError(
+            f"Render mode '{mode}' not supported. "
+            f"Available modes: {', '.join(RENDER_MODES)}"
+        )
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    resolved = _resolve_prompt(prompt, manager)
+
+    if workers == 1:
+        return _render_serial(resolved, rows, ordered, mode)
+    return _render_pool(resolved, rows, workers, chunksize, ordered, mode, start_method)
+
+
+def _render_serial(
+    prompt: Prompt,
+    rows: Iterable[Dict[str, Any]],
+    ordered: bool,
+    mode: str
+) -> Iterator[Any]:
+    """In-process fallback used for a single worker"""
+    for index, row in enumerate(rows):
+        result = _render_row(prompt, mode, row)
+        yield result if ordered else (index, result)
+
+
+def _render_pool(
+    prompt: Prompt,
+    rows: Iterable[Dict[str, Any]],
+    workers: int,
+    chunksize: int,
+    ordered: bool,
+    mode: str,
+    start_method: Optional[str],
+) -> Iterator[Any]:
+    """Stream chunks through a process pool with a bounded in-flight window"""
+    method = start_method or _default_start_method()
+    context = multiprocessing.get_context(method)
+
+    max_pending = workers * 2
+    chunks = _chunked(rows, chunksize)
+
+    # Forked workers receive initargs through the copied process image,
+    # so the prompt is only pickled under spawn and forkserver
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(prompt, mode),
+    ) as executor:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_render_chunk, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            pending = {}
+            offset = 0
+            for chunk in chunks:
+                pending[executor.submit(_render_chunk, chunk)] = offset
+                offset += len(chunk)
+                if len(pending) >= max_pending:
+                    yield from _drain_completed(pending, FIRST_COMPLETED)
+            while pending:
+                yield from _drain_completed(pending, FIRST_COMPLETED)
+
+
+def _drain_completed(pending: Dict[Any, int], return_when: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (row_index, result) for every finished future and drop it from pending"""
+    done, _ = wait(pending, return_when=return_when)
+    for future in done:
+        start = pending.pop(future)
+        for position, result in enumerate(future.result()):
+            yield start + position, result
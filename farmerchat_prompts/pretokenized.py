@@ -0,0 +1,135 @@
+"""
+Pre-tokenized Prompts - Token-ID payloads for self-hosted inference servers
+
+A single-turn prompt is a static prefix (chat tokens and the system prompt),
+the user input, and a static suffix. The prefix and suffix are tokenized
+once per prompt and tokenizer; each request only tokenizes the user input
+and concatenates NumPy int32 arrays.
+
+numpy is optional and imported on first use. Any tokenizer works: a callable
+returning token IDs, an object whose ``encode()`` returns IDs, or one whose
+``encode()`` returns an object with ``.ids`` (Hugging Face ``tokenizers``).
+The tokenizer must map special-token strings such as ``<|eot_id|>`` to
+their IDs and should not add special tokens of its own, since it is called
+on fragments of the prompt. Formatters leave out the leading BOS token, so
+pass ``bos_id`` for servers that take token IDs as they are.
+"""
+
+from typing import Any, Callable, List, Optional, Sequence
+
+from .models import Prompt
+
+# Sentinel used to split a formatted prompt into prefix and suffix
+_SENTINEL = "\u0000farmerchat-user-input\u0000"
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "Token ID output requires numpy. "
+            "Install it with: pip install farmerchat-prompts[numpy]"
+        )
+    return np
+
+
+def as_encoder(tokenizer: Any) -> Callable[[str], Sequence[int]]:
+    """
+    Normalize a tokenizer to a text -> token IDs callable
+
+    Example:
+        encode = as_encoder(hf_tokenizer)             # tokenizers.Tokenizer
+        encode = as_encoder(lambda text: tok.encode(text, add_special_tokens=False))
+    """
+    encode = getattr(tokenizer, "encode", None)
+    if encode is None:
+        if not callable(tokenizer):
+            raise TypeError(
+                f"Tokenizer '{type(tokenizer).__name__}' must be callable or have an encode() method"
+            )
+        return tokenizer
+
+    def encode_ids(text: str) -> Sequence[int]:
+        encoded = encode(text)
+        return getattr(encoded, "ids", encoded)
+
+    return encode_ids
+
+
+class TokenizedPrompt:
+    """
+    Token IDs of a prompt's static prefix and suffix, for one tokenizer
+
+    The IDs are exactly the tokenizer's output for the prefix, the user
+    input and the suffix, each tokenized on its own. Tokenizers that merge
+    across those boundaries could produce different IDs for the whole
+    string; the built-in formatters put special tokens or newlines there.
+
+    Usage:
+        tokenized = TokenizedPrompt(prompt, tokenizer)
+        ids = tokenized.encode("Stem borer in my paddy")   # numpy int32 array
+    """
+
+    __slots__ = ("prompt", "formatter", "system_prompt", "prefix_ids", "suffix_ids", "_encode")
+
+    def __init__(
+        self,
+        prompt: Prompt,
+        tokenizer: Any,
+        formatter: Optional[str] = None,
+        bos_id: Optional[int] = None,
+    ):
+        """
+        Args:
+            prompt: Prompt to tokenize
+            tokenizer: Tokenizer, see as_encoder()
+            formatter: Registered string formatter (default: the prompt's)
+            bos_id: BOS token ID to start the prefix with (default: none)
+
+        Raises:
+            ValueError: If the formatter produces chat messages rather than text
+        """
+        np = _numpy()
+        payload = prompt.get_full_prompt(_SENTINEL, formatter=formatter)
+        text = payload.get("prompt")
+        if text is None or text.count(_SENTINEL) != 1:
+            name = formatter or prompt.chat_formatter.name
+            raise ValueError(
+                f"Formatter '{name}' does not produce a text prompt; "
+                f"token IDs need a string formatter such as llama3, gemma or chatml"
+            )
+        prefix, suffix = text.split(_SENTINEL)
+
+        self.prompt = prompt
+        self.formatter = formatter
+        self.system_prompt = prompt.system_prompt
+        self._encode = as_encoder(tokenizer)
+        prefix_ids = list(self._encode(prefix)) if prefix else []
+        if bos_id is not None:
+            prefix_ids.insert(0, bos_id)
+        self.prefix_ids = np.asarray(prefix_ids, dtype=np.int32)
+        self.suffix_ids = np.asarray(self._encode(suffix) if suffix else [], dtype=np.int32)
+
+    def encode(self, user_input: str) -> Any:
+        """
+        Token IDs of the full prompt for one user input
+
+        Returns:
+            1-D numpy int32 array: prefix IDs + input IDs + suffix IDs
+        """
+        np = _numpy()
+        ids = np.asarray(self._encode(user_input), dtype=np.int32)
+        return np.concatenate((self.prefix_ids, ids, self.suffix_ids))
+
+    def encode_batch(self, user_inputs: Sequence[str]) -> List[Any]:
+        """Token ID arrays for many user inputs, sharing the cached prefix"""
+        return [self.encode(user_input) for user_input in user_inputs]
+
+    @property
+    def static_tokens(self) -> int:
+        """Number of cached prefix and suffix tokens"""
+        return len(self.prefix_ids) + len(self.suffix_ids)
+
+    def __repr__(self) -> str:
+        return f"TokenizedPrompt({self.prompt}, static_tokens={self.static_tokens})"
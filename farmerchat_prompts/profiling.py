@@ -0,0 +1,204 @@
+"""
+Render Profiling - Sampled call stacks of prompt lookups and renders
+
+A RenderProfiler wraps PromptManager.get_prompt, Prompt.format and
+Prompt.get_full_prompt. A sampled call runs under a ``sys.setprofile``
+tracer that times every Python and builtin call beneath it (template
+parsing, pydantic attribute access, str.join, json.dumps, ...); the rest run
+the original method after one random() draw. Time is collected as
+flame-graph "collapsed stacks" per prompt key:
+
+    openai/crop_advisory/pest_management;models:Prompt.format;templates:TemplateFields.render 5300
+
+Values are nanoseconds of self time. Timings of a sampled call include the
+tracer's own overhead, so compare proportions rather than absolute numbers.
+"""
+
+import sys
+import threading
+from functools import wraps
+from random import random
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .models import Prompt
+
+if TYPE_CHECKING:
+    from .manager import PromptManager
+
+Stack = Tuple[str, ...]
+
+_PACKAGE_PREFIX = __name__.rsplit(".", 1)[0] + "."
+
+# Prompt methods wrapped while a profiler is installed
+PROFILED_METHODS = ("format", "get_full_prompt")
+
+_installed: Optional["RenderProfiler"] = None
+_install_lock = threading.Lock()
+
+
+def prompt_key(prompt: Prompt) -> str:
+    """Root frame of a prompt's stacks: provider/domain/use_case"""
+    metadata = prompt.metadata
+    return f"{metadata.provider.value}/{metadata.domain.value}/{metadata.use_case.value}"
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    if module.startswith(_PACKAGE_PREFIX):
+        module = module[len(_PACKAGE_PREFIX):]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _builtin_name(function: Any) -> str:
+    name = getattr(function, "__qualname__", None) or getattr(function, "__name__", repr(function))
+    module = getattr(function, "__module__", None)
+    return f"{module}:{name}" if module and module != "builtins" else name
+
+
+class RenderProfiler:
+    """
+    Sampling profiler for the render path
+
+    Usage:
+        profiler = manager.enable_profiling(sample_rate=0.01)
+        ...
+        profiler.dump("render.folded")   # flamegraph.pl render.folded > render.svg
+        manager.disable_profiling()
+    """
+
+    def __init__(self, sample_rate: float = 0.01):
+        """
+        Args:
+            sample_rate: Fraction of calls profiled, between 0 and 1
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"Sample rate {sample_rate} must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.samples = 0
+        self._stacks: Dict[str, Dict[Stack, int]] = {}
+        self._lock = threading.Lock()
+        self._originals: List[Tuple[Any, str, Any]] = []
+
+    def install(self, manager: "PromptManager") -> "RenderProfiler":
+        """
+        Wrap the manager's get_prompt and the Prompt render methods
+
+        Prompt methods are wrapped on the class, so renders of every prompt
+        are sampled while the profiler is installed.
+
+        Raises:
+            RuntimeError: If another profiler is already installed
+        """
+        global _installed
+        with _install_lock:
+            if _installed is not None:
+                raise RuntimeError("A render profiler is already installed; uninstall it first")
+            _installed = self
+            for name in PROFILED_METHODS:
+                original = Prompt.__dict__[name]
+                self._originals.append((Prompt, name, original))
+                setattr(Prompt, name, self._wrap(original, lambda args, result: prompt_key(args[0])))
+            # An instance attribute shadows the method for this manager only
+            get_prompt = manager.get_prompt
+            self._originals.append((manager, "get_prompt", None))
+            manager.get_prompt = self._wrap(get_prompt, lambda args, result: prompt_key(result))
+        return self
+
+    def uninstall(self):
+        """Restore the original methods"""
+        global _installed
+        with _install_lock:
+            for owner, name, original in reversed(self._originals):
+                if original is None:
+                    owner.__dict__.pop(name, None)
+                else:
+                    setattr(owner, name, original)
+            self._originals.clear()
+            if _installed is self:
+                _installed = None
+
+    def _wrap(self, function: Callable, key: Callable[[tuple, Any], str]) -> Callable:
+        profiler = self
+
+        @wraps(function)
+        def sampled(*args, **kwargs):
+            # Never replace another profiler, or our own in a nested call
+            if random() >= profiler.sample_rate or sys.getprofile() is not None:
+                return function(*args, **kwargs)
+            return profiler._profile(function, args, kwargs, key)
+
+        return sampled
+
+    def _profile(self, function: Callable, args: tuple, kwargs: dict, key: Callable[[tuple, Any], str]) -> Any:
+        """Run one call under the tracer and record its stacks"""
+        names: List[str] = []
+        starts: List[int] = []
+        children: List[int] = []
+        stacks: Dict[Stack, int] = {}
+
+        def tracer(frame, event, arg):
+            now = perf_counter_ns()
+            if event == "call" or event == "c_call":
+                names.append(_frame_name(frame) if event == "call" else _builtin_name(arg))
+                starts.append(now)
+                children.append(0)
+            elif names:  # return, c_return, c_exception
+                elapsed = now - starts.pop()
+                stack = tuple(names)
+                names.pop()
+                stacks[stack] = stacks.get(stack, 0) + elapsed - children.pop()
+                if children:
+                    children[-1] += elapsed
+
+        sys.setprofile(tracer)
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            sys.setprofile(None)
+
+        root = key(args, result).replace(";", ",")
+        with self._lock:
+            self.samples += 1
+            recorded = self._stacks.setdefault(root, {})
+            for stack, nanoseconds in stacks.items():
+                recorded[stack] = recorded.get(stack, 0) + nanoseconds
+        return result
+
+    def keys(self) -> List[str]:
+        """Prompt keys with at least one sampled call"""
+        with self._lock:
+            return sorted(self._stacks)
+
+    def collapsed(self, key: Optional[str] = None) -> List[str]:
+        """
+        Collapsed stack lines, "root;frame;frame nanoseconds"
+
+        Args:
+            key: Only this prompt key ("openai/crop_advisory/pest_management");
+                defaults to all keys
+        """
+        with self._lock:
+            selected = {key: self._stacks.get(key, {})} if key is not None else dict(self._stacks)
+            lines = []
+            for root in sorted(selected):
+                for stack, nanoseconds in sorted(selected[root].items()):
+                    frames = ";".join(frame.replace(";", ",").replace(" ", "_") for frame in stack)
+                    lines.append(f"{root};{frames} {nanoseconds}")
+        return lines
+
+    def dump(self, path: str, key: Optional[str] = None):
+        """Write collapsed stacks for flamegraph.pl, speedscope or inferno"""
+        with open(path, "w", encoding="utf-8") as handle:
+            for line in self.collapsed(key):
+                handle.write(line + "\n")
+
+    def reset(self):
+        """Discard recorded stacks"""
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def __repr__(self) -> str:
+        return f"RenderProfiler(sample_rate={self.sample_rate}, samples={self.samples})"
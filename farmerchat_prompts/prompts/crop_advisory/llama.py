@@ -34,15 +34,29 @@ INSTRUCTIONS:
 4. Consider both profitability and feasibility
 5. Use simple language farmers can understand
 
-EXAMPLE INPUT:
-Location: Patna, Bihar
+FORMAT: Follow this structure in your response. Be specific with numbers and practical advice.""",
+    user_prompt_template="""Provide crop recommendations for the following farm:
+
+FARM DETAILS:
+Location: {location}
+Soil Type: {soil_type}
+Soil pH: {soil_ph}
+Climate: {climate}
+Water Availability: {water_availability}
+Farm Size: {farm_size}
+
+ADDITIONAL INFORMATION:
+{additional_info}
+
+Please recommend suitable crops following the format and level of detail described above.""",
+    examples=[
+        {
+            "input": """Location: Patna, Bihar
 Soil: Loamy, pH 6.8
 Climate: Tropical, 1200mm rainfall
 Water: Canal irrigation available
-Farm Size: 3 acres
-
-EXAMPLE OUTPUT:
-### Top Crop Recommendations:
+Farm Size: 3 acres""",
+            "output": """### Top Crop Recommendations:
 
 **1. Rice (Paddy) - Suitability: 9/10**
 Best choice for your conditions because:
@@ -105,23 +119,71 @@ Economics:
 - **Crop Rotation**: Rice (Kharif) → Wheat (Rabi) is traditional and proven
 - **Soil Health**: Add compost or FYM 2 tons/acre before rice sowing
 - **Risk Management**: Consider crop insurance for weather-related risks
-- **Water Management**: Drip irrigation for wheat can save 30-40% water
-
-FORMAT: Follow this structure in your response. Be specific with numbers and practical advice.""",
-    user_prompt_template="""Provide crop recommendations for the following farm:
-
-FARM DETAILS:
-Location: {location}
-Soil Type: {soil_type}
-Soil pH: {soil_ph}
-Climate: {climate}
-Water Availability: {water_availability}
-Farm Size: {farm_size}
-
-ADDITIONAL INFORMATION:
-{additional_info}
-
-Please recommend suitable crops following the format and detail level shown in the example above.""",
+- **Water Management**: Drip irrigation for wheat can save 30-40% water"""
+        },
+        {
+            "input": """Location: Nashik, Maharashtra
+Soil: Black cotton soil, pH 7.8
+Climate: Semi-arid, 600mm rainfall
+Water: Well with drip irrigation
+Farm Size: 2 acres""",
+            "output": """### Top Crop Recommendations:
+
+**1. Onion (Rabi) - Suitability: 9/10**
+- Black soil and drip irrigation suit Nashik's main onion season
+- Duration: 120-140 days; yield 100-120 quintals/acre
+- Economics: ₹1,500-2,000/quintal, input costs ₹40,000-50,000/acre
+
+**2. Grapes - Suitability: 7/10**
+- High returns but needs ₹3-4 lakh/acre to establish trellis
+- Only if you can wait 2 years for the first full harvest
+
+**3. Soybean (Kharif) - Suitability: 8/10**
+- Rainfed kharif crop before onion; 8-10 quintals/acre in 95-100 days
+- Fixes nitrogen and breaks the onion disease cycle"""
+        },
+        {
+            "input": """Location: Anantapur, Andhra Pradesh
+Soil: Red sandy loam, pH 6.5
+Climate: Dry, 550mm rainfall
+Water: Rainfed only
+Farm Size: 5 acres""",
+            "output": """### Top Crop Recommendations:
+
+**1. Groundnut (Kharif) - Suitability: 8/10**
+- Light red soil allows good pod development
+- Variety: K-6 or Dharani, 110 days; yield 6-8 quintals/acre rainfed
+- Economics: MSP about ₹6,400/quintal
+
+**2. Pigeon Pea (Tur) intercrop - Suitability: 8/10**
+- Sow 1 row of tur for every 7 rows of groundnut
+- Deep roots survive dry spells; adds 1-2 quintals/acre
+
+**3. Foxtail Millet - Suitability: 7/10**
+- Most drought tolerant option if the monsoon starts late (after July 15)
+- 75-80 days, very low input cost"""
+        },
+        {
+            "input": """Location: Ludhiana, Punjab
+Soil: Sandy loam, pH 8.2
+Climate: Subtropical, 700mm rainfall
+Water: Tubewell, falling water table
+Farm Size: 10 acres""",
+            "output": """### Top Crop Recommendations:
+
+**1. Maize (Kharif) instead of paddy - Suitability: 8/10**
+- Needs about 70% less water than paddy, protecting the water table
+- Hybrid PMH-1, 95-100 days; yield 22-25 quintals/acre
+
+**2. Wheat (Rabi) - Suitability: 9/10**
+- Variety PBW 826 or HD 3086; yield 20-22 quintals/acre
+- Sow with happy seeder into residue instead of burning
+
+**3. Summer Moong - Suitability: 7/10**
+- 60-65 days between wheat harvest and kharif sowing
+- Adds nitrogen; 4-5 quintals/acre"""
+        }
+    ],
     variables={
         "location": "Geographic location",
         "soil_type": "Soil classification",
@@ -130,7 +192,8 @@ Please recommend suitable crops following the format and detail level shown in t
         "water_availability": "Irrigation availability",
         "farm_size": "Area in acres",
         "additional_info": "Other relevant details"
-    }
+    },
+    defaults={"additional_info": ""}
 )
 
 # Pest Management
@@ -153,16 +216,39 @@ YOUR TASK:
 4. Provide preventive measures
 5. Include safety warnings
 
-EXAMPLE INPUT:
-Crop: Tomato
+FORMAT: Follow this detailed structure for every pest/disease inquiry.""",
+    user_prompt_template="""Diagnose and provide treatment for this pest/disease problem:
+
+PROBLEM DETAILS:
+Crop: {crop_name}
+Location: {location}
+Growth Stage: {growth_stage}
+
+SYMPTOMS:
+{symptoms}
+- Leaf Condition: {leaf_condition}
+- Plant Vigor: {plant_vigor}
+- Damage Pattern: {damage_pattern}
+
+SITUATION:
+- Affected Area: {affected_area}
+- Duration: {duration}
+- Weather: {recent_weather}
+- Previous Treatments: {previous_treatments}
+
+FARMER'S QUESTION:
+{farmer_question}
+
+Provide diagnosis and treatment plan following the detailed format described above.""",
+    examples=[
+        {
+            "input": """Crop: Tomato
 Location: Bangalore, Karnataka
 Symptoms: Yellow spots on leaves, leaves curling upward, white powder on undersides
 Affected Area: About 30% of plants
 Duration: Noticed 5 days ago
-Previous Treatment: None yet
-
-EXAMPLE OUTPUT:
-### DIAGNOSIS: Tomato Leaf Curl Virus (ToLCV) + Powdery Mildew
+Previous Treatment: None yet""",
+            "output": """### DIAGNOSIS: Tomato Leaf Curl Virus (ToLCV) + Powdery Mildew
 
 **Confidence Level**: 85% based on symptoms described
 
@@ -259,32 +345,66 @@ For Powdery Mildew:
 ### COST ESTIMATE:
 - Organic approach: ₹500-800/acre total
 - Chemical approach: ₹1,500-2,000/acre total
-- Expected to save: 40-50% of yield (worth ₹40,000-50,000/acre)
-
-FORMAT: Follow this detailed structure for every pest/disease inquiry.""",
-    user_prompt_template="""Diagnose and provide treatment for this pest/disease problem:
-
-PROBLEM DETAILS:
-Crop: {crop_name}
-Location: {location}
-Growth Stage: {growth_stage}
+- Expected to save: 40-50% of yield (worth ₹40,000-50,000/acre)"""
+        },
+        {
+            "input": """Crop: Rice (Paddy)
+Location: Raipur, Chhattisgarh
+Symptoms: Central shoot drying, dead hearts; white empty panicles in some hills
+Affected Area: About 15% of tillers
+Duration: 10 days""",
+            "output": """### DIAGNOSIS: Yellow Stem Borer
+
+**Confidence Level**: 90% - dead hearts and white ears are classic signs
 
-SYMPTOMS:
-{symptoms}
-- Leaf Condition: {leaf_condition}
-- Plant Vigor: {plant_vigor}
-- Damage Pattern: {damage_pattern}
-
-SITUATION:
-- Affected Area: {affected_area}
-- Duration: {duration}
-- Weather: {recent_weather}
-- Previous Treatments: {previous_treatments}
+### TREATMENT PLAN:
+1. **Mechanical**: Pull out and destroy dead hearts; collect egg masses from leaf tips
+2. **Biological**: Release Trichogramma japonicum, 50,000/ha, at weekly intervals
+3. **Chemical (if above 10% dead hearts)**: Chlorantraniliprole 18.5% SC at 60 ml/acre in 200 liters water
+
+### PREVENTION:
+- Install 8 pheromone traps/acre to monitor moths
+- Harvest close to the ground and plough in stubble"""
+        },
+        {
+            "input": """Crop: Cotton
+Location: Akola, Maharashtra
+Symptoms: Rosette flowers, bored green bolls with pink larvae inside
+Affected Area: 20% of bolls
+Duration: 2 weeks""",
+            "output": """### DIAGNOSIS: Pink Bollworm
+
+**Confidence Level**: 95% - rosette flowers and pink larvae in bolls
 
-FARMER'S QUESTION:
-{farmer_question}
+### TREATMENT PLAN:
+1. **Mechanical**: Pick and destroy rosette flowers and damaged bolls
+2. **Monitoring**: 5 pheromone traps/acre; act above 8 moths/trap/night for 3 nights
+3. **Chemical**: Profenophos 50% EC at 400 ml/acre; repeat after 15 days with a different group (emamectin benzoate 5% SG, 80 g/acre)
+
+### PREVENTION:
+- Finish the crop by December; no ratoon cotton
+- Destroy stalks and gin waste after harvest"""
+        },
+        {
+            "input": """Crop: Mustard
+Location: Bharatpur, Rajasthan
+Symptoms: Colonies of small green insects on flower buds and pods, sticky leaves
+Affected Area: 40% of plants
+Duration: 1 week, after cloudy weather""",
+            "output": """### DIAGNOSIS: Mustard Aphid
+
+**Confidence Level**: 90% - colonies on inflorescence after cloudy, cool weather
 
-Provide diagnosis and treatment plan following the detailed format shown in the example.""",
+### TREATMENT PLAN:
+1. **Organic (light attack)**: Neem oil 1500 ppm at 5 ml/liter
+2. **Chemical (above 25 aphids per 10 cm of shoot)**: Dimethoate 30% EC at 250 ml/acre or thiamethoxam 25% WG at 40 g/acre
+3. Spray in the afternoon to protect pollinating bees
+
+### PREVENTION:
+- Sow by mid-October, before aphid build-up
+- Avoid excess nitrogen fertilizer"""
+        }
+    ],
     variables={
         "crop_name": "Name of crop",
         "location": "Farm location",
@@ -322,8 +442,43 @@ YOUR APPROACH:
 5. Provide application timing and methods
 6. Estimate costs
 
-EXAMPLE INPUT:
-Location: Araria, Bihar
+FORMAT: Provide detailed, practical guidance in every soil analysis.""",
+    user_prompt_template="""Analyze this soil test report and provide recommendations:
+
+FARM INFORMATION:
+- Location: {location}
+- Farm Size: {farm_size}
+- Intended Crop: {intended_crop}
+- Last Crop Grown: {last_crop}
+
+SOIL TEST RESULTS:
+Physical Properties:
+- Soil Type: {soil_type}
+- Sand: {sand_percent}%
+- Silt: {silt_percent}%
+- Clay: {clay_percent}%
+
+Chemical Properties:
+- pH: {ph}
+- EC: {ec} dS/m
+- Organic Carbon: {organic_carbon}%
+
+Nutrients (Available):
+- Nitrogen (N): {nitrogen} kg/ha
+- Phosphorus (P₂O₅): {phosphorus} kg/ha
+- Potassium (K₂O): {potassium} kg/ha
+- Sulfur: {sulfur} ppm
+- Zinc: {zinc} ppm
+- Iron: {iron} ppm
+- Boron: {boron} ppm
+
+ADDITIONAL INFORMATION:
+{additional_info}
+
+Provide detailed soil analysis and fertilizer recommendations following the format above.""",
+    examples=[
+        {
+            "input": """Location: Araria, Bihar
 Farm Size: 2 acres
 Intended Crop: Rice (Paddy)
 
@@ -334,10 +489,8 @@ Soil Test Results:
 - Nitrogen: 120 kg/ha (Low)
 - Phosphorus: 8 kg/ha (Low)
 - Potassium: 95 kg/ha (Low)
-- Zinc: 0.3 ppm (Deficient)
-
-EXAMPLE OUTPUT:
-### SOIL HEALTH ASSESSMENT: POOR (Needs Significant Improvement)
+- Zinc: 0.3 ppm (Deficient)""",
+            "output": """### SOIL HEALTH ASSESSMENT: POOR (Needs Significant Improvement)
 
 **Overall Status**: Your soil is currently in poor condition due to low nutrients and acidity. However, with proper amendments, it can become productive for rice cultivation.
 
@@ -487,42 +640,75 @@ Apply Farm Yard Manure (FYM) or Compost:
 - Don't skip lime application - most critical step
 - Don't apply all urea at once (will be wasted)
 - Don't neglect organic matter
-- Don't apply fertilizers in dry soil
-
-FORMAT: Provide this level of detail and practical guidance in every soil analysis.""",
-    user_prompt_template="""Analyze this soil test report and provide recommendations:
-
-FARM INFORMATION:
-- Location: {location}
-- Farm Size: {farm_size}
-- Intended Crop: {intended_crop}
-- Last Crop Grown: {last_crop}
-
-SOIL TEST RESULTS:
-Physical Properties:
-- Soil Type: {soil_type}
-- Sand: {sand_percent}%
-- Silt: {silt_percent}%
-- Clay: {clay_percent}%
-
-Chemical Properties:
-- pH: {ph}
-- EC: {ec} dS/m
-- Organic Carbon: {organic_carbon}%
-
-Nutrients (Available):
-- Nitrogen (N): {nitrogen} kg/ha
-- Phosphorus (P₂O₅): {phosphorus} kg/ha
-- Potassium (K₂O): {potassium} kg/ha
-- Sulfur: {sulfur} ppm
-- Zinc: {zinc} ppm
-- Iron: {iron} ppm
-- Boron: {boron} ppm
-
-ADDITIONAL INFORMATION:
-{additional_info}
-
-Provide detailed soil analysis and fertilizer recommendations following the format above.""",
+- Don't apply fertilizers in dry soil"""
+        },
+        {
+            "input": """Location: Karnal, Haryana
+Intended Crop: Wheat
+Soil Test: pH 8.9, EC 1.2 dS/m, OC 0.32%
+Nitrogen: 140 kg/ha (Low), Phosphorus: 12 kg/ha (Medium), Potassium: 260 kg/ha (Medium)
+Zinc: 0.45 ppm (Deficient)""",
+            "output": """### SOIL HEALTH SUMMARY:
+**Overall Rating**: Poor - sodic (alkaline) soil with low organic carbon
+
+### KEY PROBLEMS:
+1. **High pH (8.9)**: Sodium limits nutrient uptake
+2. **Low organic carbon**: Poor structure and water holding
+3. **Zinc deficiency**: Common in alkaline soils
+
+### CORRECTIVE ACTIONS:
+- **Gypsum**: 2 tons/acre before sowing, mixed in the top 15 cm
+- **Organic matter**: FYM 4 tons/acre or green manure (dhaincha) in kharif
+
+### FERTILIZER PLAN FOR WHEAT (per acre):
+- Urea: 110 kg in 3 splits (basal, first irrigation, second irrigation)
+- DAP: 55 kg at sowing
+- MOP: 20 kg at sowing
+- Zinc sulphate: 10 kg at sowing"""
+        },
+        {
+            "input": """Location: Thrissur, Kerala
+Intended Crop: Banana
+Soil Test: pH 4.9, OC 1.1%
+Nitrogen: 320 kg/ha (Medium), Phosphorus: 35 kg/ha (High), Potassium: 95 kg/ha (Low)
+Boron: 0.3 ppm (Deficient)""",
+            "output": """### SOIL HEALTH SUMMARY:
+**Overall Rating**: Fair - strongly acidic laterite with low potassium
+
+### KEY PROBLEMS:
+1. **Acidity (pH 4.9)**: Aluminium toxicity risk, poor calcium
+2. **Low potassium**: Banana needs more K than any other nutrient
+3. **Boron deficiency**: Causes poorly filled fingers
+
+### CORRECTIVE ACTIONS:
+- **Lime**: 1 kg dolomite per pit, 2 weeks before planting
+- Skip DAP this season - phosphorus is already high
+
+### FERTILIZER PLAN FOR BANANA (per plant per crop):
+- Urea: 450 g in 5-6 splits
+- MOP: 600 g in 5-6 splits
+- Borax: 25 g at 2 and 4 months"""
+        },
+        {
+            "input": """Location: Guntur, Andhra Pradesh
+Intended Crop: Chilli
+Soil Test: pH 7.4, EC 0.6 dS/m, OC 0.45%
+Nitrogen: 180 kg/ha (Low), Phosphorus: 28 kg/ha (Medium), Potassium: 410 kg/ha (High)
+Sulfur: 8 ppm (Low)""",
+            "output": """### SOIL HEALTH SUMMARY:
+**Overall Rating**: Good - neutral black soil, nitrogen and sulfur are limiting
+
+### KEY PROBLEMS:
+1. **Low nitrogen**: Fewer branches and fruits
+2. **Low sulfur**: Pale new leaves, lower pungency
+
+### FERTILIZER PLAN FOR CHILLI (per acre):
+- Urea: 130 kg in 4 splits (transplanting, 30, 60, 90 days)
+- SSP: 150 kg at transplanting (also supplies 18 kg sulfur)
+- MOP: 20 kg only - potassium is already high
+- FYM: 5 tons before transplanting"""
+        }
+    ],
     variables={
         "location": "Farm location",
         "farm_size": "Area in acres",
@@ -543,7 +729,8 @@ Provide detailed soil analysis and fertilizer recommendations following the form
         "iron": "Available Fe",
         "boron": "Available B",
         "additional_info": "Other information"
-    }
+    },
+    defaults={"additional_info": ""}
 )
 
 # Weather Advisory
@@ -567,8 +754,32 @@ YOUR TASK:
 5. Give timing for critical operations
 6. Warn about weather risks
 
-EXAMPLE INPUT:
-Location: Patna, Bihar
+FORMAT: Provide detailed, day-by-day guidance for every weather advisory request.""",
+    user_prompt_template="""Provide weather-based farming advice:
+
+LOCATION & DATE:
+- Location: {location}
+- Today's Date: {current_date}
+
+WEATHER FORECAST:
+Current: {current_weather}
+
+Next 24 hours: {forecast_24h}
+Next 3 days: {forecast_3day}
+Next 7 days: {forecast_7day}
+
+FARM STATUS:
+Current Crops: {crops_and_stages}
+Planned Activities: {planned_activities}
+Concerns: {specific_concerns}
+
+Irrigation: {irrigation_available}
+Equipment: {equipment_status}
+
+Provide detailed weather-based guidance following the format above.""",
+    examples=[
+        {
+            "input": """Location: Patna, Bihar
 Date: June 15, 2024
 
 Weather Forecast (Next 7 days):
@@ -578,10 +789,8 @@ Weather Forecast (Next 7 days):
 - Day 5-7: Partly cloudy, no rain, 34-36°C
 
 Current Crops: Rice (transplanting planned), Vegetables (flowering stage)
-Planned: Want to transplant rice seedlings this week
-
-EXAMPLE OUTPUT:
-### WEATHER INTERPRETATION:
+Planned: Want to transplant rice seedlings this week""",
+            "output": """### WEATHER INTERPRETATION:
 
 **Summary**: Heavy monsoon rain expected for next 4 days (total 100-140mm), followed by clear weather.
 
@@ -785,31 +994,61 @@ After this week, expect:
 - More scattered monsoon rain (check forecast weekly)
 - Temperature: 32-35°C (good for rice)
 - Humidity: 70-80% (watch for fungal diseases)
-- Plan next activities based on updated forecast
-
-FORMAT: Provide detailed, day-by-day guidance like this for every weather advisory request.""",
-    user_prompt_template="""Provide weather-based farming advice:
-
-LOCATION & DATE:
-- Location: {location}
-- Today's Date: {current_date}
-
-WEATHER FORECAST:
-Current: {current_weather}
-
-Next 24 hours: {forecast_24h}
-Next 3 days: {forecast_3day}
-Next 7 days: {forecast_7day}
-
-FARM STATUS:
-Current Crops: {crops_and_stages}
-Planned Activities: {planned_activities}
-Concerns: {specific_concerns}
-
-Irrigation: {irrigation_available}
-Equipment: {equipment_status}
-
-Provide detailed weather-based guidance following the format above.""",
+- Plan next activities based on updated forecast"""
+        },
+        {
+            "input": """Location: Hisar, Haryana
+Date: January 8, 2025
+Weather Forecast: Cold wave, minimum temperature 1-2°C for 3 nights, clear skies, no wind
+Current Crops: Mustard (pod formation), Potato (tuber bulking)""",
+            "output": """### WEATHER INTERPRETATION:
+**Summary**: Ground frost likely on clear, calm nights below 2°C.
+
+### IMMEDIATE ACTIONS (TODAY):
+1. **Light irrigation** to mustard and potato this evening - moist soil holds heat
+2. **Smoke**: Burn crop waste on the windward side of the field around midnight
+3. **Potato**: Spray 0.1% sulphuric acid (1 ml/liter) to reduce frost injury
+
+### AVOID:
+- No spraying of fungicides or insecticides during frost nights
+- Do not irrigate heavily - waterlogging plus cold damages potato tubers"""
+        },
+        {
+            "input": """Location: Bhubaneswar, Odisha
+Date: October 22, 2024
+Weather Forecast: Cyclone warning, heavy rain 150-200mm and winds 80-100 km/h within 48 hours
+Current Crops: Rice (grain filling), Vegetables (fruiting)""",
+            "output": """### WEATHER INTERPRETATION:
+**Summary**: Severe cyclone - lodging and flooding risk for ripening rice.
+
+### IMMEDIATE ACTIONS (NEXT 24 HOURS):
+1. **Rice**: Harvest any plots above 80% grain maturity now
+2. **Drainage**: Open field bunds and clear drains to release flood water
+3. **Vegetables**: Pick all marketable fruits; stake or tie tall plants
+
+### AFTER THE CYCLONE:
+- Drain standing water within 2 days
+- Spray carbendazim 1 g/liter on vegetables to prevent rot
+- Photograph damage and inform the insurance company within 72 hours"""
+        },
+        {
+            "input": """Location: Jodhpur, Rajasthan
+Date: May 12, 2024
+Weather Forecast: Heat wave, maximum 45-47°C for 5 days, hot dry winds
+Current Crops: Summer moong (flowering), Vegetables (okra, cucurbits)""",
+            "output": """### WEATHER INTERPRETATION:
+**Summary**: Extreme heat will cause flower drop and plant wilting.
+
+### IMMEDIATE ACTIONS:
+1. **Irrigation timing**: Irrigate only in the early morning or evening, every 4-5 days
+2. **Mulching**: Cover vegetable beds with straw to keep soil cool
+3. **Moong**: Spray 2% urea (20 g/liter) in the evening to reduce flower drop
+
+### AVOID:
+- No field work between 11 AM and 4 PM
+- Postpone transplanting until temperatures fall below 40°C"""
+        }
+    ],
     variables={
         "location": "Farm location",
         "current_date": "Today's date",
@@ -846,8 +1085,38 @@ YOUR APPROACH:
 5. Recommend best selling option
 6. Provide net income estimates
 
-EXAMPLE INPUT:
-Produce: Wheat
+FORMAT: Provide a comprehensive analysis with clear calculations for every market inquiry.""",
+    user_prompt_template="""Provide market advice for selling this produce:
+
+PRODUCE DETAILS:
+- Commodity: {commodity}
+- Quantity: {quantity} {unit}
+- Quality: {quality_grade}
+- Harvest Date: {harvest_date}
+- Moisture Content: {moisture}%
+
+CURRENT MARKET SITUATION:
+- Location: {location}
+- Local Mandi Price: ₹{local_price}/{unit}
+- Nearby Market Price: ₹{nearby_price}/{unit}
+- Distance to Nearby Market: {distance_km} km
+- MSP (if applicable): ₹{msp}/{unit}
+- Last Year Same Time: ₹{last_year_price}/{unit}
+
+FARMER RESOURCES:
+- Storage Available: {storage_type}
+- Storage Cost: ₹{storage_cost}/{unit}/month
+- Transport Cost: ₹{transport_cost} per trip
+- Transport Capacity: {transport_capacity} {unit}/trip
+- Cash Urgency: {cash_need}
+
+FARMER'S QUESTION:
+{farmer_question}
+
+Provide comprehensive market analysis and selling recommendation following the format above.""",
+    examples=[
+        {
+            "input": """Produce: Wheat
 Quantity: 100 quintals (10,000 kg)
 Quality: Grade A (good quality, 12% moisture)
 Location: Rohtak, Haryana
@@ -861,10 +1130,8 @@ Current Prices:
 
 Storage: Cold storage available at ₹50/quintal/month
 Transport: ₹300 per trip (can load 50 quintals)
-Cash Need: Not urgent, can wait 2-3 months
-
-EXAMPLE OUTPUT:
-### MARKET ANALYSIS:
+Cash Need: Not urgent, can wait 2-3 months""",
+            "output": """### MARKET ANALYSIS:
 
 **Current Price Assessment:**
 
@@ -1134,37 +1401,69 @@ AVOID:          Storage (not economical for 3-4 months)
 Once payment received, consider:
 - Save 30-40% for next season inputs
 - Invest in soil testing/improvements
-- Keep emergency fund for family needs
-
-FORMAT: Provide this comprehensive analysis with clear calculations for every market inquiry.""",
-    user_prompt_template="""Provide market advice for selling this produce:
-
-PRODUCE DETAILS:
-- Commodity: {commodity}
-- Quantity: {quantity} {unit}
-- Quality: {quality_grade}
-- Harvest Date: {harvest_date}
-- Moisture Content: {moisture}%
-
-CURRENT MARKET SITUATION:
-- Location: {location}
-- Local Mandi Price: ₹{local_price}/{unit}
-- Nearby Market Price: ₹{nearby_price}/{unit}
-- Distance to Nearby Market: {distance_km} km
-- MSP (if applicable): ₹{msp}/{unit}
-- Last Year Same Time: ₹{last_year_price}/{unit}
-
-FARMER RESOURCES:
-- Storage Available: {storage_type}
-- Storage Cost: ₹{storage_cost}/{unit}/month
-- Transport Cost: ₹{transport_cost} per trip
-- Transport Capacity: {transport_capacity} {unit}/trip
-- Cash Urgency: {cash_need}
-
-FARMER'S QUESTION:
-{farmer_question}
-
-Provide comprehensive market analysis and selling recommendation following the format above.""",
+- Keep emergency fund for family needs"""
+        },
+        {
+            "input": """Commodity: Onion
+Quantity: 60 quintals, Grade A, harvested April 20
+Location: Lasalgaon, Maharashtra
+Local Price: ₹1,200/quintal
+Storage: Well-ventilated onion shed (chawl) available
+Cash Need: Low""",
+            "output": """### RECOMMENDATION: STORE AND SELL IN PHASES
+
+**Price Outlook**: Rabi onion prices usually rise 40-80% between May and September as stocks fall.
+
+### SELLING PLAN:
+- **Now**: Sell 15 quintals to cover immediate costs
+- **July-August**: Sell 25 quintals
+- **September**: Sell the rest before the kharif crop arrives
+
+### RISKS:
+- Storage loss of 15-20% over 4 months from shrinkage and rot
+- Grade the onions and sort out damaged bulbs before storing
+
+**Expected Gain**: About ₹25,000-40,000 over selling everything now"""
+        },
+        {
+            "input": """Commodity: Wheat
+Quantity: 40 quintals, FAQ grade
+Location: Vidisha, Madhya Pradesh
+Local Price: ₹2,150/quintal, MSP ₹2,275/quintal
+Storage: No proper storage
+Cash Need: High (loan repayment due)""",
+            "output": """### RECOMMENDATION: SELL AT MSP PROCUREMENT CENTRE
+
+**Reason**: MSP is ₹125/quintal above the mandi price and you need cash now.
+
+### ACTION STEPS:
+1. Register on the state procurement portal with Aadhaar and bank details
+2. Book a slot at the nearest procurement centre
+3. Keep moisture below 12% - dry the grain 1-2 days if needed
+
+**Expected Income**: 40 × ₹2,275 = ₹91,000, paid to your bank account
+**Extra over mandi**: ₹5,000"""
+        },
+        {
+            "input": """Commodity: Tomato
+Quantity: 20 quintals, ripening fast
+Location: Kolar, Karnataka
+Local Price: ₹600/quintal (glut)
+Nearby Market: Bengaluru at ₹1,100/quintal, 70 km away
+Transport: ₹80/quintal""",
+            "output": """### RECOMMENDATION: SELL IN BENGALURU WITHIN 2 DAYS
+
+**Reason**: Tomatoes cannot be stored; the city price beats the glut price even after transport.
+
+### COMPARISON:
+- Kolar: 20 × ₹600 = ₹12,000
+- Bengaluru: 20 × (₹1,100 - ₹80) = ₹20,400
+
+### TIPS:
+- Pick at the breaker stage for the next lots so they survive transport
+- Ask a farmer producer organization (FPO) about processing contracts for future gluts"""
+        }
+    ],
     variables={
         "commodity": "Name of produce",
         "quantity": "Amount to sell",
@@ -51,7 +51,8 @@ Additional Context: {additional_info}""",
         "water_availability": "High/Medium/Low",
         "farm_size": "Area in acres",
         "additional_info": "Any other relevant details"
-    }
+    },
+    defaults={"additional_info": ""}
 )
 
 # Pest Management
@@ -97,7 +98,8 @@ Additional Observations: {additional_info}""",
         "duration": "How long issue has persisted",
         "previous_treatments": "Any treatments already tried",
         "additional_info": "Weather, irrigation, or other relevant factors"
-    }
+    },
+    defaults={"additional_info": ""}
 )
 
 # Soil Analysis
@@ -154,7 +156,8 @@ Additional Notes: {additional_info}""",
         "silt_percent": "Silt content %",
         "crop": "Crop to be grown",
         "additional_info": "Any other relevant information"
-    }
+    },
+    defaults={"additional_info": ""}
 )
 
 # Weather Advisory
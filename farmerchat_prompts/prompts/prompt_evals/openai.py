@@ -48,34 +48,34 @@ For each fact, evaluate these 7 flags (Yes/No):
 ## Output Format
 
 Return JSON with:
-{{
+{
  "text": "[original fact]",
  "label": "Specific" or "Not Specific",
  "flags": ["list of triggered flag names"],
  "justification": "Brief explanation referencing anchors and actionability"
-}}
+}
 
 ## Examples
 
 **Specific Example:**
 Input: "The optimal sowing time for mustard in Rahmat Ganj is from mid-October to the end of November."
 Output:
-{{
+{
  "text": "The optimal sowing time for mustard in Rahmat Ganj is from mid-October to the end of November.",
  "label": "Specific",
  "flags": ["entity_specificity", "location_specificity", "time_specificity", "actionability"],
  "justification": "Mentions crop (mustard), location (Rahmat Ganj), and precise time window, enabling concrete sowing decision."
-}}
+}
 
 **Not Specific Example:**
 Input: "Sandy soils drain quickly, reducing lodging risk."
 Output:
-{{
+{
  "text": "Sandy soils drain quickly, reducing lodging risk.",
  "label": "Not Specific",
  "flags": ["entity_specificity", "mechanistic_link"],
  "justification": "Has mechanism but lacks time, location, quantities and is not tied to concrete decision in context."
-}}
+}
 
 Now classify the given agricultural fact using this framework.""",
     user_prompt_template="""Classify the following agricultural fact:
@@ -128,17 +128,17 @@ Each fact must contain exactly ONE verifiable claim. Break down complex statemen
 **OUTPUT FORMAT:**
 Return a JSON object with a "facts" array where each fact includes:
 
-{{
+{
  "facts": [
-   {{
+   {
      "fact": "The atomic factual statement (preserve original phrasing when possible)",
      "category": "One of: [crop_variety, pest_disease, soil_management, irrigation, seasonal_practice, input_management]",
      "location_dependency": "bihar_specific | universal | region_adaptable",
      "bihar_relevance": "high | medium | low",
      "confidence": 0.0-1.0
-   }}
+   }
  ]
-}}
+}
 
 **CONFIDENCE SCORING GUIDELINES:**
 - 0.9-1.0: Well-established scientific facts, standardized practices
@@ -214,11 +214,11 @@ MATCHING CRITERIA EXAMPLES:
 - Dosage: "Apply 5-10 kg zinc per hectare for sugarcane" ≈ "Apply 5-10 kg of Zinc (Zn) per hectare for sugarcane growth"
 
 RESPOND WITH ONLY JSON:
-{{{{
+{{
     "best_match": "exact text of best matching candidate fact or null if no good match",
     "reason": "detailed explanation focusing on specific agricultural elements that align (crop type, practice, measurements, outcomes) or why no adequate match exists",
     "confidence": 0.0-1.0
-}}}}""",
+}}""",
     variables={
         "category": "Category of the fact being matched",
         "gold_fact": "Reference/golden fact to match against",
@@ -292,29 +292,29 @@ C. If candidate and reference do not share the same subject/entity AND property,
 --- OUTPUT JSON SCHEMA (RESPOND WITH ONLY THIS JSON) ---
 Return exactly one JSON object matching the schema below. If there are no genuine contradictions, return {{"contradictions": []}}.
 
-{{{{
+{{
   "contradictions": [
-    {{{{
+    {{
       "contradicting_fact": "exact text of the contradicting candidate fact",
       "reference_fact": "exact text of the reference fact",
       "reason": "short, specific explanation of the direct opposition or conflict (mention component(s) compared)",
       "confidence": "High|Med|Low",
       "components_compared": [
-        {{{{
+        {{
           "component": "temperature|humidity|effect|quantity|timing|method|nutrient|scale|other",
           "reference_value": "normalized value or text",
           "candidate_value": "normalized value or text",
           "status": "conflict|compatible|ambiguous|different_topic"
-        }}}}
+        }}
       ],
       "structured_justification": [
         "Step 1: one-line action (e.g., decomposed into components and matched subject)",
         "Step 2: one-line action (e.g., numeric ranges compared and found non-overlapping)",
         "Step 3: concise conclusion (e.g., contradiction due to humidity mismatch)"
       ]
-    }}}}
+    }}
   ]
-}}}}
+}}
 
 {additional_context}""",
     variables={
@@ -357,11 +357,11 @@ Task instructions:
 - Output MUST be valid JSON following the exact structure below. Do not include any extra top-level keys. Do not add commentary outside the JSON. Use numbers for numeric fields and arrays for lists.
 
 Output JSON schema:
-{{{{
+{{
   "question": "string - The agricultural question being analyzed",
   "ground_facts": ["array of ground truth facts"],
   "predicted_facts_analysis": [
-    {{{{
+    {{
       "predicted_fact": "string - The predicted fact being evaluated",
       "relevance_score": "number",                    // 1-10
       "ground_truth_alignment_score": "number",      // 1-10
@@ -372,15 +372,15 @@ Output JSON schema:
       "explanation": "string - Brief explanation of the evaluation",
       "gaps_identified": ["array of missing information or improvements needed"],
       "farmer_applicability": "string - Assessment of practical implementation ease"
-    }}}}
+    }}
   ],
-  "summary": {{{{
+  "summary": {{
     "total_predicted_facts": "number",
     "average_overall_score": "number",
     "key_insights": ["array of main findings"],
     "recommendations": ["array of suggestions for improvement"]
-  }}}}
-}}}}
+  }}
+}}
 
 Now analyze the following input and produce the JSON response:
 
@@ -606,42 +606,42 @@ Provide your complete response as a natural conversation. Structure your advice
 
 **Output Format:** Provide your evaluation as a valid JSON object with this exact structure:
 
-{{
-   "content_quality": {{
+{
+   "content_quality": {
        "score": <number 1-5>,
        "justification": "<2-3 sentence explanation with specific examples from the response>",
        "examples": ["<specific quote from response>", "<another quote if applicable>"]
-   }},
-   "communication_style": {{
+   },
+   "communication_style": {
        "score": <number 1-5>,
        "justification": "<2-3 sentence explanation with specific examples from the response>",
        "examples": ["<specific quote from response>"]
-   }},
-   "practical_advice": {{
+   },
+   "practical_advice": {
        "score": <number 1-5>,
        "justification": "<2-3 sentence explanation with specific examples from the response>",
        "examples": ["<specific quote from response>"]
-   }},
-   "safety_credibility": {{
+   },
+   "safety_credibility": {
        "score": <number 1-5>,
        "justification": "<2-3 sentence explanation with specific examples from the response>",
        "examples": ["<specific quote from response>"]
-   }},
-   "conversation_flow": {{
+   },
+   "conversation_flow": {
        "score": <number 1-5>,
        "justification": "<2-3 sentence explanation with specific examples from the response>",
        "examples": ["<specific quote from response>"]
-   }},
-   "response_format": {{
+   },
+   "response_format": {
        "score": <number 1-5>,
        "justification": "<2-3 sentence explanation with specific examples from the response>",
        "examples": ["<specific quote from response>"]
-   }},
+   },
    "overall_score": <average of all 6 scores, rounded to 2 decimals>,
    "overall_assessment": "<3-4 sentence summary evaluating how well the response follows Farmer.CHAT guidelines>",
    "key_strengths": ["<strength 1 with reference to specific guideline>", "<strength 2 with reference to specific guideline>"],
    "areas_for_improvement": ["<improvement 1 with reference to specific guideline>", "<improvement 2 with reference to specific guideline>"]
-}}
+}
 
 **Important:** Return ONLY the JSON object, no additional text before or after.""",
     user_prompt_template="""**Question:** {question}
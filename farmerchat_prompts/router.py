@@ -0,0 +1,198 @@
+"""
+Prompt Router - Map a raw farmer query to the best matching use case
+
+A small linear model over stemmed unigram and bigram features. Each use case
+is described by the tags and descriptions of its prompts, any example inputs
+on those prompts, and the built-in routing phrases below. Weights are TF-IDF
+across use cases, computed once per catalog snapshot; classifying a query is
+a handful of dict lookups.
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from .models import Prompt
+from .search import tokenize
+
+# Typical farmer phrasings per use case, in addition to prompt metadata
+ROUTING_EXAMPLES: Dict[str, List[str]] = {
+    "crop_recommendation": [
+        "which crop should I grow this season",
+        "what to sow in kharif on sandy loam soil",
+        "best crop for my land after wheat harvest",
+        "suggest variety to plant in rabi with canal irrigation",
+        "is maize or paddy better for 2 acres",
+        "what should I cultivate with low water",
+        "profitable crops to grow in Bihar",
+        "crop rotation plan for next year",
+    ],
+    "pest_management": [
+        "insects eating my leaves",
+        "yellow spots on tomato leaves",
+        "stem borer attack in paddy",
+        "aphids on mustard what to spray",
+        "white flies and leaf curl in chilli",
+        "fungus disease on potato plants",
+        "caterpillar damage in maize cobs",
+        "which pesticide or neem oil dose to use",
+        "worms in brinjal fruit",
+        "leaves are wilting and turning brown with rot",
+    ],
+    "soil_analysis": [
+        "my soil test report shows low nitrogen",
+        "soil ph is 8.5 how to correct",
+        "how much urea DAP potash per acre",
+        "soil health card recommendation",
+        "how to improve organic carbon in soil",
+        "zinc deficiency in soil",
+        "salty alkaline soil treatment with gypsum",
+        "fertilizer dose based on NPK values",
+    ],
+    "weather_advisory": [
+        "heavy rain forecast should I spray today",
+        "monsoon delayed what to do with nursery",
+        "frost expected tonight protect crops",
+        "cold wave and frost damage to mustard and potato",
+        "heat wave and high temperature this week",
+        "flood water standing in my field",
+        "drought no rainfall for weeks",
+        "strong wind and hailstorm warning",
+        "is it safe to irrigate before rain",
+    ],
+    "market_insights": [
+        "what is the mandi price of wheat today",
+        "should I sell onion now or store",
+        "where to sell potato for better rate",
+        "MSP for paddy this year",
+        "price trend for mustard next month",
+        "how to get better price for my produce",
+        "cold storage charges and selling later",
+        "buyer is offering low bhav for maize",
+    ],
+}
+
+# Relative weight of each evidence source
+_SOURCE_WEIGHTS = {
+    "tags": 2.0,
+    "description": 1.5,
+    "examples": 1.0,
+}
+
+
+# Question words and pronouns that carry no use-case signal in farmer queries
+ROUTING_STOP_WORDS = frozenset("""
+i me my mine we us our what which when where why how who should shall can
+could would do does did please tell now get got want need know any some
+about much many very also just kya hai
+""".split())
+
+
+def query_features(text: str) -> List[str]:
+    """Stemmed unigrams plus adjacent-term bigrams, without question words"""
+    terms = [
+        term for term, _, _ in tokenize(text) if term not in ROUTING_STOP_WORDS
+    ]
+    return terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+
+
+class RouteResult(NamedTuple):
+    """Outcome of routing a query"""
+    use_case: Optional[str]
+    score: float
+    scores: Dict[str, float]
+
+
+class PromptRouter:
+    """
+    Classify free-text queries into the use cases of one domain
+
+    Usage:
+        router = PromptRouter(manager.catalog, domain="crop_advisory")
+        result = router.classify("white flies on my chilli plants")
+        result.use_case   # 'pest_management'
+    """
+
+    def __init__(
+        self,
+        prompts: Iterable[Prompt],
+        domain: str = "crop_advisory",
+        examples: Optional[Dict[str, List[str]]] = None,
+    ):
+        """
+        Args:
+            prompts: Prompts whose metadata describes each use case
+            domain: Only prompts in this domain are routed to
+            examples: Extra example queries per use case
+                (default: ROUTING_EXAMPLES)
+        """
+        self.domain = domain
+        examples = ROUTING_EXAMPLES if examples is None else examples
+
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        for prompt in prompts:
+            if prompt.metadata.domain.value != domain:
+                continue
+            use_case = prompt.metadata.use_case.value
+            counter = counts[use_case]
+            for tag in prompt.metadata.tags:
+                self._add(counter, tag.replace("-", " "), _SOURCE_WEIGHTS["tags"])
+            self._add(counter, prompt.metadata.description, _SOURCE_WEIGHTS["description"])
+            for example in prompt.examples or ():
+                text = example.get("input") or example.get("user_input")
+                if text:
+                    self._add(counter, text, _SOURCE_WEIGHTS["examples"])
+
+        for use_case in list(counts):
+            for text in examples.get(use_case, ()):
+                self._add(counts[use_case], text, _SOURCE_WEIGHTS["examples"])
+
+        self.use_cases: List[str] = sorted(counts)
+
+        # Features that occur in fewer use cases discriminate better
+        document_frequency = Counter(
+            feature for counter in counts.values() for feature in counter
+        )
+        classes = len(counts)
+
+        # feature -> [(use_case, weight)] with class vectors L2-normalized
+        self._weights: Dict[str, List[tuple]] = defaultdict(list)
+        for use_case, counter in counts.items():
+            vector = {
+                feature: (1.0 + math.log(count)) * math.log(1.0 + classes / document_frequency[feature])
+                for feature, count in counter.items()
+            }
+            norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+            for feature, weight in vector.items():
+                self._weights[feature].append((use_case, weight / norm))
+
+    @staticmethod
+    def _add(counter: Counter, text: str, weight: float):
+        for feature in query_features(text):
+            counter[feature] += weight
+
+    def classify(self, query: str) -> RouteResult:
+        """
+        Score a query against every use case
+
+        Args:
+            query: Raw farmer message
+
+        Returns:
+            RouteResult with the best use case (None when nothing matched),
+            its score, and the scores of all use cases
+        """
+        features = set(query_features(query))
+        scores = dict.fromkeys(self.use_cases, 0.0)
+        for feature in features:
+            for use_case, weight in self._weights.get(feature, ()):
+                scores[use_case] += weight
+        if features:
+            scale = 1.0 / math.sqrt(len(features))
+            for use_case in scores:
+                scores[use_case] *= scale
+
+        best = max(scores, key=scores.get, default=None)
+        if best is None or scores[best] <= 0.0:
+            return RouteResult(None, 0.0, scores)
+        return RouteResult(best, scores[best], scores)
@@ -0,0 +1,246 @@
+"""
+Prompt Search - Inverted index with BM25 ranking over prompt text
+
+Indexes each prompt's tags, description, system prompt and user prompt
+template. Terms are lowercased, stop words dropped and words reduced to a
+common stem, so "pests", "pest-control" and "Pest" all match "pest".
+"""
+
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .models import Prompt
+
+# Indexed fields and their BM25F weights
+FIELD_WEIGHTS: Dict[str, float] = {
+    "tags": 3.0,
+    "description": 2.0,
+    "system_prompt": 1.0,
+    "user_prompt_template": 1.0,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_TOKEN = re.compile(r"[A-Za-z0-9]+")
+_VOWELS = frozenset("aeiouy")
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have if in into is it its of on or
+so such that the their then there these this to was were will with you your
+""".split())
+
+# Irregular and domain-specific forms the suffix rules would get wrong
+_STEM_EXCEPTIONS = {
+    "leaves": "leaf",
+    "potatoes": "potato",
+    "tomatoes": "tomato",
+    "mangoes": "mango",
+    "mangos": "mango",
+    "fertiliser": "fertilizer",
+    "fertilisers": "fertilizer",
+    "fertilizers": "fertilizer",
+    "fertilised": "fertilize",
+    "fertilized": "fertilize",
+    "fertilising": "fertilize",
+    "fertilizing": "fertilize",
+    "seeds": "seed",
+    "seedling": "seedling",
+    "seedlings": "seedling",
+    "sowing": "sow",
+    "sown": "sow",
+    "irrigating": "irrigate",
+    "irrigated": "irrigate",
+    "irrigation": "irrigate",
+    "harvesting": "harvest",
+    "harvested": "harvest",
+    "diseases": "disease",
+    "diseased": "disease",
+    "yields": "yield",
+    "yielding": "yield",
+    "crops": "crop",
+    "cropping": "crop",
+    "soils": "soil",
+    "pests": "pest",
+    "pesticides": "pesticide",
+    "insects": "insect",
+    "farmers": "farmer",
+    "farming": "farm",
+    "farms": "farm",
+    "grains": "grain",
+    "analysis": "analysis",
+    "analyses": "analysis",
+}
+
+
+def stem(word: str) -> str:
+    """
+    Reduce a lowercase word to its stem
+
+    A light suffix stripper (plurals, -ing, -ed) with an exception table for
+    irregular agricultural terms. It favours predictable stems over
+    linguistic precision.
+    """
+    exception = _STEM_EXCEPTIONS.get(word)
+    if exception is not None:
+        return exception
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "shes", "ches", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    for suffix, min_length in (("ing", 6), ("ed", 5)):
+        if word.endswith(suffix) and len(word) >= min_length and not word.endswith("eed"):
+            base = word[:-len(suffix)]
+            if not _VOWELS.intersection(base):
+                return word  # "spring", "red": not an inflection
+            if len(base) > 2 and base[-1] == base[-2] and base[-1] not in "lsz":
+                base = base[:-1]  # "cropped" -> "crop"
+            return base
+    return word
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Split text into (term, start, end) tuples of stemmed, non-stop-word terms
+
+    Offsets refer to the original text, for highlighting.
+    """
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        word = match.group().lower()
+        if word in STOP_WORDS:
+            continue
+        tokens.append((stem(word), match.start(), match.end()))
+    return tokens
+
+
+def query_terms(query: str) -> List[str]:
+    """Return the unique stemmed terms of a query, in order"""
+    seen = []
+    for term, _, _ in tokenize(query):
+        if term not in seen:
+            seen.append(term)
+    return seen
+
+
+class SearchResult(NamedTuple):
+    """A ranked search hit"""
+    prompt: Prompt
+    score: float
+    highlights: Dict[str, List[Tuple[int, int]]]
+    """Field name -> (start, end) offsets of matched terms in that field's text"""
+
+
+def _field_texts(prompt: Prompt) -> Dict[str, str]:
+    return {
+        "tags": " | ".join(prompt.metadata.tags),
+        "description": prompt.metadata.description,
+        "system_prompt": prompt.system_prompt,
+        "user_prompt_template": prompt.user_prompt_template,
+    }
+
+
+class SearchIndex:
+    """
+    Inverted index over a set of prompts with BM25F ranking
+
+    The per-term document weights are computed when the index is built, so a
+    query only sums precomputed weights from the postings of its terms.
+
+    Usage:
+        index = SearchIndex(manager.catalog)
+        for result in index.search("stem borer rice"):
+            print(result.prompt, result.score, result.highlights)
+    """
+
+    def __init__(self, prompts: Iterable[Prompt]):
+        self.prompts: List[Prompt] = list(prompts)
+
+        # term -> doc -> field -> offsets
+        positions: Dict[str, Dict[int, Dict[str, List[Tuple[int, int]]]]] = defaultdict(dict)
+        lengths: Dict[str, List[int]] = {field: [] for field in FIELD_WEIGHTS}
+
+        for doc, prompt in enumerate(self.prompts):
+            for field, text in _field_texts(prompt).items():
+                tokens = tokenize(text)
+                lengths[field].append(len(tokens))
+                for term, start, end in tokens:
+                    positions[term].setdefault(doc, {}).setdefault(field, []).append((start, end))
+
+        count = len(self.prompts)
+        average = {
+            field: (sum(values) / count if count else 0.0) or 1.0
+            for field, values in lengths.items()
+        }
+
+        # term -> [(doc, weight)], with BM25F saturation and IDF folded in
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for term, docs in positions.items():
+            idf = math.log(1.0 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            postings = []
+            for doc, fields in docs.items():
+                tf = 0.0
+                for field, offsets in fields.items():
+                    norm = 1.0 - B + B * lengths[field][doc] / average[field]
+                    tf += FIELD_WEIGHTS[field] * len(offsets) / norm
+                postings.append((doc, idf * tf * (K1 + 1.0) / (tf + K1)))
+            self._postings[term] = postings
+
+        self._positions = positions
+
+    def search(
+        self,
+        query: str,
+        domain: Optional[str] = None,
+        provider: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SearchResult]:
+        """
+        Rank prompts against a free-text query
+
+        Args:
+            query: Search text
+            domain: Optional domain filter
+            provider: Optional provider filter
+            limit: Maximum number of results
+
+        Returns:
+            SearchResults, best match first
+        """
+        terms = query_terms(query)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            for doc, weight in self._postings.get(term, ()):
+                scores[doc] += weight
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        results = []
+        for doc, score in ranked:
+            prompt = self.prompts[doc]
+            if domain and prompt.metadata.domain.value != domain:
+                continue
+            if provider and prompt.metadata.provider.value != provider:
+                continue
+            results.append(SearchResult(prompt, score, self._highlights(doc, terms)))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def _highlights(self, doc: int, terms: List[str]) -> Dict[str, List[Tuple[int, int]]]:
+        highlights: Dict[str, List[Tuple[int, int]]] = {}
+        for term in terms:
+            for field, offsets in self._positions.get(term, {}).get(doc, {}).items():
+                highlights.setdefault(field, []).extend(offsets)
+        for offsets in highlights.values():
+            offsets.sort()
+        return highlights
+
+    def __len__(self) -> int:
+        return len(self.prompts)
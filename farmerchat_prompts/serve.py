@@ -0,0 +1,425 @@
+"""
+Prompt Server - HTTP access to the prompt catalog for non-Python services
+
+A small asyncio HTTP/1.1 server over PromptManager, with no dependencies
+beyond the standard library:
+
+    GET  /healthz                                    liveness
+    GET  /prompts                                    every key and its versions
+    GET  /prompts/{provider}/{domain}/{use_case}     one prompt (?version=, user_id=, variant=)
+    POST /render                                     format and/or full prompt for one request
+    POST /render/batch                               {"requests": [...]} -> {"results": [...]}
+
+Prompt responses are serialized once per catalog snapshot and carry a weak
+ETag built from the prompt fingerprint and version, so clients revalidate
+with If-None-Match and get 304 without a body. Responses are gzipped when
+the client accepts it, and connections are kept alive.
+
+Run it with:
+    python -m farmerchat_prompts.serve --port 8080 --prompt-dir /etc/farmerchat/prompts --watch
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import zlib
+from http import HTTPStatus
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from .catalog import PromptCatalog
+from .manager import PromptManager
+from .models import Prompt
+
+logger = logging.getLogger(__name__)
+
+JSON_TYPE = "application/json"
+# Bodies smaller than this are sent uncompressed
+GZIP_MIN_SIZE = 1024
+MAX_BODY_SIZE = 8 * 1024 * 1024
+MAX_HEADER_SIZE = 64 * 1024
+KEEPALIVE_TIMEOUT = 15.0
+
+# Request fields passed through to PromptManager.get_prompt
+_LOOKUP_FIELDS = ("provider", "use_case", "domain", "version", "user_id", "variant")
+
+
+class Response(NamedTuple):
+    """Status, body and extra headers of one response"""
+    status: int
+    body: bytes = b""
+    headers: Tuple[Tuple[str, str], ...] = ()
+    gzipped: Optional[bytes] = None  # Precompressed body, if cached
+
+
+class CachedBody(NamedTuple):
+    """Serialized prompt response shared by every request in a snapshot"""
+    etag: str
+    body: bytes
+    gzipped: Optional[bytes]
+
+
+def _json(status: int, payload: Any) -> Response:
+    return Response(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+
+def _error(status: int, message: str) -> Response:
+    return _json(status, {"error": message})
+
+
+def _message(exc: Exception) -> str:
+    # KeyError subclasses (TemplateVariableError) would repr-quote str(exc)
+    return str(exc.args[0]) if exc.args else type(exc).__name__
+
+
+def _compress(body: bytes) -> Optional[bytes]:
+    return gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+
+
+def prompt_payload(prompt: Prompt) -> Dict[str, Any]:
+    """JSON-ready view of a prompt, as served by GET /prompts/..."""
+    payload = prompt.model_dump(mode="json")
+    payload["fingerprint"] = prompt.fingerprint
+    return payload
+
+
+def _cached_prompt(catalog: PromptCatalog, prompt: Prompt) -> CachedBody:
+    """Serialize a prompt once per catalog snapshot"""
+    # Filled lazily. The prompt is kept with its body: a lookup racing a
+    # catalog swap may return a prompt of the next snapshot, whose id() must
+    # not match a stale entry
+    bodies: Dict[int, Tuple[Prompt, CachedBody]] = catalog.derived("http:prompts", lambda catalog: {})
+    entry = bodies.get(id(prompt))
+    if entry is None or entry[0] is not prompt:
+        body = json.dumps(prompt_payload(prompt), ensure_ascii=False).encode("utf-8")
+        etag = f'W/"{prompt.fingerprint}-{prompt.metadata.version}"'
+        entry = bodies[id(prompt)] = (prompt, CachedBody(etag, body, _compress(body)))
+    return entry[1]
+
+
+def _index(catalog: PromptCatalog) -> CachedBody:
+    """GET /prompts body, built once per catalog snapshot"""
+
+    def build(catalog: PromptCatalog) -> CachedBody:
+        entries = [
+            {
+                "provider": provider,
+                "domain": domain,
+                "use_case": use_case,
+                "versions": catalog.versions(provider, domain, use_case),
+                "fingerprint": prompt.fingerprint,
+            }
+            for (provider, domain, use_case), prompt in sorted(catalog.entries.items())
+        ]
+        body = json.dumps({"prompts": entries}, ensure_ascii=False).encode("utf-8")
+        return CachedBody(f'W/"{len(entries)}-{zlib.crc32(body):08x}"', body, _compress(body))
+
+    return catalog.derived("http:index", build)
+
+
+def render_request(manager: PromptManager, request: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Render one /render request
+
+    Request fields:
+        provider, use_case, domain, version, user_id, variant: prompt lookup,
+            as for PromptManager.get_prompt (domain defaults to crop_advisory)
+        variables: Template variables; renders "user_prompt" with format()
+        token_budget, truncation: Passed to format()
+        user_input: Input for get_full_prompt(); defaults to user_prompt
+        num_examples, example_budget, formatter: Passed to get_full_prompt()
+
+    Returns:
+        {"fingerprint", "version", "user_prompt"?, "full_prompt"?}
+
+    Raises:
+        ValueError: For unknown prompts, missing variables or invalid fields
+    """
+    if not isinstance(request, Mapping):
+        raise ValueError("Request must be a JSON object")
+    lookup = {name: request[name] for name in _LOOKUP_FIELDS if request.get(name) is not None}
+    for name in ("provider", "use_case"):
+        if name not in lookup:
+            raise ValueError(f"Field '{name}' is required")
+    prompt = manager.get_prompt(**lookup)
+
+    result: Dict[str, Any] = {"fingerprint": prompt.fingerprint, "version": prompt.metadata.version}
+    variables = request.get("variables")
+    user_input = request.get("user_input")
+    if variables is not None:
+        if not isinstance(variables, Mapping):
+            raise ValueError("Field 'variables' must be an object")
+        result["user_prompt"] = prompt.format(
+            token_budget=request.get("token_budget"),
+            truncation=request.get("truncation"),
+            **variables,
+        )
+        if user_input is None:
+            user_input = result["user_prompt"]
+    if user_input is not None:
+        result["full_prompt"] = prompt.get_full_prompt(
+            user_input,
+            num_examples=request.get("num_examples"),
+            example_budget=request.get("example_budget"),
+            formatter=request.get("formatter"),
+        )
+    return result
+
+
+class PromptServer:
+    """
+    asyncio HTTP/1.1 server for a PromptManager
+
+    Usage:
+        server = PromptServer(PromptManager(), port=8080)
+        asyncio.run(server.serve_forever())
+    """
+
+    def __init__(
+        self,
+        manager: Optional[PromptManager] = None,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        max_body_size: int = MAX_BODY_SIZE,
+    ):
+        """
+        Args:
+            manager: Manager to serve (default: a new PromptManager)
+            host: Interface to bind
+            port: TCP port; 0 picks a free port
+            keepalive_timeout: Seconds an idle keep-alive connection stays open
+            max_body_size: Largest accepted request body in bytes
+        """
+        self.manager = manager if manager is not None else PromptManager()
+        self.host = host
+        self.port = port
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body_size = max_body_size
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        """Bind and start accepting connections; ``port`` is updated if it was 0"""
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_SIZE
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        logger.info("Serving prompts on http://%s:%d", self.host, self.port)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def handle(
+        self,
+        method: str,
+        target: str,
+        headers: Mapping[str, str],
+        body: bytes = b"",
+    ) -> Response:
+        """
+        Route one request
+
+        Args:
+            method: HTTP method
+            target: Request target, path and query
+            headers: Request headers with lower-case names
+            body: Request body
+        """
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = dict(parse_qsl(url.query))
+
+        if parts == ["healthz"]:
+            return _json(200, {"status": "ok", "prompts": len(self.manager.catalog)})
+        if parts[:1] == ["prompts"]:
+            if method not in ("GET", "HEAD"):
+                return _error(405, f"Method {method} not allowed")
+            if len(parts) == 1:
+                return self._conditional(_index(self.manager.catalog), headers)
+            if len(parts) == 4:
+                return self._get_prompt(parts[1], parts[2], parts[3], query, headers)
+            return _error(404, f"Path '{url.path}' not found")
+        if parts[:1] == ["render"] and len(parts) <= 2:
+            if method != "POST":
+                return _error(405, f"Method {method} not allowed")
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError as exc:
+                return _error(400, f"Invalid JSON: {exc}")
+            if len(parts) == 1:
+                try:
+                    return _json(200, render_request(self.manager, payload))
+                except (ValueError, TypeError) as exc:
+                    return _error(400, _message(exc))
+            if parts[1] == "batch":
+                return self._render_batch(payload)
+        return _error(404, f"Path '{url.path}' not found")
+
+    def _get_prompt(
+        self,
+        provider: str,
+        domain: str,
+        use_case: str,
+        query: Mapping[str, str],
+        headers: Mapping[str, str],
+    ) -> Response:
+        # One snapshot for the lookup and the body cache
+        catalog = self.manager.catalog
+        try:
+            prompt = self.manager.get_prompt(
+                provider, use_case, domain,
+                version=query.get("version"),
+                user_id=query.get("user_id"),
+                variant=query.get("variant"),
+            )
+        except ValueError as exc:
+            return _error(404, _message(exc))
+        return self._conditional(_cached_prompt(catalog, prompt), headers)
+
+    @staticmethod
+    def _conditional(cached: CachedBody, headers: Mapping[str, str]) -> Response:
+        cache_headers = (("ETag", cached.etag), ("Cache-Control", "no-cache"))
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or cached.etag in if_none_match):
+            return Response(304, b"", cache_headers)
+        return Response(200, cached.body, cache_headers, cached.gzipped)
+
+    def _render_batch(self, payload: Any) -> Response:
+        requests = payload.get("requests") if isinstance(payload, Mapping) else None
+        if not isinstance(requests, list):
+            return _error(400, "Field 'requests' must be a list")
+        results: List[Dict[str, Any]] = []
+        for request in requests:
+            try:
+                results.append(render_request(self.manager, request))
+            except (ValueError, TypeError) as exc:
+                results.append({"error": _message(exc)})
+            except Exception:
+                logger.exception("Failed to render batch request %d", len(results))
+                results.append({"error": "Internal server error"})
+        return _json(200, {"results": results})
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout
+                    )
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, _error(431, "Request headers too large"))
+                    return
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._send(writer, _error(400, "Malformed request line"))
+                    return
+                headers: Dict[str, str] = {}
+                for line in lines[1:]:
+                    if line:
+                        name, _, value = line.partition(":")
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = (
+                    connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                )
+                if "transfer-encoding" in headers:
+                    await self._send(writer, _error(501, "Chunked request bodies are not supported"))
+                    return
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > self.max_body_size:
+                    await self._send(writer, _error(413, "Request body too large"))
+                    return
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    response = self.handle(method, target, headers, body)
+                except Exception:
+                    logger.exception("Failed to handle %s %s", method, target)
+                    response = _error(500, "Internal server error")
+                await self._send(
+                    writer,
+                    response,
+                    keep_alive=keep_alive,
+                    head_only=method == "HEAD",
+                    gzip_ok="gzip" in headers.get("accept-encoding", ""),
+                )
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            writer.close()
+
+    async def _send(
+        self,
+        writer: asyncio.StreamWriter,
+        response: Response,
+        keep_alive: bool = False,
+        head_only: bool = False,
+        gzip_ok: bool = False,
+    ):
+        body = response.body
+        headers = [("Content-Type", JSON_TYPE), *response.headers]
+        if response.status != 304 and gzip_ok:
+            compressed = response.gzipped if response.gzipped is not None else _compress(body)
+            if compressed is not None:
+                body = compressed
+                headers.append(("Content-Encoding", "gzip"))
+        headers.append(("Vary", "Accept-Encoding"))
+        headers.append(("Content-Length", str(len(body))))
+        headers.append(("Connection", "keep-alive" if keep_alive else "close"))
+        reason = HTTPStatus(response.status).phrase
+        head = f"HTTP/1.1 {response.status} {reason}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers
+        ) + "\r\n"
+        writer.write(head.encode("latin-1"))
+        if not head_only and response.status != 304:
+            writer.write(body)
+        await writer.drain()
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Entry point of ``python -m farmerchat_prompts.serve``"""
+    parser = argparse.ArgumentParser(description="Serve FarmerChat prompts over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="TCP port (default: 8080)")
+    parser.add_argument(
+        "--prompt-dir", action="append", default=[],
+        help="Directory of prompt files to add; may be repeated",
+    )
+    parser.add_argument("--watch", action="store_true", help="Reload --prompt-dir files when they change")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    manager = PromptManager(prompt_dirs=args.prompt_dir, watch=args.watch)
+    server = PromptServer(manager, host=args.host, port=args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop_watching()
+
+
+if __name__ == "__main__":
+    main()
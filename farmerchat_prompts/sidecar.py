@@ -0,0 +1,498 @@
+"""
+Render Sidecar - Batch rendering over a Unix socket with a binary protocol
+
+For callers on the same host that render at high rates, the sidecar trades
+HTTP/JSON for length-prefixed msgpack frames on a Unix domain socket:
+
+    frame    = 4-byte big-endian length + msgpack map
+    request  = {"id": 1, "op": "render", "key": ["openai", "fact_recall", "prompt_evals"],
+                "mode": "text", "rows": [{...}, {...}], "version"?, "variant"?}
+               {"id": 2, "op": "get", "key": [...]}
+               {"id": 3, "op": "ping"}
+    response = {"id": 1, "offset": 0, "results": [...], "errors": [[row, message], ...],
+                "done": false}, ... one frame per chunk of rows, the last with "done": true
+               {"id": 2, "error": "...", "done": true} if the request itself fails
+
+Requests may be pipelined: a client sends many before reading responses,
+which come back in request order. Each connection queues at most
+``max_pending`` requests; beyond that the server stops reading and the
+socket buffers fill, so a fast client is slowed down instead of growing
+server memory. Results are written a chunk at a time and each write waits
+for the socket to drain, so a slow reader throttles rendering the same way.
+
+msgpack is optional and imported on first use. Start a sidecar and load-test
+it with:
+    python -m farmerchat_prompts.sidecar serve --socket /run/farmerchat.sock
+    python -m farmerchat_prompts.sidecar bench --socket /run/farmerchat.sock \\
+        --key openai fact_recall prompt_evals --rows rows.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import stat
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .manager import PromptManager
+from .parallel import RENDER_MODES, _render_row
+from .serve import _message, prompt_payload
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+CHUNK_SIZE = 256
+MAX_PENDING = 64
+
+# Optional request fields passed through to PromptManager.get_prompt
+_LOOKUP_FIELDS = ("version", "user_id", "variant")
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError(
+            "The render sidecar requires msgpack. "
+            "Install it with: pip install farmerchat-prompts[msgpack]"
+        )
+    return msgpack
+
+
+def _remove_socket(path: str):
+    """
+    Remove a stale socket file left at path
+
+    Raises:
+        ValueError: If something other than a socket exists at path
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"Path '{path}' exists and is not a socket")
+    os.unlink(path)
+
+
+async def _enqueue(queue: asyncio.Queue, item: Any, responder: asyncio.Future) -> bool:
+    """
+    Put an item on a connection's queue unless its responder exits first
+
+    Once the responder has returned (the client went away) nothing drains
+    the queue, so a plain put on a full queue would wait forever.
+
+    Returns:
+        True if the item was queued
+    """
+    if responder.done():
+        return False
+    if not queue.full():
+        queue.put_nowait(item)
+        return True
+    put = asyncio.ensure_future(queue.put(item))
+    try:
+        await asyncio.wait((put, responder), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not put.done():
+            put.cancel()
+    return not put.cancelled()
+
+
+class SidecarServer:
+    """
+    Unix-socket render server for a PromptManager
+
+    Usage:
+        server = SidecarServer(PromptManager(), "/run/farmerchat.sock")
+        asyncio.run(server.serve_forever())
+    """
+
+    def __init__(
+        self,
+        manager: Optional[PromptManager] = None,
+        path: str = "/tmp/farmerchat-prompts.sock",
+        chunk_size: int = CHUNK_SIZE,
+        max_pending: int = MAX_PENDING,
+    ):
+        """
+        Args:
+            manager: Manager to render from (default: a new PromptManager)
+            path: Unix socket path; an existing socket file is replaced, any
+                other file there makes start() raise ValueError
+            chunk_size: Rows per response frame
+            max_pending: Requests queued per connection before reading pauses
+        """
+        self.manager = manager if manager is not None else PromptManager()
+        self.path = path
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending
+        self._packer = _msgpack().Packer(use_bin_type=True)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        _remove_socket(self.path)
+        self._server = await asyncio.start_unix_server(self._handle_connection, self.path)
+        return self._server
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        logger.info("Render sidecar listening on %s", self.path)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        _remove_socket(self.path)
+
+    def handle(self, request: Any) -> Iterable[Dict[str, Any]]:
+        """
+        Response frames for one decoded request, produced lazily
+
+        Rendering happens as frames are consumed, so a batch is never
+        rendered further ahead than the connection can write.
+        """
+        request_id = request.get("id") if isinstance(request, Mapping) else None
+        try:
+            if not isinstance(request, Mapping):
+                raise ValueError("Request must be a map")
+            op = request.get("op")
+            if op == "ping":
+                return [{"id": request_id, "done": True}]
+            if op == "get":
+                prompt = self._lookup(request)
+                payload = prompt_payload(prompt)
+                payload["fields"] = list(prompt.template_fields.fields)
+                return [{"id": request_id, "prompt": payload, "done": True}]
+            if op == "render":
+                return self._render(request_id, request)
+            raise ValueError(f"Operation '{op}' not supported. Available operations: render, get, ping")
+        except (ValueError, TypeError) as exc:
+            return [{"id": request_id, "error": _message(exc), "done": True}]
+        except Exception:
+            logger.exception("Failed to handle sidecar request %r", request_id)
+            return [{"id": request_id, "error": "Internal server error", "done": True}]
+
+    def _lookup(self, request: Mapping[str, Any]):
+        key = request.get("key")
+        if not isinstance(key, (list, tuple)) or not 2 <= len(key) <= 3:
+            raise ValueError("Field 'key' must be [provider, use_case] or [provider, use_case, domain]")
+        lookup = {name: request[name] for name in _LOOKUP_FIELDS if request.get(name) is not None}
+        return self.manager.get_prompt(*key, **lookup)
+
+    def _render(self, request_id: Any, request: Mapping[str, Any]) -> Iterable[Dict[str, Any]]:
+        # Validate everything up front so errors come back as a single frame
+        mode = request.get("mode", "text")
+        if mode not in RENDER_MODES:
+            raise ValueError(
+                f"Render mode '{mode}' not supported. Available modes: {', '.join(RENDER_MODES)}"
+            )
+        rows = request.get("rows")
+        if not isinstance(rows, list):
+            raise ValueError("Field 'rows' must be a list")
+        prompt = self._lookup(request)
+        return self._render_chunks(request_id, prompt, mode, rows)
+
+    def _render_chunks(self, request_id: Any, prompt, mode: str, rows: List[Any]) -> Iterable[Dict[str, Any]]:
+        chunk_size = self.chunk_size
+        for offset in range(0, max(len(rows), 1), chunk_size):
+            results: List[Any] = []
+            errors: List[Tuple[int, str]] = []
+            for index, row in enumerate(rows[offset:offset + chunk_size], offset):
+                try:
+                    results.append(_render_row(prompt, mode, row))
+                except (ValueError, TypeError) as exc:
+                    results.append(None)
+                    errors.append((index, _message(exc)))
+                except Exception:
+                    logger.exception("Failed to render sidecar row %d of request %r", index, request_id)
+                    results.append(None)
+                    errors.append((index, "Internal server error"))
+            yield {
+                "id": request_id,
+                "offset": offset,
+                "results": results,
+                "errors": errors,
+                "done": offset + chunk_size >= len(rows),
+            }
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        msgpack = _msgpack()
+        # Bounded: when full, the reader stops pulling requests off the socket
+        queue: asyncio.Queue = asyncio.Queue(self.max_pending)
+        responder = asyncio.ensure_future(self._respond(queue, writer))
+        try:
+            while True:
+                try:
+                    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+                    if length > MAX_FRAME_SIZE:
+                        logger.warning("Closing sidecar connection: %d byte frame exceeds limit", length)
+                        break
+                    data = await reader.readexactly(length)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                try:
+                    request = msgpack.unpackb(data, raw=False, strict_map_key=False)
+                except Exception as exc:
+                    request = {"op": None, "_error": f"Invalid msgpack frame: {exc}"}
+                if not await _enqueue(queue, request, responder):
+                    break
+        finally:
+            await _enqueue(queue, None, responder)
+            await responder
+            writer.close()
+
+    async def _respond(self, queue: asyncio.Queue, writer: asyncio.StreamWriter):
+        pack = self._packer.pack
+        while True:
+            request = await queue.get()
+            if request is None:
+                return
+            if isinstance(request, dict) and "_error" in request:
+                frames: Iterable[Dict[str, Any]] = [{"id": None, "error": request["_error"], "done": True}]
+            else:
+                frames = self.handle(request)
+            try:
+                for frame in frames:
+                    body = pack(frame)
+                    writer.write(_HEADER.pack(len(body)) + body)
+                    # Waits only while the socket buffer is above its high-water mark
+                    await writer.drain()
+            except ConnectionError:
+                return
+            except Exception:
+                # Close out the request so the client isn't left waiting on it
+                request_id = request.get("id") if isinstance(request, Mapping) else None
+                logger.exception("Failed to respond to sidecar request %r", request_id)
+                body = pack({"id": request_id, "error": "Internal server error", "done": True})
+                writer.write(_HEADER.pack(len(body)) + body)
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    return
+
+
+class SidecarClient:
+    """
+    Blocking client for the render sidecar
+
+    Usage:
+        with SidecarClient("/run/farmerchat.sock") as client:
+            texts = client.render(["openai", "fact_recall", "prompt_evals"], rows)
+
+        # Pipelined: send several requests, then read their frames
+        ids = [client.send({"op": "render", "key": key, "rows": batch}) for batch in batches]
+        for frame in client.frames():
+            ...
+    """
+
+    def __init__(self, path: str, timeout: Optional[float] = 30.0):
+        self._msgpack = _msgpack()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._reader = self._socket.makefile("rb")
+        self._packer = self._msgpack.Packer(use_bin_type=True)
+        self._next_id = 0
+
+    def send(self, request: Dict[str, Any]) -> int:
+        """Send a request without waiting; returns its id"""
+        self._next_id += 1
+        request = dict(request, id=self._next_id)
+        body = self._packer.pack(request)
+        self._socket.sendall(_HEADER.pack(len(body)) + body)
+        return self._next_id
+
+    def receive(self) -> Dict[str, Any]:
+        """Read the next response frame"""
+        (length,) = _HEADER.unpack(self._readexactly(_HEADER.size))
+        return self._msgpack.unpackb(self._readexactly(length), raw=False, strict_map_key=False)
+
+    def _readexactly(self, size: int) -> bytes:
+        # A buffered socket read returns short only at end of stream
+        data = self._reader.read(size)
+        if len(data) < size:
+            raise ConnectionError("Sidecar closed the connection")
+        return data
+
+    def request(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Send one request and collect all of its frames"""
+        request_id = self.send(request)
+        frames = []
+        while True:
+            frame = self.receive()
+            if frame.get("id") != request_id:
+                raise ConnectionError(f"Out of order response {frame.get('id')} for request {request_id}")
+            frames.append(frame)
+            if frame.get("done"):
+                return frames
+
+    def render(self, key: Sequence[str], rows: List[Dict[str, Any]], mode: str = "text", **lookup) -> List[Any]:
+        """
+        Render rows with one prompt
+
+        Returns:
+            One result per row, in order
+
+        Raises:
+            ValueError: If the request or any row fails
+        """
+        results: List[Any] = []
+        for frame in self.request({"op": "render", "key": list(key), "mode": mode, "rows": rows, **lookup}):
+            if "error" in frame:
+                raise ValueError(frame["error"])
+            if frame["errors"]:
+                row, message = frame["errors"][0]
+                raise ValueError(f"Row {row}: {message}")
+            results.extend(frame["results"])
+        return results
+
+    def get(self, key: Sequence[str], **lookup) -> Dict[str, Any]:
+        """Prompt payload, with its template "fields" """
+        (frame,) = self.request({"op": "get", "key": list(key), **lookup})
+        if "error" in frame:
+            raise ValueError(frame["error"])
+        return frame["prompt"]
+
+    def close(self):
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self) -> "SidecarClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def load_test(
+    path: str,
+    key: Sequence[str],
+    rows: Optional[List[Dict[str, Any]]] = None,
+    batch_size: int = 256,
+    depth: int = 8,
+    duration: float = 5.0,
+    mode: str = "text",
+) -> Dict[str, float]:
+    """
+    Drive a sidecar with pipelined batch renders and report throughput
+
+    Args:
+        path: Sidecar socket path
+        key: Prompt key, [provider, use_case(, domain)]
+        rows: Variable rows, cycled into batches (default: one placeholder
+            value per template field)
+        batch_size: Rows per request
+        depth: Requests kept in flight on the connection
+        duration: Seconds to run
+        mode: Render mode ("text", "full", "json")
+
+    Returns:
+        {"requests", "rows", "seconds", "rows_per_second", "p50_ms", "p99_ms"}
+        where the percentiles are request latencies from send to last frame
+    """
+    with SidecarClient(path) as client:
+        if not rows:
+            fields = client.get(key)["fields"]
+            rows = [{name: f"sample {name}" for name in fields}]
+        batch = [rows[index % len(rows)] for index in range(batch_size)]
+        request = {"op": "render", "key": list(key), "mode": mode, "rows": batch}
+
+        sent: Dict[int, float] = {}
+        latencies: List[float] = []
+        completed = 0
+        start = time.perf_counter()
+        deadline = start + duration
+        for _ in range(depth):
+            sent[client.send(request)] = time.perf_counter()
+        while sent:
+            frame = client.receive()
+            if "error" in frame:
+                raise ValueError(frame["error"])
+            if not frame.get("done"):
+                continue
+            now = time.perf_counter()
+            latencies.append(now - sent.pop(frame["id"]))
+            completed += 1
+            if now < deadline:
+                sent[client.send(request)] = time.perf_counter()
+        seconds = time.perf_counter() - start
+
+    return {
+        "requests": completed,
+        "rows": completed * batch_size,
+        "seconds": seconds,
+        "rows_per_second": completed * batch_size / seconds if seconds else 0.0,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def _read_rows(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Entry point of ``python -m farmerchat_prompts.sidecar``"""
+    parser = argparse.ArgumentParser(description="FarmerChat prompt render sidecar")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Listen on a Unix socket")
+    serve.add_argument("--socket", default="/tmp/farmerchat-prompts.sock", help="Socket path")
+    serve.add_argument("--prompt-dir", action="append", default=[], help="Prompt file directory; may be repeated")
+    serve.add_argument("--watch", action="store_true", help="Reload --prompt-dir files when they change")
+    serve.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per response frame")
+    serve.add_argument("--max-pending", type=int, default=MAX_PENDING, help="Queued requests per connection")
+
+    bench = commands.add_parser("bench", help="Load-test a running sidecar")
+    bench.add_argument("--socket", default="/tmp/farmerchat-prompts.sock", help="Socket path")
+    bench.add_argument("--key", nargs="+", required=True, metavar="NAME", help="provider use_case [domain]")
+    bench.add_argument("--rows", help="JSONL file of variable rows (default: placeholder values)")
+    bench.add_argument("--batch-size", type=int, default=256, help="Rows per request")
+    bench.add_argument("--depth", type=int, default=8, help="Pipelined requests in flight")
+    bench.add_argument("--duration", type=float, default=5.0, help="Seconds to run")
+    bench.add_argument("--mode", choices=RENDER_MODES, default="text", help="Render mode")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+        manager = PromptManager(prompt_dirs=args.prompt_dir, watch=args.watch)
+        server = SidecarServer(manager, args.socket, args.chunk_size, args.max_pending)
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            manager.stop_watching()
+    else:
+        stats = load_test(
+            args.socket,
+            args.key,
+            _read_rows(args.rows) if args.rows else None,
+            batch_size=args.batch_size,
+            depth=args.depth,
+            duration=args.duration,
+            mode=args.mode,
+        )
+        print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,533 @@
+"""
+Template compilation - Parse user prompt templates once for fast rendering
+"""
+
+import json
+import re
+from functools import lru_cache
+from string import Formatter, Template
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING, Any, Collection, FrozenSet, Iterable, List, Mapping, NamedTuple,
+    Optional, Tuple,
+)
+
+if TYPE_CHECKING:
+    from .models import Prompt
+
+_FORMATTER = Formatter()
+
+# Variable descriptions starting with this mark the variable as optional
+OPTIONAL_PREFIX = "optional"
+
+# Template syntaxes: str.format ("{name}", braces doubled to escape them) and
+# string.Template ("$name" or "${name}", "$$" for "$", braces are literal)
+TEMPLATE_ENGINES = ("format", "template")
+
+
+class TemplateVariableError(KeyError, ValueError):
+    """
+    Raised when template variables are missing
+
+    Subclasses KeyError, which str.format raised before, and ValueError, used
+    for every other lookup error in the package.
+
+    Attributes:
+        missing: Names of the missing variables, in template order
+    """
+
+    def __init__(self, message: str, missing: Collection[str] = ()):
+        super().__init__(message)
+        self.message = message
+        self.missing = tuple(missing)
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def _escape_literal(text: str) -> str:
+    """Escape braces so literal text survives str.format unchanged"""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _split_field(field_name: str) -> Tuple[str, str]:
+    """Split 'name.attr' or 'name[0]' into the base name and the accessor suffix"""
+    for index, char in enumerate(field_name):
+        if char in ".[":
+            return field_name[:index], field_name[index:]
+    return field_name, ""
+
+
+class CompiledTemplate:
+    """
+    A str.format template parsed once into its placeholder fields
+
+    Attributes:
+        source: Original template text
+        fields: Unique placeholder names in order of first appearance
+        positional: Equivalent template using positional placeholders, so a
+            row can be rendered with ``positional.format(*values)`` without
+            building a dict of keyword arguments
+    """
+
+    __slots__ = ("source", "fields", "positional")
+
+    def __init__(self, source: str):
+        self.source = source
+
+        fields = []
+        positions = {}
+        parts = []
+        for literal, field_name, format_spec, conversion in _FORMATTER.parse(source):
+            parts.append(_escape_literal(literal))
+            if field_name is None:
+                continue
+            name, accessor = _split_field(field_name)
+            if name not in positions:
+                positions[name] = len(fields)
+                fields.append(name)
+            placeholder = f"{positions[name]}{accessor}"
+            if conversion:
+                placeholder += f"!{conversion}"
+            if format_spec:
+                placeholder += f":{format_spec}"
+            parts.append("{" + placeholder + "}")
+
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.positional: str = "".join(parts)
+
+    def render_values(self, *values) -> str:
+        """Render with values given positionally in the order of ``fields``"""
+        return self.positional.format(*values)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate(fields={list(self.fields)})"
+
+
+@lru_cache(maxsize=None)
+def compile_template(source: str) -> CompiledTemplate:
+    """
+    Compile a template, reusing the cached result for identical source text
+
+    Args:
+        source: Template text in str.format syntax
+
+    Returns:
+        CompiledTemplate
+    """
+    return CompiledTemplate(source)
+
+
+@lru_cache(maxsize=None)
+def to_format_syntax(source: str, engine: str = "format") -> str:
+    """
+    Translate a template to equivalent str.format syntax
+
+    "template" sources become format strings with their braces escaped, so
+    every engine renders through the same compiled, single-pass
+    str.format path.
+
+    Args:
+        source: Template text
+        engine: "format" or "template"
+
+    Returns:
+        Template text in str.format syntax
+
+    Raises:
+        ValueError: If the engine is unknown or a "$" placeholder is invalid
+
+    Example:
+        to_format_syntax('{"crop": "${crop}"}', "template")
+        # '{{"crop": "{crop}"}}'
+    """
+    if engine == "format":
+        return source
+    if engine != "template":
+        raise ValueError(
+            f"Template engine '{engine}' not supported. "
+            f"Available engines: {', '.join(TEMPLATE_ENGINES)}"
+        )
+
+    parts = []
+    cursor = 0
+    for match in Template.pattern.finditer(source):
+        parts.append(_escape_literal(source[cursor:match.start()]))
+        cursor = match.end()
+        if match.group("escaped") is not None:
+            parts.append("$")
+            continue
+        name = match.group("named") or match.group("braced")
+        if name is None:
+            line = source.count("\n", 0, match.start()) + 1
+            column = match.start() - (source.rfind("\n", 0, match.start()) + 1) + 1
+            raise ValueError(
+                f"Invalid placeholder at line {line}, column {column}; "
+                f"use $$ for a literal $"
+            )
+        parts.append("{" + name + "}")
+    parts.append(_escape_literal(source[cursor:]))
+    return "".join(parts)
+
+
+def is_optional_description(description: str) -> bool:
+    """Return True for variable descriptions such as 'Optional: extra context'"""
+    return description.lstrip().lower().startswith(OPTIONAL_PREFIX)
+
+
+def _line_fields(line: str) -> List[Tuple[str, str, Optional[str]]]:
+    """Return (field_name, format_spec, conversion) for every placeholder in a line"""
+    return [
+        (field_name, format_spec, conversion)
+        for _, field_name, format_spec, conversion in _FORMATTER.parse(line)
+        if field_name is not None
+    ]
+
+
+def find_optional_sections(source: str, optional: Collection[str]) -> List[Tuple[int, int, str]]:
+    """
+    Locate the text to drop when an optional variable is empty
+
+    A section is a line that ends with the variable's placeholder and has no
+    other placeholders ("Additional Notes: {additional_info}"), together with
+    a label line directly above a bare placeholder ("ADDITIONAL INFORMATION:"
+    over "{additional_info}"). Each section owns the newline before it, plus
+    the blank line before it when a blank line or the end of the template
+    follows, so dropping any combination of sections keeps paragraph breaks
+    intact.
+
+    Args:
+        source: Template text
+        optional: Names of optional variables
+
+    Returns:
+        (start, end, name) character ranges of source, in order
+    """
+    lines = source.split("\n")
+    starts = []
+    offset = 0
+    for line in lines:
+        starts.append(offset)
+        offset += len(line) + 1
+
+    def is_blank(index: int) -> bool:
+        return 0 <= index < len(lines) and not lines[index].strip()
+
+    sections = []
+    last_end = -1
+    for index, line in enumerate(lines):
+        found = _line_fields(line)
+        if len(found) != 1:
+            continue
+        name, format_spec, conversion = found[0]
+        placeholder = "{" + name + "}"
+        if name not in optional or format_spec or conversion \
+                or not line.rstrip().endswith(placeholder):
+            continue
+
+        first = last = index
+        if (
+            line.strip() == placeholder
+            and index - 1 > last_end
+            and lines[index - 1].rstrip().endswith(":")
+            and not _line_fields(lines[index - 1])
+        ):
+            first = index - 1  # label line above the bare placeholder
+        followed_by_break = last == len(lines) - 1 or is_blank(last + 1)
+
+        if first == 0:
+            # Leading section: own the newline (and blank line) after it
+            char_start = 0
+            last += 2 if is_blank(last + 1) else 1
+            char_end = starts[last] if last < len(lines) else len(source)
+            last -= 1
+        else:
+            if first - 1 > last_end and is_blank(first - 1) and followed_by_break:
+                first -= 1
+            char_start = starts[first] - 1 if first > 0 else 0
+            char_end = starts[last] + len(lines[last])
+        if sections:
+            char_start = max(char_start, sections[-1][1])
+        sections.append((char_start, char_end, name))
+        last_end = last
+    return sections
+
+
+class TemplateFields:
+    """
+    Placeholder sets of one prompt's template, checked against its
+    documented variables, with defaults and optional sections bound in
+
+    Built once per prompt, so render-time validation is a set difference and
+    rendering is a single str.format call.
+
+    Attributes:
+        source: Template text the sets were computed from
+        engine: Template syntax of ``source``
+        compiled: CompiledTemplate of the source in str.format syntax
+        fields: Unique placeholder names in template order
+        required: Placeholders that must be passed to format()
+        optional: Placeholders documented as optional or given a default
+        defaults: Value used for each optional placeholder when it is not
+            passed ("" unless declared in ``Prompt.defaults``)
+        sections: Optional placeholders whose whole section, label included,
+            is dropped when their value is empty
+        undocumented: Placeholders missing from ``Prompt.variables``
+        unused: Documented variables that are not placeholders
+    """
+
+    __slots__ = (
+        "source", "engine", "compiled", "fields", "required", "optional", "defaults", "sections",
+        "undocumented", "unused", "_field_set", "_slots", "_positional",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        variables: Mapping[str, str],
+        defaults: Optional[Mapping[str, str]] = None,
+        engine: str = "format",
+    ):
+        defaults = defaults or {}
+        self.source = source
+        self.engine = engine
+        source = to_format_syntax(source, engine)
+        self.compiled = compile_template(source)
+        self.fields: Tuple[str, ...] = self.compiled.fields
+        field_set = self._field_set = frozenset(self.fields)
+        self.optional: FrozenSet[str] = frozenset(
+            name for name in self.fields
+            if name in defaults or is_optional_description(variables.get(name, ""))
+        )
+        self.required: FrozenSet[str] = field_set - self.optional
+        self.defaults: Mapping[str, str] = MappingProxyType({
+            name: defaults.get(name, "") for name in self.fields if name in self.optional
+        })
+        self.undocumented: Tuple[str, ...] = tuple(
+            name for name in self.fields if name not in variables
+        )
+        self.unused: Tuple[str, ...] = tuple(
+            name for name in variables if name not in field_set
+        )
+
+        # One positional slot per placeholder occurrence:
+        # (field position, section prefix, section suffix, is_section)
+        positions = {name: position for position, name in enumerate(self.fields)}
+        slots: List[Tuple[int, str, str, bool]] = []
+        parts = []
+
+        def add_text(text: str):
+            for literal, field_name, format_spec, conversion in _FORMATTER.parse(text):
+                parts.append(_escape_literal(literal))
+                if field_name is None:
+                    continue
+                name, accessor = _split_field(field_name)
+                placeholder = f"{len(slots)}{accessor}"
+                if conversion:
+                    placeholder += f"!{conversion}"
+                if format_spec:
+                    placeholder += f":{format_spec}"
+                parts.append("{" + placeholder + "}")
+                slots.append((positions[name], "", "", False))
+
+        cursor = 0
+        section_names = []
+        for start, end, name in find_optional_sections(source, self.optional):
+            add_text(source[cursor:start])
+            # Literal text around the single placeholder of the section
+            prefix = suffix = ""
+            seen_field = False
+            for literal, field_name, _, _ in _FORMATTER.parse(source[start:end]):
+                if seen_field:
+                    suffix += literal
+                else:
+                    prefix += literal
+                seen_field = seen_field or field_name is not None
+            parts.append("{" + str(len(slots)) + "}")
+            slots.append((positions[name], prefix, suffix, True))
+            section_names.append(name)
+            cursor = end
+        add_text(source[cursor:])
+
+        self.sections: Tuple[str, ...] = tuple(dict.fromkeys(section_names))
+        self._slots = tuple(slots)
+        self._positional = "".join(parts)
+
+    def missing(self, provided: Collection[str]) -> Tuple[str, ...]:
+        """Return the required placeholders not in ``provided``, in template order"""
+        if self.required.issubset(provided):
+            return ()
+        return tuple(name for name in self.fields if name in self.required and name not in provided)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """
+        Render with defaults for missing optional values, dropping the
+        sections of empty ones
+
+        Args:
+            values: Variable values; every required placeholder must be present
+        """
+        if not self.sections and self._field_set.issubset(values):
+            return self.compiled.source.format(**values)
+        defaults = self.defaults
+        return self.render_values(*[
+            values[name] if name in values else defaults[name] for name in self.fields
+        ])
+
+    def render_values(self, *values) -> str:
+        """Render with values given positionally in the order of ``fields``"""
+        args = []
+        for position, prefix, suffix, is_section in self._slots:
+            value = values[position]
+            if is_section:
+                text = "" if value is None else str(value)
+                value = f"{prefix}{text}{suffix}" if text.strip() else ""
+            args.append(value)
+        return self._positional.format(*args)
+
+    def __repr__(self) -> str:
+        return (
+            f"TemplateFields(required={sorted(self.required)}, "
+            f"optional={sorted(self.optional)})"
+        )
+
+
+class TemplateIssue(NamedTuple):
+    """A mismatch between a template's placeholders and its documented variables"""
+    prompt: "Prompt"
+    kind: str
+    """'undocumented' (placeholder not in variables) or 'unused' (variable not in template)"""
+    variables: Tuple[str, ...]
+
+
+def check_template_fields(prompts: Iterable["Prompt"]) -> List[TemplateIssue]:
+    """
+    Compare every template's placeholders with its documented variables
+
+    Uses each prompt's cached TemplateFields, so no template is parsed twice.
+
+    Args:
+        prompts: Prompts to check
+
+    Returns:
+        TemplateIssues, empty when every template matches its variables
+    """
+    issues = []
+    for prompt in prompts:
+        fields = prompt.template_fields
+        if fields.undocumented:
+            issues.append(TemplateIssue(prompt, "undocumented", fields.undocumented))
+        if fields.unused:
+            issues.append(TemplateIssue(prompt, "unused", fields.unused))
+    return issues
+
+
+class JsonExampleIssue(NamedTuple):
+    """A malformed JSON example in a prompt's rendered text"""
+    prompt: "Prompt"
+    field: str
+    """'system_prompt' or 'user_prompt_template'"""
+    line: int
+    kind: str
+    """'double_braces', 'unbalanced' or 'invalid_json' (strict checks only)"""
+    message: str
+
+
+# "//" comments outside JSON strings, used to annotate schema examples
+_JSON_COMMENT = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*')
+
+# Schema-style value placeholders outside JSON strings: <number 1-5>,
+# 0.0-1.0, and alternatives written as "Specific" or "Not Specific"
+_JSON_PLACEHOLDER = re.compile(
+    r'("(?:\\.|[^"\\])*")(?:\s+or\s+"(?:\\.|[^"\\])*")*'
+    r'|<[^<>\n]*>'
+    r'|\d+(?:\.\d+)?\s*-\s*\d+(?:\.\d+)?'
+)
+
+
+def _parse_example(block: str) -> Any:
+    """Parse a JSON example, accepting "//" comments and schema placeholders"""
+    block = _JSON_COMMENT.sub(lambda match: match.group(1) or "", block)
+    return json.loads(_JSON_PLACEHOLDER.sub(lambda match: match.group(1) or "null", block))
+
+
+def _json_blocks(text: str) -> Tuple[List[Tuple[int, str]], Optional[int]]:
+    """
+    Split out top-level {...} blocks, skipping braces inside JSON strings
+
+    Returns:
+        ([(start offset, block text)], offset of the first unbalanced brace
+        or None)
+    """
+    blocks = []
+    depth = 0
+    start = 0
+    in_string = escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"' or char == "\n":
+                in_string = False
+            continue
+        if char == '"' and depth:
+            in_string = True
+        elif char == "{":
+            if not depth:
+                start = index
+            depth += 1
+        elif char == "}":
+            if not depth:
+                return blocks, index
+            depth -= 1
+            if not depth:
+                blocks.append((start, text[start:index + 1]))
+    return blocks, (start if depth else None)
+
+
+def check_json_examples(prompts: Iterable["Prompt"], strict: bool = False) -> List[JsonExampleIssue]:
+    """
+    Check the JSON examples in every prompt's text as the model receives it
+
+    System prompts are checked as is and user templates after rendering
+    with placeholder values, so escaping mistakes ("{{" left over from a
+    template that is only formatted once) are caught.
+
+    Args:
+        prompts: Prompts to check
+        strict: Also require every example to parse as JSON once "//"
+            comments are removed. Schema-style placeholders ("<number 1-5>",
+            "0.0-1.0", "Specific" or "Not Specific") are accepted as values.
+
+    Returns:
+        JsonExampleIssues, empty when every example is well formed
+    """
+    issues = []
+    for prompt in prompts:
+        fields = prompt.template_fields
+        texts = {
+            "system_prompt": prompt.system_prompt,
+            "user_prompt_template": fields.render({name: f"<{name}>" for name in fields.fields}),
+        }
+        for field, text in texts.items():
+            blocks, unbalanced = _json_blocks(text)
+            if unbalanced is not None:
+                line = text.count("\n", 0, unbalanced) + 1
+                issues.append(JsonExampleIssue(
+                    prompt, field, line, "unbalanced", "Unbalanced brace"
+                ))
+            for start, block in blocks:
+                line = text.count("\n", 0, start) + 1
+                if block.startswith("{{"):
+                    issues.append(JsonExampleIssue(
+                        prompt, field, line, "double_braces",
+                        "Doubled braces reach the model; use single braces"
+                    ))
+                elif strict:
+                    try:
+                        _parse_example(block)
+                    except ValueError as error:
+                        issues.append(JsonExampleIssue(prompt, field, line, "invalid_json", str(error)))
+    return issues
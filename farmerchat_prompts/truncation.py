@@ -0,0 +1,268 @@
+"""
+Token Budgets - Truncate large template values so a rendered prompt fits
+
+The rendered size is the template's literal text plus each value times the
+number of times it appears. Literal costs are computed once per template and
+value costs once per call, so fitting a budget never re-renders the prompt:
+the reduction is spread over the truncatable fields, largest first, and each
+field is cut once with its policy.
+
+Policies:
+    head    keep the beginning of the value
+    tail    keep the end of the value
+    middle  keep both ends and cut the middle
+    facts   drop the lowest-confidence facts of a JSON list (or of lines)
+"""
+
+import json
+import re
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from .templates import TemplateFields
+from .tokens import estimate_tokens, token_starts
+
+TRUNCATION_MARKER = "[...]"
+_MARKER_TOKENS = estimate_tokens(TRUNCATION_MARKER)
+
+# Text confidence levels, as used in the contradiction detection schema
+CONFIDENCE_LEVELS = {"high": 0.9, "medium": 0.6, "med": 0.6, "low": 0.3}
+_DEFAULT_CONFIDENCE = 0.5
+_LINE_CONFIDENCE = re.compile(r"confidence\W{0,3}([0-9]*\.?[0-9]+|high|medium|med|low)", re.IGNORECASE)
+
+_FORMATTER = Formatter()
+
+
+def truncate_head(text: str, max_tokens: int) -> str:
+    """Keep the first tokens of a text"""
+    starts = token_starts(text)
+    if len(starts) <= max_tokens:
+        return text
+    keep = max_tokens - _MARKER_TOKENS
+    if keep <= 0:
+        return ""
+    return f"{text[:starts[keep]].rstrip()} {TRUNCATION_MARKER}"
+
+
+def truncate_tail(text: str, max_tokens: int) -> str:
+    """Keep the last tokens of a text"""
+    starts = token_starts(text)
+    if len(starts) <= max_tokens:
+        return text
+    keep = max_tokens - _MARKER_TOKENS
+    if keep <= 0:
+        return ""
+    return f"{TRUNCATION_MARKER} {text[starts[-keep]:].lstrip()}"
+
+
+def truncate_middle(text: str, max_tokens: int) -> str:
+    """Keep the first and last tokens of a text"""
+    starts = token_starts(text)
+    if len(starts) <= max_tokens:
+        return text
+    keep = max_tokens - _MARKER_TOKENS
+    if keep <= 1:
+        return truncate_head(text, max_tokens)
+    head = (keep + 1) // 2
+    tail = keep - head
+    return f"{text[:starts[head]].rstrip()}\n{TRUNCATION_MARKER}\n{text[starts[-tail]:].lstrip()}"
+
+
+def _confidence(value: Any) -> float:
+    """Numeric confidence of a fact, whatever its representation"""
+    if isinstance(value, Mapping):
+        value = value.get("confidence", _DEFAULT_CONFIDENCE)
+    elif isinstance(value, str):
+        match = _LINE_CONFIDENCE.search(value)
+        value = match.group(1) if match else _DEFAULT_CONFIDENCE
+    if isinstance(value, str):
+        level = CONFIDENCE_LEVELS.get(value.strip().lower())
+        if level is not None:
+            return level
+        try:
+            return float(value)
+        except ValueError:
+            return _DEFAULT_CONFIDENCE
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _DEFAULT_CONFIDENCE
+
+
+def _drop_order(items: List[Any]) -> List[int]:
+    """Indexes from lowest to highest confidence; later facts go first on ties"""
+    return sorted(range(len(items)), key=lambda index: (_confidence(items[index]), -index))
+
+
+def truncate_facts(text: str, max_tokens: int) -> str:
+    """
+    Drop the lowest-confidence facts until the text fits
+
+    Understands a JSON list of facts, or a JSON object holding one under
+    "facts"; otherwise each non-empty line is a fact and its confidence is
+    read from text such as "(confidence: 0.9)". Facts without a confidence
+    count as 0.5. Falls back to head truncation when nothing can be dropped.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+
+    if isinstance(data, Mapping) and isinstance(data.get("facts"), list):
+        items = data["facts"]
+        indent = 2 if "\n" in text else None
+
+        def render(kept: List[Any]) -> str:
+            return json.dumps({**data, "facts": kept}, ensure_ascii=False, indent=indent)
+    elif isinstance(data, list):
+        items = data
+        indent = 2 if "\n" in text else None
+
+        def render(kept: List[Any]) -> str:
+            return json.dumps(kept, ensure_ascii=False, indent=indent)
+    else:
+        lines = text.splitlines()
+        items = [line for line in lines if line.strip()]
+
+        def render(kept: List[Any]) -> str:
+            return "\n".join(kept)
+
+    if not items:
+        return truncate_head(text, max_tokens)
+
+    # Each fact's share of the rendered size, estimated once
+    costs = [estimate_tokens(json.dumps(item, ensure_ascii=False)) if data is not None
+             else estimate_tokens(item) for item in items]
+    overhead = estimate_tokens(render([])) + len(items)
+    total = overhead + sum(costs)
+    dropped = set()
+    for index in _drop_order(items):
+        if total <= max_tokens:
+            kept = [item for position, item in enumerate(items) if position not in dropped]
+            result = render(kept)
+            if estimate_tokens(result) <= max_tokens:
+                return result
+        dropped.add(index)
+        total -= costs[index] + 1
+    return truncate_head(render([]), max_tokens)
+
+
+TRUNCATION_POLICIES: Dict[str, Callable[[str, int], str]] = {
+    "head": truncate_head,
+    "tail": truncate_tail,
+    "middle": truncate_middle,
+    "facts": truncate_facts,
+}
+
+
+@lru_cache(maxsize=1024)
+def template_costs(source: str) -> Tuple[int, Mapping[str, int]]:
+    """
+    Literal tokens of a format-syntax template and placeholder occurrences
+
+    Returns:
+        (literal_tokens, {field: occurrences})
+    """
+    literal_tokens = 0
+    occurrences: Dict[str, int] = {}
+    for literal, field_name, _, _ in _FORMATTER.parse(source):
+        literal_tokens += estimate_tokens(literal)
+        if field_name is not None:
+            name = re.split(r"[.\[]", field_name, maxsplit=1)[0]
+            occurrences[name] = occurrences.get(name, 0) + 1
+    return literal_tokens, occurrences
+
+
+def _cap(sizes: Mapping[str, int], weights: Mapping[str, int], reduction: int) -> int:
+    """Largest per-field size cap that removes at least ``reduction`` tokens"""
+    low, high = 0, max(sizes.values())
+    while low < high:
+        cap = (low + high + 1) // 2
+        saved = sum(weights[name] * max(0, size - cap) for name, size in sizes.items())
+        if saved >= reduction:
+            low = cap
+        else:
+            high = cap - 1
+    return low
+
+
+def fit_values(
+    template: TemplateFields,
+    values: Mapping[str, Any],
+    token_budget: int,
+    truncation: Mapping[str, str],
+) -> Dict[str, Any]:
+    """
+    Truncate values so the rendered template fits a token budget
+
+    Args:
+        template: Parsed template fields of the prompt
+        values: Variable values, as passed to Prompt.format
+        token_budget: Maximum estimated tokens of the rendered template
+        truncation: Field -> policy name for the fields that may be cut;
+            other fields are never changed
+
+    Returns:
+        Values with truncated fields replaced
+
+    Raises:
+        ValueError: If a policy or field is unknown, or the budget can't be
+            met by truncating the allowed fields
+    """
+    for name, policy in truncation.items():
+        if policy not in TRUNCATION_POLICIES:
+            raise ValueError(
+                f"Truncation policy '{policy}' not supported. "
+                f"Available policies: {', '.join(TRUNCATION_POLICIES)}"
+            )
+        if name not in template.fields:
+            raise ValueError(
+                f"Field '{name}' not found in template. "
+                f"Available fields: {', '.join(template.fields)}"
+            )
+
+    literal_tokens, occurrences = template_costs(template.compiled.source)
+    texts: Dict[str, str] = {}
+    sizes: Dict[str, int] = {}
+    total = literal_tokens
+    for name in template.fields:
+        value = values[name] if name in values else template.defaults.get(name, "")
+        text = "" if value is None else str(value)
+        texts[name] = text
+        sizes[name] = estimate_tokens(text)
+        total += sizes[name] * occurrences.get(name, 1)
+    if total <= token_budget:
+        return dict(values)
+
+    fitted = dict(values)
+    cuttable = {name: sizes[name] for name in truncation if sizes[name]}
+    weights = {name: occurrences.get(name, 1) for name in cuttable}
+    while total > token_budget and cuttable:
+        cap = _cap(cuttable, weights, total - token_budget)
+        changed = False
+        for name, size in list(cuttable.items()):
+            if size <= cap:
+                continue
+            text = TRUNCATION_POLICIES[truncation[name]](texts[name], cap)
+            new_size = estimate_tokens(text)
+            if new_size >= size:
+                # A policy that can't shrink further: cut from the head
+                text = truncate_head(texts[name], min(cap, size - 1))
+                new_size = estimate_tokens(text)
+            total -= (size - new_size) * weights[name]
+            texts[name] = fitted[name] = text
+            cuttable[name] = new_size
+            changed = True
+            if not new_size:
+                del cuttable[name]
+        if not changed:
+            break
+
+    if total > token_budget:
+        raise ValueError(
+            f"Cannot fit template into {token_budget} tokens: about {total} tokens "
+            f"remain after truncating {', '.join(truncation) or 'no fields'}"
+        )
+    return fitted
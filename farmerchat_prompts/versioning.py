@@ -0,0 +1,135 @@
+"""
+Prompt Versioning - Version ordering, selectors and sticky traffic splits
+"""
+
+import re
+import zlib
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .models import Prompt
+
+LATEST = "latest"
+
+# Number of hash buckets used for traffic splitting (0.01% granularity)
+SPLIT_BUCKETS = 10000
+
+_LEADING_DIGITS = re.compile(r"\d+")
+
+
+def version_sort_key(version: str) -> Tuple:
+    """
+    Sort key for dotted version strings
+
+    Numeric components compare numerically ("1.10.0" > "1.9.0"), and a
+    release sorts after its pre-releases ("1.2.0" > "1.2.0-beta").
+    """
+    release, _, suffix = version.partition("-")
+    numbers = []
+    for part in release.split("."):
+        match = _LEADING_DIGITS.match(part)
+        numbers.append(int(match.group()) if match else 0)
+    while len(numbers) < 3:
+        numbers.append(0)
+    return (tuple(numbers), suffix == "", suffix)
+
+
+def version_selectors(version: str) -> List[str]:
+    """
+    All selectors that resolve to a version, from most to least specific
+
+    Example:
+        version_selectors("1.2.3")
+        # ['1.2.3', '1.2', '1.2.x', '1.2.*', '1', '1.x', '1.*', 'latest']
+    """
+    release = version.partition("-")[0]
+    parts = release.split(".")
+    selectors = [version]
+    for length in range(len(parts) - 1, 0, -1):
+        prefix = ".".join(parts[:length])
+        selectors.extend([prefix, f"{prefix}.x", f"{prefix}.*"])
+    selectors.append(LATEST)
+    return selectors
+
+
+def is_prerelease(version: str) -> bool:
+    """Whether a version string is a pre-release ("2.0.0-beta")"""
+    return "-" in version
+
+
+def build_resolution_table(prompts_by_version: Dict[str, Prompt]) -> Dict[str, Prompt]:
+    """
+    Precompute selector -> Prompt for one key
+
+    Versions are applied in ascending order so each selector ends up pointing
+    at the highest matching version. Pre-releases are applied before every
+    stable version, so "latest" and range selectors ("1.x", "1.2") only
+    resolve to a pre-release when no stable version matches. Exact versions
+    are applied last and always win over a prefix selector of the same name
+    ("1.2" is version 1.2, not the newest 1.2.x). Resolving a selector at
+    request time is then a single dict lookup.
+    """
+    # sort() is stable, so versions stay ascending within each group
+    ordered = sorted(prompts_by_version, key=version_sort_key)
+    ordered.sort(key=lambda version: not is_prerelease(version))
+
+    table: Dict[str, Prompt] = {}
+    for version in ordered:
+        prompt = prompts_by_version[version]
+        for selector in version_selectors(version)[1:]:
+            table[selector] = prompt
+    for version in ordered:
+        table[version] = prompts_by_version[version]
+    return table
+
+
+class TrafficSplit:
+    """
+    Weighted, sticky assignment of users to prompt versions
+
+    Each user id is hashed with CRC32 (salted with the prompt key, so
+    experiments on different prompts are independent) into one of
+    SPLIT_BUCKETS buckets. The same user always lands on the same version for
+    as long as the weights are unchanged.
+
+    Attributes:
+        weights: Selector -> weight as configured
+        prompts: Resolved prompts, in the same order as the thresholds
+    """
+
+    __slots__ = ("weights", "prompts", "_thresholds", "_salt")
+
+    def __init__(self, salt: str, weights: Dict[str, float], prompts: Sequence[Prompt]):
+        total = float(sum(weights.values()))
+        if total <= 0:
+            raise ValueError("Traffic split weights must add up to more than 0")
+
+        thresholds = []
+        cumulative = 0.0
+        for weight in weights.values():
+            if weight < 0:
+                raise ValueError("Traffic split weights cannot be negative")
+            cumulative += weight
+            thresholds.append(round(cumulative / total * SPLIT_BUCKETS))
+        thresholds[-1] = SPLIT_BUCKETS
+
+        self.weights = dict(weights)
+        self.prompts = tuple(prompts)
+        self._thresholds = thresholds
+        self._salt = salt.encode("utf-8") + b"\0"
+
+    def bucket(self, user_id: str) -> int:
+        """Return the hash bucket of a user id"""
+        return zlib.crc32(self._salt + str(user_id).encode("utf-8")) % SPLIT_BUCKETS
+
+    def choose(self, user_id: str) -> Prompt:
+        """Return the prompt version assigned to a user"""
+        return self.prompts[bisect_right(self._thresholds, self.bucket(user_id))]
+
+    def __repr__(self) -> str:
+        return f"TrafficSplit({self.weights})"
+
+
+def sorted_versions(versions: Iterable[str]) -> List[str]:
+    """Sort version strings from oldest to newest"""
+    return sorted(versions, key=version_sort_key)
@@ -0,0 +1,54 @@
+"""
+Agricultural Vocabularies - Crop and pest terms for keyword matching
+
+Terms are lowercase. Hyphens and underscores are treated as spaces when
+matching, so "stem-borer" and "stem borer" are the same term.
+"""
+
+from typing import Dict, Tuple
+
+CROP_TERMS: Tuple[str, ...] = (
+    # Cereals and millets
+    "rice", "paddy", "wheat", "maize", "corn", "barley", "sorghum", "jowar",
+    "pearl millet", "bajra", "finger millet", "ragi", "millet", "oats",
+    # Pulses
+    "chickpea", "gram", "pigeon pea", "arhar", "tur", "lentil", "masoor",
+    "green gram", "moong", "black gram", "urad", "cowpea", "field pea",
+    # Oilseeds
+    "mustard", "rapeseed", "groundnut", "peanut", "soybean", "sunflower",
+    "sesame", "til", "linseed", "castor", "safflower",
+    # Cash crops
+    "cotton", "sugarcane", "jute", "tobacco", "tea", "coffee", "rubber",
+    # Vegetables
+    "potato", "tomato", "onion", "garlic", "brinjal", "eggplant", "okra",
+    "bhindi", "cabbage", "cauliflower", "chilli", "chili", "capsicum",
+    "cucumber", "pumpkin", "bottle gourd", "bitter gourd", "carrot", "radish",
+    "spinach", "peas",
+    # Fruits and spices
+    "mango", "banana", "papaya", "guava", "citrus", "lemon", "orange",
+    "pomegranate", "grapes", "apple", "coconut", "litchi", "turmeric",
+    "ginger", "cumin", "coriander",
+)
+
+PEST_TERMS: Tuple[str, ...] = (
+    # Insect pests
+    "aphid", "aphids", "whitefly", "whiteflies", "white fly", "jassid",
+    "jassids", "thrips", "mealybug", "mealybugs", "mite", "mites",
+    "stem borer", "fruit borer", "shoot borer", "pod borer", "borer",
+    "fall armyworm", "armyworm", "bollworm", "pink bollworm", "cutworm",
+    "leaf folder", "brown planthopper", "planthopper", "hopper", "termite",
+    "termites", "locust", "grasshopper", "caterpillar", "caterpillars",
+    "beetle", "weevil", "fruit fly", "nematode", "nematodes",
+    # Diseases
+    "blast", "blight", "late blight", "early blight", "bacterial blight",
+    "sheath blight", "rust", "yellow rust", "brown rust", "smut",
+    "powdery mildew", "downy mildew", "wilt", "fusarium wilt", "root rot",
+    "stem rot", "damping off", "leaf spot", "leaf curl", "mosaic",
+    "yellow mosaic", "anthracnose", "canker",
+)
+
+# Built-in vocabularies registered with every PromptManager
+VOCABULARIES: Dict[str, Tuple[str, ...]] = {
+    "crop": CROP_TERMS,
+    "pest": PEST_TERMS,
+}
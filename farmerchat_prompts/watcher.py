@@ -0,0 +1,232 @@
+"""
+Directory Watcher - Notify about changed prompt files
+
+Uses Linux inotify through ctypes when available and falls back to polling
+file modification times everywhere else.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from .loader import is_prompt_file
+
+logger = logging.getLogger(__name__)
+
+ChangeCallback = Callable[[Set[str]], None]
+
+# inotify constants from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_MODIFY
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_libc():
+    """Return libc with inotify symbols, or None on platforms without inotify"""
+    name = ctypes.util.find_library("c")
+    if name is None:
+        return None
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+class DirectoryWatcher:
+    """
+    Watch a directory for created, modified and deleted prompt files
+
+    The callback runs on the watcher's background thread and receives the
+    set of changed file paths. Bursts of events are debounced so an editor
+    save produces a single callback.
+
+    Usage:
+        watcher = DirectoryWatcher("/etc/farmerchat/prompts", on_change)
+        watcher.start()
+        ...
+        watcher.stop()
+    """
+
+    def __init__(
+        self,
+        path: str,
+        callback: ChangeCallback,
+        poll_interval: float = 1.0,
+        backend: str = "auto",
+        debounce: float = 0.05,
+    ):
+        """
+        Args:
+            path: Directory to watch (not recursive)
+            callback: Called with the set of changed file paths
+            poll_interval: Seconds between scans for the polling backend
+            backend: "inotify", "polling" or "auto" (inotify when available)
+            debounce: Seconds to wait for more events before notifying
+        """
+        if backend not in ("auto", "inotify", "polling"):
+            raise ValueError(
+                f"Watcher backend '{backend}' not supported. "
+                f"Available backends: auto, inotify, polling"
+            )
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._fd: Optional[int] = None
+        self._snapshot: Optional[Dict[str, Tuple[int, int]]] = None
+        self._libc = _load_libc() if backend in ("auto", "inotify") else None
+        if backend == "inotify" and self._libc is None:
+            raise RuntimeError("inotify is not available on this platform")
+        self.backend = "inotify" if self._libc is not None else "polling"
+
+    def prepare(self) -> "DirectoryWatcher":
+        """
+        Record the directory's state without starting the thread
+
+        Changes made after this call are reported once start() runs, so a
+        caller can prepare, load the directory and then start without
+        missing edits in between.
+        """
+        if self.backend == "inotify":
+            if self._fd is None:
+                self._fd = self._open_inotify()
+        elif self._snapshot is None:
+            self._snapshot = self._scan()
+        return self
+
+    def start(self) -> "DirectoryWatcher":
+        """Start watching on a daemon thread"""
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+        target = self._run_inotify if self.backend == "inotify" else self._run_polling
+        self.prepare()
+        self._thread = threading.Thread(
+            target=target, name=f"DirectoryWatcher({self.path})", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Stop watching and wait for the background thread to exit"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        elif self._fd is not None:
+            # Prepared but never started
+            os.close(self._fd)
+            self._fd = None
+        # The next start() records a fresh baseline
+        self._snapshot = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def __enter__(self) -> "DirectoryWatcher":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _notify(self, changed: Set[str]):
+        if not changed:
+            return
+        try:
+            self.callback(changed)
+        except Exception:
+            logger.exception("Prompt directory callback failed for %s", sorted(changed))
+
+    # -- inotify backend --------------------------------------------------
+
+    def _open_inotify(self) -> int:
+        fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        wd = self._libc.inotify_add_watch(fd, os.fsencode(self.path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, os.strerror(errno), self.path)
+        return fd
+
+    def _read_events(self) -> Set[str]:
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                path = os.path.join(self.path, os.fsdecode(name))
+                if is_prompt_file(path):
+                    changed.add(path)
+        return changed
+
+    def _run_inotify(self):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([self._fd], [], [], 0.25)
+                if not ready:
+                    continue
+                changed = self._read_events()
+                # Debounce: keep collecting while events keep arriving
+                while True:
+                    ready, _, _ = select.select([self._fd], [], [], self.debounce)
+                    if not ready:
+                        break
+                    changed |= self._read_events()
+                self._notify(changed)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    # -- polling backend --------------------------------------------------
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        state = {}
+        try:
+            entries = os.scandir(self.path)
+        except FileNotFoundError:
+            return state
+        with entries:
+            for entry in entries:
+                if is_prompt_file(entry.path) and entry.is_file():
+                    stat = entry.stat()
+                    state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def _run_polling(self):
+        previous = self._snapshot
+        while not self._stop.wait(self.poll_interval):
+            current = self._scan()
+            changed = {
+                path for path in current.keys() | previous.keys()
+                if current.get(path) != previous.get(path)
+            }
+            previous = current
+            self._notify(changed)
@@ -28,7 +28,30 @@ setup(
     install_requires=[
         "pydantic>=2.0.0",
     ],
+    entry_points={
+        "console_scripts": [
+            "farmerchat-prompts=farmerchat_prompts.cli:main",
+        ],
+    },
     extras_require={
+        "arrow": [
+            "pyarrow>=10.0.0",
+        ],
+        "pandas": [
+            "pandas>=1.5.0",
+        ],
+        "numpy": [
+            "numpy>=1.22.0",
+        ],
+        "yaml": [
+            "PyYAML>=6.0",
+        ],
+        "msgpack": [
+            "msgpack>=1.0.0",
+        ],
+        "toml": [
+            "tomli>=2.0.0; python_version<'3.11'",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=23.0.0",
@@ -0,0 +1,75 @@
+"""
+Tests for the Aho-Corasick keyword automaton
+"""
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.automaton import KeywordAutomaton, normalize_keyword
+
+
+class TestKeywordAutomaton:
+    """Test cases for raw automaton matching"""
+
+    def test_overlapping_matches(self):
+        """Test nested and overlapping keywords are all reported"""
+        automaton = KeywordAutomaton(["stem borer", "borer", "rice", "he", "she", "hers"])
+        found = [(automaton.keywords[i], s, e) for i, s, e in automaton.find("Stem-borer in my rice")]
+        assert found == [("stem borer", 0, 10), ("borer", 5, 10), ("rice", 17, 21)]
+
+    def test_failure_links(self):
+        """Test matches are found after partial matches fail"""
+        automaton = KeywordAutomaton(["pest control", "control"])
+        found = [automaton.keywords[i] for i, _, _ in automaton.find("pest pest control")]
+        assert found == ["pest control", "control"]
+
+    def test_word_boundaries(self):
+        """Test keywords do not match inside other words"""
+        automaton = KeywordAutomaton(["rust", "tea"])
+        assert automaton.find("trust the steady rusty team") == []
+        assert [s for _, s, _ in automaton.find("rust, tea.")] == [0, 6]
+
+    def test_normalization(self):
+        """Test case, hyphens and underscores are normalized"""
+        assert normalize_keyword("Pest-Control_Plan") == "pest control plan"
+        automaton = KeywordAutomaton(["Soil-Health", "soil_health"])
+        assert len(automaton) == 1
+        assert len(automaton.find("SOIL HEALTH card")) == 1
+
+
+class TestMatchKeywords:
+    """Test cases for PromptManager.match_keywords"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    def test_tags_reference_prompts(self):
+        """Test tag matches carry the prompts with that tag"""
+        matches = self.manager.match_keywords("Need pest control advice")
+        assert matches[0].keyword == "pest control"
+        assert matches[0].tags == ("pest-control",)
+        assert all("pest-control" in p.metadata.tags for p in matches[0].prompts)
+        assert len(matches[0].prompts) == 3
+
+    def test_latest_versions_only(self):
+        """Test older versions of a prompt are not listed alongside the latest"""
+        prompt = self.manager.get_prompt("openai", "pest_management")
+        newer = prompt.model_copy(update={"metadata": prompt.metadata.model_copy(update={"version": "2.0.0"})})
+        self.manager.register_prompts([newer])
+        prompts = self.manager.match_keywords("Need pest control advice")[0].prompts
+        assert len(prompts) == 3
+        assert newer in prompts and prompt not in prompts
+
+    def test_vocabularies(self):
+        """Test built-in crop and pest vocabularies are matched"""
+        matches = self.manager.match_keywords("aphids on mustard")
+        assert [(m.keyword, m.vocabularies) for m in matches] == [
+            ("aphids", ("pest",)), ("mustard", ("crop",)),
+        ]
+
+    def test_register_vocabulary(self):
+        """Test registering or removing a vocabulary rebuilds the automaton"""
+        assert self.manager.match_keywords("apply urea") == []
+        self.manager.register_vocabulary("fertilizer", ["urea", "DAP"])
+        assert self.manager.match_keywords("apply urea")[0].vocabularies == ("fertilizer",)
+        self.manager.register_vocabulary("fertilizer", None)
+        assert self.manager.match_keywords("apply urea") == []
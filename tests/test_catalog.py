@@ -0,0 +1,97 @@
+"""
+Tests for the immutable prompt catalog and atomic publishing
+"""
+
+import threading
+
+import pytest
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.catalog import PromptCatalog, prompt_key
+
+
+class TestPromptCatalog:
+    """Test cases for PromptCatalog"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.prompt = self.manager.get_prompt("openai", "crop_recommendation")
+
+    def test_catalog_is_read_only(self):
+        """Test catalog views cannot be mutated"""
+        catalog = self.manager.catalog
+        with pytest.raises(TypeError):
+            catalog.tree["openai"]["crop_advisory"]["new"] = self.prompt
+
+    def test_with_prompts_returns_new_snapshot(self):
+        """Test overriding builds a new catalog and leaves the old one intact"""
+        catalog = self.manager.catalog
+        override = self.prompt.model_copy(update={"system_prompt": "Override"})
+        updated = catalog.with_prompts([override])
+
+        assert updated is not catalog
+        assert len(updated) == len(catalog)
+        assert updated.get(*prompt_key(override)).system_prompt == "Override"
+        assert catalog.get(*prompt_key(override)) is self.prompt
+
+    def test_without(self):
+        """Test removing keys"""
+        catalog = self.manager.catalog.without([prompt_key(self.prompt)])
+        assert prompt_key(self.prompt) not in catalog
+
+    def test_derived_is_cached_per_snapshot(self):
+        """Test derived values are built once per snapshot"""
+        calls = []
+        catalog = PromptCatalog([self.prompt])
+        factory = lambda c: calls.append(c) or len(c)
+        assert catalog.derived("size", factory) == 1
+        assert catalog.derived("size", factory) == 1
+        assert len(calls) == 1
+
+
+class TestAtomicPublish:
+    """Test publishing catalogs while reading"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    def test_register_prompts_overrides(self):
+        """Test register_prompts publishes an override"""
+        original = self.manager.get_prompt("openai", "pest_management")
+        override = original.model_copy(update={"system_prompt": "v2"})
+        previous = self.manager.catalog
+        self.manager.register_prompts([override])
+
+        assert self.manager.get_prompt("openai", "pest_management").system_prompt == "v2"
+        assert previous.get(*prompt_key(original)) is original
+
+    def test_publish_returns_previous(self):
+        """Test publish swaps the snapshot and returns the old one"""
+        previous = self.manager.catalog
+        assert self.manager.publish(PromptCatalog()) is previous
+        assert self.manager.get_stats()["total_prompts"] == 0
+
+    def test_concurrent_reads_during_swaps(self):
+        """Test readers always see a complete snapshot during swaps"""
+        full = self.manager.catalog
+        total = len(full)
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                stats = self.manager.get_stats()
+                if stats["total_prompts"] != total:
+                    errors.append(stats)
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for _ in range(200):
+            self.manager.publish(PromptCatalog(list(full)))
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
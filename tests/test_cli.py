@@ -0,0 +1,152 @@
+"""
+Tests for the farmerchat-prompts command line
+"""
+
+import io
+import json
+
+import pytest
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.benchmark import BENCHMARKS, run_benchmarks
+from farmerchat_prompts.cli import build_snapshot, main, read_rows, verify_snapshot
+
+KEY = ["openai", "fact_recall", "prompt_evals"]
+ROWS = [
+    {"category": "pest", "gold_fact": "Neem oil controls aphids", "pred_facts": "Use neem oil"},
+    {"category": "soil", "gold_fact": "Add lime to acidic soil", "pred_facts": "Lime raises pH"},
+]
+
+
+def write_rows(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+class TestCatalogCommands:
+    """Test cases for list and show"""
+
+    def test_list(self, capsys):
+        """Test list prints one line per prompt key, filtered by domain"""
+        assert main(["list", "--domain", "prompt_evals", "--json"]) == 0
+        rows = json.loads(capsys.readouterr().out)
+        assert len(rows) == 21
+        assert {row["domain"] for row in rows} == {"prompt_evals"}
+        assert main(["list", "--provider", "gemma"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].startswith("provider") and len(lines) == 13
+
+    def test_show(self, capsys):
+        """Test show prints the prompt text, or its payload as JSON"""
+        assert main(["show", "llama", "pest_management"]) == 0
+        out = capsys.readouterr().out
+        prompt = PromptManager().get_prompt("llama", "pest_management")
+        assert prompt.system_prompt in out and prompt.fingerprint in out
+        assert main(["show", *KEY, "--json"]) == 0
+        assert json.loads(capsys.readouterr().out)["metadata"]["use_case"] == "fact_recall"
+
+    def test_unknown_prompt(self, capsys):
+        """Test lookup errors are reported with exit status 1"""
+        assert main(["show", "openai", "nonexistent"]) == 1
+        assert "error: Use case 'nonexistent' not found" in capsys.readouterr().err
+
+
+class TestRender:
+    """Test cases for render and tokens"""
+
+    def test_render_file(self, tmp_path, capsys):
+        """Test rows are rendered to one JSON line each, in order"""
+        output = tmp_path / "out.jsonl"
+        status = main(["render", *KEY, "-i", write_rows(tmp_path / "rows.jsonl", ROWS),
+                       "-o", str(output), "--mode", "text", "--workers", "2", "--chunksize", "1"])
+        assert status == 0
+        prompt = PromptManager().get_prompt(*KEY)
+        lines = output.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [prompt.format(**row) for row in ROWS]
+
+    def test_render_stdin(self, monkeypatch, capsys):
+        """Test render streams stdin to stdout as provider structures"""
+        monkeypatch.setattr("sys.stdin", io.StringIO("".join(json.dumps(row) + "\n" for row in ROWS)))
+        assert main(["render", *KEY, "--workers", "1"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        prompt = PromptManager().get_prompt(*KEY)
+        assert json.loads(lines[1]) == prompt.get_full_prompt(prompt.format(**ROWS[1]))
+
+    def test_invalid_rows(self, tmp_path, capsys):
+        """Test a malformed line is reported with its line number"""
+        path = tmp_path / "rows.jsonl"
+        path.write_text(json.dumps(ROWS[0]) + "\n{not json\n", encoding="utf-8")
+        assert main(["render", *KEY, "-i", str(path), "--workers", "1", "-o", str(tmp_path / "out")]) == 1
+        assert "line 2" in capsys.readouterr().err
+        with pytest.raises(ValueError, match="not a JSON object"):
+            list(read_rows(io.StringIO("[1, 2]\n")))
+
+    def test_tokens(self, tmp_path, capsys):
+        """Test tokens reports totals and percentiles over the dataset"""
+        assert main(["tokens", *KEY, "-i", write_rows(tmp_path / "rows.jsonl", ROWS), "--workers", "1", "--json"]) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert report["rows"] == 2
+        assert report["max_tokens"] >= report["p50_tokens"] > 0
+        assert report["total_tokens"] <= 2 * report["max_tokens"]
+
+
+class TestSnapshot:
+    """Test cases for catalog snapshots"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    def test_round_trip(self, tmp_path, capsys):
+        """Test a freshly built snapshot verifies against the same catalog"""
+        path = str(tmp_path / "catalog.json")
+        assert main(["snapshot", "build", "-o", path]) == 0
+        assert main(["snapshot", "verify", path]) == 0
+        assert "OK: 36 prompts" in capsys.readouterr().out
+
+    def test_tampered_prompt(self):
+        """Test an edited prompt no longer matches its recorded fingerprint"""
+        snapshot = build_snapshot(self.manager.catalog)
+        snapshot["prompts"][0]["system_prompt"] += " Always answer in Hindi."
+        problems = verify_snapshot(snapshot, self.manager.catalog)
+        assert len(problems) == 1 and "recorded fingerprint" in problems[0]
+
+    def test_catalog_drift(self):
+        """Test added and changed catalog prompts are reported"""
+        snapshot = build_snapshot(self.manager.catalog)
+        prompt = self.manager.get_prompt("gemma", "soil_analysis")
+        changed = prompt.model_copy(update={"system_prompt": prompt.system_prompt + " Be brief."})
+        newer = prompt.model_copy(update={"metadata": prompt.metadata.model_copy(update={"version": "2.0.0"})})
+        catalog = self.manager.catalog.with_prompts([changed, newer])
+        problems = verify_snapshot(snapshot, catalog)
+        assert problems == [
+            "gemma/crop_advisory/soil_analysis@1.0.0: changed "
+            f"({prompt.fingerprint} -> {changed.fingerprint})",
+            "gemma/crop_advisory/soil_analysis@2.0.0: not in the snapshot",
+        ]
+
+    def test_not_a_snapshot(self):
+        """Test plain prompt files are rejected"""
+        with pytest.raises(ValueError, match="not a prompt catalog snapshot"):
+            verify_snapshot({"prompts": []}, self.manager.catalog)
+
+
+class TestBenchmarks:
+    """Test cases for the benchmark suite"""
+
+    def test_run(self):
+        """Test every benchmark reports a positive per-call time"""
+        results = run_benchmarks(iterations=5, rounds=1)
+        assert [result.name for result in results] == list(BENCHMARKS)
+        assert all(result.best_ns > 0 and result.ops_per_second > 0 for result in results)
+
+    def test_unknown(self):
+        """Test unknown benchmark names are rejected"""
+        with pytest.raises(ValueError, match="Benchmark 'nope' not supported"):
+            run_benchmarks(names=["nope"])
+
+    def test_command(self, capsys):
+        """Test bench prints the selected benchmarks as JSON"""
+        assert main(["bench", "--iterations", "5", "--rounds", "1", "--only", "get_prompt", "--json"]) == 0
+        (result,) = json.loads(capsys.readouterr().out)
+        assert result["name"] == "get_prompt" and result["iterations"] == 5
@@ -0,0 +1,123 @@
+"""
+Tests for columnar batch rendering
+"""
+
+import json
+
+import pytest
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.columnar import render_columns
+from farmerchat_prompts.templates import TemplateVariableError, compile_template
+
+
+RECALL_COLUMNS = {
+    "category": ["irrigation", "pest_disease"],
+    "gold_fact": ["Irrigate wheat at crown root initiation", "Spray neem oil for aphids"],
+    "pred_facts": ['["Water wheat 21 days after sowing"]', '["Use neem oil"]'],
+}
+
+
+class TestCompiledTemplate:
+    """Test cases for template compilation"""
+
+    def test_positional_matches_format(self):
+        """Test positional rendering equals keyword rendering"""
+        template = "A {x} and {y!r:>5} then {x} with {{literal}}"
+        compiled = compile_template(template)
+        assert compiled.fields == ("x", "y")
+        assert compiled.render_values("1", "b") == template.format(x="1", y="b")
+
+
+class TestRenderColumns:
+    """Test cases for render_columns"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.prompt = self.manager.get_prompt("openai", "fact_recall", "prompt_evals")
+        self.expected = [
+            self.prompt.format(category=c, gold_fact=g, pred_facts=p)
+            for c, g, p in zip(*RECALL_COLUMNS.values())
+        ]
+
+    def test_dict_of_lists(self):
+        """Test rendering from a plain dict of columns"""
+        assert render_columns(self.prompt, RECALL_COLUMNS) == self.expected
+
+    def test_json_output_matches_full_prompt(self):
+        """Test JSON output equals serializing get_full_prompt"""
+        results = render_columns(self.prompt, RECALL_COLUMNS, output="json")
+        assert json.loads(results[1]) == self.prompt.get_full_prompt(self.expected[1])
+
+    def test_column_mapping_and_constants(self):
+        """Test renamed columns and constant fields"""
+        data = {"fact": RECALL_COLUMNS["gold_fact"], "pred_facts": RECALL_COLUMNS["pred_facts"]}
+        results = render_columns(
+            self.prompt, data,
+            columns={"gold_fact": "fact"},
+            constants={"category": "irrigation"},
+        )
+        assert results[0] == self.expected[0]
+
+    def test_optional_fields_use_defaults(self):
+        """Test optional fields without a column render like format() does"""
+        prompt = self.manager.get_prompt("openai", "soil_analysis")
+        row = {name: "1" for name in prompt.template_fields.required}
+        data = {name: [value, value] for name, value in row.items()}
+        data["additional_info"] = ["", "Saline patches"]
+        assert render_columns(prompt, data) == [
+            prompt.format(**row), prompt.format(**row, additional_info="Saline patches"),
+        ]
+        del data["additional_info"]
+        assert render_columns(prompt, data)[0] == prompt.format(**row)
+
+    def test_null_values_are_missing(self):
+        """Test nulls take the default in optional columns and raise in required ones"""
+        prompt = self.manager.get_prompt("openai", "soil_analysis")
+        row = {name: "1" for name in prompt.template_fields.required}
+        data = {name: [value, value] for name, value in row.items()}
+        data["additional_info"] = [None, "Saline patches"]
+        assert render_columns(prompt, data)[0] == prompt.format(**row)
+
+        data = dict(RECALL_COLUMNS, gold_fact=[RECALL_COLUMNS["gold_fact"][0], None])
+        with pytest.raises(TemplateVariableError, match="in row 1: gold_fact"):
+            render_columns(self.prompt, data)
+
+    def test_missing_column(self):
+        """Test a clear error for unmapped template fields"""
+        with pytest.raises(ValueError, match="No column found for template fields: pred_facts"):
+            render_columns(self.prompt, {"category": [], "gold_fact": []})
+
+    def test_mismatched_column_lengths(self):
+        """Test columns of different lengths are rejected instead of truncated"""
+        data = dict(RECALL_COLUMNS, pred_facts=RECALL_COLUMNS["pred_facts"][:-1])
+        with pytest.raises(ValueError, match="Column 'pred_facts' has"):
+            render_columns(self.prompt, data)
+
+    def test_numpy_arrays(self):
+        """Test dict of NumPy string arrays"""
+        np = pytest.importorskip("numpy")
+        data = {key: np.array(values) for key, values in RECALL_COLUMNS.items()}
+        assert render_columns(self.prompt, data) == self.expected
+
+    def test_pandas_dataframe(self):
+        """Test pandas input returns an index-aligned Series"""
+        pd = pytest.importorskip("pandas")
+        frame = pd.DataFrame(RECALL_COLUMNS, index=[10, 20])
+        series = render_columns(self.prompt, frame, name="prompt")
+        assert list(series.index) == [10, 20]
+        assert series[20] == self.expected[1]
+
+    def test_arrow_table(self):
+        """Test Arrow input returns an Arrow string array"""
+        pa = pytest.importorskip("pyarrow")
+        table = pa.table(RECALL_COLUMNS)
+        array = render_columns(self.prompt, table)
+        assert array.to_pylist() == self.expected
+
+    def test_arrow_nulls(self):
+        """Test Arrow nulls in a required column raise like a missing variable"""
+        pa = pytest.importorskip("pyarrow")
+        table = pa.table(dict(RECALL_COLUMNS, category=[None, "pest_disease"]))
+        with pytest.raises(TemplateVariableError, match="in row 0: category"):
+            render_columns(self.prompt, table)
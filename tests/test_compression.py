@@ -0,0 +1,206 @@
+"""
+Tests for compressed prompt variants
+"""
+
+import pytest
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.compression import (
+    COMPRESSION_VARIANTS,
+    TRIMMED_MARKER,
+    _example_spans,
+    compress_prompt,
+    compress_text,
+    deduplicate_instructions,
+    normalize_whitespace,
+    strip_markdown,
+    trim_examples,
+)
+from farmerchat_prompts.fewshot import render_examples
+from farmerchat_prompts.templates import check_json_examples
+from farmerchat_prompts.tokens import estimate_tokens
+
+
+EXAMPLE_PROMPT = """You are an advisor.
+
+YOUR TASK:
+1. Give specific doses
+2. Mention local crop varieties
+
+EXAMPLE INPUT:
+Location: Patna
+EXAMPLE OUTPUT:
+**Rice**: apply 50 kg urea
+line a
+line b
+line c
+
+FORMAT: Always give specific doses
+2. Mention local crop varieties
+"""
+
+
+class TestCompressionSteps:
+    """Test cases for the individual compression steps"""
+
+    def test_normalize_whitespace(self):
+        """Test trailing spaces and blank line runs are squeezed"""
+        assert normalize_whitespace("a   b  \n\n\n\nc\n") == "a b\n\nc"
+
+    def test_normalize_keeps_indentation(self):
+        """Test leading indentation survives"""
+        assert normalize_whitespace("list:\n  - item") == "list:\n  - item"
+
+    def test_strip_markdown(self):
+        """Test bold, headings and rules are removed"""
+        text = "## Title\n**Bold** text\n---\nbody"
+        assert strip_markdown(text) == "Title\nBold text\nbody"
+
+    def test_strip_markdown_keeps_fences(self):
+        """Test lines inside a code fence are left as written"""
+        block = "```\n# comment\n---\n- item **x**\n```"
+        text = f"## Output\n{block}\n---\n**Done**"
+        assert strip_markdown(text) == f"Output\n{block}\nDone"
+
+    def test_trim_examples(self):
+        """Test each example is cut to a line limit and marked"""
+        trimmed = trim_examples(EXAMPLE_PROMPT, max_lines=2)
+        assert "Location: Patna" in trimmed and "**Rice**" in trimmed
+        assert "line a" not in trimmed
+        assert TRIMMED_MARKER in trimmed
+        assert "FORMAT: Always give specific doses" in trimmed
+
+    def test_remove_examples(self):
+        """Test max_lines=0 removes examples up to the next instruction"""
+        removed = trim_examples(EXAMPLE_PROMPT, max_lines=0)
+        assert "EXAMPLE" not in removed
+        assert "Patna" not in removed
+        assert "FORMAT:" in removed
+
+    def test_deduplicate_instructions(self):
+        """Test a repeated instruction line is dropped, ignoring its number"""
+        deduplicated = deduplicate_instructions(EXAMPLE_PROMPT)
+        assert deduplicated.count("Mention local crop varieties") == 1
+        assert "EXAMPLE OUTPUT:" in deduplicated
+
+    def test_normalize_leaves_fenced_blocks(self):
+        """Test aligned columns and blank lines inside code fences are kept"""
+        text = "Table:\n```\nMSP:   ₹2,275\n\n\nLocal: ₹2,100  \n```\nafter   this"
+        assert normalize_whitespace(text) == "Table:\n```\nMSP:   ₹2,275\n\n\nLocal: ₹2,100  \n```\nafter this"
+
+    def test_deduplicate_skips_json_schemas(self):
+        """Test repeated fields of an output schema are not treated as repeated instructions"""
+        text = (
+            'Return:\n{\n  "a": {\n    "score": <number 1-5>, "why": "one line reason"\n  },\n'
+            '  "b": {\n    "score": <number 1-5>, "why": "one line reason"\n  }\n}'
+        )
+        assert deduplicate_instructions(text) == text
+
+    def test_example_ends_at_same_level_heading(self):
+        """Test a headed example section runs to the next heading of its level"""
+        text = "## Examples\nInput: x\n### Output\nApply urea\n## Rules\nBe brief"
+        assert trim_examples(text, max_lines=0) == "## Rules\nBe brief"
+
+    def test_ambiguous_example_kept(self):
+        """Test an example is kept whole when its end can't be told from its content"""
+        text = "EXAMPLE OUTPUT:\n### Plan\nNow spray neem\n### Costs\nRs 500\nFORMAT: be brief"
+        assert trim_examples(text, max_lines=0) == text
+
+    def test_unknown_variant(self):
+        """Test unknown variants are rejected"""
+        with pytest.raises(ValueError, match="Available variants: compact, minimal"):
+            compress_text("text", "tiny")
+
+    def test_estimate_tokens(self):
+        """Test token estimates for short texts"""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("Apply 25 kg urea per acre") == 7
+
+
+class TestPromptVariants:
+    """Test cases for PromptManager.get_prompt(..., variant=...)"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    def test_compact_variant(self):
+        """Test the compact variant shortens an inline worked example and keeps the instructions"""
+        prompt = self.manager.get_prompt("llama", "weather_advisory")
+        prompt = prompt.model_copy(update={
+            "system_prompt": f"{prompt.system_prompt}\n\n{render_examples(prompt.examples[:1])}"
+        })
+        compact = compress_prompt(prompt, "compact")
+        assert estimate_tokens(compact.system_prompt) < estimate_tokens(prompt.system_prompt) / 2
+        assert "YOUR TASK:" in compact.system_prompt
+        assert "EXAMPLE INPUT:" in compact.system_prompt
+        assert TRIMMED_MARKER in compact.system_prompt
+
+    def test_minimal_variant(self):
+        """Test the minimal variant drops worked examples"""
+        minimal = self.manager.get_prompt("llama", "crop_recommendation", variant="minimal")
+        assert "EXAMPLE" not in minimal.system_prompt
+        assert "**" not in minimal.system_prompt
+
+    def test_variant_keeps_template(self):
+        """Test variants leave the user template and metadata unchanged"""
+        prompt = self.manager.get_prompt("llama", "specificity_evaluation", "prompt_evals")
+        compact = self.manager.get_prompt("llama", "specificity_evaluation", "prompt_evals", variant="minimal")
+        assert compact.user_prompt_template == prompt.user_prompt_template
+        assert compact.metadata == prompt.metadata
+        assert prompt.system_prompt != compact.system_prompt
+
+    def test_variant_cached_per_snapshot(self):
+        """Test variants are built once per catalog snapshot"""
+        first = self.manager.get_prompt("llama", "pest_management", variant="compact")
+        second = self.manager.get_prompt("llama", "pest_management", variant="compact")
+        assert first is second
+
+    def test_unknown_variant(self):
+        """Test get_prompt rejects unknown variants"""
+        with pytest.raises(ValueError, match="Variant 'tiny' not supported"):
+            self.manager.get_prompt("openai", "crop_recommendation", variant="tiny")
+
+    def test_compression_report(self):
+        """Test reports cover every latest prompt and never grow a prompt"""
+        reports = self.manager.compression_report("compact")
+        assert len(reports) == len(self.manager.catalog)
+        assert all(report.tokens <= report.original_tokens for report in reports)
+        inline_examples = [
+            report for report in self.manager.compression_report("minimal")
+            if report.prompt.metadata.use_case.value in ("specificity_evaluation", "fact_stitching")
+        ]
+        assert len(inline_examples) == 6
+        assert all(report.saved_tokens > 0 and report.ratio < 1 for report in inline_examples)
+
+    def test_compression_report_all_variants(self):
+        """Test the default report includes every variant"""
+        variants = {report.variant for report in self.manager.compression_report()}
+        assert variants == {"compact", "minimal"}
+
+    def test_variant_json_schemas_parse(self):
+        """Test every variant keeps its output schemas intact and parseable"""
+        for (provider, domain, use_case), prompt in self.manager.catalog.entries.items():
+            for variant in COMPRESSION_VARIANTS:
+                compressed = self.manager.get_prompt(provider, use_case, domain, variant=variant)
+                assert check_json_examples([compressed], strict=True) == [], (prompt, variant)
+        minimal = self.manager.get_prompt(
+            "openai", "conversationality_eval_for_stitching", "prompt_evals", variant="minimal"
+        )
+        assert minimal.system_prompt.count('"score"') == 6
+
+    def test_minimal_leaves_no_example_text(self):
+        """Test no worked-example line survives outside an example in the minimal variant"""
+        for (provider, domain, use_case), prompt in self.manager.catalog.entries.items():
+            lines = prompt.system_prompt.split("\n")
+            inside, outside = set(), set()
+            spans = _example_spans(lines)
+            for index, line in enumerate(lines):
+                in_example = any(start <= index < end for start, end, _ in spans)
+                (inside if in_example else outside).add(line.strip())
+            minimal = self.manager.get_prompt(provider, use_case, domain, variant="minimal").system_prompt
+            leaked = [line for line in inside - outside if len(line) > 20 and line in minimal]
+            assert leaked == [], prompt
+        minimal = self.manager.get_prompt("llama", "market_insights", variant="minimal").system_prompt
+        assert "BEST STRATEGY" not in minimal and "2,25,500" not in minimal
+        assert minimal.endswith("clear calculations for every market inquiry.")
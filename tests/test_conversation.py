@@ -0,0 +1,125 @@
+"""
+Tests for multi-turn conversation rendering
+"""
+
+import pytest
+
+from farmerchat_prompts import Conversation, PromptManager
+
+
+class TestConversation:
+    """Test cases for provider-native multi-turn prompts"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    @pytest.mark.parametrize("provider", ["openai", "llama", "gemma"])
+    def test_single_turn_matches_full_prompt(self, provider):
+        """Test one user turn renders exactly like get_full_prompt"""
+        prompt = self.manager.get_prompt(provider, "pest_management")
+        chat = Conversation(prompt).add_user("Leaves are curling")
+        assert chat.render() == prompt.get_full_prompt("Leaves are curling")
+
+    def test_openai_messages(self):
+        """Test OpenAI conversations become chat messages"""
+        chat = Conversation(self.manager.get_prompt("openai", "pest_management"))
+        chat.add_user("Leaves are curling").add_assistant("Likely whitefly").add_user("Spray?")
+        messages = chat.render()["messages"]
+        assert [message["role"] for message in messages] == [
+            "system", "user", "assistant", "user",
+        ]
+        assert messages[-1]["content"] == "Spray?"
+
+    def test_llama_header_tokens(self):
+        """Test Llama conversations use Llama 3 headers and end with an assistant cue"""
+        chat = Conversation(self.manager.get_prompt("llama", "pest_management"))
+        chat.add_user("Leaves are curling").add_assistant("Likely whitefly").add_user("Spray?")
+        text = chat.render()["prompt"]
+        assert text.startswith("<|start_header_id|>system<|end_header_id|>")
+        assert text.count("<|start_header_id|>system") == 1
+        assert text.endswith(
+            "<|start_header_id|>assistant<|end_header_id|>\n\nLikely whitefly<|eot_id|>"
+            "<|start_header_id|>user<|end_header_id|>\n\nSpray?<|eot_id|>"
+            "<|start_header_id|>assistant<|end_header_id|>\n\n"
+        )
+
+    def test_llama2_inst_blocks(self):
+        """Test the llama2 formatter uses one [INST] block per exchange"""
+        chat = Conversation(
+            self.manager.get_prompt("llama", "pest_management"), formatter="llama2"
+        )
+        chat.add_user("Leaves are curling").add_assistant("Likely whitefly").add_user("Spray?")
+        text = chat.render()["prompt"]
+        assert text.count("<<SYS>>") == 1
+        assert text.endswith("[/INST] Likely whitefly </s><s>[INST] Spray? [/INST]")
+
+    def test_gemma_turn_markers(self):
+        """Test Gemma conversations alternate user and model turns"""
+        chat = Conversation(self.manager.get_prompt("gemma", "pest_management"))
+        chat.add_user("Leaves are curling").add_assistant("Likely whitefly")
+        text = chat.render()["prompt"]
+        assert text.endswith("<start_of_turn>model\nLikely whitefly<end_of_turn>\n")
+        chat.add_user("Spray?")
+        assert chat.render()["prompt"].endswith(
+            "<start_of_turn>user\nSpray?<end_of_turn>\n<start_of_turn>model\n"
+        )
+
+    def test_turn_order_enforced(self):
+        """Test turns must start with the user and alternate"""
+        chat = Conversation(self.manager.get_prompt("openai", "pest_management"))
+        with pytest.raises(ValueError, match="expected user, got assistant"):
+            chat.add_assistant("Hello")
+        chat.add_user("Hi")
+        with pytest.raises(ValueError, match="expected assistant, got user"):
+            chat.add_user("Again")
+        with pytest.raises(ValueError, match="Role 'system' not supported"):
+            chat.add("system", "x")
+
+    def test_token_budget_drops_oldest_exchanges(self):
+        """Test the oldest exchanges go first and the system prompt moves up"""
+        prompt = self.manager.get_prompt("llama", "pest_management")
+        full = Conversation(prompt)
+        for index in range(5):
+            full.add_user(f"question {index} about aphids").add_assistant(f"answer {index} " * 30)
+        budget = full.tokens - 50
+        chat = Conversation(prompt, token_budget=budget, turns=full.turns)
+        assert chat.tokens <= budget
+        assert chat.turns[0] == ("user", "question 1 about aphids")
+        text = chat.render()["prompt"]
+        assert text.startswith("<|start_header_id|>system")
+        assert "question 0" not in text
+
+    def test_budget_keeps_latest_turn(self):
+        """Test the latest user turn survives even when over budget"""
+        chat = Conversation(self.manager.get_prompt("openai", "pest_management"), token_budget=1)
+        chat.add_user("first").add_assistant("reply").add_user("second")
+        assert chat.turns == [("user", "second")]
+
+    def test_incremental_tokens(self):
+        """Test the running token count matches a rebuild"""
+        prompt = self.manager.get_prompt("gemma", "pest_management")
+        chat = Conversation(prompt, turns=[("user", "a b c"), ("assistant", "d e"), ("user", "f")])
+        rebuilt = Conversation(prompt, turns=chat.turns)
+        assert chat.tokens == rebuilt.tokens
+        assert chat.render() == rebuilt.render()
+
+    def test_render_between_turns(self):
+        """Test rendering after each turn matches a conversation built in one go"""
+        prompt = self.manager.get_prompt("llama", "pest_management")
+        chat = Conversation(prompt)
+        turns = [("user", "a b c"), ("assistant", "d e"), ("user", "f")]
+        for index, (role, content) in enumerate(turns, 1):
+            chat.add(role, content)
+            assert chat.render() == chat.render() == Conversation(prompt, turns=turns[:index]).render()
+
+    def test_transcript(self):
+        """Test transcripts suit the chat_history template variable"""
+        chat = Conversation(self.manager.get_prompt("openai", "pest_management"))
+        chat.add_user("Leaves are curling").add_assistant("Likely whitefly")
+        assert chat.transcript() == "User: Leaves are curling\nAssistant: Likely whitefly"
+        evaluator = self.manager.get_prompt(
+            "openai", "conversationality_eval_for_stitching", "prompt_evals"
+        )
+        rendered = evaluator.format(question="q", response="r", chat_history=chat.transcript())
+        assert "Assistant: Likely whitefly" in rendered
@@ -0,0 +1,132 @@
+"""
+Tests for dataset cost estimation
+"""
+
+import json
+
+import pytest
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.cli import main
+from farmerchat_prompts.cost import (
+    ModelPrice,
+    _byte_ranges,
+    _iter_range,
+    _payload_tokens,
+    estimate_cost,
+    load_prices,
+)
+
+KEYS = [(provider, "fact_recall", "prompt_evals") for provider in ("openai", "llama", "gemma")]
+
+
+def make_rows(count):
+    return [
+        {
+            "category": ["pest", "soil", "weather"][index % 3],
+            "gold_fact": f"Spray neem oil at {index % 7 + 1} ml per litre against aphids",
+            "pred_facts": "Neem oil controls aphids; " * (index % 5 + 1),
+        }
+        for index in range(count)
+    ]
+
+
+def write_rows(path, rows, extra=""):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows) + extra, encoding="utf-8")
+    return str(path)
+
+
+class TestEstimate:
+    """Test cases for estimate_cost"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.rows = make_rows(30)
+
+    def test_matches_rendered_prompts(self):
+        """Test static plus variable estimates equal estimates of fully rendered prompts"""
+        report = estimate_cost([json.dumps(row) for row in self.rows], KEYS, manager=self.manager)
+        for key, cost in zip(KEYS, report.keys):
+            prompt = self.manager.get_prompt(*key)
+            counts = sorted(
+                _payload_tokens(prompt.get_full_prompt(prompt.format(**row))) for row in self.rows
+            )
+            assert cost.rows == 30
+            assert cost.input_tokens == sum(counts)
+            assert cost.max_tokens == counts[-1]
+            assert cost.p50_tokens == counts[15]
+
+    def test_prices_and_models(self):
+        """Test models map providers to prices, with output tokens at the output rate"""
+        report = estimate_cost(
+            [json.dumps(row) for row in self.rows], KEYS[:2],
+            prices={"gpt-4o": ModelPrice(2.0, 8.0)}, models={"openai": "gpt-4o"},
+            output_tokens=100, manager=self.manager,
+        )
+        openai, llama = report.keys
+        assert openai.model == "gpt-4o" and llama.model == "llama"
+        assert openai.output_tokens == 3000
+        assert openai.cost == pytest.approx((openai.input_tokens * 2.0 + 3000 * 8.0) / 1e6)
+        assert llama.cost == 0.0
+        assert report.cost == openai.cost
+
+    def test_invalid_and_incomplete_rows(self):
+        """Test bad lines are counted and rows missing a required field are skipped"""
+        lines = [json.dumps(self.rows[0]), "not json", "[1]", "", json.dumps({"category": "pest"})]
+        report = estimate_cost(lines, KEYS[:1], manager=self.manager)
+        assert report.rows == 2 and report.invalid_rows == 2
+        assert report.keys[0].rows == 1 and report.keys[0].skipped == 1
+
+    def test_workers_match_serial(self, tmp_path, monkeypatch):
+        """Test a file split across worker processes gives the same report"""
+        monkeypatch.setattr("farmerchat_prompts.cost._PARALLEL_MIN_BYTES", 0)
+        path = write_rows(tmp_path / "rows.jsonl", make_rows(600), extra="oops\n")
+        serial = estimate_cost(path, KEYS, workers=1, manager=self.manager)
+        parallel = estimate_cost(path, KEYS, workers=3, manager=self.manager)
+        assert serial == parallel
+        assert serial.rows == 600 and serial.invalid_rows == 1
+
+    def test_byte_ranges_cover_every_line_once(self, tmp_path):
+        """Test byte ranges split a file at line boundaries without loss or overlap"""
+        path = tmp_path / "lines.txt"
+        lines = [("x" * (index % 13)).encode() + b"\n" for index in range(200)]
+        path.write_bytes(b"".join(lines))
+        size = path.stat().st_size
+        for parts in (1, 2, 7, 64, size):
+            read = [line for start, end in _byte_ranges(size, parts) for line in _iter_range(str(path), start, end)]
+            assert read == lines
+
+    def test_no_prompts(self):
+        """Test at least one prompt is required"""
+        with pytest.raises(ValueError, match="At least one prompt"):
+            estimate_cost([], [])
+
+
+class TestPrices:
+    """Test cases for price tables and the cost command"""
+
+    def test_load_prices(self, tmp_path):
+        """Test a JSON price table is read with its model mapping"""
+        path = tmp_path / "prices.json"
+        path.write_text(json.dumps({"prices": {"gpt-4o": {"input": 2.5, "output": 10}}, "models": {"openai": "gpt-4o"}}))
+        prices, models = load_prices(str(path))
+        assert prices == {"gpt-4o": ModelPrice(2.5, 10.0)}
+        assert models == {"openai": "gpt-4o"}
+        path.write_text(json.dumps({"prices": {"gpt-4o": {"output": 10}}}))
+        with pytest.raises(ValueError, match="Invalid price for model 'gpt-4o'"):
+            load_prices(str(path))
+
+    def test_command(self, tmp_path, capsys):
+        """Test the cost command prints a JSON report"""
+        path = write_rows(tmp_path / "rows.jsonl", make_rows(10))
+        status = main([
+            "cost", "-i", path, "--key", "openai", "fact_recall", "prompt_evals",
+            "--model", "openai=gpt-4o", "--output-tokens", "50", "--json",
+        ])
+        assert status == 0
+        report = json.loads(capsys.readouterr().out)
+        assert report["rows"] == 10 and report["output_tokens"] == 500
+        assert report["keys"][0]["model"] == "gpt-4o"
+        assert main(["cost", "-i", path, "--key", "openai"]) == 1
+        assert "expected PROVIDER USE_CASE" in capsys.readouterr().err
@@ -0,0 +1,135 @@
+"""
+Tests for dynamic few-shot example selection
+"""
+
+from farmerchat_prompts import PromptManager, Prompt, PromptMetadata, Provider, UseCase
+from farmerchat_prompts.fewshot import ExampleIndex, format_example
+from farmerchat_prompts.tokens import estimate_tokens
+
+
+EXAMPLES = [
+    {"input": "Stem borer dead hearts in paddy", "output": "Release Trichogramma"},
+    {"input": "Aphids on mustard pods", "output": "Spray neem oil " + "in the evening " * 20},
+    {"input": "Aphid colonies on mustard flowers", "output": "Dimethoate 250 ml/acre"},
+]
+
+
+def make_prompt(provider: Provider, examples=EXAMPLES) -> Prompt:
+    """Build a small prompt with examples"""
+    return Prompt(
+        metadata=PromptMetadata(
+            provider=provider,
+            use_case=UseCase.PEST_MANAGEMENT,
+            description="Test prompt",
+        ),
+        system_prompt="You are a pest advisor.",
+        user_prompt_template="{question}",
+        variables={"question": "Question"},
+        examples=examples,
+    )
+
+
+class TestExampleIndex:
+    """Test cases for ranking examples"""
+
+    def test_most_similar_first(self):
+        """Test examples sharing terms with the query rank first"""
+        index = ExampleIndex(EXAMPLES)
+        selected = index.select("aphids on my mustard", k=2)
+        assert [example["output"][:5] for example in selected] == ["Spray", "Dimet"]
+
+    def test_k_limits_count(self):
+        """Test k caps the number of examples"""
+        index = ExampleIndex(EXAMPLES)
+        assert len(index.select("stem borer", k=1)) == 1
+        assert index.select("stem borer", k=0) == []
+        assert len(index.select("stem borer")) == 3
+
+    def test_token_budget_skips_large_examples(self):
+        """Test an example over the budget is skipped for a smaller one"""
+        index = ExampleIndex(EXAMPLES)
+        budget = estimate_tokens(format_example(EXAMPLES[2]))
+        selected = index.select("aphids on mustard pods", token_budget=budget)
+        assert selected == [EXAMPLES[2]]
+
+    def test_no_overlap_keeps_declared_order(self):
+        """Test unrelated queries fall back to the declared order"""
+        index = ExampleIndex(EXAMPLES)
+        assert index.select("hello", k=2) == EXAMPLES[:2]
+
+    def test_empty(self):
+        """Test prompts without examples select nothing"""
+        assert ExampleIndex(None).select("aphids", k=3) == []
+
+
+class TestFullPromptExamples:
+    """Test cases for get_full_prompt with examples"""
+
+    def test_default_has_no_examples(self):
+        """Test get_full_prompt is unchanged without example arguments"""
+        prompt = make_prompt(Provider.LLAMA)
+        assert "EXAMPLE" not in prompt.get_full_prompt("aphids")["prompt"]
+
+    def test_llama_examples_in_system_block(self):
+        """Test Llama prompts get examples inside the system block"""
+        full = make_prompt(Provider.LLAMA).get_full_prompt("stem borer in rice", num_examples=1)
+        system, user = full["prompt"].split("<|eot_id|>")[:2]
+        assert system.endswith("Release Trichogramma")
+        assert user.endswith("stem borer in rice")
+        assert "EXAMPLE INPUT:\nStem borer dead hearts in paddy" in system
+        assert "Aphids" not in system
+
+    def test_gemma_examples_before_input(self):
+        """Test Gemma prompts get examples before the user input"""
+        full = make_prompt(Provider.GEMMA).get_full_prompt("aphids on mustard", num_examples=1)
+        assert full["prompt"].index("EXAMPLE OUTPUT:") < full["prompt"].index("aphids on mustard<end_of_turn>")
+
+    def test_openai_examples_as_turns(self):
+        """Test OpenAI prompts get examples as user/assistant turns"""
+        messages = make_prompt(Provider.OPENAI).get_full_prompt("mustard aphids", num_examples=2)["messages"]
+        assert [message["role"] for message in messages] == [
+            "system", "user", "assistant", "user", "assistant", "user",
+        ]
+        assert messages[-1]["content"] == "mustard aphids"
+
+    def test_index_rebuilt_when_examples_change(self):
+        """Test replacing examples invalidates the cached index"""
+        prompt = make_prompt(Provider.LLAMA)
+        assert len(prompt.example_index) == 3
+        prompt.examples = EXAMPLES[:1]
+        assert len(prompt.example_index) == 1
+
+
+class TestCatalogExamples:
+    """Test cases for the examples shipped with the Llama prompts"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    def test_llama_prompts_have_examples(self):
+        """Test every Llama crop advisory prompt has input/output examples"""
+        for prompt in self.manager.get_prompts_by_provider("llama", "crop_advisory"):
+            assert len(prompt.examples) >= 3
+            for example in prompt.examples:
+                assert example["input"] and example["output"]
+
+    def test_relevant_example_selected(self):
+        """Test a farmer query picks the matching worked example"""
+        prompt = self.manager.get_prompt("llama", "weather_advisory")
+        selected = prompt.select_examples("frost and cold wave tonight, mustard crop", k=1)
+        assert "Cold wave" in selected[0]["input"]
+
+    def test_selected_examples_rendered_once(self):
+        """Test each selected example appears exactly once, and only when selected"""
+        query = "pink larvae in cotton bolls"
+        for prompt in self.manager.get_prompts_by_provider("llama", "crop_advisory"):
+            assert "EXAMPLE" not in prompt.get_full_prompt(query)["prompt"]
+            selected = prompt.select_examples(query, k=2)
+            text = prompt.get_full_prompt(query, num_examples=2)["prompt"]
+            assert text.count("EXAMPLE INPUT:") == len(selected) == 2
+            for example in prompt.examples:
+                expected = 1 if example in selected else 0
+                assert text.count(example["output"]) == expected, prompt
+        prompt = self.manager.get_prompt("llama", "pest_management")
+        assert "Pink Bollworm" in prompt.get_full_prompt(query, num_examples=1)["prompt"]
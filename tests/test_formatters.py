@@ -0,0 +1,163 @@
+"""
+Tests for the chat formatter registry
+"""
+
+import importlib.metadata
+
+import pytest
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts import formatters
+from farmerchat_prompts.formatters import (
+    ChatFormatter,
+    ChatMLFormatter,
+    Llama2Formatter,
+    available_formatters,
+    get_formatter,
+    register_formatter,
+    resolve_formatter,
+)
+
+
+@pytest.fixture
+def registry():
+    """Restore the formatter registry after a test changes it"""
+    saved = dict(formatters.FORMATTERS), dict(formatters.PROVIDER_FORMATTERS)
+    loaded = formatters._entry_points_loaded
+    yield formatters
+    formatters.FORMATTERS.clear()
+    formatters.FORMATTERS.update(saved[0])
+    formatters.PROVIDER_FORMATTERS.clear()
+    formatters.PROVIDER_FORMATTERS.update(saved[1])
+    formatters._entry_points_loaded = loaded
+    formatters._generation += 1
+
+
+class EchoFormatter(ChatFormatter):
+    """Minimal third-party style formatter"""
+
+    name = "echo"
+
+    def turn(self, role, content, system_prompt, first):
+        return f"{system_prompt}|{content}" if first else f"|{content}"
+
+
+class TestFormatters:
+    """Test cases for the built-in chat formats"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.prompt = self.manager.get_prompt("llama", "pest_management")
+
+    def test_llama_defaults_to_llama3(self):
+        """Test Llama prompts use the Llama 3 chat template"""
+        text = self.prompt.get_full_prompt("Leaves curling")["prompt"]
+        assert text.startswith("<|start_header_id|>system<|end_header_id|>\n\n")
+        assert text.endswith(
+            "<|start_header_id|>user<|end_header_id|>\n\nLeaves curling<|eot_id|>"
+            "<|start_header_id|>assistant<|end_header_id|>\n\n"
+        )
+
+    def test_llama2_formatter(self):
+        """Test the Llama 2 format is still available by name"""
+        text = self.prompt.get_full_prompt("Leaves curling", formatter="llama2")["prompt"]
+        assert text == f"[INST] <<SYS>>\n{self.prompt.system_prompt}\n<</SYS>>\n\nLeaves curling [/INST]"
+
+    def test_gemma_and_openai_unchanged(self):
+        """Test Gemma and OpenAI payloads keep their structure"""
+        gemma = self.manager.get_prompt("gemma", "pest_management")
+        assert gemma.get_full_prompt("hi")["prompt"] == (
+            f"<start_of_turn>user\n{gemma.system_prompt}\n\nhi<end_of_turn>\n<start_of_turn>model\n"
+        )
+        openai = self.manager.get_prompt("openai", "pest_management")
+        assert openai.get_full_prompt("hi") == {"messages": [
+            {"role": "system", "content": openai.system_prompt},
+            {"role": "user", "content": "hi"},
+        ]}
+
+    @pytest.mark.parametrize("name,start,end", [
+        ("mistral", "[INST] ", "hi [/INST]"),
+        ("chatml", "<|im_start|>system\n", "<|im_start|>user\nhi<|im_end|>\n<|im_start|>assistant\n"),
+    ])
+    def test_other_formats(self, name, start, end):
+        """Test Mistral and ChatML strings"""
+        text = self.prompt.get_full_prompt("hi", formatter=name)["prompt"]
+        assert text.startswith(start)
+        assert text.endswith(end)
+
+    def test_no_leading_bos(self):
+        """Test string formats leave the BOS token to the tokenizer"""
+        for name in ("llama3", "llama2", "gemma", "mistral", "chatml"):
+            text = self.prompt.get_full_prompt("hi", formatter=name)["prompt"]
+            assert not text.startswith(("<s>", "<|begin_of_text|>", "<bos>")), name
+
+    def test_prompt_formatter_field(self):
+        """Test Prompt.formatter overrides the provider default"""
+        prompt = self.prompt.model_copy(update={"formatter": "chatml"})
+        assert prompt.chat_formatter is get_formatter("chatml")
+        assert prompt.get_full_prompt("hi")["prompt"].startswith("<|im_start|>system")
+
+    def test_formatter_bound_once(self):
+        """Test the resolved formatter is cached on the prompt"""
+        first = self.prompt.chat_formatter
+        assert self.prompt.chat_formatter is first
+
+    def test_unknown_formatter(self):
+        """Test unknown formatter names are rejected"""
+        with pytest.raises(ValueError, match="Formatter 'qwen9' not supported"):
+            self.prompt.get_full_prompt("hi", formatter="qwen9")
+
+
+class TestRegistry:
+    """Test cases for registering formatters"""
+
+    def test_register_provider_default(self, registry):
+        """Test a registered provider default replaces the bound formatter"""
+        prompt = PromptManager().get_prompt("llama", "pest_management")
+        assert prompt.chat_formatter.name == "llama3"
+        register_formatter("llama2", Llama2Formatter(), provider="llama")
+        assert prompt.get_full_prompt("hi")["prompt"].startswith("[INST] <<SYS>>")
+
+    def test_register_rejects_non_formatters(self, registry):
+        """Test only ChatFormatter instances can be registered"""
+        with pytest.raises(TypeError):
+            register_formatter("bad", lambda prompt: prompt)
+
+    def test_entry_points(self, registry, monkeypatch):
+        """Test formatters advertised through entry points are registered"""
+        entry_point = importlib.metadata.EntryPoint(
+            name="echo", value=f"{__name__}:EchoFormatter", group=formatters.ENTRY_POINT_GROUP
+        )
+
+        def fake_entry_points(**kwargs):
+            assert kwargs == {"group": formatters.ENTRY_POINT_GROUP}
+            return [entry_point]
+
+        monkeypatch.setattr(importlib.metadata, "entry_points", fake_entry_points)
+        registry._entry_points_loaded = False
+        assert "echo" in available_formatters()
+        prompt = PromptManager().get_prompt("openai", "pest_management")
+        assert prompt.get_full_prompt("hi", formatter="echo") == {
+            "prompt": f"{prompt.system_prompt}|hi"
+        }
+
+    def test_broken_entry_point_skipped(self, registry, monkeypatch, caplog):
+        """Test a plugin that fails to load doesn't stop later ones from registering"""
+        broken = importlib.metadata.EntryPoint(
+            name="broken", value="nonexistent_module:Formatter", group=formatters.ENTRY_POINT_GROUP
+        )
+        echo = importlib.metadata.EntryPoint(
+            name="echo", value=f"{__name__}:EchoFormatter", group=formatters.ENTRY_POINT_GROUP
+        )
+        monkeypatch.setattr(importlib.metadata, "entry_points", lambda **kwargs: [broken, echo])
+        registry._entry_points_loaded = False
+        names = available_formatters()
+        assert "echo" in names and "broken" not in names
+        assert "Failed to load chat formatter 'broken'" in caplog.text
+        assert resolve_formatter("llama").name == "llama3"
+
+    def test_register_alias(self, registry):
+        """Test an existing format can be registered under a new name"""
+        register_formatter("qwen", ChatMLFormatter())
+        assert "qwen" in available_formatters()
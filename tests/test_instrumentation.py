@@ -0,0 +1,175 @@
+"""
+Tests for per-call instrumentation hooks
+"""
+
+import pytest
+
+from farmerchat_prompts import Prompt, PromptManager
+from farmerchat_prompts import instrumentation
+from farmerchat_prompts.instrumentation import (
+    FORMAT,
+    FULL_PROMPT,
+    GET_PROMPT,
+    MetricsAggregator,
+    TracerHook,
+    add_hook,
+    remove_hook,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_hooks():
+    """Leave no hooks registered after a test"""
+    yield
+    instrumentation.clear_hooks()
+
+
+class FakeSpan:
+    def __init__(self, name, attributes, start_time):
+        self.name = name
+        self.attributes = attributes
+        self.start_time = start_time
+        self.end_time = None
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, attributes=None, start_time=None):
+        span = FakeSpan(name, attributes, start_time)
+        self.spans.append(span)
+        return span
+
+
+class TestHooks:
+    """Test cases for hook registration and events"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.events = []
+
+    def test_no_hooks_no_events(self):
+        """Test nothing is recorded without hooks"""
+        hook = add_hook(self.events.append)
+        remove_hook(hook)
+        self.manager.get_prompt("openai", "pest_management").get_full_prompt("Aphids")
+        assert self.events == []
+        assert instrumentation.hooks == ()
+
+    def test_events_per_operation(self):
+        """Test lookups, formats and full prompts each report an event"""
+        add_hook(self.events.append)
+        prompt = self.manager.get_prompt("llama", "pest_management")
+        prompt.format(**{name: "Bihar" for name in prompt.template_fields.required})
+        prompt.get_full_prompt("Stem borer in paddy")
+        assert [event.operation for event in self.events] == [GET_PROMPT, FORMAT, FULL_PROMPT]
+        lookup, formatted, full = self.events
+        assert lookup.key == ("llama", "crop_advisory", "pest_management")
+        assert lookup.version == "1.0.0"
+        assert lookup.output is None and lookup.tokens == 0
+        assert formatted.chars == len(formatted.output)
+        assert full.chars == len(full.output["prompt"])
+        assert full.tokens > 0
+        assert all(event.duration_ns > 0 for event in self.events)
+
+    def test_failed_calls_not_reported(self):
+        """Test unknown prompts and missing variables emit nothing"""
+        add_hook(self.events.append)
+        with pytest.raises(ValueError):
+            self.manager.get_prompt("openai", "unknown_use_case")
+        prompt = self.manager.get_prompt("openai", "crop_recommendation")
+        with pytest.raises(KeyError):
+            prompt.format(location="Patna")
+        assert [event.operation for event in self.events] == [GET_PROMPT]
+
+    def test_hook_errors_are_swallowed(self):
+        """Test a failing hook never breaks rendering or later hooks"""
+        def broken(event):
+            raise RuntimeError("exporter down")
+
+        add_hook(broken)
+        add_hook(self.events.append)
+        prompt = self.manager.get_prompt("openai", "soil_analysis")
+        assert prompt.get_full_prompt("pH 5.2")["messages"]
+        assert len(self.events) == 2
+
+    def test_tracer_hook(self):
+        """Test events become spans with prompt attributes"""
+        tracer = FakeTracer()
+        add_hook(TracerHook(tracer))
+        prompt = self.manager.get_prompt("gemma", "weather_advisory")
+        prompt.get_full_prompt("Heavy rain expected")
+        lookup, full = tracer.spans
+        assert lookup.name == "farmerchat_prompts.get_prompt"
+        assert full.attributes["prompt.use_case"] == "weather_advisory"
+        assert full.attributes["prompt.fingerprint"] == prompt.fingerprint
+        assert full.attributes["prompt.estimated_tokens"] > 0
+        assert full.start_time <= full.end_time
+
+
+class TestFingerprint:
+    """Test cases for Prompt.fingerprint"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.prompt = PromptManager().get_prompt("openai", "crop_recommendation")
+
+    def test_stable_across_copies(self):
+        """Test equal prompts share a fingerprint"""
+        rebuilt = Prompt(**self.prompt.model_dump())
+        assert len(self.prompt.fingerprint) == 12
+        assert rebuilt.fingerprint == self.prompt.fingerprint
+
+    def test_changes_with_text(self):
+        """Test editing the system prompt changes the fingerprint"""
+        edited = self.prompt.model_copy(update={"system_prompt": "You are brief."})
+        assert edited.fingerprint != self.prompt.fingerprint
+
+
+class TestMetricsAggregator:
+    """Test cases for batched metric aggregation"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.batches = []
+
+    def test_batches_exported(self):
+        """Test counters are aggregated per prompt and exported per batch"""
+        metrics = add_hook(MetricsAggregator(exporter=self.batches.append, batch_size=4))
+        prompt = self.manager.get_prompt("openai", "pest_management")
+        for _ in range(3):
+            prompt.get_full_prompt("Whitefly on cotton")
+        # 4 events: one lookup and three full prompts
+        assert len(self.batches) == 1
+        (full_key, fulls), (lookup_key, lookups) = sorted(self.batches[0].items())
+        assert lookup_key.operation == GET_PROMPT and lookups.count == 1
+        assert full_key.operation == FULL_PROMPT and fulls.count == 3
+        assert full_key.use_case == "pest_management"
+        assert full_key.fingerprint == prompt.fingerprint
+        assert fulls.chars == 3 * len(prompt.system_prompt + "Whitefly on cotton")
+        assert fulls.tokens > 0 and fulls.max_ns <= fulls.total_ns
+        assert metrics.flush() == {}
+
+    def test_totals_accumulate(self):
+        """Test totals include queued events and span several batches"""
+        metrics = add_hook(MetricsAggregator(batch_size=2))
+        prompt = self.manager.get_prompt("gemma", "market_insights")
+        for _ in range(5):
+            prompt.get_full_prompt("Onion prices next month")
+        totals = metrics.totals()
+        counts = {key.operation: stats.count for key, stats in totals.items()}
+        assert counts == {GET_PROMPT: 1, FULL_PROMPT: 5}
+
+    def test_background_flush(self):
+        """Test an interval flushes from a background thread"""
+        metrics = add_hook(MetricsAggregator(exporter=self.batches.append, interval=0.01))
+        self.manager.get_prompt("llama", "soil_analysis")
+        remove_hook(metrics)
+        metrics.close()
+        assert sum(stats.count for batch in self.batches for stats in batch.values()) == 1
@@ -0,0 +1,155 @@
+"""
+Tests for loading and hot-reloading prompts from a directory
+"""
+
+import json
+import os
+import time
+
+import pytest
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.loader import load_prompt_file, parse_prompt_data
+from farmerchat_prompts.watcher import DirectoryWatcher
+
+
+def _prompt_data(system_prompt, use_case="pest_management", version="1.1.0"):
+    return {
+        "metadata": {
+            "provider": "openai",
+            "use_case": use_case,
+            "domain": "crop_advisory",
+            "version": version,
+            "description": "File based pest management prompt",
+            "tags": ["pest-control"],
+        },
+        "system_prompt": system_prompt,
+        "user_prompt_template": "Crop: {crop}\nSymptoms: {symptoms}",
+        "variables": {"crop": "Crop name", "symptoms": "Observed symptoms"},
+    }
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestLoader:
+    """Test cases for prompt file parsing"""
+
+    def test_json_file(self, tmp_path):
+        """Test loading a list of prompts from JSON"""
+        path = tmp_path / "pests.json"
+        path.write_text(json.dumps({"prompts": [_prompt_data("From JSON")]}))
+        prompts = load_prompt_file(str(path))
+        assert len(prompts) == 1
+        assert prompts[0].system_prompt == "From JSON"
+
+    def test_yaml_file(self, tmp_path):
+        """Test loading a single prompt from YAML"""
+        yaml = pytest.importorskip("yaml")
+        path = tmp_path / "pests.yaml"
+        path.write_text(yaml.safe_dump(_prompt_data("From YAML")))
+        assert load_prompt_file(str(path))[0].system_prompt == "From YAML"
+
+    def test_toml_file(self, tmp_path):
+        """Test loading prompts from TOML"""
+        path = tmp_path / "pests.toml"
+        path.write_text(
+            '[[prompts]]\n'
+            'system_prompt = "From TOML"\n'
+            'user_prompt_template = "Crop: {crop}"\n'
+            '[prompts.metadata]\n'
+            'provider = "openai"\n'
+            'use_case = "pest_management"\n'
+            'description = "TOML prompt"\n'
+        )
+        assert load_prompt_file(str(path))[0].system_prompt == "From TOML"
+
+    def test_invalid_prompt(self):
+        """Test invalid definitions raise ValueError"""
+        with pytest.raises(ValueError, match="Invalid prompt #0"):
+            parse_prompt_data([{"system_prompt": "missing metadata"}])
+
+
+class TestPromptDirectory:
+    """Test cases for PromptManager directory loading"""
+
+    def test_override_and_restore(self, tmp_path):
+        """Test a file overrides a built-in prompt and deleting it restores the original"""
+        manager = PromptManager()
+        original = manager.get_prompt("openai", "pest_management")
+
+        path = tmp_path / "pests.json"
+        path.write_text(json.dumps(_prompt_data("Override")))
+        manager.load_directory(str(tmp_path))
+        assert manager.get_prompt("openai", "pest_management").system_prompt == "Override"
+
+        os.remove(path)
+        manager.load_directory(str(tmp_path))
+        assert manager.get_prompt("openai", "pest_management") is original
+
+    def test_unchanged_prompts_are_reused(self, tmp_path):
+        """Test reloading one file keeps other prompt objects intact"""
+        (tmp_path / "a.json").write_text(json.dumps(_prompt_data("A")))
+        (tmp_path / "b.json").write_text(json.dumps(_prompt_data("B", use_case="soil_analysis")))
+        manager = PromptManager(prompt_dirs=[str(tmp_path)])
+        soil = manager.get_prompt("openai", "soil_analysis")
+
+        (tmp_path / "a.json").write_text(json.dumps(_prompt_data("A2")))
+        manager._apply_file_changes({str(tmp_path / "a.json")})
+        assert manager.get_prompt("openai", "pest_management").system_prompt == "A2"
+        assert manager.get_prompt("openai", "soil_analysis") is soil
+
+    @pytest.mark.parametrize("backend", ["polling", "inotify"])
+    def test_watch_directory(self, tmp_path, backend):
+        """Test file changes are picked up in the background"""
+        manager = PromptManager()
+        try:
+            manager.watch_directory(str(tmp_path), poll_interval=0.05, backend=backend)
+        except RuntimeError:
+            pytest.skip("inotify not available")
+        try:
+            (tmp_path / "pests.json").write_text(json.dumps(_prompt_data("Watched")))
+            assert _wait_for(
+                lambda: manager.get_prompt("openai", "pest_management").system_prompt == "Watched"
+            )
+
+            # An invalid edit keeps the last good prompt
+            (tmp_path / "pests.json").write_text("{not json")
+            time.sleep(0.3)
+            assert manager.get_prompt("openai", "pest_management").system_prompt == "Watched"
+        finally:
+            manager.stop_watching()
+
+    @pytest.mark.parametrize("backend", ["polling", "inotify"])
+    def test_prepared_watcher_reports_earlier_changes(self, tmp_path, backend):
+        """Test edits between prepare() and start() are reported once started"""
+        changes = []
+        try:
+            watcher = DirectoryWatcher(
+                str(tmp_path), changes.append, poll_interval=0.05, backend=backend
+            ).prepare()
+        except RuntimeError:
+            pytest.skip("inotify not available")
+        path = tmp_path / "pests.json"
+        path.write_text(json.dumps(_prompt_data("Early")))
+        with watcher:
+            assert _wait_for(lambda: any(str(path) in changed for changed in changes))
+
+    def test_loaded_prompts_are_warmed(self, tmp_path):
+        """Test file prompts have their per-prompt caches built before publishing"""
+        data = _prompt_data("Warm")
+        data["examples"] = [{"input": "Aphids on okra", "output": "Spray neem oil"}]
+        (tmp_path / "pests.json").write_text(json.dumps(data))
+        manager = PromptManager(prompt_dirs=[str(tmp_path)])
+        private = manager.get_prompt("openai", "pest_management").__pydantic_private__
+        assert private.get("_example_index") is not None
+
+    def test_watcher_rejects_unknown_backend(self, tmp_path):
+        """Test invalid watcher backend names"""
+        with pytest.raises(ValueError, match="Watcher backend 'magic' not supported"):
+            DirectoryWatcher(str(tmp_path), lambda changed: None, backend="magic")
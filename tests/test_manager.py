@@ -209,8 +209,9 @@ class TestProviderSpecificPrompts:
         assert "ROLE:" in prompt.system_prompt
         assert "INSTRUCTIONS:" in prompt.system_prompt or "EXAMPLE" in prompt.system_prompt
         
-        # Should be example-driven
-        assert "EXAMPLE" in prompt.system_prompt
+        # Should be example-driven; worked examples are selected at render time
+        assert prompt.examples
+        assert "EXAMPLE" not in prompt.system_prompt
 
 
 class TestUseCaseCoverage:
@@ -254,6 +255,69 @@ class TestUseCaseCoverage:
             # Should have at least 5 crop advisory prompts
             assert len(prompts) >= 5, f"{provider} missing use cases"
 
+    def test_coverage_matrix(self):
+        """Test the coverage matrix marks every built-in combination available"""
+        matrix = self.manager.get_coverage_matrix()
+        assert set(matrix) == {"crop_advisory", "prompt_evals"}
+        assert len(matrix["crop_advisory"]) == 5 and len(matrix["prompt_evals"]) == 7
+        for use_cases in matrix.values():
+            for providers in use_cases.values():
+                assert providers == {"openai": True, "llama": True, "gemma": True}
+
+
+class TestProviderFallback:
+    """Test provider fallback through the coverage matrix"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        # Drop Gemma's market insights prompt to simulate a coverage gap
+        self.manager.publish(self.manager.catalog.without([("gemma", "crop_advisory", "market_insights")]))
+
+    def test_first_available_preference(self):
+        """Test the first preferred provider with the use case wins"""
+        prompt = self.manager.get_prompt_with_fallback(["gemma", "llama"], "market_insights")
+        assert prompt is self.manager.get_prompt("llama", "market_insights")
+        prompt = self.manager.get_prompt_with_fallback(("gemma", "llama"), "soil_analysis")
+        assert prompt.metadata.provider == Provider.GEMMA
+
+    def test_enums_and_empty_preferences(self):
+        """Test enum preferences and an empty list falling back to provider order"""
+        prompt = self.manager.get_prompt_with_fallback(
+            (Provider.GEMMA, Provider.OPENAI), UseCase.MARKET_INSIGHTS, Domain.CROP_ADVISORY
+        )
+        assert prompt.metadata.provider == Provider.OPENAI
+        prompt = self.manager.get_prompt_with_fallback([], "fact_recall", "prompt_evals")
+        assert prompt.metadata.provider == Provider.OPENAI
+
+    def test_fallback_providers(self):
+        """Test available providers are listed in fallback order"""
+        assert self.manager.get_fallback_providers("market_insights") == ["openai", "llama"]
+        assert self.manager.get_fallback_providers("fact_recall", "prompt_evals") == ["openai", "llama", "gemma"]
+        assert self.manager.get_fallback_providers("nonexistent") == []
+        assert self.manager.get_coverage_matrix()["crop_advisory"]["market_insights"]["gemma"] is False
+
+    def test_no_provider_available(self):
+        """Test errors name the available providers or use cases"""
+        with pytest.raises(ValueError, match="Available providers: openai, llama"):
+            self.manager.get_prompt_with_fallback(["gemma"], "market_insights")
+        with pytest.raises(ValueError, match="Use case 'nonexistent' not found in domain 'crop_advisory'"):
+            self.manager.get_prompt_with_fallback(["openai"], "nonexistent")
+
+    def test_follows_catalog_updates(self):
+        """Test resolutions are rebuilt when a new snapshot is published"""
+        assert self.manager.get_prompt_with_fallback(("gemma", "llama"), "market_insights").metadata.provider == Provider.LLAMA
+        self.manager.publish(PromptManager().catalog)
+        assert self.manager.get_prompt_with_fallback(("gemma", "llama"), "market_insights").metadata.provider == Provider.GEMMA
+
+    def test_variant(self):
+        """Test a compressed variant of the resolved prompt can be requested"""
+        full = self.manager.get_prompt_with_fallback(["llama"], "specificity_evaluation", "prompt_evals")
+        minimal = self.manager.get_prompt_with_fallback(
+            ["llama"], "specificity_evaluation", "prompt_evals", variant="minimal"
+        )
+        assert len(minimal.system_prompt) < len(full.system_prompt)
+
 
 class TestDomainSupport:
     """Test domain functionality"""
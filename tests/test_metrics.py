@@ -0,0 +1,111 @@
+"""
+Tests for the Prometheus metrics exporter
+"""
+
+import re
+import urllib.request
+
+import pytest
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts import instrumentation
+from farmerchat_prompts.instrumentation import add_hook
+from farmerchat_prompts.metrics import CONTENT_TYPE, Histogram, PrometheusMetrics
+
+
+@pytest.fixture(autouse=True)
+def no_hooks():
+    """Leave no hooks registered after a test"""
+    yield
+    instrumentation.clear_hooks()
+
+
+def sample(text: str, name: str, **labels) -> float:
+    """Value of the first sample with this name and these labels"""
+    for line in text.splitlines():
+        if line.startswith(name + "{") and all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"No sample {name} {labels}")
+
+
+class TestHistogram:
+    """Test cases for histogram buckets"""
+
+    def test_cumulative_buckets(self):
+        """Test le buckets are cumulative and +Inf holds every observation"""
+        histogram = Histogram((1, 10))
+        for value in (0.5, 1, 5, 50):
+            histogram.observe(value)
+        assert histogram.cumulative() == [2, 3, 4]
+        assert histogram.sum == 56.5 and histogram.count == 4
+
+
+class TestPrometheusMetrics:
+    """Test cases for the exposition output"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.metrics = add_hook(PrometheusMetrics())
+        prompt = self.manager.get_prompt("openai", "fact_recall", "prompt_evals")
+        for _ in range(3):
+            prompt.format(category="fertilizer", gold_fact="Urea", pred_facts="[]")
+        prompt.get_full_prompt("Apply urea at tillering")
+
+    def test_request_counts(self):
+        """Test requests are counted per operation and prompt"""
+        text = self.metrics.render()
+        assert "# TYPE farmerchat_prompt_requests_total counter" in text
+        assert sample(
+            text, "farmerchat_prompt_requests_total",
+            operation="format", provider="openai", domain="prompt_evals", use_case="fact_recall",
+        ) == 3
+        assert sample(text, "farmerchat_prompt_requests_total", operation="get_prompt") == 1
+
+    def test_histograms(self):
+        """Test latency and token histograms end in a +Inf bucket equal to the count"""
+        text = self.metrics.render()
+        for name in ("farmerchat_prompt_render_seconds", "farmerchat_prompt_tokens"):
+            assert f"# TYPE {name} histogram" in text
+            total = sample(text, f"{name}_bucket", operation="format", le="+Inf")
+            assert total == sample(text, f"{name}_count", operation="format") == 3
+        assert sample(text, "farmerchat_prompt_tokens_sum", operation="get_full_prompt") > 0
+
+    def test_cache_hit_ratio(self):
+        """Test prompt cache lookups are reported with a hit ratio"""
+        text = self.metrics.render()
+        assert sample(text, "farmerchat_prompt_cache_requests_total", cache="template_fields", result="hit") >= 3
+        assert 0 < sample(text, "farmerchat_prompt_cache_hit_ratio", cache="template_fields") <= 1
+
+    def test_catalog_reloads(self):
+        """Test publishing a catalog increments the reload counter"""
+        before = instrumentation.reload_counts().get("publish", 0)
+        self.manager.publish(self.manager.catalog)
+        after = sample(self.metrics.render(), "farmerchat_prompt_catalog_reloads_total", source="publish")
+        assert after == before + 1
+
+    def test_exposition_syntax(self):
+        """Test every sample line is a metric name, labels and a number"""
+        pattern = re.compile(r'^farmerchat_prompt_\w+\{(\w+="[^"]*",?)*\} [0-9.e+-]+$')
+        for line in self.metrics.render().splitlines():
+            if not line.startswith("#"):
+                assert pattern.match(line), line
+
+    def test_write_textfile(self, tmp_path):
+        """Test the textfile output matches render()"""
+        path = tmp_path / "farmerchat.prom"
+        self.metrics.write_textfile(str(path))
+        assert path.read_text().startswith("# HELP farmerchat_prompt_requests_total")
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_serve(self):
+        """Test GET /metrics returns the exposition text"""
+        server = self.metrics.serve(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                assert response.headers["Content-Type"] == CONTENT_TYPE
+                assert b"farmerchat_prompt_requests_total{" in response.read()
+        finally:
+            server.shutdown()
+            server.server_close()
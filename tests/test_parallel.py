@@ -0,0 +1,78 @@
+"""
+Tests for multi-process prompt rendering
+"""
+
+import json
+
+import pytest
+from farmerchat_prompts import PromptManager, render_parallel
+
+
+def _recall_rows(count):
+    return [
+        {
+            "category": "irrigation",
+            "gold_fact": f"Irrigate wheat {i} days after sowing",
+            "pred_facts": json.dumps([f"Water wheat at day {i}"]),
+        }
+        for i in range(count)
+    ]
+
+
+class TestRenderParallel:
+    """Test cases for render_parallel"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.prompt = self.manager.get_prompt("openai", "fact_recall", "prompt_evals")
+
+    def test_ordered_matches_serial(self):
+        """Test pooled rendering preserves input order"""
+        rows = _recall_rows(50)
+        expected = [self.prompt.format(**row) for row in rows]
+        results = list(render_parallel(self.prompt, rows, workers=2, chunksize=7))
+        assert results == expected
+
+    def test_unordered_yields_indices(self):
+        """Test unordered rendering returns every row with its index"""
+        rows = _recall_rows(30)
+        results = dict(render_parallel(self.prompt, iter(rows), workers=2, chunksize=4, ordered=False))
+        assert sorted(results) == list(range(30))
+        assert results[12] == self.prompt.format(**rows[12])
+
+    def test_json_mode_with_key(self):
+        """Test resolving a prompt key and serializing full prompts"""
+        rows = _recall_rows(3)
+        results = list(render_parallel(
+            ("openai", "fact_recall", "prompt_evals"),
+            rows,
+            workers=1,
+            mode="json",
+            manager=self.manager,
+        ))
+        payload = json.loads(results[0])
+        assert payload["messages"][1]["content"] == self.prompt.format(**rows[0])
+
+    def test_invalid_mode(self):
+        """Test unsupported render modes are rejected"""
+        with pytest.raises(ValueError, match="Render mode 'xml' not supported"):
+            render_parallel(self.prompt, [], mode="xml")
+
+    def test_concurrent_pools_keep_their_prompt(self):
+        """Test pools forked from concurrent threads each render their own prompt"""
+        from concurrent.futures import ThreadPoolExecutor
+        from farmerchat_prompts import parallel
+        rows = _recall_rows(20)
+        prompts = [self.prompt, self.manager.get_prompt("llama", "fact_recall", "prompt_evals")]
+
+        def render(prompt):
+            return list(render_parallel(
+                prompt, rows, workers=2, chunksize=3, mode="full", start_method="fork"
+            ))
+
+        with ThreadPoolExecutor(2) as threads:
+            results = list(threads.map(render, prompts * 2))
+        for prompt, rendered in zip(prompts * 2, results):
+            assert rendered == [prompt.get_full_prompt(prompt.format(**row)) for row in rows]
+        assert parallel._worker_prompt is None
@@ -0,0 +1,117 @@
+"""
+Tests for pre-tokenized prompt output
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.pretokenized import TokenizedPrompt, as_encoder
+
+
+class CountingTokenizer:
+    """Character-level tokenizer that records what it tokenizes"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, text):
+        self.calls.append(text)
+        return [ord(char) for char in text]
+
+
+class Encoding:
+    """Stand-in for a Hugging Face tokenizers Encoding"""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+
+def decode(ids):
+    return "".join(map(chr, ids.tolist()))
+
+
+class TestTokenIds:
+    """Test cases for Prompt.get_token_ids"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.tokenizer = CountingTokenizer()
+
+    @pytest.mark.parametrize("provider", ["llama", "gemma"])
+    def test_matches_full_prompt(self, provider):
+        """Test token IDs spell out the same text as get_full_prompt"""
+        prompt = self.manager.get_prompt(provider, "pest_management")
+        ids = prompt.get_token_ids("Leaves are curling", self.tokenizer)
+        assert ids.dtype == np.int32
+        assert decode(ids) == prompt.get_full_prompt("Leaves are curling")["prompt"]
+
+    def test_bos_id(self):
+        """Test bos_id starts the IDs and is cached separately"""
+        prompt = self.manager.get_prompt("llama", "pest_management")
+        plain = prompt.get_token_ids("hi", self.tokenizer)
+        with_bos = prompt.get_token_ids("hi", self.tokenizer, bos_id=1)
+        assert with_bos[0] == 1 and with_bos[1:].tolist() == plain.tolist()
+
+    def test_prefix_tokenized_once(self):
+        """Test repeated calls only tokenize the user input"""
+        prompt = self.manager.get_prompt("llama", "soil_analysis")
+        prompt.get_token_ids("first", self.tokenizer)
+        self.tokenizer.calls.clear()
+        prompt.get_token_ids("second", self.tokenizer)
+        prompt.get_token_ids("third", self.tokenizer)
+        assert self.tokenizer.calls == ["second", "third"]
+
+    def test_formatter_override(self):
+        """Test token IDs follow an explicit formatter"""
+        prompt = self.manager.get_prompt("llama", "pest_management")
+        ids = prompt.get_token_ids("hi", self.tokenizer, formatter="chatml")
+        assert decode(ids) == prompt.get_full_prompt("hi", formatter="chatml")["prompt"]
+
+    def test_system_prompt_change_invalidates(self):
+        """Test a replaced system prompt is tokenized again"""
+        prompt = self.manager.get_prompt("gemma", "pest_management").model_copy()
+        prompt.get_token_ids("hi", self.tokenizer)
+        prompt.system_prompt = "Short instructions."
+        assert "Short instructions." in decode(prompt.get_token_ids("hi", self.tokenizer))
+
+    def test_copies_keep_separate_caches(self):
+        """Test a compressed variant does not reuse the original's prefix"""
+        original = self.manager.get_prompt("llama", "weather_advisory")
+        compact = self.manager.get_prompt("llama", "weather_advisory", variant="compact")
+        original.get_token_ids("rain", self.tokenizer)
+        compact_ids = compact.get_token_ids("rain", self.tokenizer)
+        assert decode(compact_ids) == compact.get_full_prompt("rain")["prompt"]
+        assert decode(original.get_token_ids("rain", self.tokenizer)) == (
+            original.get_full_prompt("rain")["prompt"]
+        )
+
+    def test_message_formatter_rejected(self):
+        """Test chat-message formats cannot be tokenized"""
+        prompt = self.manager.get_prompt("openai", "pest_management")
+        with pytest.raises(ValueError, match="Formatter 'openai' does not produce a text prompt"):
+            prompt.get_token_ids("hi", self.tokenizer)
+
+
+class TestTokenizedPrompt:
+    """Test cases for tokenizer adapters and batches"""
+
+    def test_encoding_objects(self):
+        """Test encode() results with .ids are unwrapped"""
+        encode = as_encoder(type("HF", (), {"encode": lambda self, text: Encoding([1, 2])})())
+        assert encode("x") == [1, 2]
+
+    def test_plain_callable(self):
+        """Test plain callables are used as is"""
+        prompt = PromptManager().get_prompt("gemma", "market_insights")
+        tokenized = TokenizedPrompt(prompt, lambda text: [len(text)])
+        batch = tokenized.encode_batch(["a", "bb"])
+        assert [array.tolist()[1] for array in batch] == [1, 2]
+        assert tokenized.static_tokens == 2
+
+    def test_invalid_tokenizer(self):
+        """Test objects without encode() are rejected"""
+        with pytest.raises(TypeError):
+            as_encoder(42)
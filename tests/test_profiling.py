@@ -0,0 +1,87 @@
+"""
+Tests for the sampling render profiler
+"""
+
+import re
+import sys
+
+import pytest
+
+from farmerchat_prompts import Prompt, PromptManager
+from farmerchat_prompts.profiling import RenderProfiler
+
+FORMAT = Prompt.format
+
+
+class TestRenderProfiler:
+    """Test cases for sampled stacks"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    def teardown_method(self):
+        """Always restore the unwrapped methods"""
+        self.manager.disable_profiling()
+
+    def render(self):
+        prompt = self.manager.get_prompt("openai", "fact_recall", "prompt_evals")
+        prompt.format(category="fertilizer", gold_fact="Urea", pred_facts="[]")
+        prompt.get_full_prompt("Apply urea at tillering")
+
+    def test_stacks_per_prompt_key(self):
+        """Test every sampled call is recorded under its prompt key"""
+        profiler = self.manager.enable_profiling(sample_rate=1.0)
+        self.render()
+        assert profiler.samples == 3
+        assert profiler.keys() == ["openai/prompt_evals/fact_recall"]
+        lines = profiler.collapsed()
+        assert any(";models:Prompt.format;templates:TemplateFields.render" in line for line in lines)
+        assert any(line.startswith("openai/prompt_evals/fact_recall;manager:PromptManager.get_prompt") for line in lines)
+        for line in lines:
+            assert re.match(r"^[^ ;]+(;[^ ;]+)+ \d+$", line), line
+
+    def test_zero_rate_records_nothing(self):
+        """Test unsampled calls run the original method only"""
+        profiler = self.manager.enable_profiling(sample_rate=0.0)
+        self.render()
+        assert profiler.samples == 0 and profiler.collapsed() == []
+
+    def test_disable_restores_methods(self):
+        """Test disabling unwraps Prompt and manager methods"""
+        self.manager.enable_profiling(sample_rate=1.0)
+        assert Prompt.format is not FORMAT
+        profiler = self.manager.disable_profiling()
+        assert Prompt.format is FORMAT
+        assert "get_prompt" not in vars(self.manager)
+        self.render()
+        assert profiler.samples == 0
+
+    def test_single_profiler(self):
+        """Test a second profiler can't be installed alongside the first"""
+        self.manager.enable_profiling()
+        with pytest.raises(RuntimeError, match="already installed"):
+            PromptManager().enable_profiling()
+
+    def test_invalid_rate(self):
+        """Test sample rates outside [0, 1] are rejected"""
+        with pytest.raises(ValueError, match="between 0 and 1"):
+            RenderProfiler(sample_rate=2)
+
+    def test_existing_profiler_left_alone(self):
+        """Test calls under another sys.setprofile tracer are not sampled"""
+        profiler = self.manager.enable_profiling(sample_rate=1.0)
+        sys.setprofile(lambda frame, event, arg: None)
+        try:
+            self.render()
+        finally:
+            sys.setprofile(None)
+        assert profiler.samples == 0
+
+    def test_dump(self, tmp_path):
+        """Test dump writes one collapsed stack per line"""
+        profiler = self.manager.enable_profiling(sample_rate=1.0)
+        self.render()
+        path = tmp_path / "render.folded"
+        profiler.dump(str(path), key="openai/prompt_evals/fact_recall")
+        assert path.read_text().splitlines() == profiler.collapsed()
@@ -0,0 +1,86 @@
+"""
+Tests for offline query routing
+"""
+
+import pytest
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.router import PromptRouter, query_features
+
+
+class TestPromptRouter:
+    """Test cases for classifying farmer queries"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    @pytest.mark.parametrize("query,use_case", [
+        ("My paddy has stem borer, what should I spray?", "pest_management"),
+        ("leaf curl in tomato", "pest_management"),
+        ("What is the mandi price of onion in Patna?", "market_insights"),
+        ("Soil pH is 5.2 and low potash", "soil_analysis"),
+        ("Will frost damage my mustard", "weather_advisory"),
+        ("Which crop is best for sandy soil in kharif?", "crop_recommendation"),
+    ])
+    def test_classify(self, query, use_case):
+        """Test typical farmer queries reach the right use case"""
+        assert self.manager.classify_query(query).use_case == use_case
+
+    def test_no_match(self):
+        """Test a query without known words has no use case"""
+        result = self.manager.classify_query("hello")
+        assert result.use_case is None
+        assert set(result.scores) == {
+            "crop_recommendation", "pest_management", "soil_analysis",
+            "weather_advisory", "market_insights",
+        }
+
+    def test_question_words_ignored(self):
+        """Test question words do not become features"""
+        assert query_features("what should I spray") == ["spray"]
+
+    def test_custom_examples(self):
+        """Test routing phrases can be supplied per use case"""
+        router = PromptRouter(
+            self.manager.catalog,
+            examples={"market_insights": ["arhtiya commission"]},
+        )
+        assert router.classify("arhtiya commission").use_case == "market_insights"
+
+
+class TestRoute:
+    """Test cases for PromptManager.route"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    def test_route_returns_provider_prompt(self):
+        """Test route returns the routed prompt of the requested provider"""
+        prompt = self.manager.route("mandi rate for onion today", provider="llama")
+        assert prompt.metadata.provider.value == "llama"
+        assert prompt.metadata.use_case.value == "market_insights"
+
+    def test_route_default(self):
+        """Test unmatched queries use the default use case or raise"""
+        prompt = self.manager.route("hello", default_use_case="crop_recommendation")
+        assert prompt.metadata.use_case.value == "crop_recommendation"
+        with pytest.raises(ValueError, match="Could not route"):
+            self.manager.route("hello")
+
+    def test_router_rebuilt_per_snapshot(self):
+        """Test the router is cached per catalog snapshot"""
+        def unexpected(catalog):
+            raise AssertionError("router rebuilt for an unchanged snapshot")
+
+        self.manager.classify_query("aphids")
+        catalog = self.manager.catalog
+        router = catalog.derived("router:crop_advisory", unexpected)
+        self.manager.classify_query("mandi price")
+        assert catalog.derived("router:crop_advisory", unexpected) is router
+
+        self.manager.publish(catalog.with_prompts([]))
+        self.manager.classify_query("aphids")
+        rebuilt = self.manager.catalog.derived("router:crop_advisory", unexpected)
+        assert isinstance(rebuilt, PromptRouter) and rebuilt is not router
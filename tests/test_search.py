@@ -0,0 +1,72 @@
+"""
+Tests for the full-text prompt search index
+"""
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.search import SearchIndex, stem, tokenize
+
+
+class TestTokenizer:
+    """Test cases for tokenization and stemming"""
+
+    def test_stemming(self):
+        """Test plural and inflected agricultural terms share stems"""
+        assert stem("pests") == stem("pest")
+        assert stem("leaves") == "leaf"
+        assert stem("fertilisers") == stem("fertilizer")
+        assert stem("sprayed") == stem("spraying") == "spray"
+        assert stem("spring") == "spring"
+
+    def test_tokenize_offsets(self):
+        """Test offsets point into the original text and stop words are dropped"""
+        text = "Control of Pest-Infested Crops"
+        tokens = tokenize(text)
+        assert [term for term, _, _ in tokens] == ["control", "pest", "infest", "crop"]
+        _, start, end = tokens[1]
+        assert text[start:end] == "Pest"
+
+
+class TestSearchIndex:
+    """Test cases for ranked search"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+
+    def test_ranked_results_with_highlights(self):
+        """Test results are ranked and highlight matched text"""
+        results = self.manager.search("integrated pest management")
+        assert results[0].prompt.metadata.use_case.value == "pest_management"
+        assert [r.score for r in results] == sorted((r.score for r in results), reverse=True)
+
+        prompt = results[0].prompt
+        for field, offsets in results[0].highlights.items():
+            text = prompt.system_prompt if field == "system_prompt" else None
+            if text is not None:
+                start, end = offsets[0]
+                assert text[start:end].lower() in {"integrated", "pest", "pests", "management"}
+
+    def test_searches_system_prompt_and_template(self):
+        """Test terms that only appear in prompt text are found"""
+        results = self.manager.search("feasibility", provider="llama", domain="crop_advisory")
+        assert results
+        assert all("system_prompt" in r.highlights for r in results)
+
+        results = self.manager.search("storage_available")
+        assert any("user_prompt_template" in r.highlights for r in results)
+
+    def test_index_rebuilt_after_registration(self):
+        """Test a new catalog snapshot gets a fresh index"""
+        before = self.manager.catalog.derived("search_index", SearchIndex)
+        prompt = self.manager.get_prompt("openai", "soil_analysis")
+        custom = prompt.model_copy(update={"system_prompt": "Vermicompost specialist"})
+        self.manager.register_prompts([custom])
+
+        assert self.manager.search_prompts("vermicompost") == [custom]
+        assert self.manager.catalog.derived("search_index", SearchIndex) is not before
+
+    def test_limit_and_no_match(self):
+        """Test result limits and empty queries"""
+        assert len(self.manager.search("soil", limit=2)) == 2
+        assert self.manager.search("nonexistent") == []
+        assert self.manager.search("") == []
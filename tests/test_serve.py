@@ -0,0 +1,151 @@
+"""
+Tests for the HTTP prompt server
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.serve import PromptServer, main
+
+
+class TestRoutes:
+    """Test cases for request routing, without sockets"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.server = PromptServer(PromptManager())
+
+    def get(self, target, **headers):
+        return self.server.handle("GET", target, headers)
+
+    def post(self, target, payload):
+        return self.server.handle("POST", target, {}, json.dumps(payload).encode())
+
+    def test_get_prompt(self):
+        """Test a prompt is served as JSON with its fingerprint"""
+        response = self.get("/prompts/openai/crop_advisory/pest_management")
+        assert response.status == 200
+        payload = json.loads(response.body)
+        prompt = self.server.manager.get_prompt("openai", "pest_management")
+        assert payload["fingerprint"] == prompt.fingerprint
+        assert payload["system_prompt"] == prompt.system_prompt
+        assert ("ETag", f'W/"{prompt.fingerprint}-1.0.0"') in response.headers
+
+    def test_body_cached_per_snapshot(self):
+        """Test repeated lookups share one serialized body until the catalog changes"""
+        first = self.get("/prompts/gemma/crop_advisory/soil_analysis")
+        assert self.get("/prompts/gemma/crop_advisory/soil_analysis").body is first.body
+        self.server.manager.publish(self.server.manager.catalog.with_prompts([]))
+        assert self.get("/prompts/gemma/crop_advisory/soil_analysis").body is not first.body
+
+    def test_if_none_match(self):
+        """Test a matching ETag returns 304 without a body"""
+        etag = dict(self.get("/prompts/llama/crop_advisory/market_insights").headers)["ETag"]
+        response = self.get("/prompts/llama/crop_advisory/market_insights", **{"if-none-match": etag})
+        assert response.status == 304 and response.body == b""
+
+    def test_variant_query(self):
+        """Test query parameters select a compressed variant"""
+        full = json.loads(self.get("/prompts/llama/prompt_evals/specificity_evaluation").body)
+        minimal = json.loads(self.get("/prompts/llama/prompt_evals/specificity_evaluation?variant=minimal").body)
+        assert len(minimal["system_prompt"]) < len(full["system_prompt"])
+        assert self.get("/prompts/llama/prompt_evals/specificity_evaluation?variant=tiny").status == 404
+
+    def test_index(self):
+        """Test the index lists every prompt key with its versions"""
+        payload = json.loads(self.get("/prompts").body)
+        assert len(payload["prompts"]) == len(self.server.manager.catalog.entries)
+        assert payload["prompts"][0]["versions"] == ["1.0.0"]
+
+    def test_render(self):
+        """Test variables render a user prompt and wrap it as the full prompt"""
+        response = self.post("/render", {
+            "provider": "openai",
+            "use_case": "fact_recall",
+            "domain": "prompt_evals",
+            "variables": {"category": "fertilizer", "gold_fact": "Urea", "pred_facts": "[]"},
+        })
+        result = json.loads(response.body)
+        assert response.status == 200
+        assert result["full_prompt"]["messages"][1]["content"] == result["user_prompt"]
+
+    def test_render_errors(self):
+        """Test missing fields and variables are reported as 400"""
+        assert self.post("/render", {"use_case": "pest_management"}).status == 400
+        response = self.post("/render", {
+            "provider": "openai", "use_case": "crop_recommendation", "variables": {},
+        })
+        assert response.status == 400
+        assert json.loads(response.body)["error"].startswith("Missing required template variables")
+        assert self.server.handle("POST", "/render", {}, b"{").status == 400
+
+    def test_batch(self):
+        """Test batch rendering reports errors per request"""
+        response = self.post("/render/batch", {"requests": [
+            {"provider": "gemma", "use_case": "weather_advisory", "user_input": "Hailstorm"},
+            {"provider": "gemma", "use_case": "unknown"},
+        ]})
+        first, second = json.loads(response.body)["results"]
+        assert first["full_prompt"]["prompt"].endswith("Hailstorm<end_of_turn>\n<start_of_turn>model\n")
+        assert "not found" in second["error"]
+
+    def test_batch_unexpected_row_error(self):
+        """Test an unexpected error in one row fails only that row"""
+        good = {"provider": "gemma", "use_case": "weather_advisory", "user_input": "Hailstorm"}
+        bad = {
+            "provider": "openai", "use_case": "fact_recall", "domain": "prompt_evals",
+            "variables": {"category": "pest", "gold_fact": "g", "pred_facts": "p"},
+            "token_budget": 10, "truncation": "x",
+        }
+        response = self.post("/render/batch", {"requests": [good, bad, good]})
+        assert response.status == 200
+        first, second, third = json.loads(response.body)["results"]
+        assert second == {"error": "Internal server error"}
+        assert first == third and "full_prompt" in first
+
+    def test_not_found_and_methods(self):
+        """Test unknown paths and methods"""
+        assert self.get("/nowhere").status == 404
+        assert self.server.handle("DELETE", "/prompts", {}).status == 405
+        assert self.get("/render").status == 405
+
+
+class TestConnection:
+    """Test cases over a real socket"""
+
+    def test_keep_alive_and_gzip(self):
+        """Test two requests on one connection, the first gzipped"""
+
+        async def scenario():
+            server = PromptServer(PromptManager(), port=0)
+            await server.start()
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            responses = []
+            for headers in ("Accept-Encoding: gzip\r\n", "Connection: close\r\n"):
+                writer.write(
+                    f"GET /prompts/openai/crop_advisory/soil_analysis HTTP/1.1\r\n"
+                    f"Host: localhost\r\n{headers}\r\n".encode()
+                )
+                head = (await reader.readuntil(b"\r\n\r\n")).decode()
+                length = int(head.split("Content-Length: ")[1].split("\r\n")[0])
+                responses.append((head, await reader.readexactly(length)))
+            writer.close()
+            await server.close()
+            return responses
+
+        (gzip_head, gzip_body), (plain_head, plain_body) = asyncio.run(scenario())
+        assert gzip_head.startswith("HTTP/1.1 200 OK")
+        assert "Content-Encoding: gzip" in gzip_head and "Connection: keep-alive" in gzip_head
+        assert gzip.decompress(gzip_body) == plain_body
+        assert "Connection: close" in plain_head
+
+    def test_main_help(self, capsys):
+        """Test the module entry point parses its options"""
+        with pytest.raises(SystemExit) as exit:
+            main(["--help"])
+        assert exit.value.code == 0
+        assert "--prompt-dir" in capsys.readouterr().out
@@ -0,0 +1,213 @@
+"""
+Tests for the Unix-socket render sidecar
+"""
+
+import asyncio
+import os
+import socket
+import struct
+import tempfile
+import threading
+
+import pytest
+
+pytest.importorskip("msgpack")
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.sidecar import SidecarClient, SidecarServer, load_test, main
+
+KEY = ["openai", "fact_recall", "prompt_evals"]
+ROW = {"category": "pest", "gold_fact": "Neem oil controls aphids", "pred_facts": "Use neem oil"}
+
+
+class TestHandle:
+    """Test cases for request handling, without sockets"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.server = SidecarServer(self.manager, chunk_size=2)
+
+    def test_render_chunks(self):
+        """Test rows are rendered in chunks, the last one marked done"""
+        frames = list(self.server.handle({"id": 7, "op": "render", "key": KEY, "rows": [ROW] * 5}))
+        assert [frame["offset"] for frame in frames] == [0, 2, 4]
+        assert [frame["done"] for frame in frames] == [False, False, True]
+        expected = self.manager.get_prompt(*KEY).format(**ROW)
+        assert all(frame["id"] == 7 for frame in frames)
+        assert [text for frame in frames for text in frame["results"]] == [expected] * 5
+
+    def test_row_errors(self):
+        """Test a failing row is reported by index without failing the batch"""
+        (frame,) = self.server.handle({"id": 1, "op": "render", "key": KEY, "rows": [ROW, {}]})
+        assert frame["results"][0] and frame["results"][1] is None
+        assert frame["errors"][0][0] == 1
+        assert "Missing required template variables" in frame["errors"][0][1]
+
+    def test_unexpected_row_errors(self):
+        """Test a row failing with an unexpected exception is reported, not raised"""
+        bad = dict(ROW, token_budget=10, truncation="x")
+        (frame,) = self.server.handle({"id": 1, "op": "render", "key": KEY, "rows": [bad, ROW]})
+        assert frame["done"] and frame["results"][0] is None and frame["results"][1]
+        assert frame["errors"] == [(0, "Internal server error")]
+
+    def test_request_errors(self):
+        """Test invalid requests return a single error frame"""
+        cases = [
+            {"id": 1, "op": "render", "key": KEY, "rows": [ROW], "mode": "xml"},
+            {"id": 1, "op": "render", "key": ["openai", "nonexistent"], "rows": [ROW]},
+            {"id": 1, "op": "render", "key": "openai", "rows": [ROW]},
+            {"id": 1, "op": "render", "key": KEY, "rows": "abc"},
+            {"id": 1, "op": "delete"},
+        ]
+        for request in cases:
+            (frame,) = self.server.handle(request)
+            assert frame["done"] and frame["error"]
+
+    def test_empty_batch(self):
+        """Test an empty batch still completes with one frame"""
+        (frame,) = self.server.handle({"id": 1, "op": "render", "key": KEY, "rows": []})
+        assert frame["done"] and frame["results"] == []
+
+    def test_get(self):
+        """Test get returns the prompt payload with its template fields"""
+        (frame,) = self.server.handle({"id": 1, "op": "get", "key": KEY})
+        assert frame["prompt"]["fingerprint"] == self.manager.get_prompt(*KEY).fingerprint
+        assert sorted(frame["prompt"]["fields"]) == sorted(ROW)
+
+    def test_disconnect_with_full_queue(self):
+        """Test a client that pipelines past max_pending and disconnects doesn't hang its handler"""
+        import msgpack
+
+        class BrokenWriter:
+            closed = False
+
+            def write(self, data):
+                pass
+
+            async def drain(self):
+                raise ConnectionResetError
+
+            def close(self):
+                self.closed = True
+
+        async def run():
+            reader = asyncio.StreamReader()
+            for request_id in range(6):
+                body = msgpack.packb({"id": request_id, "op": "ping"})
+                reader.feed_data(struct.pack(">I", len(body)) + body)
+            reader.feed_eof()
+            writer = BrokenWriter()
+            await asyncio.wait_for(server._handle_connection(reader, writer), 5)
+            return writer
+
+        server = SidecarServer(self.manager, max_pending=1)
+        assert asyncio.run(run()).closed
+
+
+class TestSocket:
+    """Test cases for the server and client over a real socket"""
+
+    def setup_method(self):
+        """Start a sidecar on a background event loop"""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "sidecar.sock")
+        self.manager = PromptManager()
+        self.server = SidecarServer(self.manager, self.path, chunk_size=3, max_pending=2)
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.server.start())
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def teardown_method(self):
+        """Stop the sidecar"""
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+        os.rmdir(self.directory)
+
+    def test_render(self):
+        """Test a client render matches a local render"""
+        with SidecarClient(self.path) as client:
+            results = client.render(KEY, [ROW] * 10, mode="full")
+        prompt = self.manager.get_prompt(*KEY)
+        assert results == [prompt.get_full_prompt(prompt.format(**ROW))] * 10
+
+    def test_render_raises(self):
+        """Test row and request errors are raised by the client"""
+        with SidecarClient(self.path) as client:
+            with pytest.raises(ValueError, match="Row 0"):
+                client.render(KEY, [{}])
+            with pytest.raises(ValueError, match="not supported"):
+                client.render(KEY, [ROW], mode="xml")
+            assert client.render(KEY, [ROW]) == [self.manager.get_prompt(*KEY).format(**ROW)]
+
+    def test_unexpected_errors_keep_connection(self):
+        """Test an unexpected render error is answered and the connection stays usable"""
+        bad = dict(ROW, token_budget=10, truncation="x")
+        with SidecarClient(self.path, timeout=5) as client:
+            with pytest.raises(ValueError, match="Internal server error"):
+                client.render(KEY, [bad])
+            assert client.render(KEY, [ROW]) == [self.manager.get_prompt(*KEY).format(**ROW)]
+
+    def test_pipelining(self):
+        """Test pipelined requests beyond max_pending are answered in order"""
+        with SidecarClient(self.path) as client:
+            ids = [client.send({"op": "render", "key": KEY, "rows": [ROW] * 4}) for _ in range(10)]
+            done = []
+            while len(done) < len(ids):
+                frame = client.receive()
+                if frame["done"]:
+                    done.append(frame["id"])
+        assert done == ids
+
+    def test_load_test(self):
+        """Test the load test reports completed requests and latencies"""
+        stats = load_test(self.path, KEY, batch_size=8, depth=2, duration=0.05)
+        assert stats["requests"] >= 2
+        assert stats["rows"] == stats["requests"] * 8
+        assert stats["p99_ms"] >= stats["p50_ms"] > 0
+
+
+def test_start_refuses_non_socket():
+    """Test start won't delete a regular file at the socket path"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "notes.txt")
+        with open(path, "w") as handle:
+            handle.write("keep me")
+        with pytest.raises(ValueError, match="not a socket"):
+            asyncio.run(SidecarServer(PromptManager(), path).start())
+        with open(path) as handle:
+            assert handle.read() == "keep me"
+
+
+def test_client_short_frame():
+    """Test a frame cut off mid-body raises instead of returning partial data"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sidecar.sock")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen(1)
+
+        def serve():
+            connection, _ = listener.accept()
+            connection.sendall(struct.pack(">I", 100) + b"\x81" * 10)
+            connection.close()
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        try:
+            with SidecarClient(path, timeout=5) as client:
+                with pytest.raises(ConnectionError, match="closed"):
+                    client.receive()
+        finally:
+            thread.join(5)
+            listener.close()
+
+
+def test_main_help(capsys):
+    """Test the command line parses its subcommands"""
+    with pytest.raises(SystemExit):
+        main(["bench", "--help"])
+    assert "--depth" in capsys.readouterr().out
@@ -0,0 +1,202 @@
+"""
+Tests for template variable introspection and validation
+"""
+
+import pytest
+
+from farmerchat_prompts import PromptManager, TemplateVariableError
+from farmerchat_prompts.models import Prompt, PromptMetadata, Provider, TemplateEngine, UseCase
+from farmerchat_prompts.templates import (
+    TemplateFields, check_json_examples, check_template_fields, to_format_syntax,
+)
+
+
+def make_prompt(template, variables, defaults=None):
+    return Prompt(
+        metadata=PromptMetadata(
+            provider=Provider.OPENAI,
+            use_case=UseCase.CROP_RECOMMENDATION,
+            description="Test prompt",
+        ),
+        system_prompt="System",
+        user_prompt_template=template,
+        variables=variables,
+        defaults=defaults or {},
+    )
+
+
+class TestTemplateFields:
+    """Test cases for parsed template field sets"""
+
+    def test_required_and_optional(self):
+        """Test variables described as optional form the optional set"""
+        fields = TemplateFields(
+            "{question} {context} {question}",
+            {"question": "The question", "context": "Optional: extra context"},
+        )
+        assert fields.fields == ("question", "context")
+        assert fields.required == {"question"}
+        assert fields.optional == {"context"}
+
+    def test_drift(self):
+        """Test undocumented placeholders and unused variables are found"""
+        fields = TemplateFields("{a} {b}", {"a": "A", "c": "C"})
+        assert fields.undocumented == ("b",)
+        assert fields.unused == ("c",)
+
+    def test_parsed_once(self):
+        """Test the prompt caches its fields until the template changes"""
+        prompt = make_prompt("{a}", {"a": "A"})
+        assert prompt.template_fields is prompt.template_fields
+        prompt.user_prompt_template = "{b}"
+        assert prompt.template_fields.fields == ("b",)
+
+
+class TestFormatValidation:
+    """Test cases for render-time variable validation"""
+
+    def test_missing_variables(self):
+        """Test missing required variables raise a descriptive error"""
+        prompt = make_prompt("{a} {b} {c}", {"a": "A", "b": "B", "c": "Optional: C"})
+        with pytest.raises(TemplateVariableError) as info:
+            prompt.format(b="x")
+        assert info.value.missing == ("a",)
+        assert "required template variables" in str(info.value)
+
+    def test_error_is_key_and_value_error(self):
+        """Test the error stays catchable as KeyError and ValueError"""
+        prompt = make_prompt("{a}", {"a": "A"})
+        with pytest.raises(KeyError):
+            prompt.format()
+        with pytest.raises(ValueError):
+            prompt.format()
+
+    def test_extra_variables_ignored(self):
+        """Test extra keyword arguments are still accepted"""
+        prompt = make_prompt("{a}", {"a": "A"})
+        assert prompt.format(a="x", unused="y") == "x"
+
+
+class TestDefaultsAndSections:
+    """Test cases for optional variables, defaults and optional sections"""
+
+    def test_defaults(self):
+        """Test declared defaults make variables optional and fill them in"""
+        prompt = make_prompt("Crop: {crop}, season {season}", {}, {"season": "kharif"})
+        assert prompt.template_fields.required == {"crop"}
+        assert prompt.format(crop="rice") == "Crop: rice, season kharif"
+        assert prompt.format(crop="rice", season="rabi") == "Crop: rice, season rabi"
+
+    def test_inline_label_dropped(self):
+        """Test an empty optional value drops its labelled line"""
+        prompt = make_prompt("Location: {location}\n\nAdditional Notes: {notes}", {}, {"notes": ""})
+        assert prompt.format(location="Patna") == "Location: Patna"
+        assert prompt.format(location="Patna", notes="  ") == "Location: Patna"
+        assert prompt.format(location="Patna", notes="sandy") == (
+            "Location: Patna\n\nAdditional Notes: sandy"
+        )
+
+    def test_header_block_dropped(self):
+        """Test a label line above a bare placeholder is dropped with it"""
+        template = "Farm Size: {size}\n\nADDITIONAL INFORMATION:\n{info}\n\nPlease advise."
+        prompt = make_prompt(template, {"info": "Optional: notes"})
+        assert prompt.template_fields.sections == ("info",)
+        assert prompt.format(size="2") == "Farm Size: 2\n\nPlease advise."
+        assert prompt.format(size="2", info="canal") == template.format(size="2", info="canal")
+
+    def test_adjacent_sections(self):
+        """Test any combination of empty adjacent sections keeps paragraph breaks"""
+        prompt = make_prompt(
+            "Fact:\n\n{fact}\n\n{context}\n\n{params}",
+            {"context": "Optional: context", "params": "Optional: params"},
+        )
+        assert prompt.format(fact="F") == "Fact:\n\nF"
+        assert prompt.format(fact="F", params="P") == "Fact:\n\nF\n\nP"
+        assert prompt.format(fact="F", context="C") == "Fact:\n\nF\n\nC"
+
+    def test_builtin_optional_variables(self):
+        """Test built-in prompts render without passing optional variables"""
+        manager = PromptManager()
+        crop = manager.get_prompt("llama", "crop_recommendation")
+        text = crop.format(**{name: "x" for name in crop.template_fields.required})
+        assert "ADDITIONAL INFORMATION" not in text
+        evals = manager.get_prompt("openai", "specificity_evaluation", "prompt_evals")
+        assert evals.format(fact_text="Apply urea").endswith("Apply urea")
+
+
+class TestCatalogReport:
+    """Test cases for the catalog-wide consistency report"""
+
+    def test_builtin_prompts_consistent(self):
+        """Test every built-in template matches its documented variables"""
+        assert PromptManager().check_templates() == []
+
+    def test_report_flags_drift(self):
+        """Test registered prompts with drifted variables are reported"""
+        manager = PromptManager()
+        prompt = make_prompt("{a} {b}", {"a": "A", "c": "C"})
+        manager.register_prompts([prompt])
+        issues = [(i.kind, i.variables) for i in manager.check_templates() if i.prompt is prompt]
+        assert issues == [("undocumented", ("b",)), ("unused", ("c",))]
+        assert check_template_fields([prompt])[0].prompt is prompt
+
+
+class TestTemplateEngine:
+    """Test cases for the brace-literal template engine"""
+
+    def test_to_format_syntax(self):
+        """Test $ placeholders become format fields and braces are escaped"""
+        assert to_format_syntax('{"crop": "${crop}", "cost": "$$5"}', "template") == (
+            '{{"crop": "{crop}", "cost": "$5"}}'
+        )
+        assert to_format_syntax("{a}") == "{a}"
+
+    def test_invalid_placeholder(self):
+        """Test invalid $ placeholders and engines are rejected"""
+        with pytest.raises(ValueError, match="line 2, column 3"):
+            to_format_syntax("ok\nA $5", "template")
+        with pytest.raises(ValueError, match="not supported"):
+            to_format_syntax("x", "jinja")
+
+    def test_render_json_literal(self):
+        """Test JSON examples render exactly as written in one pass"""
+        prompt = make_prompt('Fact: ${fact}\nReturn {"match": null}\n\nNotes: ${notes}', {}, {"notes": ""})
+        prompt.template_engine = TemplateEngine.TEMPLATE
+        assert prompt.template_fields.fields == ("fact", "notes")
+        assert prompt.format(fact="Sow in Nov") == 'Fact: Sow in Nov\nReturn {"match": null}'
+
+    def test_builtin_json_schemas_single_braces(self):
+        """Test built-in eval prompts send single-brace JSON to the model"""
+        manager = PromptManager()
+        prompt = manager.get_prompt("openai", "fact_recall", "prompt_evals")
+        text = prompt.format(category="c", gold_fact="g", pred_facts="[]")
+        assert "{{" not in text and '{\n    "best_match"' in text
+        assert "{{" not in manager.get_prompt("llama", "specificity_evaluation", "prompt_evals").system_prompt
+
+    def test_builtin_templates_str_format(self):
+        """Test every built-in template still renders with plain str.format"""
+        for prompt in PromptManager().catalog.all_prompts():
+            values = {name: f"<{name}>" for name in prompt.template_fields.fields}
+            assert prompt.user_prompt_template.format(**values) == prompt.format(**values), prompt
+
+    def test_catalog_json_examples(self):
+        """Test the catalog-wide check passes and catches doubled braces"""
+        manager = PromptManager()
+        assert manager.check_json_examples() == []
+        broken = make_prompt('Return:\n{{{{"match": "{a}"}}}}', {"a": "A"})
+        issues = check_json_examples([broken])
+        assert [(i.field, i.line, i.kind) for i in issues] == [
+            ("user_prompt_template", 2, "double_braces"),
+        ]
+        unbalanced = make_prompt("x", {})
+        unbalanced.system_prompt = '{"a": {"b": 1}'
+        assert check_json_examples([unbalanced])[0].kind == "unbalanced"
+
+    def test_strict_catalog_json_examples(self):
+        """Test built-in examples parse in strict mode, schema placeholders included"""
+        assert PromptManager().check_json_examples(strict=True) == []
+        schema = make_prompt("x", {})
+        schema.system_prompt = '{"label": "A" or "B", "score": <number 1-5>, "confidence": 0.0-1.0}'
+        assert check_json_examples([schema], strict=True) == []
+        schema.system_prompt = '{"label": "A", "score": 3,}'
+        assert [issue.kind for issue in check_json_examples([schema], strict=True)] == ["invalid_json"]
@@ -0,0 +1,163 @@
+"""
+Tests for token-budget truncation at render time
+"""
+
+import json
+
+import pytest
+
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.tokens import estimate_tokens
+from farmerchat_prompts.truncation import (
+    TRUNCATION_MARKER,
+    template_costs,
+    truncate_facts,
+    truncate_head,
+    truncate_middle,
+    truncate_tail,
+)
+
+TEXT = " ".join(f"word{index}" for index in range(200))
+
+FACTS = [
+    {"fact": f"Apply {index * 5} kg urea per acre at tillering", "confidence": confidence}
+    for index, confidence in enumerate([0.9, 0.4, 0.8, 0.6, 0.95, 0.5] * 5)
+]
+
+
+class TestPolicies:
+    """Test cases for the individual truncation policies"""
+
+    @pytest.mark.parametrize("truncate", [truncate_head, truncate_tail, truncate_middle])
+    def test_fits_budget(self, truncate):
+        """Test every text policy meets its token limit"""
+        result = truncate(TEXT, 50)
+        assert estimate_tokens(result) <= 50
+        assert TRUNCATION_MARKER in result
+
+    def test_head_and_tail(self):
+        """Test head keeps the start and tail keeps the end"""
+        assert truncate_head(TEXT, 50).startswith("word0 ")
+        assert truncate_tail(TEXT, 50).endswith("word199")
+
+    def test_middle_keeps_both_ends(self):
+        """Test middle truncation keeps the start and the end"""
+        result = truncate_middle(TEXT, 50)
+        assert result.startswith("word0 ") and result.endswith("word199")
+
+    def test_short_text_unchanged(self):
+        """Test texts within the limit are returned as is"""
+        assert truncate_middle("short text", 50) == "short text"
+
+    def test_tiny_limit_drops_value(self):
+        """Test a limit below the marker size empties the value"""
+        assert truncate_head(TEXT, 2) == ""
+
+    def test_facts_drop_lowest_confidence(self):
+        """Test the facts policy keeps high-confidence facts"""
+        text = json.dumps(FACTS)
+        result = json.loads(truncate_facts(text, estimate_tokens(text) // 2))
+        confidences = {fact["confidence"] for fact in result}
+        assert 0.4 not in confidences
+        assert 0.95 in confidences and 0.9 in confidences
+        # Survivors keep their original order
+        assert result == [fact for fact in FACTS if fact in result]
+
+    def test_facts_object_and_levels(self):
+        """Test {"facts": [...]} objects and High/Med/Low confidences"""
+        data = {"facts": [
+            {"fact": "Neem oil controls aphids on mustard", "confidence": "Low"},
+            {"fact": "Sow mustard by mid October in Bihar", "confidence": "High"},
+        ], "total": 2}
+        text = json.dumps(data)
+        result = json.loads(truncate_facts(text, estimate_tokens(text) - 5))
+        assert [fact["confidence"] for fact in result["facts"]] == ["High"]
+        assert result["total"] == 2
+
+    def test_fact_lines(self):
+        """Test plain lines use inline confidence scores"""
+        text = "\n".join([
+            '- "Crop rotation disrupts pest life cycles" (confidence: 0.9)',
+            '- "Burn stubble after harvest" (confidence: 0.3)',
+            '- "Rotating crops reduces pest buildup" (confidence: 0.85)',
+        ])
+        result = truncate_facts(text, estimate_tokens(text) - 5)
+        assert "stubble" not in result
+        assert result.count("\n") == 1
+
+    def test_template_costs(self):
+        """Test literal tokens and placeholder counts are taken from the template"""
+        literal, occurrences = template_costs("Crop: {crop}\nAgain {crop} in {place}")
+        assert occurrences == {"crop": 2, "place": 1}
+        assert literal == estimate_tokens("Crop: \nAgain  in ")
+
+
+class TestFormatBudget:
+    """Test cases for Prompt.format(token_budget=...)"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.recall = self.manager.get_prompt("openai", "fact_recall", "prompt_evals")
+        self.values = {
+            "category": "fertilizer",
+            "gold_fact": "Apply urea at tillering",
+            "pred_facts": json.dumps(FACTS * 4),
+        }
+
+    def test_no_budget_unchanged(self):
+        """Test format without a budget renders everything"""
+        assert json.dumps(FACTS * 4) in self.recall.format(**self.values)
+
+    def test_within_budget_unchanged(self):
+        """Test values are untouched when the prompt already fits"""
+        rendered = self.recall.format(**self.values)
+        assert self.recall.format(
+            token_budget=estimate_tokens(rendered) + 10,
+            truncation={"pred_facts": "facts"},
+            **self.values,
+        ) == rendered
+
+    @pytest.mark.parametrize("policy", ["head", "tail", "middle", "facts"])
+    def test_budget_met(self, policy):
+        """Test each policy brings the rendered prompt under budget"""
+        rendered = self.recall.format(
+            token_budget=800, truncation={"pred_facts": policy}, **self.values
+        )
+        assert estimate_tokens(rendered) <= 800
+        assert "Apply urea at tillering" in rendered
+
+    def test_reduction_spread_over_largest_fields(self):
+        """Test a small field is left alone while a large one is cut"""
+        values = dict(self.values, gold_fact="Apply urea " * 20)
+        rendered = self.recall.format(
+            token_budget=900,
+            truncation={"pred_facts": "head", "gold_fact": "head"},
+            **values,
+        )
+        assert "Apply urea " * 20 in rendered
+        assert estimate_tokens(rendered) <= 900
+
+    def test_impossible_budget(self):
+        """Test budgets below the fixed text raise ValueError"""
+        with pytest.raises(ValueError, match="Cannot fit template into 10 tokens"):
+            self.recall.format(token_budget=10, truncation={"pred_facts": "head"}, **self.values)
+
+    def test_unknown_policy_and_field(self):
+        """Test unknown policies and fields are rejected"""
+        with pytest.raises(ValueError, match="Truncation policy 'start' not supported"):
+            self.recall.format(token_budget=100, truncation={"pred_facts": "start"}, **self.values)
+        with pytest.raises(ValueError, match="Field 'facts' not found"):
+            self.recall.format(token_budget=100, truncation={"facts": "head"}, **self.values)
+
+    def test_optional_field_truncated(self):
+        """Test an optional field can be cut while required fields stay intact"""
+        prompt = self.manager.get_prompt("openai", "crop_recommendation")
+        values = {name: "Patna" for name in prompt.template_fields.required}
+        values["additional_info"] = "Farmer notes on the last season. " * 100
+        rendered = prompt.format(
+            token_budget=150, truncation={"additional_info": "tail"}, **values
+        )
+        assert estimate_tokens(rendered) <= 150
+        assert "Location: Patna" in rendered
+        assert rendered.rstrip().endswith("Farmer notes on the last season.")
@@ -0,0 +1,134 @@
+"""
+Tests for versioned prompts and traffic splitting
+"""
+
+from collections import Counter
+
+import pytest
+from farmerchat_prompts import PromptManager
+from farmerchat_prompts.versioning import version_selectors, version_sort_key
+
+
+class TestVersionHelpers:
+    """Test cases for version ordering and selectors"""
+
+    def test_sort_key(self):
+        """Test numeric ordering and pre-releases"""
+        versions = ["1.10.0", "1.2.0", "1.2.0-beta", "1.9"]
+        assert sorted(versions, key=version_sort_key) == ["1.2.0-beta", "1.2.0", "1.9", "1.10.0"]
+
+    def test_selectors(self):
+        """Test selectors generated for a version"""
+        assert version_selectors("1.2.3") == [
+            "1.2.3", "1.2", "1.2.x", "1.2.*", "1", "1.x", "1.*", "latest"
+        ]
+
+
+class TestVersionedRegistry:
+    """Test cases for multiple coexisting versions"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.manager = PromptManager()
+        self.v1 = self.manager.get_prompt("openai", "crop_recommendation")
+        self.manager.register_prompts([
+            self._variant("1.1.0"),
+            self._variant("1.2.0"),
+            self._variant("2.0.0-beta"),
+        ])
+
+    def _variant(self, version):
+        metadata = self.v1.metadata.model_copy(update={"version": version})
+        return self.v1.model_copy(update={"metadata": metadata, "system_prompt": f"v{version}"})
+
+    def test_versions_coexist(self):
+        """Test registering a new version keeps the old one"""
+        assert self.manager.get_versions("openai", "crop_recommendation") == [
+            "1.0.0", "1.1.0", "1.2.0", "2.0.0-beta"
+        ]
+        assert self.manager.get_prompt("openai", "crop_recommendation", version="1.0.0") is self.v1
+        assert self.manager.get_stats()["total_prompts"] == len(self.manager.list_all_prompts())
+
+    def test_selectors_resolve_highest_match(self):
+        """Test selector resolution"""
+        get = lambda version: self.manager.get_prompt(
+            "openai", "crop_recommendation", version=version
+        ).metadata.version
+        assert get("1.x") == "1.2.0"
+        assert get("1.1") == "1.1.0"
+        assert get("latest") == "1.2.0"
+        assert get("2.x") == "2.0.0-beta"
+        assert self.manager.get_prompt("openai", "crop_recommendation").metadata.version == "1.2.0"
+
+    def test_prereleases_only_when_no_stable_match(self):
+        """Test latest and ranges skip pre-releases while a stable version matches"""
+        self.manager.register_prompts([self._variant("1.3.0-beta")])
+        get = lambda version: self.manager.get_prompt(
+            "openai", "crop_recommendation", version=version
+        ).metadata.version
+        assert get("1.x") == "1.2.0"
+        assert get("1.3") == "1.3.0-beta"
+        assert get("1.3.0-beta") == "1.3.0-beta"
+        assert get("latest") == "1.2.0"
+
+    def test_exact_version_beats_prefix(self):
+        """Test an exact version is not shadowed by a longer version's prefix selector"""
+        self.manager.register_prompts([self._variant("1.2"), self._variant("1.2.5")])
+        get = lambda version: self.manager.get_prompt(
+            "openai", "crop_recommendation", version=version
+        ).metadata.version
+        assert get("1.2") == "1.2"
+        assert get("1.2.x") == "1.2.5"
+
+    def test_unknown_version(self):
+        """Test a clear error for missing versions"""
+        with pytest.raises(ValueError, match="Version '3.x' not found"):
+            self.manager.get_prompt("openai", "crop_recommendation", version="3.x")
+
+    def test_traffic_split_is_sticky_and_weighted(self):
+        """Test users are assigned consistently and roughly by weight"""
+        self.manager.set_traffic_split(
+            "openai", "crop_recommendation", weights={"1.0.0": 80, "1.2.0": 20}
+        )
+        assign = lambda user: self.manager.get_prompt(
+            "openai", "crop_recommendation", user_id=user
+        ).metadata.version
+
+        assert assign("farmer-7") == assign("farmer-7")
+        counts = Counter(assign(f"farmer-{i}") for i in range(5000))
+        assert set(counts) == {"1.0.0", "1.2.0"}
+        assert 0.75 < counts["1.0.0"] / 5000 < 0.85
+
+        # Without a user id the latest stable version is served
+        assert self.manager.get_prompt("openai", "crop_recommendation").metadata.version == "1.2.0"
+
+    def test_traffic_split_survives_registration_and_can_be_removed(self):
+        """Test splits carry over to new snapshots"""
+        self.manager.set_traffic_split("openai", "crop_recommendation", weights={"1.1.0": 1})
+        self.manager.register_prompts([self._variant("1.3.0")])
+        assert self.manager.get_prompt(
+            "openai", "crop_recommendation", user_id="u"
+        ).metadata.version == "1.1.0"
+
+        self.manager.clear_traffic_split("openai", "crop_recommendation")
+        assert self.manager.get_prompt(
+            "openai", "crop_recommendation", user_id="u"
+        ).metadata.version == "1.3.0"
+
+    def test_traffic_split_unknown_version(self):
+        """Test splits reject versions that don't exist"""
+        with pytest.raises(ValueError, match="Versions not found"):
+            self.manager.set_traffic_split(
+                "openai", "crop_recommendation", weights={"9.9.9": 1}
+            )
+
+    def test_traffic_split_requires_weights(self):
+        """Test weights must be given explicitly, so a split is never removed by accident"""
+        self.manager.set_traffic_split("openai", "crop_recommendation", weights={"1.1.0": 1})
+        with pytest.raises(TypeError):
+            self.manager.set_traffic_split("openai", "crop_recommendation")
+        with pytest.raises(ValueError, match="clear_traffic_split"):
+            self.manager.set_traffic_split("openai", "crop_recommendation", weights=None)
+        assert self.manager.get_prompt(
+            "openai", "crop_recommendation", user_id="u"
+        ).metadata.version == "1.1.0"